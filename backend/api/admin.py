@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 from datetime import datetime
@@ -83,6 +84,20 @@ async def get_rate_limiting_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting rate limiting stats: {str(e)}")
 
+@router.get("/stats/cache")
+async def get_cache_stats():
+    """Статистика кэшей: настройки приложения, HTTP-кэш парсеров и кэш ответов модели"""
+    from services.settings_service import settings_service
+    from services.http_cache import http_cache
+    from services.llm_cache import llm_cache
+    
+    # Размеры кэшей считаются запросами к БД / SQLite - не в event loop
+    return {
+        "settings": settings_service.get_cache_stats(),
+        "http": await asyncio.to_thread(http_cache.get_stats) if http_cache else None,
+        "llm": await asyncio.to_thread(llm_cache.get_stats) if llm_cache else None
+    }
+
 @router.get("/stats/database")
 async def get_database_stats():
     """Статистика производительности базы данных"""
@@ -28,21 +28,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
 
     # Проверяем токен
-    logger.info(f"Verifying token: {credentials.credentials[:20]}...")
-    username = auth_service.verify_token(credentials.credentials)
-    if username is None:
+    payload = auth_service.decode_token(credentials.credentials)
+    if payload is None:
         logger.warning("Token verification failed")
         raise credentials_exception
 
-    logger.info(f"Token verified for username: {username}")
-
-    # Получаем пользователя
-    user = auth_service.get_user_by_username(username)
+    # Получаем пользователя (кэш на AUTH_USER_CACHE_TTL секунд)
+    user = auth_service.get_user_for_token(payload)
     if user is None:
-        logger.warning(f"User not found: {username}")
+        logger.warning(f"User not found: {payload['sub']}")
         raise credentials_exception
 
-    logger.info(f"User authenticated: {user.username}, role: {user.role}")
+    logger.debug(f"User authenticated: {user.username}, role: {user.role}")
     return user
 
 
@@ -95,11 +92,10 @@ async def get_current_user_optional(
     if not token:
         return None
     try:
-        username = auth_service.verify_token(token)
-        if username is None:
+        payload = auth_service.decode_token(token)
+        if payload is None:
             return None
         
-        user = auth_service.get_user_by_username(username)
-        return user
+        return auth_service.get_user_for_token(payload)
     except:
         return None
\ No newline at end of file
@@ -3,10 +3,10 @@ API endpoints для мониторинга расходов
 """
 
 from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Optional
-from datetime import datetime, date
+from typing import Dict, List, Optional
+from datetime import datetime, date, time, timedelta
 from sqlmodel import Session, select, func
-from sqlalchemy import text
+from sqlalchemy import text, tuple_
 from database.models import (
     ExpenseCreate, ExpenseRead, ExpenseSummary, 
     Expense, User, ExpenseType, ProjectType
@@ -42,6 +42,74 @@ EXPENSE_TYPE_COSTS = {
 }
 
 
+def _created_at_range(date_from: Optional[date], date_to: Optional[date]) -> list:
+    """
+    Условия на created_at для периода [date_from, date_to] включительно
+    
+    Диапазон по самой колонке (а не date(created_at)) позволяет использовать
+    индекс по created_at.
+    """
+    conditions = []
+    if date_from:
+        conditions.append(Expense.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        conditions.append(Expense.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    return conditions
+
+
+def _expense_groups(session: Session, conditions: list) -> Dict[str, list]:
+    """
+    Суммы и количество расходов по проектам, пользователям и типам
+    
+    В PostgreSQL - один запрос с GROUP BY GROUPING SETS, в SQLite - по
+    запросу на группировку. Учитываются только расходы существующих
+    пользователей.
+    
+    Returns:
+        {"project": [(project, amount, count)],
+         "user": [((user_id, username), amount, count)],
+         "type": [(expense_type, amount, count)]}
+    """
+    amount = func.coalesce(func.sum(Expense.amount), 0)
+    count = func.count(Expense.id)
+    groupings = {
+        "project": (Expense.project,),
+        "user": (Expense.user_id, User.username),
+        "type": (Expense.expense_type,),
+    }
+    
+    def base(*columns):
+        return (
+            select(*columns, amount, count)
+            .join(User, Expense.user_id == User.id)
+            .where(*conditions)
+        )
+    
+    groups = {name: [] for name in groupings}
+    if session.get_bind().dialect.name != "postgresql":
+        for name, columns in groupings.items():
+            for row in session.exec(base(*columns).group_by(*columns)).all():
+                key = tuple(row[:len(columns)]) if len(columns) > 1 else row[0]
+                groups[name].append((key, row[-2], row[-1]))
+        return groups
+    
+    query = base(
+        Expense.project, Expense.user_id, User.username, Expense.expense_type,
+        func.grouping(Expense.project).label("project_grouped"),
+        func.grouping(Expense.user_id).label("user_grouped")
+    ).group_by(func.grouping_sets(*(tuple_(*columns) for columns in groupings.values())))
+    
+    for project, user_id, username, expense_type, project_grouped, user_grouped, total, total_count in session.exec(query).all():
+        # GROUPING(col) = 0: колонка входит в набор группировки этой строки
+        if not project_grouped:
+            groups["project"].append((project, total, total_count))
+        elif not user_grouped:
+            groups["user"].append(((user_id, username), total, total_count))
+        else:
+            groups["type"].append((expense_type, total, total_count))
+    return groups
+
+
 @router.get("", response_model=dict)
 async def get_expenses(
     date_from: Optional[date] = Query(None, description="Дата начала периода"),
@@ -60,10 +128,7 @@ async def get_expenses(
         query = select(Expense, User.username).join(User, Expense.user_id == User.id)
         
         # Применяем фильтры
-        if date_from:
-            query = query.where(func.date(Expense.created_at) >= date_from)
-        if date_to:
-            query = query.where(func.date(Expense.created_at) <= date_to)
+        query = query.where(*_created_at_range(date_from, date_to))
         if user_id:
             query = query.where(Expense.user_id == user_id)
         if project:
@@ -90,7 +155,9 @@ async def get_expenses(
                 "expenseType": expense.expense_type,
                 "expenseTypeName": EXPENSE_TYPE_NAMES.get(expense.expense_type, expense.expense_type),
                 "amount": float(expense.amount),
-                "description": expense.description or f"{EXPENSE_TYPE_NAMES.get(expense.expense_type)} для проекта {PROJECT_NAMES.get(expense.project)}"
+                "description": expense.description or f"{EXPENSE_TYPE_NAMES.get(expense.expense_type)} для проекта {PROJECT_NAMES.get(expense.project)}",
+                "cacheHit": expense.cache_hit,
+                "tokensSaved": expense.tokens_saved
             }
             expenses.append(expense_data)
         
@@ -185,65 +252,57 @@ async def get_expenses_summary(
     Получить сводку расходов
     """
     try:
-        # Базовый запрос
-        query = select(Expense).join(User, Expense.user_id == User.id)
+        conditions = _created_at_range(date_from, date_to)
+        groups = _expense_groups(session, conditions)
         
-        # Применяем фильтры по датам
-        if date_from:
-            query = query.where(func.date(Expense.created_at) >= date_from)
-        if date_to:
-            query = query.where(func.date(Expense.created_at) <= date_to)
-            
-        expenses = session.exec(query).all()
+        # Каждый расход попадает ровно в одну группу по типу
+        total_amount = sum(amount for _, amount, _ in groups["type"])
+        expenses_count = sum(count for _, _, count in groups["type"])
         
-        # Общая сумма и количество
-        total_amount = sum(expense.amount for expense in expenses)
-        expenses_count = len(expenses)
-        
-        # Группировка по проектам
+        # Группировка по проектам (все проекты, в том числе без расходов)
+        project_totals = {project: (amount, count) for project, amount, count in groups["project"]}
         by_project = {}
         for project_type in ProjectType:
-            project_expenses = [e for e in expenses if e.project == project_type]
+            amount, count = project_totals.get(project_type.value, (0, 0))
             by_project[project_type.value] = {
                 "name": PROJECT_NAMES.get(project_type.value, project_type.value),
-                "amount": sum(e.amount for e in project_expenses),
-                "count": len(project_expenses)
+                "amount": amount,
+                "count": count
             }
         
         # Группировка по пользователям
-        by_user = {}
-        user_expenses = {}
-        for expense in expenses:
-            if expense.user_id not in user_expenses:
-                user_expenses[expense.user_id] = []
-            user_expenses[expense.user_id].append(expense)
-            
-        for user_id, user_expense_list in user_expenses.items():
-            user = session.get(User, user_id)
-            if user:
-                by_user[user_id] = {
-                    "name": user.username,
-                    "amount": sum(e.amount for e in user_expense_list),
-                    "count": len(user_expense_list)
-                }
+        by_user = {
+            user_id: {"name": username, "amount": amount, "count": count}
+            for (user_id, username), amount, count in groups["user"]
+        }
         
         # Группировка по типам расходов
+        type_totals = {expense_type: (amount, count) for expense_type, amount, count in groups["type"]}
         by_type = {}
         for expense_type in ExpenseType:
-            type_expenses = [e for e in expenses if e.expense_type == expense_type]
+            amount, count = type_totals.get(expense_type.value, (0, 0))
             by_type[expense_type] = {
                 "name": EXPENSE_TYPE_NAMES.get(expense_type, expense_type),
-                "amount": sum(e.amount for e in type_expenses),
-                "count": len(type_expenses),
+                "amount": amount,
+                "count": count,
                 "cost_per_unit": EXPENSE_TYPE_COSTS.get(expense_type, 0)
             }
         
+        # Операции, выполненные по кэшированному ответу модели
+        cache_hits, tokens_saved = session.exec(
+            select(func.count(Expense.id), func.coalesce(func.sum(Expense.tokens_saved), 0))
+            .join(User, Expense.user_id == User.id)
+            .where(Expense.cache_hit == True, *conditions)  # noqa: E712
+        ).one()
+        
         return ExpenseSummary(
             total_amount=total_amount,
             expenses_count=expenses_count,
             by_project=by_project,
             by_user=by_user,
-            by_type=by_type
+            by_type=by_type,
+            cache_hits=cache_hits,
+            tokens_saved=tokens_saved
         )
         
     except Exception as e:
@@ -311,10 +370,15 @@ async def auto_create_expense(
     description: Optional[str] = None,
     related_article_id: Optional[int] = None,
     related_session_id: Optional[str] = None,
-    session: Session = None
+    session: Session = None,
+    cache_hit: bool = False,
+    tokens_saved: Optional[int] = None
 ):
     """
     Автоматически создать расход (для использования в других сервисов)
+    
+    Сумма расхода не зависит от cache_hit: тариф - за операцию, а не за токены.
+    Попадание в кэш и сэкономленные токены сохраняются для отчета.
     """
     logger.info(f"[ENTRY] auto_create_expense called: user_id={user_id}, project={project}, expense_type={expense_type}, session={session is not None}")
     if not session:
@@ -322,7 +386,8 @@ async def auto_create_expense(
         with Session(engine) as session:
             return await auto_create_expense(
                 user_id, project, expense_type, description,
-                related_article_id, related_session_id, session
+                related_article_id, related_session_id, session,
+                cache_hit, tokens_saved
             )
     
     try:
@@ -401,6 +466,8 @@ async def auto_create_expense(
             description=description or f"{EXPENSE_TYPE_NAMES.get(final_expense_type)} для проекта {PROJECT_NAMES.get((final_project_enum.value if final_project_enum else final_project_value))}",
             related_article_id=related_article_id,
             related_session_id=related_session_id,
+            cache_hit=cache_hit,
+            tokens_saved=tokens_saved,
         )
         
         session.add(expense)
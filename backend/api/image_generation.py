@@ -1,10 +1,11 @@
+import asyncio
 import os
-import uuid
 from pathlib import Path
 from typing import Optional
 import logging
 
 from fastapi import APIRouter, HTTPException, Request, Depends, UploadFile, File
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
@@ -12,6 +13,7 @@ from core.config import settings
 from api.dependencies import get_current_user_optional, get_current_user
 from database.models import User
 from services.kie_image_client import get_kie_client
+from services.image_store import image_store, VARIANTS
 
 logger = logging.getLogger(__name__)
 
@@ -82,16 +84,21 @@ async def generate_image(
         username = current_user.username if current_user else 'anonymous'
         logger.info(f"Генерируем изображение для пользователя {username}: {prompt[:100]}...")
 
-        # Генерация изображения через KIE AI
-        image_bytes = await kie_client.generate_image(prompt)
+        # Генерация изображения через KIE AI, результат скачивается
+        # потоково сразу в файл (PNG формат от KIE)
+        filepath = image_store.temp_path("png")
+        try:
+            size = await kie_client.generate_image_to_file(prompt, filepath)
 
-        if not image_bytes:
-            raise RuntimeError("Пустой ответ от KIE API")
+            if not size:
+                raise RuntimeError("Пустой ответ от KIE API")
 
-        # Сохранение файла (PNG формат от KIE)
-        filename = f"{uuid.uuid4().hex}.png"
-        filepath = STORAGE_DIR / filename
-        filepath.write_bytes(image_bytes)
+            # Перенос в хранилище (имя по SHA-256) и построение вариантов
+            filename = await image_store.ingest_file(filepath, "png")
+        except BaseException:
+            # Не оставляем на диске пустой или недоперенесенный файл
+            await asyncio.to_thread(filepath.unlink, missing_ok=True)
+            raise
 
         # Формирование URL для доступа к изображению
         base_url = os.getenv('IMAGE_SERVICE_PUBLIC_BASE_URL', str(request.base_url)).rstrip("/")
@@ -178,12 +185,8 @@ async def upload_image(
         }
         file_extension = extension_map.get(file.content_type, 'jpg')
 
-        # Генерируем уникальное имя файла
-        filename = f"{uuid.uuid4().hex}.{file_extension}"
-        filepath = STORAGE_DIR / filename
-
-        # Сохраняем файл
-        filepath.write_bytes(file_content)
+        # Сохраняем файл: имя по SHA-256, повторная загрузка того же файла не дублирует его
+        filename = await image_store.ingest_bytes(file_content, file_extension)
 
         # Формируем URL для доступа к изображению
         base_url = os.getenv('IMAGE_SERVICE_PUBLIC_BASE_URL', str(request.base_url)).rstrip("/")
@@ -205,3 +208,28 @@ async def upload_image(
         error_msg = f"Ошибка загрузки изображения: {str(e)}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
+
+
+@router.get("/{digest}/{variant}")
+async def get_image_variant(digest: str, variant: str, request: Request):
+    """
+    Уменьшенный вариант изображения из хранилища (thumb, telegram, bitrix)
+
+    WebP отдается клиентам, которые его принимают (Accept), остальным - JPEG.
+    Если вариант еще не построен, отдается оригинал.
+    """
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=404, detail="Неизвестный вариант изображения")
+
+    formats = VARIANTS[variant][1]
+    accepts_webp = "image/webp" in request.headers.get("accept", "")
+    fmt = "webp" if accepts_webp and "webp" in formats else ("jpg" if "jpg" in formats else formats[0])
+
+    for extension in ("png", "jpg", "webp", "gif"):
+        path = image_store.local_path(f"/images/{digest}.{extension}", variant, fmt)
+        if path:
+            # Вариант неизменен (имя по содержимому); оригинал вместо варианта кэшируем ненадолго
+            cache_control = "public, max-age=31536000, immutable" if path.parent.name == digest else "public, max-age=300"
+            return FileResponse(str(path), headers={"Cache-Control": cache_control, "Vary": "Accept"})
+
+    raise HTTPException(status_code=404, detail="Изображение не найдено")
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from typing import List, Optional
 from models.schemas import ParseRequest, AdaptedNews, AdaptationRequest
 from services.news_parser_manager import news_parser_manager
+from services.base_parser import collect_fetch_stats, new_fetch_stats
 from core.config import settings
 from database.models import SourceType, ArticleRead, SourceStatsRead, ParseSessionRead
 from database.service import news_service
@@ -144,11 +145,14 @@ async def parse_news_to_database(request: ParseRequest):
                 logger.info(f"Parsing from {source}...")
                 
                 # Парсим новости
+                fetch_stats = new_fetch_stats()
                 articles = await news_parser_manager.parse_news_from_source(
                     source=source,
                     max_articles=request.max_articles,
                     date_filter=request.date_filter,
-                    fetch_full_content=request.fetch_full_content
+                    fetch_full_content=request.fetch_full_content,
+                    skip_known_urls=True,
+                    fetch_stats=fetch_stats
                 )
                 
                 # Сохраняем в базу данных
@@ -159,7 +163,8 @@ async def parse_news_to_database(request: ParseRequest):
                     session_id=session_id,
                     parsed_count=len(articles),
                     saved_count=save_result["saved"],
-                    duplicate_count=save_result["duplicates"]
+                    duplicate_count=save_result["duplicates"],
+                    fetch_stats=fetch_stats
                 )
                 
                 results[source] = {
@@ -423,6 +428,7 @@ async def delete_article(article_id: int):
             if not article:
                 raise HTTPException(status_code=404, detail="Article not found")
             
+            news_service.record_daily_articles(session, article.source_site, -1, article.created_at.date())
             session.delete(article)
             return {"message": f"Article {article_id} deleted successfully"}
     except HTTPException:
@@ -467,6 +473,7 @@ async def parse_news_with_batch_save(request: ParseRequest):
                 
                 # Обеспечиваем наличие активной сессии
                 await news_parser_manager._ensure_parser_session(parser)
+                fetch_stats = new_fetch_stats()
                 
                 # Создаем сессию парсинга
                 session_id = news_service.create_parse_session(
@@ -501,21 +508,25 @@ async def parse_news_with_batch_save(request: ParseRequest):
                 # Запускаем парсинг с промежуточным сохранением
                 if hasattr(parser, 'parse_news_list_with_batch_save'):
                     # Используем специальный метод с пакетным сохранением (только для RIA пока)
-                    articles = await parser.parse_news_list_with_batch_save(
-                        max_articles=request.max_articles,
-                        date_filter=request.date_filter,
-                        fetch_full_content=request.fetch_full_content,
-                        batch_size=10,
-                        save_callback=save_batch
-                    )
+                    with collect_fetch_stats(fetch_stats):
+                        articles = await parser.parse_news_list_with_batch_save(
+                            max_articles=request.max_articles,
+                            date_filter=request.date_filter,
+                            fetch_full_content=request.fetch_full_content,
+                            batch_size=10,
+                            save_callback=save_batch,
+                            known_url_probe=news_service.get_known_urls
+                        )
                 else:
                     # Для остальных парсеров используем обычный парсинг + сохранение в конце
                     logger.info(f"[{source}] Using standard parsing (no batch save support)")
-                    articles = await parser.parse_news_list(
-                        max_articles=request.max_articles,
-                        date_filter=request.date_filter,
-                        fetch_full_content=request.fetch_full_content
-                    )
+                    with collect_fetch_stats(fetch_stats):
+                        articles = await parser.parse_news_list(
+                            max_articles=request.max_articles,
+                            date_filter=request.date_filter,
+                            fetch_full_content=request.fetch_full_content,
+                            known_url_probe=news_service.get_known_urls
+                        )
                     
                     # Сохраняем все статьи сразу
                     if articles:
@@ -530,7 +541,8 @@ async def parse_news_with_batch_save(request: ParseRequest):
                     session_id=session_id,
                     parsed_count=len(articles),
                     saved_count=source_saved,
-                    duplicate_count=source_duplicates
+                    duplicate_count=source_duplicates,
+                    fetch_stats=fetch_stats
                 )
                 
                 # Сохраняем результат для этого источника
@@ -623,9 +635,12 @@ async def delete_articles_by_source(source: str):
 
 @router.get("/articles-with-publication-status", response_model=List[dict])
 async def get_articles_with_publication_status(
+    response: Response,
     source: Optional[str] = Query(None, description="Фильтр по источнику"),
-    limit: int = Query(1000, description="Количество статей"),
+    limit: int = Query(1000, ge=1, le=1000, description="Количество статей"),
     offset: int = Query(0, description="Смещение для пагинации"),
+    cursor: Optional[str] = Query(None, description="Курсор keyset-пагинации (заголовок X-Next-Cursor предыдущей страницы)"),
+    include_content: bool = Query(True, description="Возвращать полный текст статей"),
 ):
     """Получение статей с информацией о публикации"""
     try:
@@ -644,86 +659,90 @@ async def get_articles_with_publication_status(
             if not source_type:
                 raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
         
-        # Получаем статьи
-        articles = news_service.get_articles(
-            source=source_type,
-            limit=limit,
-            offset=offset
-        )
-        
-        # Получаем черновики и публикации для статей
-        news_generation_service = NewsGenerationService()
+        # Статьи и их черновики одним запросом
+        try:
+            page = news_service.get_articles_with_drafts(
+                source=source_type,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                include_content=include_content
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        
+        # Маппинг кода проекта -> название
+        code_to_name = {
+            'GS': 'Gynecology School',
+            'TS': 'Therapy School',
+            'PS': 'Pediatrics School',
+            'TEST': 'Test Project',
+            'TEST2': 'Test Project 2'
+        }
 
         result = []
-        for article in articles:
-            # Получаем все черновики для статьи
-            drafts = news_generation_service.get_drafts_by_article(article.id)
+        for article in page["articles"]:
+            drafts = article["drafts"]
 
             # Получаем публикации из черновиков
-            publications = []
-
-            # Маппинг кода проекта -> название
-            code_to_name = {
-                'GS': 'Gynecology School',
-                'TS': 'Therapy School',
-                'PS': 'Pediatrics School',
-                'TEST': 'Test Project',
-                'TEST2': 'Test Project 2'
-            }
-
-            for draft in drafts:
-                if draft.is_published and draft.published_project_code:
-                    publications.append({
-                        'project_code': draft.published_project_code,
-                        'project_name': code_to_name.get(draft.published_project_code, draft.published_project_code),
-                        'bitrix_id': draft.bitrix_id,
-                        'published_at': draft.published_at.isoformat() if draft.published_at else None
-                    })
-
-            unique_pubs = publications
+            unique_pubs = [
+                {
+                    'project_code': draft["published_project_code"],
+                    'project_name': code_to_name.get(draft["published_project_code"], draft["published_project_code"]),
+                    'bitrix_id': draft["bitrix_id"],
+                    'published_at': draft["published_at"].isoformat() if draft["published_at"] else None
+                }
+                for draft in drafts
+                if draft["is_published"] and draft["published_project_code"]
+            ]
             
             # Находим один опубликованный черновик для обратной совместимости
-            published_draft = next((d for d in drafts if d.is_published), None)
+            published_draft = next((d for d in drafts if d["is_published"]), None)
 
             # Находим запланированный черновик по статусу "scheduled"
-            scheduled_draft = next((d for d in drafts if d.status == "scheduled"), None)
+            scheduled_draft = next((d for d in drafts if d["status"] == "scheduled"), None)
 
             # Проверяем наличие черновиков с готовым контентом
-            has_draft = any(d for d in drafts if d.generated_news_text or d.summary)
+            has_draft = any(d["has_content"] for d in drafts)
 
             # Получаем ID последнего черновика для возможности удаления
             latest_draft = drafts[0] if drafts else None
 
             # Формируем результат
             article_data = {
-                "id": article.id,
-                "title": article.title,
-                "url": article.url,
-                "source": article.source_site.value,
-                "published_date": article.published_date,
-                "published_time": article.published_time,
-                "created_at": article.created_at,
-                "content": article.content,
-                "author": article.author,
-                "views_count": article.views_count,
+                "id": article["id"],
+                "title": article["title"],
+                "url": article["url"],
+                "source": article["source_site"].value,
+                "published_date": article["published_date"],
+                "published_time": article["published_time"],
+                "created_at": article["created_at"],
+                "content": article.get("content"),
+                "author": article["author"],
+                "views_count": article["views_count"],
                 # Информация о публикации (legacy + расширенная)
                 "is_published": bool(unique_pubs) or (published_draft is not None),
                 "is_scheduled": scheduled_draft is not None,
-                "scheduled_at": scheduled_draft.scheduled_at.isoformat() if scheduled_draft and scheduled_draft.scheduled_at else None,
-                "published_project_code": published_draft.published_project_code if published_draft else (unique_pubs[0]["project_code"] if unique_pubs else None),
-                "published_project_name": published_draft.published_project_name if published_draft else (unique_pubs[0]["project_name"] if unique_pubs else None),
-                "bitrix_id": published_draft.bitrix_id if published_draft else (unique_pubs[0]["bitrix_id"] if unique_pubs else None),
-                "draft_published_at": published_draft.published_at if published_draft else (unique_pubs[0]["published_at"] if unique_pubs else None),
+                "scheduled_at": scheduled_draft["scheduled_at"].isoformat() if scheduled_draft and scheduled_draft["scheduled_at"] else None,
+                "published_project_code": published_draft["published_project_code"] if published_draft else (unique_pubs[0]["project_code"] if unique_pubs else None),
+                "published_project_name": published_draft["published_project_name"] if published_draft else (unique_pubs[0]["project_name"] if unique_pubs else None),
+                "bitrix_id": published_draft["bitrix_id"] if published_draft else (unique_pubs[0]["bitrix_id"] if unique_pubs else None),
+                "draft_published_at": published_draft["published_at"] if published_draft else (unique_pubs[0]["published_at"] if unique_pubs else None),
                 # Новый массив всех публикаций
                 "published_projects": unique_pubs,
                 # Информация о черновиках
                 "has_draft": has_draft,
-                "draft_id": latest_draft.id if latest_draft else None,
+                "draft_id": latest_draft["id"] if latest_draft else None,
             }
             result.append(article_data)
         
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting articles with publication status: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get articles: {str(e)}")
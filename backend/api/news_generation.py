@@ -2,6 +2,7 @@
 API эндпоинты для генерации новостей
 """
 
+import asyncio
 import json
 import time
 import logging
@@ -21,8 +22,9 @@ from database.schemas import (
 from models.schemas import ArticleDraftUpdate, PublishToBitrixRequest, PublishRequest, ScheduleRequest, PublicationMode, PublishedNewsFilter, PublishedNewsResponse
 from services.ai_service import get_ai_service
 from services.news_generation_service import news_generation_service
+from services.generation_job_service import generation_job_service, TERMINAL_STATUSES
 from services.bitrix_service import bitrix_service
-import httpx
+from services.telegram_service import convert_markdown_to_html, send_to_telegram
 from core.config import settings
 from api.expenses import auto_create_expense
 from database.models import ExpenseType
@@ -39,6 +41,54 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/news-generation", tags=["news-generation"])
 
 
+def _sse(event: str, data: Any) -> str:
+    """Кадр text/event-stream"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _sse_response(events, background: Optional[BackgroundTasks] = None) -> StreamingResponse:
+    """Потоковый ответ без буферизации в nginx"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background
+    )
+
+
+async def _log_summary_expense(current_user: Optional[User], article_id: int, article_title: str, metrics: Dict, session: Optional[Session] = None):
+    """Логирование расхода 40 ₽ за выжимку (создание новости) с отметкой о попадании в кэш"""
+    try:
+        if current_user:
+            # Преобразуем строку проекта в ProjectType
+            project = None
+            if current_user.project:
+                try:
+                    # Сначала попробуем как enum value
+                    project = ProjectType(current_user.project)
+                except ValueError:
+                    try:
+                        # Попробуем как enum name (GYNECOLOGY -> ProjectType.GYNECOLOGY)
+                        project = ProjectType[current_user.project]
+                    except KeyError:
+                        logger.warning(f"Unknown project type: {current_user.project}")
+                        # Устанавливаем fallback проект
+                        project = ProjectType.GYNECOLOGY
+
+            await auto_create_expense(
+                user_id=current_user.id,
+                project=project,
+                expense_type=ExpenseType.NEWS_CREATION,
+                description=f"Создание выжимки для статьи '{article_title[:50]}...'",
+                related_article_id=article_id,
+                session=session,
+                cache_hit=metrics.get("cache_hit", False),
+                tokens_saved=metrics.get("tokens_saved")
+            )
+    except Exception as e:
+        logger.warning(f"Failed to log expense for summary creation: {e}")
+
+
 @router.post("/summarize", response_model=ArticleSummary)
 async def summarize_article(
     request: ArticleSummaryRequest,
@@ -69,7 +119,8 @@ async def summarize_article(
             summary, metrics = await ai_service.summarize_article(
                 article_content=article.content,
                 article_title=article.title,
-                project=project_enum
+                project=project_enum,
+                force_fresh=request.force_fresh
             )
             
             processing_time = time.time() - start_time
@@ -84,42 +135,18 @@ async def summarize_article(
             )
 
             # Логируем расход 40 ₽ за выжимку (создание новости)
-            try:
-                if current_user:
-                    # Преобразуем строку проекта в ProjectType
-                    project = None
-                    if current_user.project:
-                        try:
-                            # Сначала попробуем как enum value
-                            project = ProjectType(current_user.project)
-                        except ValueError:
-                            try:
-                                # Попробуем как enum name (GYNECOLOGY -> ProjectType.GYNECOLOGY)
-                                project = ProjectType[current_user.project]
-                            except KeyError:
-                                logger.warning(f"Unknown project type: {current_user.project}")
-                                # Устанавливаем fallback проект
-                                project = ProjectType.GYNECOLOGY
-                    
-                    await auto_create_expense(
-                        user_id=current_user.id,
-                        project=project,
-                        expense_type=ExpenseType.NEWS_CREATION,
-                        description=f"Создание выжимки для статьи '{article.title[:50]}...'",
-                        related_article_id=article.id,
-                        session=session
-                    )
-            except Exception as e:
-                logger.warning(f"Failed to log expense for summary creation: {e}")
+            await _log_summary_expense(current_user, article.id, article.title, metrics, session)
             
             # Логируем успешную операцию в фоне
             background_tasks.add_task(
                 log_success_background,
                 draft_id,
                 "summary",
-                "gpt-3.5-turbo-16k",
+                metrics.get("model_used") or "gpt-3.5-turbo-16k",
                 processing_time,
-                metrics.get("tokens_used")
+                metrics.get("tokens_used"),
+                metrics.get("cache_hit", False),
+                metrics.get("tokens_saved")
             )
 
             return ArticleSummary(
@@ -176,6 +203,94 @@ async def summarize_article(
         raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера")
 
 
+@router.post("/summarize/stream")
+async def stream_summarize_article(
+    request: ArticleSummaryRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_optional)
+):
+    """
+    Создание выжимки с потоковой выдачей (text/event-stream)
+
+    События: field / delta / value по полям выжимки по мере генерации,
+    done - созданный черновик (как ответ /summarize), error - ошибка
+    (черновик с ошибкой сохраняется для восстановления).
+    """
+    with DatabaseSession() as session:
+        article = session.get(Article, request.article_id)
+        if not article:
+            raise HTTPException(status_code=404, detail="Статья не найдена")
+        article_id, article_title, article_content = article.id, article.title, article.content
+
+    try:
+        project_enum = ProjectType(request.project)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Неизвестный проект: {request.project}")
+
+    ai_service = get_ai_service()
+    created_by = current_user.id if current_user else None
+
+    async def events():
+        start_time = time.time()
+        yield _sse("start", {"article_id": article_id, "project": request.project})
+        try:
+            async for event, data in ai_service.stream_summary(article_content, article_title, project_enum, request.force_fresh):
+                if event == "result":
+                    summary, metrics = data["summary"], data["metrics"]
+                else:
+                    yield _sse(event, data)
+
+            processing_time = time.time() - start_time
+            draft_id = news_generation_service.create_draft(
+                article_id=article_id,
+                project=project_enum,
+                summary=summary.summary,
+                facts=summary.facts,
+                created_by=created_by
+            )
+        except Exception as ai_error:
+            processing_time = time.time() - start_time
+            draft_id = news_generation_service.create_draft(
+                article_id=article_id,
+                project=project_enum,
+                summary="",
+                facts=[],
+                created_by=created_by
+            )
+            news_generation_service.mark_draft_error(
+                draft_id=draft_id,
+                error_message=str(ai_error),
+                error_step="summary",
+                can_retry=True
+            )
+            background_tasks.add_task(
+                log_error_background_draft, draft_id, "summary", "gpt-3.5-turbo-16k", processing_time, str(ai_error)
+            )
+            yield _sse("error", {
+                "detail": f"Ошибка при генерации выжимки: {str(ai_error)}. Черновик {draft_id} сохранен для восстановления.",
+                "draft_id": draft_id
+            })
+            return
+
+        await _log_summary_expense(current_user, article_id, article_title, metrics)
+        background_tasks.add_task(
+            log_success_background, draft_id, "summary", metrics.get("model_used") or "gpt-3.5-turbo-16k",
+            processing_time, metrics.get("tokens_used"), metrics.get("cache_hit", False), metrics.get("tokens_saved")
+        )
+        result = ArticleSummary(
+            article_id=article_id,
+            project=request.project,
+            summary=summary.summary,
+            facts=summary.facts,
+            draft_id=draft_id
+        ).dict()
+        result["first_token_seconds"] = round(metrics["first_token_seconds"], 2)
+        result["cache_hit"] = metrics.get("cache_hit", False)
+        yield _sse("done", result)
+
+    return _sse_response(events(), background_tasks)
+
+
 @router.post("/confirm-summary", response_model=Dict[str, Any])
 async def confirm_summary(
     request: SummaryConfirmationRequest,
@@ -323,6 +438,182 @@ async def generate_article(
         raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера")
 
 
+@router.post("/generate-article/stream")
+async def stream_generate_article(
+    request: ArticleGenerationRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Генерация полной статьи с потоковой выдачей (text/event-stream)
+
+    События: field / delta / value по полям статьи по мере генерации
+    (news_text и SEO-поля - фрагментами, image_prompt и image_url - когда
+    готово изображение), done - сохраненная статья (как ответ /generate-article),
+    error - ошибка (черновик отмечается для повтора).
+    """
+    draft = news_generation_service.get_draft(request.draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Черновик не найден")
+
+    if draft.status != "summary_confirmed":
+        raise HTTPException(
+            status_code=400,
+            detail="Выжимка должна быть подтверждена перед генерацией статьи"
+        )
+
+    facts = json.loads(draft.facts) if draft.facts else []
+    with DatabaseSession() as session:
+        article = session.get(Article, draft.article_id)
+        original_title = article.title if article else "Без заголовка"
+
+    ai_service = get_ai_service()
+    draft_summary, project_enum = draft.summary, ProjectType(draft.project)
+
+    async def events():
+        start_time = time.time()
+        yield _sse("start", {"draft_id": request.draft_id})
+        try:
+            async for event, data in ai_service.stream_full_article(
+                summary=draft_summary,
+                facts=facts,
+                project=project_enum,
+                original_title=original_title,
+                formatting_options=request.formatting_options
+            ):
+                if event == "result":
+                    generated_article, metrics = data["article"], data["metrics"]
+                else:
+                    yield _sse(event, data)
+
+            processing_time = time.time() - start_time
+            news_generation_service.save_generated_content(
+                draft_id=request.draft_id,
+                generated_content={
+                    "news_text": generated_article.news_text,
+                    "seo_title": generated_article.seo_title,
+                    "seo_description": generated_article.seo_description,
+                    "seo_keywords": generated_article.seo_keywords,
+                    "image_prompt": generated_article.image_prompt,
+                    "image_url": generated_article.image_url
+                }
+            )
+        except Exception as ai_error:
+            processing_time = time.time() - start_time
+            news_generation_service.mark_draft_error(
+                draft_id=request.draft_id,
+                error_message=str(ai_error),
+                error_step="generation",
+                can_retry=True
+            )
+            background_tasks.add_task(
+                log_error_background_draft, request.draft_id, "generation", "gpt-4o", processing_time, str(ai_error)
+            )
+            yield _sse("error", {
+                "detail": f"Ошибка при генерации статьи: {str(ai_error)}. Черновик {request.draft_id} сохранен для восстановления."
+            })
+            return
+
+        background_tasks.add_task(
+            log_success_background, request.draft_id, "generation", metrics.get("model_used", "gpt-4o"),
+            processing_time, metrics.get("tokens_used")
+        )
+        result = GeneratedArticleResponse(
+            draft_id=request.draft_id,
+            news_text=generated_article.news_text,
+            seo_title=generated_article.seo_title,
+            seo_description=generated_article.seo_description,
+            seo_keywords=generated_article.seo_keywords,
+            image_prompt=generated_article.image_prompt,
+            image_url=generated_article.image_url
+        ).dict()
+        result["first_token_seconds"] = round(metrics["first_token_seconds"], 2)
+        result["stage_seconds"] = metrics["stage_seconds"]
+        yield _sse("done", result)
+
+    return _sse_response(events(), background_tasks)
+
+
+@router.post("/jobs", response_model=Dict[str, Any])
+async def create_generation_job(
+    request: ArticleGenerationRequest,
+    current_user: User = Depends(get_current_user_optional)
+):
+    """
+    Постановка генерации статьи в фоновую очередь
+
+    Возвращает ID задачи сразу; прогресс доступен через GET /jobs/{job_id}
+    и поток событий GET /jobs/{job_id}/events.
+    """
+    try:
+        draft = news_generation_service.get_draft(request.draft_id)
+        if not draft:
+            raise HTTPException(status_code=404, detail="Черновик не найден")
+
+        if draft.status != "summary_confirmed":
+            raise HTTPException(
+                status_code=400,
+                detail="Выжимка должна быть подтверждена перед генерацией статьи"
+            )
+
+        job = generation_job_service.submit(
+            draft_id=request.draft_id,
+            formatting_options=request.formatting_options,
+            created_by=current_user.id if current_user else None
+        )
+        return {"success": True, "job_id": job["job_id"], "status": job["status"], "stage": job["stage"]}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in create_generation_job: {e}")
+        raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера")
+
+
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_generation_job(job_id: int):
+    """
+    Состояние задачи генерации (результат - после завершения)
+    """
+    job = generation_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(job_id: int):
+    """
+    Поток событий задачи генерации (text/event-stream)
+
+    Событие отправляется при смене статуса или этапа, последнее - при
+    завершении задачи.
+    """
+    if not generation_job_service.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+
+    async def events():
+        last_state = None
+        idle = 0
+        while True:
+            job = generation_job_service.get_job(job_id)
+            if not job:
+                break
+            state = (job["status"], job["stage"], len(job["completed_stages"]))
+            if state != last_state:
+                last_state = state
+                idle = 0
+                yield _sse(job["status"], job)
+                if job["status"] in TERMINAL_STATUSES:
+                    break
+            else:
+                idle += 1
+                if idle % 15 == 0:
+                    yield ": keepalive\n\n"
+            await asyncio.sleep(1)
+
+    return _sse_response(events())
+
+
 @router.post("/regenerate-image", response_model=Dict[str, str])
 async def regenerate_image(
     request: RegenerateImageRequest,
@@ -555,77 +846,6 @@ async def delete_draft(draft_id: int):
         raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера")
 
 
-def convert_markdown_to_html(text: str) -> str:
-    """Конвертирует простую markdown разметку в HTML для Telegram"""
-    import re
-
-    # Конвертируем **жирный** и *жирный* в <b>жирный</b>
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'\*(.*?)\*', r'<b>\1</b>', text)
-
-    # Конвертируем _курсив_ в <i>курсив</i>
-    text = re.sub(r'_(.*?)_', r'<i>\1</i>', text)
-
-    # Конвертируем `код` в <code>код</code>
-    text = re.sub(r'`(.*?)`', r'<code>\1</code>', text)
-
-    return text
-
-
-async def send_to_telegram(text: str, photo_url: Optional[str] = None) -> None:
-    """Отправка сообщения в Telegram-канал (текст или фото с подписью).
-
-    Если photo_url недоступен публично (например, localhost), пробуем скачать байты и загрузить файл.
-    """
-    try:
-        token = settings.TELEGRAM_BOT_TOKEN
-        chat_id = settings.TELEGRAM_CHAT_ID
-        if not token or not chat_id:
-            raise RuntimeError("TELEGRAM_BOT_TOKEN/CHAT_ID не настроены")
-
-        # Конвертируем markdown в HTML для корректного отображения в Telegram
-        formatted_text = convert_markdown_to_html(text)
-
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            if photo_url:
-                # Пытаемся загрузить фото по URL и отправить как файл (надёжнее, чем отдавать URL)
-                try:
-                    # Изображения теперь генерируются и хранятся в том же backend сервисе
-                    fetch_url = photo_url
-                    try:
-                        from urllib.parse import urlparse, urlunparse
-                        parts = urlparse(photo_url)
-                        # Обновленная логика для локального доступа
-                        if parts.hostname in ("localhost", "127.0.0.1") and parts.port == 8000:
-                            # Используем localhost для доступа к собственным ресурсам
-                            fetch_url = photo_url
-                    except Exception:
-                        fetch_url = photo_url
-
-                    img_resp = await client.get(fetch_url)
-                    if img_resp.status_code == 200:
-                        img_bytes = img_resp.content
-                        url = f"https://api.telegram.org/bot{token}/sendPhoto"
-                        files = {"photo": ("image.jpg", img_bytes, "image/jpeg")}
-                        data = {"chat_id": chat_id, "caption": formatted_text, "parse_mode": "HTML"}
-                        await client.post(url, data=data, files=files)
-                    else:
-                        # Фолбэк: пробуем передать как ссылку
-                        url = f"https://api.telegram.org/bot{token}/sendPhoto"
-                        payload = {"chat_id": chat_id, "photo": photo_url, "caption": formatted_text, "parse_mode": "HTML"}
-                        await client.post(url, data=payload)
-                except Exception:
-                    # Фолбэк: отправляем как ссылку
-                    url = f"https://api.telegram.org/bot{token}/sendPhoto"
-                    payload = {"chat_id": chat_id, "photo": photo_url, "caption": formatted_text, "parse_mode": "HTML"}
-                    await client.post(url, data=payload)
-            else:
-                url = f"https://api.telegram.org/bot{token}/sendMessage"
-                payload = {"chat_id": chat_id, "text": formatted_text, "parse_mode": "HTML", "disable_web_page_preview": False}
-                await client.post(url, json=payload)
-    except Exception as e:
-        logger.error(f"Error sending message to Telegram: {e}")
-
 @router.put("/drafts/{draft_id}", response_model=Dict[str, Any])
 async def update_draft(
     draft_id: int,
@@ -1260,6 +1480,20 @@ async def retry_draft_operation(
             return await summarize_article(request, background_tasks, session, current_user)
 
         elif draft.last_error_step == "generation":
+            # Если упала фоновая задача - продолжаем ее с упавшего этапа
+            job = generation_job_service.get_latest_job(draft_id)
+            if job and job["status"] == "failed":
+                generation_job_service.resume(job["job_id"])
+                job = await generation_job_service.wait(job["job_id"], timeout=settings.GENERATION_JOB_WAIT_SECONDS)
+                if job["status"] == "failed":
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Ошибка при генерации статьи: {job['error_message']}. Черновик {draft_id} сохранен для восстановления."
+                    )
+                if job["status"] == "completed":
+                    return {"success": True, "job_id": job["job_id"], **job["result"]}
+                return {"success": True, "job_id": job["job_id"], "status": job["status"], "stage": job["stage"]}
+
             # Повторяем генерацию полной статьи
             from database.schemas import ArticleGenerationRequest
             request = ArticleGenerationRequest(draft_id=draft_id)
@@ -1467,6 +1701,79 @@ async def generate_telegram_post(
 
 
 
+@router.post("/generate-telegram-post/{draft_id}/stream")
+async def stream_generate_telegram_post(
+    draft_id: int,
+    background_tasks: BackgroundTasks,
+    request: Optional[TelegramPostRequest] = None,
+    current_user: User = Depends(get_current_user_optional)
+):
+    """
+    Генерация Telegram поста с потоковой выдачей (text/event-stream)
+
+    События: delta поля telegram_post по мере генерации, value - итоговый
+    пост (после обрезки), done - сохраненный пост (как ответ
+    /generate-telegram-post/{draft_id}).
+    """
+    draft = news_generation_service.get_draft(draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Черновик не найден")
+
+    if not draft.summary:
+        raise HTTPException(status_code=400, detail="Выжимка не найдена")
+
+    with DatabaseSession() as session:
+        article = session.get(Article, draft.article_id)
+        article_title = article.title if article else "Без заголовка"
+
+    facts = json.loads(draft.facts) if draft.facts else []
+    settings = request.settings if request and request.settings else TelegramPostSettings()
+    ai_service = get_ai_service()
+    draft_summary, project_enum = draft.summary, ProjectType(draft.project)
+
+    async def events():
+        start_time = time.time()
+        yield _sse("start", {"draft_id": draft_id})
+        try:
+            async for event, data in ai_service.stream_telegram_post(
+                article_title=article_title,
+                article_url=None,  # Для интриги не нужна ссылка в генерации
+                summary=draft_summary,
+                facts=facts,
+                project=project_enum,
+                settings=settings
+            ):
+                if event == "result":
+                    tg_post, metrics = data["telegram_post"], data["metrics"]
+                else:
+                    yield _sse(event, data)
+
+            processing_time = time.time() - start_time
+            news_generation_service.save_telegram_post(draft_id, tg_post)
+        except Exception as e:
+            processing_time = time.time() - start_time
+            background_tasks.add_task(
+                log_error_background_draft, draft_id, "telegram_post", "gpt-4o-mini", processing_time, str(e)
+            )
+            yield _sse("error", {"detail": f"Ошибка при генерации Telegram поста: {str(e)}"})
+            return
+
+        if metrics.get("success"):
+            background_tasks.add_task(
+                log_success_background, draft_id, "telegram_post", metrics.get("model_used") or "gpt-4o-mini",
+                processing_time, metrics.get("tokens_used")
+            )
+        else:
+            # Модель не ответила - сохранен простой анонс из выжимки
+            background_tasks.add_task(
+                log_error_background_draft, draft_id, "telegram_post", metrics.get("model_used") or "gpt-4o-mini",
+                processing_time, metrics.get("error", "")
+            )
+        yield _sse("done", {"success": True, "telegram_post": tg_post, "processing_time": processing_time})
+
+    return _sse_response(events(), background_tasks)
+
+
 # Фоновые задачи для логирования
 
 
@@ -1502,7 +1809,9 @@ async def log_success_background(
     operation_type: str,
     model_used: str,
     processing_time: float,
-    tokens_used: Optional[int] = None
+    tokens_used: Optional[int] = None,
+    cache_hit: bool = False,
+    tokens_saved: Optional[int] = None
 ):
     """Логирование успешной операции в фоне"""
     try:
@@ -1512,7 +1821,9 @@ async def log_success_background(
             model_used=model_used,
             success=True,
             processing_time_seconds=processing_time,
-            tokens_used=tokens_used
+            tokens_used=tokens_used,
+            cache_hit=cache_hit,
+            tokens_saved=tokens_saved
         )
         
     except Exception as e:
@@ -16,7 +16,7 @@ from database.models import (
 from pydantic import BaseModel
 from api.dependencies import get_current_user_optional
 from services.ai_service import get_ai_service
-from api.news_generation import send_to_telegram
+from services.telegram_service import send_to_telegram
 from api.expenses import auto_create_expense
 
 logger = logging.getLogger(__name__)
@@ -17,6 +17,7 @@ from database.schemas import (
     URLArticleGenerationRequest, URLArticleGenerationResponse
 )
 from database.connection import get_session
+from database.service import news_service
 from api.dependencies import require_staff
 from services.url_article_parser import url_parser
 from services.ai_service import get_ai_service
@@ -54,13 +55,16 @@ async def parse_url_article(
         ai_service = get_ai_service()
         cleaned_content, cleaning_metrics = await ai_service.clean_article_content(
             parse_result['content'],
-            request.url
+            request.url,
+            force_fresh=request.force_fresh
         )
 
         # 🔍 ПРОВЕРКА FALLBACK: если GPT упал - логируем предупреждение
         if cleaning_metrics.get('fallback', False):
             logger.error(f"🔴 GPT FALLBACK! Returning raw content. Error: {cleaning_metrics.get('error', 'Unknown')}")
             logger.error(f"🔴 Error type: {cleaning_metrics.get('error_type', 'Unknown')}, Attempts: {cleaning_metrics.get('attempts', 'Unknown')}")
+        elif cleaning_metrics.get('cache_hit', False):
+            logger.info(f"✅ Article cleanup taken from cache: {cleaning_metrics.get('tokens_saved', 0)} tokens saved")
         else:
             logger.info(f"✅ Article cleaned: {cleaning_metrics.get('reduction_percent', 0)}% reduction, "
                        f"{cleaning_metrics.get('tokens_used', 0)} tokens, attempt {cleaning_metrics.get('attempt', 1)}")
@@ -109,6 +113,7 @@ async def parse_url_article(
             )
 
             session.add(article)
+            news_service.record_daily_articles(session, SourceType.URL, 1)
             session.commit()
             session.refresh(article)
 
@@ -181,13 +186,16 @@ async def generate_article_from_url(
         ai_service = get_ai_service()
         cleaned_content, cleaning_metrics = await ai_service.clean_article_content(
             raw_content,
-            source_url
+            source_url,
+            force_fresh=request.force_fresh
         )
 
         # 🔍 ПРОВЕРКА FALLBACK: если GPT упал - логируем предупреждение
         if cleaning_metrics.get('fallback', False):
             logger.error(f"🔴 GPT FALLBACK! Returning raw content. Error: {cleaning_metrics.get('error', 'Unknown')}")
             logger.error(f"🔴 Error type: {cleaning_metrics.get('error_type', 'Unknown')}, Attempts: {cleaning_metrics.get('attempts', 'Unknown')}")
+        elif cleaning_metrics.get('cache_hit', False):
+            logger.info(f"✅ Article cleanup taken from cache: {cleaning_metrics.get('tokens_saved', 0)} tokens saved")
         else:
             logger.info(f"✅ Article cleaned: {cleaning_metrics.get('reduction_percent', 0)}% reduction, "
                        f"{cleaning_metrics.get('tokens_used', 0)} tokens, attempt {cleaning_metrics.get('attempt', 1)}, "
@@ -233,6 +241,7 @@ async def generate_article_from_url(
             )
             
             session.add(new_article)
+            news_service.record_daily_articles(session, SourceType.URL, 1)
             session.commit()
             session.refresh(new_article)
             
@@ -303,7 +312,18 @@ async def generate_article_from_url(
 
         logger.info(f"Draft created: id={draft.id} from URL {source_url}")
 
-        # Шаг 4: Логируем успешную генерацию
+        # Шаг 4: Логируем очистку (с отметкой о попадании в кэш) и успешную генерацию
+        cleanup_log = GenerationLog(
+            draft_id=draft.id,
+            operation_type="url_cleanup",
+            model_used=cleaning_metrics.get('model_used', 'gpt-4o-mini'),
+            success=not cleaning_metrics.get('fallback', False),
+            error_message=cleaning_metrics.get('error'),
+            tokens_used=cleaning_metrics.get('tokens_used', 0),
+            processing_time_seconds=cleaning_metrics.get('processing_time_seconds', 0),
+            cache_hit=cleaning_metrics.get('cache_hit', False),
+            tokens_saved=cleaning_metrics.get('tokens_saved')
+        )
         gen_log = GenerationLog(
             draft_id=draft.id,
             operation_type="url_article_generation",
@@ -313,6 +333,7 @@ async def generate_article_from_url(
             tokens_used=metrics.get('tokens_used', 0),
             processing_time_seconds=metrics.get('processing_time_seconds', 0)
         )
+        session.add(cleanup_log)
         session.add(gen_log)
         session.commit()
 
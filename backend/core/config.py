@@ -25,6 +25,20 @@ class Settings:
     # Прокси для OpenAI (для обхода блокировок РФ)
     OPENAI_PROXY_URL: str = os.getenv("OPENAI_PROXY_URL", "")
 
+    # Пул HTTP-соединений OpenAI (один клиент на провайдер, keep-alive через прокси)
+    OPENAI_HTTP2: bool = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+    # Кэш ответов модели (выжимки и очистка текста) по хэшу входных данных.
+    # Хранилище: db (таблица llm_response_cache, общая для воркеров) или disk (SQLite-файл процесса)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "db").lower()
+    LLM_CACHE_DIR: str = os.getenv("LLM_CACHE_DIR", str(BASE_DIR / "storage" / "llm_cache"))
+    LLM_CACHE_TTL_HOURS: float = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
     # KIE AI Configuration (Nano Banana - Google Gemini 2.5 Flash для генерации изображений)
     KIE_API_KEY: str = os.getenv("KIE_API_KEY", "")
     KIE_API_BASE_URL: str = os.getenv("KIE_API_BASE_URL", "https://api.kie.ai/api/v1")
@@ -78,6 +92,43 @@ class Settings:
         }
     }
     
+    # Время жизни кэша app_settings в секундах (изменения из других воркеров видны не позже TTL)
+    SETTINGS_CACHE_TTL: float = float(os.getenv("SETTINGS_CACHE_TTL", "30"))
+    
+    # Дисковый HTTP-кэш парсеров (условные запросы по ETag / Last-Modified)
+    PARSER_HTTP_CACHE_ENABLED: bool = os.getenv("PARSER_HTTP_CACHE_ENABLED", "true").lower() == "true"
+    PARSER_HTTP_CACHE_DIR: str = os.getenv("PARSER_HTTP_CACHE_DIR", str(BASE_DIR / "storage" / "http_cache"))
+    PARSER_HTTP_CACHE_MAX_MB: int = int(os.getenv("PARSER_HTTP_CACHE_MAX_MB", "200"))
+
+    # Потоки для разбора HTML парсерами (вне event loop)
+    PARSER_HTML_WORKERS: int = int(os.getenv("PARSER_HTML_WORKERS", "4"))
+
+    # Процессы для trafilatura-фолбэка парсинга по URL и предельное время извлечения (секунды)
+    URL_PARSER_EXTRACT_WORKERS: int = int(os.getenv("URL_PARSER_EXTRACT_WORKERS", "2"))
+    URL_PARSER_EXTRACT_TIMEOUT: float = float(os.getenv("URL_PARSER_EXTRACT_TIMEOUT", "20"))
+
+    # Параллельных публикаций по расписанию на один проект (1 - строго по очереди)
+    PUBLICATION_CONCURRENCY_PER_PROJECT: int = int(os.getenv("PUBLICATION_CONCURRENCY_PER_PROJECT", "2"))
+    # Воркер публикаций: максимальный сон без событий, опрос без LISTEN/NOTIFY (SQLite)
+    # и пауза перед повтором черновика, публикация которого упала
+    PUBLICATION_WORKER_MAX_SLEEP: float = float(os.getenv("PUBLICATION_WORKER_MAX_SLEEP", "300"))
+    PUBLICATION_WORKER_POLL_INTERVAL: float = float(os.getenv("PUBLICATION_WORKER_POLL_INTERVAL", "30"))
+    PUBLICATION_WORKER_RETRY_DELAY: float = float(os.getenv("PUBLICATION_WORKER_RETRY_DELAY", "60"))
+
+    # Сверка SourceStats и дневной сводки с таблицей articles (минуты, 0 - отключено)
+    SOURCE_STATS_RECONCILE_MINUTES: int = int(os.getenv("SOURCE_STATS_RECONCILE_MINUTES", "60"))
+
+    # Процессы для построения уменьшенных вариантов изображений
+    IMAGE_STORE_WORKERS: int = int(os.getenv("IMAGE_STORE_WORKERS", "2"))
+
+    # Фоновые задачи генерации статей
+    GENERATION_JOB_WORKERS: int = int(os.getenv("GENERATION_JOB_WORKERS", "2"))
+    GENERATION_JOB_POLL_INTERVAL: float = float(os.getenv("GENERATION_JOB_POLL_INTERVAL", "5"))
+    # Задача без heartbeat дольше этого времени считается брошенной и подхватывается заново
+    GENERATION_JOB_STALE_SECONDS: int = int(os.getenv("GENERATION_JOB_STALE_SECONDS", "120"))
+    # Сколько повтор после ошибки ждет завершения задачи (меньше таймаута запроса в 300 секунд)
+    GENERATION_JOB_WAIT_SECONDS: int = int(os.getenv("GENERATION_JOB_WAIT_SECONDS", "280"))
+
     # Логирование
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -115,6 +166,9 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_HOURS: int = 12
+    # Кэш пользователя для get_current_user (секунды, 0 - без кэша)
+    AUTH_USER_CACHE_TTL: float = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
     
     # Данные начального администратора
     ADMIN_USERNAME: str = os.getenv("ADMIN_USERNAME", "admin")
@@ -153,5 +207,12 @@ class Settings:
     RATE_LIMIT_ADMIN: int = int(os.getenv("RATE_LIMIT_ADMIN", "30"))
     RATE_LIMIT_DEFAULT: int = int(os.getenv("RATE_LIMIT_DEFAULT", "100"))
 
+    # Хранилище состояния лимитов: memory (в каждом процессе) или redis (общее для воркеров)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    # Память процесса: не больше RATE_LIMIT_MAX_KEYS ключей (IP + правило), разбитых на шарды
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_SHARDS: int = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+
 # Создаем экземпляр настроек
 settings = Settings()
\ No newline at end of file
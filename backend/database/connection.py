@@ -43,7 +43,7 @@ def create_db_and_tables():
     try:
         # Импортируем все модели, чтобы они были зарегистрированы
         from database.models import (
-            Article, SourceStats, ParseSession, NewsGenerationDraft, GenerationLog,
+            Article, SourceStats, ArticleDailyStats, ParseSession, NewsGenerationDraft, GenerationLog, GenerationJob, LLMCacheEntry,
             User, BitrixProjectSettings, AppSettings, PublicationLog, TelegramPost,
             Publication, Expense
         )
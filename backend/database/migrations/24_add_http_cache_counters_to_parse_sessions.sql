@@ -0,0 +1,12 @@
+-- Migration 24: Add HTTP cache counters to parse_sessions
+-- Parsers serve unchanged pages from the on-disk HTTP cache; these counters
+-- show how many responses were taken from the cache per parse session
+
+ALTER TABLE parse_sessions
+ADD COLUMN IF NOT EXISTS cache_hits INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE parse_sessions
+ADD COLUMN IF NOT EXISTS not_modified_responses INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN parse_sessions.cache_hits IS 'Страницы, отданные из HTTP-кэша без запроса к источнику';
+COMMENT ON COLUMN parse_sessions.not_modified_responses IS 'Ответы 304 Not Modified на условные запросы';
@@ -0,0 +1,31 @@
+-- Migration 25: Create generation_jobs table
+-- Background article generation: the job state and intermediate results are
+-- stored per stage so a job survives restarts and resumes at the failed stage
+
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    id SERIAL PRIMARY KEY,
+    draft_id INTEGER NOT NULL REFERENCES news_generation_drafts(id) ON DELETE CASCADE,
+    job_type VARCHAR(50) NOT NULL DEFAULT 'article_generation',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    stage VARCHAR(30) NOT NULL DEFAULT 'text',
+    payload TEXT,
+    result TEXT,
+    error_message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id VARCHAR(100),
+    heartbeat_at TIMESTAMP,
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_draft_id ON generation_jobs(draft_id);
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_created_at ON generation_jobs(created_at);
+
+COMMENT ON TABLE generation_jobs IS 'Фоновые задачи генерации статей';
+COMMENT ON COLUMN generation_jobs.stage IS 'Текущий или упавший этап: text, image_prompt, image, save';
+COMMENT ON COLUMN generation_jobs.result IS 'JSON с результатами завершенных этапов';
+COMMENT ON COLUMN generation_jobs.heartbeat_at IS 'Последний сигнал жизни воркера; устаревший heartbeat возвращает задачу в очередь';
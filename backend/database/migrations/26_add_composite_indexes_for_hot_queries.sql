@@ -0,0 +1,45 @@
+-- Migration 26: Composite and partial indexes for hot draft and article queries
+-- Single-column indexes force the planner to filter or sort large parts of
+-- the tables; these indexes match the access paths of the queries below.
+-- Check with: python scripts/check_query_plans.py --database-url <scratch db>
+
+-- Publications that are due (get_scheduled_publications, scheduler claims,
+-- publication worker): only scheduled drafts are indexed, so the index stays small
+CREATE INDEX IF NOT EXISTS idx_drafts_scheduled_due
+ON news_generation_drafts (scheduled_at)
+WHERE status = 'scheduled';
+
+-- Draft of an article for a project, newest first (get_draft_by_article_and_project)
+CREATE INDEX IF NOT EXISTS idx_drafts_article_project_created
+ON news_generation_drafts (article_id, project, created_at DESC);
+
+-- Drafts of a page of articles, newest first (get_articles_with_drafts, get_drafts_by_article)
+CREATE INDEX IF NOT EXISTS idx_drafts_article_created
+ON news_generation_drafts (article_id, created_at DESC);
+
+-- Published news list ordered by the freshest date (get_published_news)
+CREATE INDEX IF NOT EXISTS idx_drafts_published_list_order
+ON news_generation_drafts ((COALESCE(published_at, scheduled_at, created_at)) DESC)
+WHERE status IN ('scheduled', 'published', 'generated');
+
+-- Keyset pagination of articles: published_date DESC NULLS LAST, created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_articles_keyset
+ON articles (published_date DESC NULLS LAST, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_articles_source_keyset
+ON articles (source_site, published_date DESC NULLS LAST, created_at DESC, id DESC);
+
+-- Queue of background generation jobs (claim of the oldest queued job)
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_queue
+ON generation_jobs (created_at)
+WHERE status IN ('queued', 'running');
+
+COMMENT ON INDEX idx_drafts_scheduled_due IS 'Наступившие публикации: только черновики в статусе scheduled';
+COMMENT ON INDEX idx_drafts_article_project_created IS 'Последний черновик статьи для проекта';
+COMMENT ON INDEX idx_drafts_published_list_order IS 'Список публикаций по COALESCE(published_at, scheduled_at, created_at)';
+COMMENT ON INDEX idx_articles_keyset IS 'Keyset-пагинация статей (published_date, created_at, id)';
+COMMENT ON INDEX idx_articles_source_keyset IS 'Keyset-пагинация статей одного источника';
+
+ANALYZE news_generation_drafts;
+ANALYZE articles;
+ANALYZE generation_jobs;
@@ -0,0 +1,22 @@
+-- Migration 27: Create article_daily_stats table
+-- Daily per-source article counts. The counters are incremented in the same
+-- transaction as the article insert, so the dashboard and source_stats are
+-- built from a few hundred rows instead of counting the articles table
+
+CREATE TABLE IF NOT EXISTS article_daily_stats (
+    day DATE NOT NULL,
+    source_site sourcetype NOT NULL,
+    articles_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, source_site)
+);
+
+-- Заполнение по уже сохраненным статьям
+INSERT INTO article_daily_stats (day, source_site, articles_count)
+SELECT created_at::date, source_site, COUNT(*)
+FROM articles
+GROUP BY created_at::date, source_site
+ON CONFLICT (day, source_site) DO UPDATE SET articles_count = EXCLUDED.articles_count, updated_at = NOW();
+
+COMMENT ON TABLE article_daily_stats IS 'Количество статей по дням (дата created_at) и источникам';
+COMMENT ON COLUMN article_daily_stats.articles_count IS 'Обновляется при сохранении и удалении статей; сверяется с articles через NewsService.rebuild_daily_stats';
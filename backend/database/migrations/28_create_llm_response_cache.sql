@@ -0,0 +1,36 @@
+-- Migration 28: Create llm_response_cache table and cache counters
+-- Summaries and text cleanups are cached by a hash of the operation, model,
+-- request parameters and inputs. Generation logs and expenses record whether
+-- the answer came from the cache and how many tokens it saved
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    operation VARCHAR(50) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    response TEXT NOT NULL,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    accessed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_llm_response_cache_operation ON llm_response_cache(operation);
+CREATE INDEX IF NOT EXISTS ix_llm_response_cache_expires_at ON llm_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS ix_llm_response_cache_accessed_at ON llm_response_cache(accessed_at);
+
+ALTER TABLE generation_logs
+ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN NOT NULL DEFAULT FALSE,
+ADD COLUMN IF NOT EXISTS tokens_saved INTEGER;
+
+ALTER TABLE expenses
+ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN NOT NULL DEFAULT FALSE,
+ADD COLUMN IF NOT EXISTS tokens_saved INTEGER;
+
+COMMENT ON TABLE llm_response_cache IS 'Кэш ответов модели (выжимки, очистка текста); ключ - sha256 операции, модели, параметров и входных данных';
+COMMENT ON COLUMN llm_response_cache.response IS 'JSON сохраненного ответа';
+COMMENT ON COLUMN llm_response_cache.tokens IS 'Стоимость исходного ответа в токенах - экономия при каждом попадании';
+COMMENT ON COLUMN generation_logs.cache_hit IS 'Ответ модели взят из кэша llm_response_cache';
+COMMENT ON COLUMN generation_logs.tokens_saved IS 'Токены, которые потребовал бы запрос к модели';
+COMMENT ON COLUMN expenses.cache_hit IS 'Операция выполнена по кэшированному ответу модели';
+COMMENT ON COLUMN expenses.tokens_saved IS 'Токены, сэкономленные кэшем';
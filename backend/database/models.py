@@ -3,7 +3,7 @@ SQLModel модели для базы данных новостного агре
 """
 
 from __future__ import annotations
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
 from enum import Enum
@@ -78,6 +78,19 @@ class SourceStats(SQLModel, table=True):
         return f"<SourceStats(source={self.source_site}, total={self.total_articles})>"
 
 
+class ArticleDailyStats(SQLModel, table=True):
+    """Количество статей за день по источнику (сводка для дашборда и SourceStats)"""
+    __tablename__ = "article_daily_stats"
+    
+    day: date = Field(primary_key=True)
+    source_site: SourceType = Field(primary_key=True)
+    articles_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=moscow_now)
+    
+    def __repr__(self):
+        return f"<ArticleDailyStats(day={self.day}, source={self.source_site}, count={self.articles_count})>"
+
+
 class ParseSession(SQLModel, table=True):
     """Сессия парсинга для отслеживания операций"""
     __tablename__ = "parse_sessions"
@@ -91,6 +104,10 @@ class ParseSession(SQLModel, table=True):
     saved_articles: int = Field(default=0)
     duplicate_articles: int = Field(default=0)
     
+    # HTTP-кэш: ответы без запроса к источнику и ответы 304 Not Modified
+    cache_hits: int = Field(default=0)
+    not_modified_responses: int = Field(default=0)
+    
     # Статус
     status: str = Field(default="started", max_length=20)  # started, completed, failed
     error_message: Optional[str] = Field(default=None)
@@ -151,6 +168,8 @@ class ParseSessionRead(SQLModel):
     parsed_articles: int
     saved_articles: int
     duplicate_articles: int
+    cache_hits: int = 0
+    not_modified_responses: int = 0
     status: str
     error_message: Optional[str] = None
     started_at: datetime
@@ -272,6 +291,10 @@ class GenerationLog(SQLModel, table=True):
     tokens_used: Optional[int] = Field(default=None)
     processing_time_seconds: Optional[float] = Field(default=None)
     
+    # Ответ модели взят из кэша: токены не потрачены, tokens_saved - сколько стоил исходный ответ
+    cache_hit: bool = Field(default=False)
+    tokens_saved: Optional[int] = Field(default=None)
+    
     # Временная метка
     created_at: datetime = Field(default_factory=moscow_now, index=True)
     
@@ -279,6 +302,55 @@ class GenerationLog(SQLModel, table=True):
         return f"<GenerationLog(id={self.id}, operation={self.operation_type}, success={self.success})>"
 
 
+class GenerationJob(SQLModel, table=True):
+    """Фоновая задача генерации статьи (состояние переживает перезапуск)"""
+    __tablename__ = "generation_jobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    draft_id: int = Field(foreign_key="news_generation_drafts.id", index=True)
+    job_type: str = Field(default="article_generation", max_length=50)
+
+    # Состояние: queued, running, completed, failed
+    status: str = Field(default="queued", max_length=20, index=True)
+    stage: str = Field(default="text", max_length=30)  # text, image_prompt, image, save
+    payload: Optional[str] = Field(default=None)  # JSON: параметры запуска
+    result: Optional[str] = Field(default=None)  # JSON: результаты завершенных этапов
+    error_message: Optional[str] = Field(default=None)
+    attempts: int = Field(default=0)
+
+    # Исполнитель: процесс-воркер и время последнего сигнала жизни
+    worker_id: Optional[str] = Field(default=None, max_length=100)
+    heartbeat_at: Optional[datetime] = Field(default=None)
+
+    created_by: Optional[int] = Field(default=None, foreign_key="users.id")
+    created_at: datetime = Field(default_factory=moscow_now, index=True)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    updated_at: datetime = Field(default_factory=moscow_now)
+
+    def __repr__(self):
+        return f"<GenerationJob(id={self.id}, draft_id={self.draft_id}, status={self.status}, stage={self.stage})>"
+
+
+class LLMCacheEntry(SQLModel, table=True):
+    """Кэшированный ответ модели (ключ - хэш операции, модели, параметров и входных данных)"""
+    __tablename__ = "llm_response_cache"
+
+    key: str = Field(primary_key=True, max_length=64)  # sha256
+    operation: str = Field(max_length=50, index=True)  # summary, cleanup
+    model: str = Field(max_length=100)
+    response: str  # JSON: content, usage, model
+    tokens: int = Field(default=0)  # Стоимость исходного ответа в токенах
+    hits: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=moscow_now)
+    expires_at: datetime = Field(index=True)
+    accessed_at: datetime = Field(default_factory=moscow_now, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry(key={self.key[:12]}, operation={self.operation}, hits={self.hits})>"
+
+
 
 class TelegramPost(SQLModel, table=True):
     """Модель Telegram поста для опубликованных новостей"""
@@ -383,6 +455,8 @@ class GenerationLogRead(SQLModel):
     error_message: Optional[str] = None
     tokens_used: Optional[int] = None
     processing_time_seconds: Optional[float] = None
+    cache_hit: bool = False
+    tokens_saved: Optional[int] = None
     created_at: datetime
 
 
@@ -491,6 +565,10 @@ class Expense(SQLModel, table=True):
     related_article_id: Optional[int] = Field(default=None, foreign_key="articles.id")
     related_session_id: Optional[str] = Field(default=None, max_length=100)  # ID сессии GPT или другой операции
     
+    # Ответ модели взят из кэша и сколько токенов это сэкономило
+    cache_hit: bool = Field(default=False)
+    tokens_saved: Optional[int] = Field(default=None)
+    
     # Системные поля
     created_at: datetime = Field(default_factory=moscow_now, index=True)
     updated_at: Optional[datetime] = Field(default=None)
@@ -513,6 +591,8 @@ class ExpenseRead(SQLModel):
     description: Optional[str]
     related_article_id: Optional[int]
     related_session_id: Optional[str]
+    cache_hit: bool = False
+    tokens_saved: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -540,6 +620,8 @@ class ExpenseSummary(SQLModel):
     by_project: dict
     by_user: dict
     by_type: dict
+    cache_hits: int = 0
+    tokens_saved: int = 0
 
 
 # Pydantic модели для API Telegram постов
@@ -20,6 +20,7 @@ class ArticleSummaryRequest(BaseModel):
     """Запрос на создание выжимки статьи"""
     article_id: int = Field(..., description="ID статьи для обработки")
     project: ProjectType = Field(..., description="Тип проекта")
+    force_fresh: bool = Field(False, description="Не брать ответ модели из кэша")
 
 
 class ArticleSummary(BaseModel):
@@ -166,6 +167,8 @@ class GenerationLogRead(BaseModel):
     error_message: Optional[str] = None
     tokens_used: Optional[int] = None
     processing_time_seconds: Optional[float] = None
+    cache_hit: bool = False
+    tokens_saved: Optional[int] = None
     created_at: datetime
 
 
@@ -304,6 +307,7 @@ class URLArticleParseRequest(BaseModel):
     """Запрос на парсинг статьи по URL"""
     url: str = Field(..., description="URL статьи для парсинга")
     project: ProjectType = Field(..., description="Тип проекта для адаптации")
+    force_fresh: bool = Field(False, description="Не брать очистку текста из кэша")
 
 
 class URLArticleParseResponse(BaseModel):
@@ -325,6 +329,7 @@ class URLArticleGenerationRequest(BaseModel):
     project: ProjectType = Field(..., description="Тип проекта")
     formatting_options: Optional[ArticleFormattingOptions] = Field(None, description="Параметры форматирования")
     generate_image: bool = Field(True, description="Генерировать ли изображение")
+    force_fresh: bool = Field(False, description="Не брать очистку текста из кэша")
 
 
 class URLArticleGenerationResponse(BaseModel):
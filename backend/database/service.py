@@ -2,15 +2,18 @@
 Сервис для работы с базой данных новостей
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from database.models import moscow_now
 from typing import List, Optional, Dict, Any
 from sqlmodel import Session, select, func, and_, or_
-from sqlalchemy.dialects.postgresql import insert
+import base64
+from sqlalchemy import String, any_, bindparam, case, delete, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 import logging
 
-from database.models import Article, SourceStats, ParseSession, SourceType
+from database.models import Article, ArticleDailyStats, SourceStats, ParseSession, SourceType, NewsGenerationDraft
 from database.connection import DatabaseSession, get_db_session
 from models.schemas import NewsSource
 
@@ -27,6 +30,11 @@ class NewsService:
         """
         Сохранение списка статей в базу данных
         
+        Выполняется пакетно: один запрос для поиска уже сохраненных URL и
+        одна вставка ``INSERT ... ON CONFLICT (url) DO NOTHING RETURNING id``.
+        Для SQLite (тестовый движок) используется построчная вставка
+        с savepoint на каждую статью.
+        
         Args:
             articles: Список статей для сохранения
             source: Источник новостей
@@ -38,50 +46,81 @@ class NewsService:
         duplicate_count = 0
         error_count = 0
         
+        now = moscow_now()
         with DatabaseSession() as session:
+            rows = []
+            seen_urls = set()
             for article_data in articles:
                 try:
                     # Конвертируем HttpUrl в строку для SQL запросов
                     url_str = str(article_data.url)
-
-                    # Проверяем существование статьи по URL
-                    existing = session.exec(
-                        select(Article).where(Article.url == url_str)
-                    ).first()
-
-                    if existing:
+                    if url_str in seen_urls:
                         duplicate_count += 1
-                        logger.debug(f"Duplicate article found: {url_str}")
+                        logger.debug(f"Duplicate article in batch: {url_str}")
                         continue
-
-                    # Создаем новую статью
-                    article = Article(
-                        title=article_data.title,
-                        url=url_str,
-                        content=article_data.content,
-                        source_site=source,
-                        published_date=article_data.published_date,
-                        published_time=article_data.published_time,
-                        views_count=article_data.views_count,
-                        author=article_data.author,
-                        created_at=moscow_now()
-                    )
-                    
-                    session.add(article)
-                    saved_count += 1
-                    logger.info(f"Saved article: {article_data.title[:50]}...")
-                    
-                except IntegrityError as e:
-                    duplicate_count += 1
-                    logger.warning(f"Integrity error (duplicate): {e}")
-                    session.rollback()
+                    seen_urls.add(url_str)
+                    rows.append({
+                        "title": article_data.title,
+                        "url": url_str,
+                        "content": article_data.content,
+                        "source_site": source,
+                        "published_date": article_data.published_date,
+                        "published_time": article_data.published_time,
+                        "views_count": article_data.views_count,
+                        "author": article_data.author,
+                        "created_at": now
+                    })
                 except Exception as e:
                     error_count += 1
-                    logger.error(f"Error saving article {str(article_data.url)}: {e}")
-                    session.rollback()
+                    logger.error(f"Error preparing article {getattr(article_data, 'url', None)}: {e}")
+            
+            # Один запрос на все URL вместо SELECT на каждую статью
+            existing_urls = self._get_existing_urls(session, [row["url"] for row in rows])
+            if existing_urls:
+                duplicate_count += len(existing_urls)
+                logger.debug(f"Found {len(existing_urls)} already stored articles")
+                rows = [row for row in rows if row["url"] not in existing_urls]
+            
+            row_saved = 0
+            stats_applied = False
+            if rows:
+                if session.get_bind().dialect.name == "postgresql":
+                    try:
+                        inserted_ids = self._bulk_insert_articles(session, rows)
+                        # Счетчики статистики - в той же транзакции, что и вставка
+                        self._apply_saved_articles(session, source, len(inserted_ids), now)
+                        session.commit()
+                        stats_applied = True
+                        saved_count += len(inserted_ids)
+                        # Строки, вставленные параллельным процессом между prefetch и INSERT
+                        duplicate_count += len(rows) - len(inserted_ids)
+                        rows = []
+                    except Exception as e:
+                        logger.warning(f"Bulk insert failed, falling back to row-by-row insert: {e}")
+                        session.rollback()
+                
+                # Построчная вставка: SQLite или откат после ошибки пакетной вставки
+                for row in rows:
+                    try:
+                        with session.begin_nested():
+                            session.add(Article(**row))
+                        row_saved += 1
+                        saved_count += 1
+                        logger.info(f"Saved article: {row['title'][:50]}...")
+                    except IntegrityError as e:
+                        duplicate_count += 1
+                        logger.warning(f"Integrity error (duplicate): {e}")
+                    except Exception as e:
+                        error_count += 1
+                        logger.error(f"Error saving article {row['url']}: {e}")
+            
+            if not stats_applied:
+                self._apply_saved_articles(session, source, row_saved, now)
         
-        # Обновляем статистику источника
-        self.update_source_stats(source, saved_count)
+        logger.info(
+            f"Saved articles for {source}: saved={saved_count}, "
+            f"duplicates={duplicate_count}, errors={error_count}"
+        )
         
         return {
             "saved": saved_count,
@@ -90,6 +129,148 @@ class NewsService:
             "total_processed": len(articles)
         }
     
+    def _get_existing_urls(self, session: Session, urls: List[str]) -> set:
+        """Поиск уже сохраненных URL одним запросом (url = ANY(...) в PostgreSQL)"""
+        if not urls:
+            return set()
+        if session.get_bind().dialect.name == "postgresql":
+            # Один параметр-массив вместо списка из сотен bind-параметров
+            condition = Article.url == any_(bindparam("urls", urls, type_=ARRAY(String)))
+        else:
+            condition = Article.url.in_(urls)
+        return set(session.exec(select(Article.url).where(condition)).all())
+    
+    def _bulk_insert_articles(self, session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+        """Пакетная вставка статей с пропуском конфликтов по URL"""
+        stmt = (
+            insert(Article.__table__)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["url"])
+            .returning(Article.__table__.c.id)
+        )
+        return list(session.execute(stmt).scalars().all())
+    
+    def record_daily_articles(self, session: Session, source: SourceType, count: int, day: Optional[date] = None):
+        """
+        Изменение счетчика статей за день в текущей транзакции
+        
+        Вызывается при каждой вставке и удалении статей (count < 0), чтобы
+        сводка article_daily_stats не требовала пересчета таблицы articles.
+        
+        Args:
+            session: Сессия, в которой сохраняются статьи
+            source: Источник статей
+            count: Сколько статей добавлено (отрицательное - удалено)
+            day: Дата created_at статей (по умолчанию - сегодня)
+        """
+        if not count:
+            return
+        day = day or moscow_now().date()
+        table = ArticleDailyStats.__table__
+        stmt = self._upsert(session, table).values(
+            day=day, source_site=source, articles_count=count, updated_at=moscow_now()
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.source_site],
+            set_={
+                "articles_count": table.c.articles_count + stmt.excluded.articles_count,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+    
+    @staticmethod
+    def _upsert(session: Session, table):
+        """INSERT с поддержкой ON CONFLICT для диалекта сессии"""
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return insert(table)
+        if dialect == "sqlite":
+            return sqlite_insert(table)
+        raise NotImplementedError(f"Upsert is not implemented for {dialect}")
+    
+    def _apply_saved_articles(self, session: Session, source: SourceType, count: int, now: datetime):
+        """
+        Инкрементальное обновление статистики после сохранения статей
+        
+        Выполняется в транзакции вставки: счетчик за день увеличивается,
+        total_articles источника увеличивается на count без пересчета
+        articles, окна today/week/month берутся из дневной сводки.
+        """
+        self.record_daily_articles(session, source, count, now.date())
+        
+        now = now.replace(tzinfo=None)  # БД хранит время без tzinfo
+        _, today_count, week_count, month_count = self._window_counts(session, source, now.date(), with_total=False)
+        values = {
+            "articles_today": today_count,
+            "articles_this_week": week_count,
+            "articles_this_month": month_count,
+            "last_parsed_at": now,
+            "updated_at": now,
+        }
+        if count:
+            values["last_article_date"] = now
+        
+        table = SourceStats.__table__
+        stmt = self._upsert(session, table).values(
+            source_site=source, total_articles=count, created_at=now, **values
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.source_site],
+            set_={"total_articles": table.c.total_articles + count, **values}
+        ))
+    
+    @staticmethod
+    def _window_counts(session: Session, source: SourceType, today: date, with_total: bool = True):
+        """
+        Количество статей источника: всего, сегодня, за 7 и за 30 дней
+        
+        Считается по дневной сводке одним запросом. Неделя и месяц - последние
+        7 и 30 календарных дней, включая сегодня. Без with_total читается
+        только диапазон последних 30 дней (total - None).
+        """
+        daily_count = ArticleDailyStats.articles_count
+        month_start = today - timedelta(days=29)
+        
+        def window_sum(first_day: date):
+            return func.coalesce(func.sum(case((ArticleDailyStats.day >= first_day, daily_count), else_=0)), 0)
+        
+        columns = [window_sum(today), window_sum(today - timedelta(days=6)), window_sum(month_start)]
+        if with_total:
+            query = select(func.coalesce(func.sum(daily_count), 0), *columns)
+        else:
+            query = select(*columns).where(ArticleDailyStats.day >= month_start)
+        row = tuple(session.exec(query.where(ArticleDailyStats.source_site == source)).one())
+        return row if with_total else (None, *row)
+    
+    def rebuild_daily_stats(self) -> int:
+        """
+        Пересчет article_daily_stats по таблице articles
+        
+        Исправляет расхождения (статьи, добавленные или удаленные в обход
+        NewsService). Выполняется в одной транзакции.
+        
+        Returns:
+            Количество строк сводки
+        """
+        day = func.date(Article.created_at)
+        with DatabaseSession() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                # Сохранения статей ждут окончания пересчета: иначе статья,
+                # вставленная между подсчетом и заменой сводки, потеряется
+                session.execute(text("LOCK TABLE article_daily_stats IN EXCLUSIVE MODE"))
+            counts = session.exec(
+                select(day, Article.source_site, func.count(Article.id))
+                .group_by(day, Article.source_site)
+            ).all()
+            now = moscow_now()
+            session.execute(delete(ArticleDailyStats))
+            for row_day, source, count in counts:
+                if isinstance(row_day, str):  # SQLite возвращает date() строкой
+                    row_day = datetime.strptime(row_day, "%Y-%m-%d").date()
+                session.add(ArticleDailyStats(day=row_day, source_site=source, articles_count=count, updated_at=now))
+        logger.info(f"Rebuilt article daily stats: {len(counts)} rows")
+        return len(counts)
+    
     def get_articles(
         self, 
         source: Optional[SourceType] = None,
@@ -146,6 +327,145 @@ class NewsService:
             
             return loaded_articles
     
+    @staticmethod
+    def _encode_article_cursor(published_date: Optional[datetime], created_at: datetime, article_id: int) -> str:
+        """Курсор keyset-пагинации: ключ сортировки последней статьи страницы"""
+        raw = "|".join([
+            published_date.isoformat() if published_date else "",
+            created_at.isoformat() if created_at else "",
+            str(article_id)
+        ])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def _decode_article_cursor(cursor: str):
+        """Разбор курсора keyset-пагинации, ValueError при некорректном значении"""
+        try:
+            published_raw, created_raw, id_raw = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            published_date = datetime.fromisoformat(published_raw) if published_raw else None
+            return published_date, datetime.fromisoformat(created_raw), int(id_raw)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def get_articles_with_drafts(
+        self,
+        source: Optional[SourceType] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_content: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Страница статей вместе с их черновиками одним запросом
+        
+        Страница статей выбирается подзапросом (только нужные списку колонки),
+        черновики присоединяются через LEFT JOIN. При переданном cursor
+        используется keyset-пагинация по (published_date, created_at, id),
+        offset при этом игнорируется.
+        
+        Returns:
+            Словарь {"articles": [...], "next_cursor": str | None}, где у каждой
+            статьи есть список "drafts" (от новых к старым)
+        """
+        article_columns = [
+            Article.id,
+            Article.title,
+            Article.url,
+            Article.source_site,
+            Article.published_date,
+            Article.published_time,
+            Article.created_at,
+            Article.author,
+            Article.views_count,
+        ]
+        if include_content:
+            article_columns.append(Article.content)
+        
+        page = select(*article_columns)
+        if source:
+            page = page.where(Article.source_site == source)
+        
+        if cursor:
+            cursor_published, cursor_created, cursor_id = self._decode_article_cursor(cursor)
+            # Порядок: published_date DESC NULLS LAST, created_at DESC, id DESC
+            older_in_group = tuple_(Article.created_at, Article.id) < tuple_(cursor_created, cursor_id)
+            if cursor_published is not None:
+                page = page.where(or_(
+                    Article.published_date < cursor_published,
+                    and_(Article.published_date == cursor_published, older_in_group),
+                    Article.published_date.is_(None)
+                ))
+            else:
+                page = page.where(and_(Article.published_date.is_(None), older_in_group))
+        elif offset:
+            page = page.offset(offset)
+        
+        page = page.order_by(
+            Article.published_date.desc().nulls_last(),
+            Article.created_at.desc(),
+            Article.id.desc()
+        ).limit(limit).subquery("page")
+        
+        has_content = case(
+            (func.length(func.coalesce(NewsGenerationDraft.generated_news_text, "")) > 0, True),
+            (func.length(func.coalesce(NewsGenerationDraft.summary, "")) > 0, True),
+            else_=False
+        )
+        query = (
+            select(
+                page,
+                NewsGenerationDraft.id.label("draft_id"),
+                NewsGenerationDraft.status.label("draft_status"),
+                NewsGenerationDraft.is_published.label("draft_is_published"),
+                NewsGenerationDraft.published_project_code.label("draft_published_project_code"),
+                NewsGenerationDraft.published_project_name.label("draft_published_project_name"),
+                NewsGenerationDraft.bitrix_id.label("draft_bitrix_id"),
+                NewsGenerationDraft.published_at.label("draft_published_at"),
+                NewsGenerationDraft.scheduled_at.label("draft_scheduled_at"),
+                has_content.label("draft_has_content"),
+            )
+            .select_from(page)
+            .outerjoin(NewsGenerationDraft, NewsGenerationDraft.article_id == page.c.id)
+            .order_by(
+                page.c.published_date.desc().nulls_last(),
+                page.c.created_at.desc(),
+                page.c.id.desc(),
+                NewsGenerationDraft.created_at.desc()
+            )
+        )
+        
+        with DatabaseSession() as session:
+            rows = session.execute(query).mappings().all()
+        
+        # Группируем строки JOIN по статьям, сохраняя порядок страницы
+        articles: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            article = articles.get(row["id"])
+            if article is None:
+                article = {column.key: row[column.key] for column in article_columns}
+                article["drafts"] = []
+                articles[row["id"]] = article
+            if row["draft_id"] is not None:
+                article["drafts"].append({
+                    "id": row["draft_id"],
+                    "status": row["draft_status"],
+                    "is_published": bool(row["draft_is_published"]),
+                    "published_project_code": row["draft_published_project_code"],
+                    "published_project_name": row["draft_published_project_name"],
+                    "bitrix_id": row["draft_bitrix_id"],
+                    "published_at": row["draft_published_at"],
+                    "scheduled_at": row["draft_scheduled_at"],
+                    "has_content": bool(row["draft_has_content"]),
+                })
+        
+        page_articles = list(articles.values())
+        next_cursor = None
+        if len(page_articles) == limit:
+            last = page_articles[-1]
+            next_cursor = self._encode_article_cursor(last["published_date"], last["created_at"], last["id"])
+        
+        return {"articles": page_articles, "next_cursor": next_cursor}
+    
     def get_article_by_url(self, url: str) -> Optional[Article]:
         """Получение статьи по URL"""
         with DatabaseSession() as session:
@@ -153,6 +473,11 @@ class NewsService:
                 select(Article).where(Article.url == url)
             ).first()
     
+    def get_known_urls(self, urls: List[str]) -> set:
+        """URL из списка, которые уже сохранены (проверка парсером до загрузки статей)"""
+        with DatabaseSession() as session:
+            return self._get_existing_urls(session, list(dict.fromkeys(urls)))
+    
     def get_source_stats(self, source: Optional[SourceType] = None) -> List[SourceStats]:
         """Получение статистики по источникам"""
         with DatabaseSession() as session:
@@ -179,81 +504,75 @@ class NewsService:
             return loaded_stats
     
     def update_source_stats(self, source: SourceType, new_articles_count: int = 0):
-        """Обновление статистики источника"""
+        """
+        Полный пересчет статистики источника
+        
+        save_articles обновляет статистику инкрементально; этот метод
+        пересчитывает ее по дневной сводке и отмечает время парсинга.
+        """
         with DatabaseSession() as session:
-            # Получаем или создаем статистику
-            stats = session.exec(
-                select(SourceStats).where(SourceStats.source_site == source)
-            ).first()
-            
-            if not stats:
-                stats = SourceStats(source_site=source)
-                session.add(stats)
-            
-            # Обновляем счетчики
-            # Приводим к naive datetime, так как БД хранит без tzinfo
-            now = moscow_now()
-            if now.tzinfo is not None:
-                now = now.replace(tzinfo=None)
-            today = now.date()
-            week_ago = now - timedelta(days=7)
-            month_ago = now - timedelta(days=30)
-            
-            # Общее количество статей
-            total_count = session.exec(
-                select(func.count(Article.id)).where(Article.source_site == source)
-            ).first() or 0
-            
-            # Статьи за сегодня
-            today_count = session.exec(
-                select(func.count(Article.id)).where(
-                    and_(
-                        Article.source_site == source,
-                        func.date(Article.created_at) == today
-                    )
-                )
-            ).first() or 0
-            
-            # Статьи за неделю
-            week_count = session.exec(
-                select(func.count(Article.id)).where(
-                    and_(
-                        Article.source_site == source,
-                        Article.created_at >= week_ago
-                    )
-                )
-            ).first() or 0
-            
-            # Статьи за месяц
-            month_count = session.exec(
-                select(func.count(Article.id)).where(
-                    and_(
-                        Article.source_site == source,
-                        Article.created_at >= month_ago
-                    )
-                )
-            ).first() or 0
-            
-            # Последняя статья
-            last_article = session.exec(
-                select(Article).where(Article.source_site == source)
-                .order_by(Article.created_at.desc())
-                .limit(1)
-            ).first()
-            
-            # Обновляем статистику
-            stats.total_articles = total_count
-            stats.articles_today = today_count
-            stats.articles_this_week = week_count
-            stats.articles_this_month = month_count
+            now = moscow_now().replace(tzinfo=None)
+            stats = self._recount_source_stats(session, source, now)
             stats.last_parsed_at = now
-            stats.updated_at = now
-            
-            if last_article:
-                stats.last_article_date = last_article.created_at
-            
             session.add(stats)
-            logger.info(f"Updated stats for {source}: total={total_count}, today={today_count}")
+            logger.info(f"Updated stats for {source}: total={stats.total_articles}, today={stats.articles_today}")
+    
+    def reconcile_source_stats(self) -> Dict[str, int]:
+        """
+        Сверка статистики с таблицей articles
+        
+        Пересобирает дневную сводку по articles и пересчитывает SourceStats
+        всех источников. Запускается периодически: исправляет расхождения
+        инкрементальных счетчиков и обновляет окна today/week/month после
+        смены дня.
+        
+        Returns:
+            Словарь {источник: расхождение total_articles до сверки}
+        """
+        self.rebuild_daily_stats()
+        drift = {}
+        with DatabaseSession() as session:
+            now = moscow_now().replace(tzinfo=None)
+            stored = dict(session.exec(select(SourceStats.source_site, SourceStats.total_articles)).all())
+            for source in SourceType:
+                stats = self._recount_source_stats(session, source, now)
+                if source not in stored and not stats.total_articles:
+                    # Источник ни разу не парсился - запись не создаем
+                    continue
+                session.add(stats)
+                if stored.get(source, 0) != stats.total_articles:
+                    drift[source.value] = stats.total_articles - stored.get(source, 0)
+        if drift:
+            logger.warning(f"Source stats drift corrected: {drift}")
+        else:
+            logger.info("Source stats reconciled, no drift")
+        return drift
+    
+    def _recount_source_stats(self, session: Session, source: SourceType, now: datetime) -> SourceStats:
+        """Пересчет счетчиков SourceStats источника по дневной сводке"""
+        stats = session.exec(
+            select(SourceStats).where(SourceStats.source_site == source)
+        ).first()
+        if not stats:
+            # В сессию добавляет вызывающий код
+            stats = SourceStats(source_site=source)
+        
+        # Все счетчики - одним запросом по дневной сводке вместо COUNT по articles
+        total_count, today_count, week_count, month_count = self._window_counts(session, source, now.date())
+        
+        # Последняя статья (индекс по source_site, без загрузки текста)
+        last_article_date = session.exec(
+            select(func.max(Article.created_at)).where(Article.source_site == source)
+        ).first()
+        
+        stats.total_articles = total_count
+        stats.articles_today = today_count
+        stats.articles_this_week = week_count
+        stats.articles_this_month = month_count
+        stats.updated_at = now
+        if last_article_date:
+            stats.last_article_date = last_article_date
+        return stats
     
     def create_parse_session(self, source: SourceType, requested_articles: int) -> int:
         """Создание сессии парсинга"""
@@ -275,9 +594,15 @@ class NewsService:
         parsed_count: int, 
         saved_count: int, 
         duplicate_count: int,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        fetch_stats: Optional[Dict[str, int]] = None
     ):
-        """Завершение сессии парсинга"""
+        """
+        Завершение сессии парсинга
+        
+        fetch_stats - счетчики парсера: попадания HTTP-кэша, ответы 304 и
+        известные URL, пропущенные до загрузки (учитываются как дубликаты).
+        """
         with DatabaseSession() as session:
             parse_session = session.get(ParseSession, session_id)
             if parse_session:
@@ -293,6 +618,10 @@ class NewsService:
                 parse_session.parsed_articles = parsed_count
                 parse_session.saved_articles = saved_count
                 parse_session.duplicate_articles = duplicate_count
+                if fetch_stats:
+                    parse_session.duplicate_articles += fetch_stats.get("known_urls", 0)
+                    parse_session.cache_hits = fetch_stats.get("cache_hits", 0)
+                    parse_session.not_modified_responses = fetch_stats.get("not_modified", 0)
                 parse_session.completed_at = now
                 parse_session.duration_seconds = int(duration)
                 parse_session.status = "failed" if error_message else "completed"
@@ -315,32 +644,32 @@ class NewsService:
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """Получение статистики для дашборда"""
         with DatabaseSession() as session:
-            # Общая статистика
-            total_articles = session.exec(select(func.count(Article.id))).first() or 0
-            
-            # Статистика по источникам
-            source_stats = session.exec(
-                select(Article.source_site, func.count(Article.id))
-                .group_by(Article.source_site)
-            ).all()
-            
-            # Статистика за последние дни
             now = moscow_now()
             if now.tzinfo is not None:
                 now = now.replace(tzinfo=None)
-            daily_stats = []
+            days = [(now - timedelta(days=i)).date() for i in range(7)]  # Последние 7 дней
             
-            for i in range(7):  # Последние 7 дней
-                date = (now - timedelta(days=i)).date()
-                count = session.exec(
-                    select(func.count(Article.id))
-                    .where(func.date(Article.created_at) == date)
-                ).first() or 0
-                
-                daily_stats.append({
-                    "date": date.isoformat(),
-                    "count": count
-                })
+            # Один сгруппированный запрос по дневной сводке: дни старше недели
+            # сворачиваются в одну строку на источник (recent_day = NULL)
+            recent_day = case((ArticleDailyStats.day >= days[-1], ArticleDailyStats.day), else_=None).label("recent_day")
+            rows = session.exec(
+                select(ArticleDailyStats.source_site, recent_day, func.sum(ArticleDailyStats.articles_count))
+                .group_by(ArticleDailyStats.source_site, recent_day)
+            ).all()
+            
+            source_stats: Dict[SourceType, int] = {}
+            per_day: Dict[str, int] = {}
+            for source, day, count in rows:
+                source_stats[source] = source_stats.get(source, 0) + count
+                if day is not None:
+                    key = day.isoformat() if isinstance(day, date) else str(day)
+                    per_day[key] = per_day.get(key, 0) + count
+            
+            total_articles = sum(source_stats.values())
+            daily_stats = [
+                {"date": day.isoformat(), "count": per_day.get(day.isoformat(), 0)}
+                for day in days
+            ]
             
             # Последние сессии парсинга
             recent_sessions = session.exec(
@@ -351,7 +680,7 @@ class NewsService:
             
             return {
                 "total_articles": total_articles,
-                "sources": dict(source_stats),
+                "sources": {source: count for source, count in source_stats.items() if count},
                 "daily_stats": daily_stats,
                 "recent_sessions": [
                     {
@@ -378,6 +707,7 @@ class NewsService:
             
             for article in articles_to_delete:
                 session.delete(article)
+            session.execute(delete(ArticleDailyStats).where(ArticleDailyStats.source_site == source))
             
             session.commit()
             logger.info(f"Deleted {count} articles from source {source}")
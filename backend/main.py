@@ -15,6 +15,7 @@ from api import settings as settings_api
 from core.config import settings
 from core.env_validator import create_backend_validator
 from services.news_parser_manager import NewsParserManager, news_parser_manager
+from services.base_parser import new_fetch_stats
 from database.connection import init_database
 from database.service import news_service
 from database.models import SourceType
@@ -45,17 +46,21 @@ async def _parse_all_sources_to_db(max_articles: int = 20):
                     source=SourceType(source),
                     requested_articles=max_articles
                 )
+                fetch_stats = new_fetch_stats()
                 articles = await news_parser_manager.parse_news_from_source(
                     source=source,
                     max_articles=max_articles,
-                    fetch_full_content=True
+                    fetch_full_content=True,
+                    skip_known_urls=True,
+                    fetch_stats=fetch_stats
                 )
                 save_result = news_service.save_articles(articles, SourceType(source))
                 news_service.complete_parse_session(
                     session_id=session_id,
                     parsed_count=len(articles),
                     saved_count=save_result["saved"],
-                    duplicate_count=save_result["duplicates"]
+                    duplicate_count=save_result["duplicates"],
+                    fetch_stats=fetch_stats
                 )
                 logger.info(
                     f"[Scheduler] {source}: parsed={len(articles)}, saved={save_result['saved']}, duplicates={save_result['duplicates']}"
@@ -100,6 +105,23 @@ async def _daily_news_parsing_scheduler():
         except Exception as e:
             logger.error(f"[Scheduler] Scheduled parsing failed: {e}")
 
+async def _source_stats_reconcile_scheduler(interval_minutes: int):
+    """Фоновая задача: периодическая сверка статистики источников с таблицей articles"""
+    from database.service import news_service
+    while True:
+        try:
+            await asyncio.to_thread(news_service.reconcile_source_stats)
+        except asyncio.CancelledError:
+            logger.info("[Stats] Reconcile task cancelled")
+            break
+        except Exception as e:
+            logger.error(f"[Stats] Source stats reconcile failed: {e}")
+        try:
+            await asyncio.sleep(interval_minutes * 60)
+        except asyncio.CancelledError:
+            logger.info("[Stats] Reconcile task cancelled")
+            break
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -129,6 +151,21 @@ async def lifespan(app: FastAPI):
             print("✅ Daily news parsing scheduler started (02:00)")
         except Exception as e:
             logger.error(f"❌ Failed to start news parsing scheduler: {e}")
+
+        # Запускаем периодическую сверку статистики источников
+        if settings.SOURCE_STATS_RECONCILE_MINUTES > 0:
+            app.state.source_stats_reconcile_task = asyncio.create_task(
+                _source_stats_reconcile_scheduler(settings.SOURCE_STATS_RECONCILE_MINUTES)
+            )
+            print(f"✅ Source stats reconcile started (every {settings.SOURCE_STATS_RECONCILE_MINUTES} min)")
+
+        # Запускаем воркеры фоновой генерации статей
+        try:
+            from services.generation_job_service import generation_job_service
+            generation_job_service.start()
+            print(f"✅ Generation job workers started ({settings.GENERATION_JOB_WORKERS})")
+        except Exception as e:
+            logger.error(f"❌ Failed to start generation job workers: {e}")
         
         # Планировщик автопубликации отключён - используется внешний cron
         # try:
@@ -158,6 +195,22 @@ async def lifespan(app: FastAPI):
                 pass
     except Exception as e:
         logger.error(f"Error stopping news parsing scheduler: {e}")
+
+    # Останавливаем сверку статистики
+    task = getattr(app.state, "source_stats_reconcile_task", None)
+    if task:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # Останавливаем воркеры генерации (незавершенные задачи возвращаются в очередь)
+    try:
+        from services.generation_job_service import generation_job_service
+        await generation_job_service.stop()
+    except Exception as e:
+        logger.error(f"Error stopping generation job workers: {e}")
     
     # Планировщик публикации отключён (используется внешний cron)
     # try:
@@ -177,6 +230,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error closing parsers: {e}")
 
+    # Останавливаем пул процессов обработки изображений
+    try:
+        from services.image_store import image_store
+        image_store.close()
+    except Exception as e:
+        logger.error(f"Error closing image store workers: {e}")
+
+    # Останавливаем пул процессов trafilatura-фолбэка парсинга по URL
+    try:
+        from services.url_article_parser import trafilatura_extractor
+        trafilatura_extractor.close()
+    except Exception as e:
+        logger.error(f"Error closing trafilatura workers: {e}")
+
+    # Закрываем пул HTTP-соединений OpenAI
+    try:
+        from services.ai_provider import close_openai_provider
+        await close_openai_provider()
+    except Exception as e:
+        logger.error(f"Error closing OpenAI HTTP client: {e}")
+
 app = FastAPI(
     title="Medical News Automation System",
     description="Система автоматизации создания новостных материалов для медицинских платформ",
@@ -206,6 +280,8 @@ async def timeout_middleware(request: Request, call_next):
         timeout = 300  # 5 минут для парсинга
     elif request.url.path.startswith("/api/news-generation/generate-article"):
         timeout = 300  # 5 минут для генерации статей с изображениями
+    elif request.url.path.startswith("/api/news-generation/retry"):
+        timeout = 300  # Повтор генерации ждет завершения фоновой задачи
     elif request.url.path.startswith("/api/url-articles/generate-from-url"):
         timeout = 300  # 5 минут для парсинга URL и генерации
     else:
@@ -1,23 +1,267 @@
+import asyncio
+import hashlib
+import math
 import time
-from collections import defaultdict, deque
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (allowed, reset_after, retry_after): seconds until the key is fully
+# replenished and seconds until the next request would be allowed
+Decision = Tuple[bool, float, float]
+
+
+def gcra(tat: Optional[float], now: float, limit: int, window: float) -> Tuple[bool, float, float, float]:
+    """
+    Generic cell rate algorithm step.
+
+    Instead of a timestamp per request only the theoretical arrival time
+    (TAT) of the key is stored: a burst of up to `limit` requests is
+    allowed, after that one request per window / limit seconds.
+
+    Returns (allowed, new_tat, reset_after, retry_after).
+    """
+    interval = window / limit
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + interval
+    allow_at = new_tat - window
+    if allow_at > now:
+        return False, tat, tat - now, allow_at - now
+    return True, new_tat, new_tat - now, 0.0
+
+
+class MemoryRateLimitStore:
+    """
+    In-process store: one float (TAT) per key, split into shards.
+
+    A key whose TAT is in the past is fully replenished and carries no
+    state, so it is dropped. Every `sweep_every` calls one shard is swept,
+    which keeps the cost of eviction small and spread out. A shard never
+    holds more than max_keys / shards keys: when it is full the least
+    recently used key is evicted (that client simply starts with a fresh
+    allowance). Called only from the event loop thread, so no locking.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000, sweep_every: int = 1024):
+        self.shards: List[Dict[str, float]] = [{} for _ in range(shards)]
+        self.shard_capacity = max(1, max_keys // shards)
+        self.sweep_every = sweep_every
+        self._calls = 0
+        self._next_sweep = 0
+        self.evicted = 0
+
+    async def acquire(self, key: str, limit: int, window: float) -> Decision:
+        return self.acquire_now(key, limit, window, time.time())
+
+    def acquire_now(self, key: str, limit: int, window: float, now: float) -> Decision:
+        shard = self.shards[hash(key) % len(self.shards)]
+        self._calls += 1
+        if self._calls % self.sweep_every == 0:
+            self._sweep(self.shards[self._next_sweep], now)
+            self._next_sweep = (self._next_sweep + 1) % len(self.shards)
+
+        # pop + insert keeps the shard ordered from least to most recently used
+        allowed, new_tat, reset_after, retry_after = gcra(shard.pop(key, None), now, limit, window)
+        if len(shard) >= self.shard_capacity:
+            self._sweep(shard, now)
+            while len(shard) >= self.shard_capacity:
+                del shard[next(iter(shard))]
+                self.evicted += 1
+        shard[key] = new_tat
+        return allowed, reset_after, retry_after
+
+    def _sweep(self, shard: Dict[str, float], now: float):
+        """Drop keys that are fully replenished."""
+        idle = [key for key, tat in shard.items() if tat <= now]
+        for key in idle:
+            del shard[key]
+        self.evicted += len(idle)
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "active_keys": sum(len(shard) for shard in self.shards),
+            "max_keys": self.shard_capacity * len(self.shards),
+            "evicted_keys": self.evicted,
+        }
+
+
+class RedisError(Exception):
+    """Error reply or protocol error from a Redis-compatible server."""
+
+
+class RedisConnection:
+    """Minimal RESP2 client connection (enough for EVALSHA/EVAL)."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: Optional[str] = None,
+                   username: Optional[str] = None, db: int = 0) -> "RedisConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        connection = cls(reader, writer)
+        try:
+            if password:
+                await connection.call(*(("AUTH", username, password) if username else ("AUTH", password)))
+            if db:
+                await connection.call("SELECT", db)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    async def call(self, *args) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.writer.write(b"".join(parts))
+        await self.writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("Connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            return (await self.reader.readexactly(size + 2))[:-2]
+        if prefix == b"*":
+            size = int(payload)
+            if size < 0:
+                return None
+            return [await self._read_reply() for _ in range(size)]
+        raise RedisError(f"Unexpected reply: {line[:50]!r}")
+
+    def close(self):
+        self.writer.close()
+
+
+class RedisRateLimitStore:
+    """
+    Shared store on a Redis-compatible server.
+
+    The GCRA step runs as a Lua script, so it is atomic for all uvicorn
+    workers and uses the server clock. Each key has a TTL equal to the time
+    until it is replenished, so idle keys are evicted by the server. If the
+    server is unavailable the decision falls back to an in-process store
+    (the limit is then per worker again) instead of failing requests. After
+    an error the server is skipped for `error_cooldown` seconds, so a hung
+    server does not add `timeout` of latency to every request.
+    """
+
+    SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat == nil or tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if allow_at > now then
+    return {0, tat - now, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, new_tat - now, 0}
+"""
+    SCRIPT_SHA = hashlib.sha1(SCRIPT.encode()).hexdigest()
+
+    def __init__(self, url: str, key_prefix: str = "ratelimit:", max_connections: int = 10,
+                 timeout: float = 0.5, fallback: Optional[MemoryRateLimitStore] = None,
+                 error_cooldown: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self.error_cooldown = error_cooldown
+        self.fallback = fallback or MemoryRateLimitStore()
+        self._idle: List[RedisConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._max_connections = max_connections
+        self._last_error_logged = 0.0
+        self._skip_until = 0.0
+        self.errors = 0
+
+    async def acquire(self, key: str, limit: int, window: float) -> Decision:
+        if time.monotonic() < self._skip_until:
+            return await self.fallback.acquire(key, limit, window)
+        interval_ms = max(1, round(window * 1000 / limit))
+        try:
+            allowed, reset_ms, retry_ms = await asyncio.wait_for(
+                self._evalsha(self.key_prefix + key, interval_ms, round(window * 1000)), self.timeout
+            )
+            return bool(allowed), reset_ms / 1000, retry_ms / 1000
+        except Exception as e:
+            self.errors += 1
+            now = time.monotonic()
+            self._skip_until = now + self.error_cooldown
+            if now - self._last_error_logged > 60:
+                self._last_error_logged = now
+                logger.warning(f"Rate limit store unavailable, using in-process limits: {e}")
+            return await self.fallback.acquire(key, limit, window)
+
+    async def _evalsha(self, key: str, interval_ms: int, window_ms: int) -> list:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_connections)
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await RedisConnection.open(
+                self.host, self.port, self.password, self.username, self.db
+            )
+            try:
+                try:
+                    result = await connection.call("EVALSHA", self.SCRIPT_SHA, 1, key, interval_ms, window_ms)
+                except RedisError as e:
+                    if not str(e).startswith("NOSCRIPT"):
+                        raise
+                    result = await connection.call("EVAL", self.SCRIPT, 1, key, interval_ms, window_ms)
+            except BaseException:
+                # Reply may be half-read (timeout/cancel): the connection is not reusable
+                connection.close()
+                raise
+            self._idle.append(connection)
+            return result
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "server": f"{self.host}:{self.port}/{self.db}",
+            "errors": self.errors,
+            "fallback": self.fallback.get_stats(),
+        }
+
 
 class RateLimiter:
     """
-    In-memory rate limiter for FastAPI applications.
-    Tracks requests per IP address with different limits for different endpoints.
+    Rate limiter for FastAPI applications.
+    Limits requests per client IP and rule (path prefix) with GCRA: constant
+    memory per key, idle keys evicted. The state lives in a pluggable store:
+    MemoryRateLimitStore (per process) or RedisRateLimitStore (shared by all
+    workers).
     """
-    
-    def __init__(self, config=None):
-        # Store request timestamps for each IP: {ip: deque([timestamp1, timestamp2, ...])}
-        self.requests: Dict[str, deque] = defaultdict(lambda: deque())
-        
+
+    def __init__(self, config=None, store=None):
+        self.store = store or MemoryRateLimitStore()
+
         # Default rate limits if no config provided (увеличены для разработки)
         default_limits = {
             "/api/auth": (200, 60),          # Auth endpoints: 200 req/min (увеличено для разработки)
@@ -30,7 +274,7 @@ class RateLimiter:
             "/api/news": (300, 60),          # General news API: 300 req/min
             "default": (300, 60)             # Default: 300 req/min
         }
-        
+
         # Use config values if provided
         if config:
             self.rate_limits = {
@@ -46,9 +290,9 @@ class RateLimiter:
             }
         else:
             self.rate_limits = default_limits
-        
+
         # Exempt paths (no rate limiting)
-        self.exempt_paths = [
+        self.exempt_paths = {
             "/health",
             "/api/health",
             "/",
@@ -61,8 +305,8 @@ class RateLimiter:
             "/api/admin/monitoring/services",
             "/api/admin/monitoring/alerts",
             "/api/admin/stats/database"
-        ]
-    
+        }
+
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP address from request."""
         # Check for forwarded headers (in case of proxy/load balancer)
@@ -70,104 +314,92 @@ class RateLimiter:
         if forwarded_for:
             # Take the first IP if multiple are present
             return forwarded_for.split(",")[0].strip()
-        
+
         real_ip = request.headers.get("X-Real-IP")
         if real_ip:
             return real_ip.strip()
-        
+
         # Fallback to client host
         client_host = getattr(request.client, "host", "unknown")
         return client_host
-    
-    def _get_rate_limit_for_path(self, path: str) -> Tuple[int, int]:
-        """Get rate limit (requests, window_seconds) for given path."""
+
+    def _get_rule_for_path(self, path: str) -> Tuple[str, int, int]:
+        """Get (rule, requests, window_seconds) for given path."""
         # Check exact matches and patterns
         for pattern, (requests, window) in self.rate_limits.items():
             if pattern == "default":
                 continue
             if path.startswith(pattern):
-                return requests, window
-        
+                return pattern, requests, window
+
         # Return default rate limit
-        return self.rate_limits["default"]
-    
-    def _cleanup_old_requests(self, ip: str, window_seconds: int):
-        """Remove request timestamps older than the window."""
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
-        
-        requests_deque = self.requests[ip]
-        
-        # Remove old timestamps from the left side of deque
-        while requests_deque and requests_deque[0] < cutoff_time:
-            requests_deque.popleft()
-    
-    def is_allowed(self, request: Request) -> Tuple[bool, Optional[dict]]:
+        return ("default", *self.rate_limits["default"])
+
+    async def is_allowed(self, request: Request) -> Tuple[bool, Optional[dict]]:
         """
         Check if request is allowed based on rate limits.
         Returns (is_allowed, rate_limit_info)
         """
         path = request.url.path
-        
+
         # Skip rate limiting for exempt paths
         if path in self.exempt_paths:
             return True, None
-        
+
         client_ip = self._get_client_ip(request)
-        requests_limit, window_seconds = self._get_rate_limit_for_path(path)
-        
-        # Clean up old requests
-        self._cleanup_old_requests(client_ip, window_seconds)
-        
-        # Check current request count
-        current_requests = len(self.requests[client_ip])
-        
+        rule, requests_limit, window_seconds = self._get_rule_for_path(path)
+
+        allowed, reset_after, retry_after = await self.store.acquire(
+            f"{rule}:{client_ip}", requests_limit, window_seconds
+        )
+
+        # Requests still available right now: the unused part of the window
+        interval = window_seconds / requests_limit
         rate_limit_info = {
             "limit": requests_limit,
-            "remaining": max(0, requests_limit - current_requests - 1),
-            "reset_time": int(time.time() + window_seconds),
+            "remaining": max(0, int((window_seconds - reset_after) / interval + 1e-9)),
+            "reset_time": int(time.time() + math.ceil(reset_after)),
+            "retry_after": max(1, math.ceil(retry_after)),
             "window_seconds": window_seconds
         }
-        
-        if current_requests >= requests_limit:
+
+        if not allowed:
             logger.warning(
                 f"Rate limit exceeded for IP {client_ip} on path {path}. "
-                f"Requests: {current_requests}/{requests_limit} in {window_seconds}s window"
+                f"Limit: {requests_limit} in {window_seconds}s window, retry in {retry_after:.1f}s"
             )
-            return False, rate_limit_info
-        
-        # Add current request timestamp
-        self.requests[client_ip].append(time.time())
-        
-        # Update remaining count
-        rate_limit_info["remaining"] = max(0, requests_limit - len(self.requests[client_ip]))
-        
-        return True, rate_limit_info
-    
+
+        return allowed, rate_limit_info
+
     def get_stats(self) -> dict:
         """Get rate limiter statistics."""
-        current_time = time.time()
-        
-        stats = {
-            "active_ips": len(self.requests),
-            "total_requests_tracked": sum(len(deque) for deque in self.requests.values()),
+        return {
+            **self.store.get_stats(),
             "rate_limit_rules": dict(self.rate_limits),
-            "exempt_paths": self.exempt_paths
+            "exempt_paths": sorted(self.exempt_paths)
         }
-        
-        return stats
 
 
 # Global rate limiter instance - will be initialized in main.py
 rate_limiter = None
 
 
+def create_rate_limit_store(config):
+    """Create the store selected by RATE_LIMIT_BACKEND ("memory" or "redis")."""
+    memory = MemoryRateLimitStore(shards=config.RATE_LIMIT_SHARDS, max_keys=config.RATE_LIMIT_MAX_KEYS)
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore(config.RATE_LIMIT_REDIS_URL, fallback=memory)
+    if config.RATE_LIMIT_BACKEND != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{config.RATE_LIMIT_BACKEND}', using memory")
+    return memory
+
+
 def initialize_rate_limiter(config):
     """Initialize global rate limiter with configuration."""
     global rate_limiter
     if config.RATE_LIMITING_ENABLED:
-        rate_limiter = RateLimiter(config)
-        logger.info("Rate limiting initialized and enabled")
+        rate_limiter = RateLimiter(config, create_rate_limit_store(config))
+        logger.info(f"Rate limiting initialized and enabled ({config.RATE_LIMIT_BACKEND} backend)")
     else:
         rate_limiter = None
         logger.info("Rate limiting disabled via configuration")
@@ -180,10 +412,10 @@ async def rate_limit_middleware(request: Request, call_next):
     # Skip if rate limiter is not initialized or disabled
     if rate_limiter is None:
         return await call_next(request)
-    
+
     # Check rate limit
-    is_allowed, rate_limit_info = rate_limiter.is_allowed(request)
-    
+    is_allowed, rate_limit_info = await rate_limiter.is_allowed(request)
+
     if not is_allowed:
         # Return 429 Too Many Requests
         headers = {}
@@ -192,9 +424,9 @@ async def rate_limit_middleware(request: Request, call_next):
                 "X-RateLimit-Limit": str(rate_limit_info["limit"]),
                 "X-RateLimit-Remaining": str(rate_limit_info["remaining"]),
                 "X-RateLimit-Reset": str(rate_limit_info["reset_time"]),
-                "Retry-After": str(rate_limit_info["window_seconds"])
+                "Retry-After": str(rate_limit_info["retry_after"])
             })
-        
+
         return JSONResponse(
             status_code=429,
             content={
@@ -205,14 +437,14 @@ async def rate_limit_middleware(request: Request, call_next):
             },
             headers=headers
         )
-    
+
     # Process request
     response = await call_next(request)
-    
+
     # Add rate limit headers to response
     if rate_limit_info:
         response.headers["X-RateLimit-Limit"] = str(rate_limit_info["limit"])
         response.headers["X-RateLimit-Remaining"] = str(rate_limit_info["remaining"])
         response.headers["X-RateLimit-Reset"] = str(rate_limit_info["reset_time"])
-    
-    return response
\ No newline at end of file
+
+    return response
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/news/articles-with-publication-status data access
+
+Seeds a scratch database with 50k articles and 20k drafts and compares
+the legacy access path (get_articles + get_drafts_by_article per article)
+with NewsService.get_articles_with_drafts (one joined query, keyset
+pagination). Reports wall time and the number of SQL statements.
+
+Runs against a temporary SQLite file by default. To benchmark PostgreSQL
+pass a URL of an EMPTY scratch database - the script creates tables and
+inserts rows into it:
+
+    python scripts/benchmark_articles_list.py --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--database-url", default=None)
+parser.add_argument("--articles", type=int, default=50_000)
+parser.add_argument("--drafts", type=int, default=20_000)
+parser.add_argument("--limit", type=int, default=1000)
+parser.add_argument("--deep-offset", type=int, default=40_000)
+args = parser.parse_args()
+
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import event, insert
+
+from database.connection import engine, create_db_and_tables
+from database.models import Article, NewsGenerationDraft, SourceType, ProjectType
+from database.service import news_service
+from services.news_generation_service import NewsGenerationService
+
+BATCH = 5000
+
+
+class QueryCounter:
+    """Counts statements executed by the engine"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed():
+    print(f"Seeding {args.articles} articles and {args.drafts} drafts...")
+    random.seed(42)
+    sources = list(SourceType)
+    projects = [p.value for p in ProjectType]
+    statuses = ["summary_pending", "generated", "scheduled", "published"]
+    body = "Текст медицинской новости. " * 80
+    base = datetime(2025, 1, 1)
+
+    with engine.begin() as conn:
+        rows = []
+        for i in range(args.articles):
+            rows.append({
+                "title": f"Новость {i}",
+                "url": f"https://example.org/news/{i}",
+                "content": body,
+                "source_site": random.choice(sources),
+                "published_date": None if i % 10 == 0 else base + timedelta(minutes=i),
+                "created_at": base + timedelta(minutes=i, seconds=30),
+                "is_processed": False,
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(Article.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Article.__table__), rows)
+
+        rows = []
+        for i in range(args.drafts):
+            status = random.choice(statuses)
+            published = status == "published"
+            rows.append({
+                "article_id": random.randint(1, args.articles),
+                "project": random.choice(projects),
+                "summary": "Выжимка",
+                "facts": "[]",
+                "generated_news_text": "Текст" if status != "summary_pending" else None,
+                "status": status,
+                "can_retry": True,
+                "retry_count": 0,
+                "is_published": published,
+                "published_project_code": "GS" if published else None,
+                "bitrix_id": i if published else None,
+                "published_at": base + timedelta(days=1) if published else None,
+                "scheduled_at": base + timedelta(days=2) if status == "scheduled" else None,
+                "created_at": base + timedelta(minutes=i),
+                "updated_at": base + timedelta(minutes=i),
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(NewsGenerationDraft.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(NewsGenerationDraft.__table__), rows)
+
+
+def legacy_page(offset: int):
+    articles = news_service.get_articles(limit=args.limit, offset=offset)
+    for article in articles:
+        NewsGenerationService.get_drafts_by_article(article.id)
+    return len(articles)
+
+
+def measure(name: str, counter: QueryCounter, func):
+    counter.count = 0
+    started = time.perf_counter()
+    rows = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{name:42} {elapsed:9.1f}ms  queries={counter.count:5}  rows={rows}")
+
+
+def main():
+    create_db_and_tables()
+    seed()
+    counter = QueryCounter()
+
+    # Cursor pointing at the same position as --deep-offset (not timed)
+    deep = news_service.get_articles_with_drafts(limit=1, offset=args.deep_offset - 1, include_content=False)
+    deep_cursor = deep["next_cursor"]
+
+    print("-" * 80)
+    measure("legacy: first page", counter, lambda: legacy_page(0))
+    measure("joined: first page (with content)", counter,
+            lambda: len(news_service.get_articles_with_drafts(limit=args.limit)["articles"]))
+    measure("joined: first page (no content)", counter,
+            lambda: len(news_service.get_articles_with_drafts(limit=args.limit, include_content=False)["articles"]))
+    measure(f"legacy: offset={args.deep_offset}", counter, lambda: legacy_page(args.deep_offset))
+    measure(f"joined: offset={args.deep_offset}", counter,
+            lambda: len(news_service.get_articles_with_drafts(
+                limit=args.limit, offset=args.deep_offset, include_content=False)["articles"]))
+    measure(f"joined: keyset at {args.deep_offset}", counter,
+            lambda: len(news_service.get_articles_with_drafts(
+                limit=args.limit, cursor=deep_cursor, include_content=False)["articles"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/expenses/summary aggregation
+
+Seeds a scratch database with users and 1M expenses and compares the legacy
+summary (load every Expense row, group in Python, session.get per user)
+with get_expenses_summary (SQL aggregation with GROUPING SETS on
+PostgreSQL, one GROUP BY per grouping on SQLite, range predicates on
+created_at). Checks that both return the same totals.
+
+Runs against a temporary SQLite file by default. To benchmark PostgreSQL
+pass a URL of an EMPTY scratch database - the script creates tables and
+inserts rows into it:
+
+    python scripts/benchmark_expenses_summary.py --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--database-url", default=None)
+parser.add_argument("--expenses", type=int, default=1_000_000)
+parser.add_argument("--users", type=int, default=50)
+parser.add_argument("--days", type=int, default=365, help="expenses are spread over this many days")
+parser.add_argument("--skip-legacy", action="store_true", help="do not run the legacy summary (slow on 1M rows)")
+args = parser.parse_args()
+
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import event, insert
+from sqlmodel import Session, select, func
+
+from database.connection import engine, create_db_and_tables
+from database.models import Expense, ExpenseType, ProjectType, User, UserRole
+from api.expenses import get_expenses_summary
+
+BATCH = 5000
+END = datetime(2025, 12, 31, 23, 0)
+
+
+class QueryCounter:
+    """Counts statements executed by the engine"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed():
+    print(f"Seeding {args.users} users and {args.expenses} expenses...")
+    random.seed(42)
+    projects = [p.value for p in ProjectType]
+    types = [t.value for t in ExpenseType]
+    costs = {"news_creation": 40.0, "photo_regeneration": 10.0, "gpt_message": 5.0, "telegram_post": 20.0}
+    span = args.days * 24 * 3600
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {
+                "username": f"user{i}",
+                "hashed_password": "x",
+                "role": UserRole.STAFF,
+                "created_at": END,
+            }
+            for i in range(args.users)
+        ])
+
+        rows = []
+        for i in range(args.expenses):
+            expense_type = random.choice(types)
+            rows.append({
+                "user_id": random.randint(1, args.users),
+                "project": random.choice(projects),
+                "expense_type": expense_type,
+                "amount": costs[expense_type],
+                "created_at": END - timedelta(seconds=random.randint(0, span)),
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(Expense.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Expense.__table__), rows)
+
+
+def legacy_summary(session: Session, date_from: date, date_to: date) -> dict:
+    """The previous implementation of get_expenses_summary"""
+    query = select(Expense).join(User, Expense.user_id == User.id)
+    if date_from:
+        query = query.where(func.date(Expense.created_at) >= date_from)
+    if date_to:
+        query = query.where(func.date(Expense.created_at) <= date_to)
+    expenses = session.exec(query).all()
+
+    by_project = {}
+    for project_type in ProjectType:
+        project_expenses = [e for e in expenses if e.project == project_type]
+        by_project[project_type.value] = {"amount": sum(e.amount for e in project_expenses), "count": len(project_expenses)}
+
+    user_expenses = {}
+    for expense in expenses:
+        user_expenses.setdefault(expense.user_id, []).append(expense)
+    by_user = {}
+    for user_id, user_expense_list in user_expenses.items():
+        user = session.get(User, user_id)
+        if user:
+            by_user[user_id] = {"amount": sum(e.amount for e in user_expense_list), "count": len(user_expense_list)}
+
+    by_type = {}
+    for expense_type in ExpenseType:
+        type_expenses = [e for e in expenses if e.expense_type == expense_type]
+        by_type[expense_type] = {"amount": sum(e.amount for e in type_expenses), "count": len(type_expenses)}
+
+    return {
+        "total_amount": sum(expense.amount for expense in expenses),
+        "expenses_count": len(expenses),
+        "by_project": by_project,
+        "by_user": by_user,
+        "by_type": by_type,
+    }
+
+
+def new_summary(session: Session, date_from: date, date_to: date) -> dict:
+    summary = asyncio.run(get_expenses_summary(date_from=date_from, date_to=date_to, session=session, current_user=None))
+    return summary.dict()
+
+
+def comparable(summary: dict) -> tuple:
+    """Totals with rounded amounts, without display names"""
+    def groups(values: dict) -> dict:
+        return {str(key): (round(value["amount"], 2), value["count"]) for key, value in values.items()}
+    return (
+        round(summary["total_amount"], 2),
+        summary["expenses_count"],
+        groups(summary["by_project"]),
+        groups(summary["by_user"]),
+        groups(summary["by_type"]),
+    )
+
+
+def measure(name: str, counter: QueryCounter, func):
+    counter.count = 0
+    with Session(engine) as session:
+        started = time.perf_counter()
+        summary = func(session)
+        elapsed = (time.perf_counter() - started) * 1000
+    print(f"{name:40} {elapsed:10.1f}ms  queries={counter.count:5}  expenses={summary['expenses_count']}")
+    return summary
+
+
+def main():
+    create_db_and_tables()
+    seed()
+    counter = QueryCounter()
+
+    periods = [
+        ("all time", None, None),
+        ("last 30 days", END.date() - timedelta(days=29), END.date()),
+        ("one day", END.date() - timedelta(days=10), END.date() - timedelta(days=10)),
+    ]
+
+    ok = True
+    print("-" * 80)
+    for label, date_from, date_to in periods:
+        new = measure(f"sql: {label}", counter, lambda s: new_summary(s, date_from, date_to))
+        if args.skip_legacy:
+            continue
+        legacy = measure(f"legacy: {label}", counter, lambda s: legacy_summary(s, date_from, date_to))
+        if comparable(new) != comparable(legacy):
+            print(f"FAIL: summaries differ for {label}")
+            ok = False
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTML parsing backends for news parsers
+
+Works on a corpus of saved pages (listing + articles) for every source.
+For each backend available in this environment (html.parser, lxml, and
+selectolax for raw parse time only) it reports:
+  - parse time per page,
+  - content extracted by the parser's own _fetch_full_article compared with
+    html.parser (length and similarity), so a faster backend that loses text
+    is visible,
+  - the longest event loop stall while pages are parsed inline vs through
+    BaseNewsParser._parse_html (thread pool).
+
+The corpus in scripts/fixtures/html (a listing page and two articles per
+source, in the markup each parser reads) is committed, so results are
+reproducible offline:
+    python scripts/benchmark_html_parsing.py --repeat 5
+--refresh replaces it with live pages (needs network):
+    python scripts/benchmark_html_parsing.py --refresh --articles 5
+"""
+import argparse
+import asyncio
+import difflib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.base_parser import make_soup
+from services.news_parser_manager import NewsParserManager
+
+DEFAULT_FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+
+def available_backends() -> list:
+    backends = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        print("lxml is not installed - only html.parser is compared")
+    return backends
+
+
+def listing_url(parser) -> str:
+    return getattr(parser, "news_url", None) or getattr(parser, "tag_url")
+
+
+async def refresh_corpus(fixtures: Path, articles: int):
+    """Downloads a listing page and a few articles of every source"""
+    manager = NewsParserManager()
+    for source, parser in manager._parsers.items():
+        target = fixtures / source
+        target.mkdir(parents=True, exist_ok=True)
+        parser.use_http_cache = False
+        async with parser:
+            pages = {"listing.html": listing_url(parser)}
+            items = await parser.parse_news_list(max_articles=articles, fetch_full_content=False)
+            for index, item in enumerate(items):
+                pages[f"article_{index}.html"] = str(item.url)
+
+            saved = {}
+            for name, url in pages.items():
+                html = await parser._get_html(url)
+                if html:
+                    (target / name).write_text(html, encoding="utf-8")
+                    saved[name] = url
+            (target / "urls.json").write_text(json.dumps(saved, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"{source:12} saved {len(saved)} pages to {target}")
+
+
+def load_corpus(fixtures: Path) -> dict:
+    corpus = {}
+    for source_dir in sorted(p for p in fixtures.iterdir() if p.is_dir()):
+        urls_file = source_dir / "urls.json"
+        if not urls_file.exists():
+            continue
+        urls = json.loads(urls_file.read_text(encoding="utf-8"))
+        corpus[source_dir.name] = [
+            (name, url, (source_dir / name).read_text(encoding="utf-8"))
+            for name, url in urls.items()
+        ]
+    return corpus
+
+
+def time_parse(html: str, backend: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        make_soup(html, backend)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def time_selectolax(html: str, repeat: int):
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        return None
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        HTMLParser(html).text()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def extract_content(parser, url: str, html: str, backend: str) -> str:
+    """Runs the parser's own article extraction on a saved page"""
+    async def from_fixture(_url):
+        return html
+
+    parser._get_html = from_fixture
+    parser.html_parser = backend
+    result = await parser._fetch_full_article(url)
+    if hasattr(result, "content"):
+        result = result.content
+    elif isinstance(result, tuple):
+        result = result[0]
+    return result or ""
+
+
+async def max_loop_stall(coro_factory, pages: list) -> float:
+    """Longest gap between ticks of a 1ms heartbeat while pages are parsed"""
+    stall = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.002)  # Heartbeat must be running before the first page
+    for html in pages:
+        await coro_factory(html)
+        await asyncio.sleep(0)  # Let the heartbeat tick between pages
+    running = False
+    await ticker
+    return stall * 1000
+
+
+async def run(args):
+    corpus = load_corpus(args.fixtures)
+    if not corpus:
+        print(f"No fixtures in {args.fixtures}. Run with --refresh first.")
+        return
+
+    backends = available_backends()
+    parsers = NewsParserManager()._parsers
+    print("-" * 100)
+    print(f"{'source':12} {'page':16} " + " ".join(f"{b:>12}" for b in backends) + f" {'selectolax':>12}  content vs html.parser")
+
+    totals = {backend: 0.0 for backend in backends}
+    for source, pages in corpus.items():
+        parser = parsers.get(source)
+        for name, url, html in pages:
+            timings = {backend: time_parse(html, backend, args.repeat) for backend in backends}
+            for backend, value in timings.items():
+                totals[backend] += value
+            raw = time_selectolax(html, args.repeat)
+
+            content_note = ""
+            if parser and name.startswith("article_"):
+                reference = await extract_content(parser, url, html, "html.parser")
+                notes = []
+                for backend in backends[1:]:
+                    content = await extract_content(parser, url, html, backend)
+                    ratio = difflib.SequenceMatcher(None, reference, content).ratio() if reference or content else 1.0
+                    notes.append(f"{backend}: {len(content)}/{len(reference)} chars, similarity {ratio:.3f}")
+                content_note = "; ".join(notes) or f"{len(reference)} chars"
+
+            row = " ".join(f"{timings[b]:10.1f}ms" for b in backends)
+            raw_cell = f"{raw:10.1f}ms" if raw is not None else f"{'-':>12}"
+            print(f"{source:12} {name:16} {row} {raw_cell}  {content_note}")
+
+    print("-" * 100)
+    print("total parse time: " + ", ".join(f"{b}={v:.1f}ms" for b, v in totals.items()))
+
+    # Влияние на event loop: разбор в самом цикле против пула потоков
+    all_pages = [html for pages in corpus.values() for _, _, html in pages]
+    parser = next(iter(parsers.values()))
+    parser.html_parser = backends[-1]
+
+    async def inline(html):
+        make_soup(html, backends[-1])
+
+    inline_stall = await max_loop_stall(inline, all_pages)
+    pooled_stall = await max_loop_stall(parser._parse_html, all_pages)
+    print(f"max event loop stall ({backends[-1]}): inline={inline_stall:.1f}ms, thread pool={pooled_stall:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--refresh", action="store_true", help="download a fresh corpus before benchmarking")
+    parser.add_argument("--articles", type=int, default=5, help="articles per source for --refresh")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.refresh:
+        asyncio.run(refresh_corpus(args.fixtures, args.articles))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
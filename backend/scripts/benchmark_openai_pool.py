@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of OpenAIProvider calls with and without the pooled HTTP client
+
+Starts a local mock of /v1/chat/completions and runs the same sequence of
+calls twice: with a new httpx.AsyncClient per call (old behaviour) and with
+the shared pooled client. The mock server sleeps on every new TCP connection
+to emulate TLS handshake / proxy CONNECT latency.
+
+Usage:
+    python scripts/benchmark_openai_pool.py --calls 50 --connect-delay 0.05
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.ai_provider import OpenAIProvider
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal chat completions endpoint with keep-alive support"""
+    protocol_version = "HTTP/1.1"
+    connect_delay = 0.0
+    connections = 0
+
+    def setup(self):
+        # Called once per TCP connection, not per request
+        type(self).connections += 1
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        body = json.dumps({
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def run_calls(provider: OpenAIProvider, calls: int) -> list:
+    """Sequential calls, like one generation flow (summary -> article -> image prompt -> post)"""
+    latencies = []
+    messages = [{"role": "user", "content": "ping"}]
+    for _ in range(calls):
+        started = time.perf_counter()
+        await provider.get_completion(messages, model="gpt-4o-mini")
+        latencies.append((time.perf_counter() - started) * 1000)
+    await provider.aclose()
+    return latencies
+
+
+def report(name: str, latencies: list, connections: int):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(
+        f"{name:12} mean={statistics.mean(latencies):7.2f}ms "
+        f"p50={statistics.median(latencies):7.2f}ms p95={p95:7.2f}ms "
+        f"max={max(latencies):7.2f}ms connections={connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--connect-delay", type=float, default=0.05,
+                        help="seconds spent on each new connection (handshake emulation)")
+    args = parser.parse_args()
+
+    MockOpenAIHandler.connect_delay = args.connect_delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    print(f"Mock server: {base_url}, calls={args.calls}, connect_delay={args.connect_delay}s")
+    print("-" * 80)
+
+    for name, pooled in (("per-call", False), ("pooled", True)):
+        MockOpenAIHandler.connections = 0
+        provider = OpenAIProvider("test-key", base_url=base_url, pooled=pooled)
+        latencies = asyncio.run(run_calls(provider, args.calls))
+        report(name, latencies, MockOpenAIHandler.connections)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark: RateLimiter.is_allowed throughput and memory
+
+Measures is_allowed calls per second for the in-process store and for the
+Redis-protocol store, and checks:
+  - a client gets exactly `limit` requests in a burst, then 429,
+  - under scanning traffic (--scan-ips distinct IPs) the in-process store
+    stays within RATE_LIMIT_MAX_KEYS keys,
+  - two limiters (two "uvicorn workers") sharing one Redis store allow
+    `limit` requests in total, not `limit` per worker.
+
+By default the Redis store talks to a local stand-in server that speaks
+RESP and executes the limiter script natively. Pass --redis-url to run
+against a real Redis instead:
+
+    python scripts/benchmark_rate_limiter.py --redis-url redis://localhost:6379/15
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import socketserver
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from starlette.requests import Request
+
+from middleware.rate_limiter import MemoryRateLimitStore, RateLimiter, RedisRateLimitStore, gcra
+
+# Отказы логируются на каждый запрос - в замере они не нужны
+logging.getLogger("middleware.rate_limiter").setLevel(logging.ERROR)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """RESP server with just enough commands for RedisRateLimitStore"""
+
+    data = {}
+    lock = threading.Lock()
+    scripts = set()
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    @classmethod
+    def _encode(cls, value) -> bytes:
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, Exception):
+            return f"-{value}\r\n".encode()
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, list):
+            return f"*{len(value)}\r\n".encode() + b"".join(cls._encode(item) for item in value)
+        return b"$-1\r\n"
+
+    def _write(self, value):
+        # Ответ одним send, как у Redis (иначе Nagle + delayed ACK дают 40 мс на ответ)
+        self.wfile.write(self._encode(value))
+
+    def _run_script(self, key: str, interval_ms: int, window_ms: int) -> list:
+        now = int(time.time() * 1000)
+        with self.lock:
+            tat, expires = self.data.get(key, (None, 0))
+            if expires <= now:
+                tat = None
+            limit = window_ms / interval_ms
+            allowed, new_tat, reset_after, retry_after = gcra(tat, now, limit, window_ms)
+            if allowed:
+                self.data[key] = (new_tat, new_tat)
+            return [int(allowed), int(reset_after), int(retry_after)]
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].decode().upper()
+            if command in ("PING", "AUTH", "SELECT"):
+                self._write("PONG" if command == "PING" else "OK")
+            elif command in ("EVAL", "EVALSHA"):
+                sha = hashlib.sha1(args[1]).hexdigest() if command == "EVAL" else args[1].decode()
+                if sha != RedisRateLimitStore.SCRIPT_SHA:
+                    self._write(RuntimeError("ERR unknown script"))
+                elif command == "EVALSHA" and sha not in self.scripts:
+                    self._write(RuntimeError("NOSCRIPT No matching script"))
+                else:
+                    self.scripts.add(sha)
+                    self._write(self._run_script(args[3].decode(), int(args[4]), int(args[5])))
+            else:
+                self._write(RuntimeError(f"ERR unknown command '{command}'"))
+
+
+def make_request(ip: str, path: str = "/api/news/articles") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"x-real-ip", ip.encode())],
+        "client": (ip, 50000),
+    })
+
+
+class Config:
+    RATE_LIMIT_AUTH = 20
+    RATE_LIMIT_PARSING = 5
+    RATE_LIMIT_GENERATION = 10
+    RATE_LIMIT_ADMIN = 30
+    RATE_LIMIT_DEFAULT = 100
+
+
+async def throughput(name: str, limiter: RateLimiter, requests: list) -> float:
+    started = time.perf_counter()
+    for request in requests:
+        await limiter.is_allowed(request)
+    elapsed = time.perf_counter() - started
+    rate = len(requests) / elapsed
+    print(f"{name:44} {rate:12,.0f} calls/s  ({elapsed * 1e6 / len(requests):.1f} us/call)")
+    return rate
+
+
+async def burst_allowed(limiters: list, ip: str, attempts: int) -> int:
+    allowed = 0
+    for index in range(attempts):
+        ok, _ = await limiters[index % len(limiters)].is_allowed(make_request(ip))
+        allowed += ok
+    return allowed
+
+
+async def run(args, redis_url: str) -> bool:
+    ok = True
+    limit = Config.RATE_LIMIT_DEFAULT
+
+    # Пул запросов заранее: в замер не входит построение Request
+    hot = [make_request(f"10.0.0.{index % args.ips}") for index in range(args.calls)]
+
+    memory = RateLimiter(Config, MemoryRateLimitStore(max_keys=args.max_keys))
+    await throughput(f"memory, {args.ips} IPs", memory, hot)
+
+    allowed = await burst_allowed([RateLimiter(Config, MemoryRateLimitStore())], "192.0.2.1", limit * 2)
+    print(f"{'memory, burst of ' + str(limit * 2):44} {allowed:12} allowed")
+    if allowed != limit:
+        print(f"FAIL: memory store allowed {allowed} of a {limit} burst limit")
+        ok = False
+
+    # Сканирование: каждый запрос с нового IP
+    store = MemoryRateLimitStore(max_keys=args.max_keys)
+    scanner = RateLimiter(Config, store)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for index in range(args.scan_ips):
+        await scanner.is_allowed(make_request(f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"))
+    grown = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    stats = store.get_stats()
+    print(f"{'memory, scan of ' + str(args.scan_ips) + ' IPs':44} {stats['active_keys']:12} keys  "
+          f"{grown / 1024 / 1024:.1f} MB  evicted {stats['evicted_keys']}")
+    if stats["active_keys"] > args.max_keys:
+        print(f"FAIL: memory store holds {stats['active_keys']} keys, limit {args.max_keys}")
+        ok = False
+
+    redis_store = RedisRateLimitStore(redis_url, key_prefix=f"bench:{time.time_ns()}:", timeout=5)
+    shared = RateLimiter(Config, redis_store)
+    await throughput(f"redis, {args.ips} IPs", shared, hot[:args.redis_calls])
+
+    # Два воркера с общим хранилищем
+    workers = [
+        RateLimiter(Config, RedisRateLimitStore(redis_url, key_prefix=redis_store.key_prefix, timeout=5))
+        for _ in range(2)
+    ]
+    allowed = await burst_allowed(workers, "192.0.2.2", limit * 2)
+    print(f"{'redis, burst of ' + str(limit * 2) + ' over 2 workers':44} {allowed:12} allowed")
+    if allowed != limit:
+        print(f"FAIL: two workers sharing the Redis store allowed {allowed}, expected {limit}")
+        ok = False
+    if redis_store.errors or any(worker.store.errors for worker in workers):
+        print("FAIL: Redis store fell back to in-process limits")
+        ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200_000, help="is_allowed calls for the memory store")
+    parser.add_argument("--redis-calls", type=int, default=20_000, help="is_allowed calls for the Redis store")
+    parser.add_argument("--ips", type=int, default=1000, help="distinct client IPs in the throughput test")
+    parser.add_argument("--scan-ips", type=int, default=500_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--redis-url", default=None, help="real Redis instead of the local stand-in")
+    args = parser.parse_args()
+
+    server = None
+    redis_url = args.redis_url
+    if not redis_url:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeRedisHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        redis_url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+    try:
+        ok = asyncio.run(run(args, redis_url))
+    finally:
+        if server:
+            server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
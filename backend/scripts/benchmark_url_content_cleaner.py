@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: URLArticleParser._clean_content on large pages
+
+Builds documents of --sizes kilobytes from the fixture pages in
+scripts/fixtures/url_cleaner (the pages repeated, as on long pages with
+comments and "read also" blocks) and times the current cleaner against the
+previous implementation kept below as legacy_clean_content: eight re.sub
+passes with patterns looked up on every call and a keyword check calling
+lower() once per keyword for every line.
+
+Checks that both produce the same output and that the current cleaner is
+at least --min-speedup times faster on every size.
+
+Usage:
+    python scripts/benchmark_url_content_cleaner.py --sizes 100,250,1000
+Exit code is 1 if any check fails.
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.url_article_parser import URLArticleParser
+
+DEFAULT_FIXTURES = Path(__file__).parent / "fixtures" / "url_cleaner"
+
+
+def legacy_clean_content(content: str) -> str:
+    """_clean_content до перехода на предкомпилированные правила (без изменений)"""
+    content = re.sub(r'\[.*?\]\(https?://(vk\.com|twitter\.com|facebook\.com|t\.me|instagram\.com|youtube\.com|ok\.ru|zen\.yandex\.ru)/[^\)]*\)', '', content)
+    content = re.sub(r'^[\s\*\[\]()•▪▫◦‣⁃]+$', '', content, flags=re.MULTILINE)
+    content = re.sub(r'©\s*\d{4}(-\d{4})?', '', content)
+    content = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', content)
+    content = re.sub(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}', '', content)
+    content = re.sub(r'\b(ИНН|ОГРН|ОКПО|КПП|ОКВЭД)[\s:]*\d+', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'\b(г\.|город|ул\.|улица|пр\.|проспект|д\.|дом)\s+[А-Яа-яёЁ0-9\s,.-]+', '', content)
+    content = re.sub(r'\*{2,}\s*(зарегистрированных|просмотров|пользователей)', '', content, flags=re.IGNORECASE)
+
+    lines = content.split('\n')
+    cleaned_lines = []
+    skip_until_title = True
+
+    for line in lines:
+        if skip_until_title:
+            if line.startswith('Title:') or line.startswith('# '):
+                skip_until_title = False
+                cleaned_lines.append(line)
+            continue
+
+        if any(keyword in line.lower() for keyword in [
+            'image ', 'войти', 'вход', 'авторизуйтесь', 'авторизоваться', 'регистрация', 'зарегистрироваться',
+            'комментарии', 'комментировать', 'загрузить еще',
+            'подписаться', 'подписка', 'реклама', 'banner', 'написать нам',
+            'cookie', 'принять', 'подтвердите', 'совершеннолетн', 'возраст', '18+',
+            '[](http', 'vk.com', 'telegram', 'поделиться', 'twitter', 'whatsapp', 'viber', 'skype',
+            'facebook', 'youtube', 'instagram', 'яндекс.метрика',
+            'рекламодателям', 'контакты', 'редакция', 'политика', 'оферта', 'пользовательское соглашение',
+            'инн', 'огрн', 'окпо', 'юридический адрес', 'наименование организации', 'ооо', 'ао', 'зао',
+            'читайте также', 'о нас', 'мероприятия', 'эксперты', 'специальности', 'главная',
+            'воспроизведение материалов', 'источник:', 'фото:', 'видео:',
+            'все права защищены', 'перепечатка', 'использование материалов',
+            'новостная лента', 'популярное', 'популярные новости', 'рекомендуем', 'по теме',
+            'смотрите также', 'больше новостей', 'следите за нами', 'ближайшие мероприятия',
+            'условия использования', 'читать далее', 'подробнее'
+        ]):
+            continue
+
+        if not line.strip():
+            if cleaned_lines and not cleaned_lines[-1].strip():
+                continue
+
+        cleaned_lines.append(line)
+
+    while cleaned_lines and not cleaned_lines[-1].strip():
+        cleaned_lines.pop()
+
+    return '\n'.join(cleaned_lines)
+
+
+def build_document(pages: list, size_kb: int) -> str:
+    """Страницы корпуса подряд, пока документ не достигнет size_kb"""
+    parts = []
+    total = 0
+    while total < size_kb * 1024:
+        for page in pages:
+            parts.append(page)
+            total += len(page.encode("utf-8"))
+    return "\n\n".join(parts)
+
+
+def timed(func, content: str, repeat: int) -> tuple:
+    """(медиана времени, результат)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(content)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--sizes", default="100,250,1000", help="document sizes, KB")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=1.5)
+    args = parser.parse_args()
+
+    pages = [
+        p.read_text(encoding="utf-8")
+        for p in sorted(args.fixtures.glob("*.md"))
+        if not p.name.endswith(".golden.md")
+    ]
+    if not pages:
+        print(f"No fixture pages in {args.fixtures}")
+        sys.exit(1)
+
+    cleaner = URLArticleParser()
+    ok = True
+    print(f"{'size':>8} {'lines':>7} {'legacy':>10} {'current':>10} {'speedup':>8}")
+    for size_kb in (int(size) for size in args.sizes.split(",")):
+        content = build_document(pages, size_kb)
+        legacy_seconds, expected = timed(legacy_clean_content, content, args.repeat)
+        current_seconds, output = timed(cleaner._clean_content, content, args.repeat)
+        speedup = legacy_seconds / current_seconds if current_seconds else float("inf")
+        print(f"{len(content.encode('utf-8')) // 1024:6} KB {content.count(chr(10)):7} "
+              f"{legacy_seconds * 1000:8.1f}ms {current_seconds * 1000:8.1f}ms {speedup:7.1f}x")
+
+        if output != expected:
+            print(f"FAIL: {size_kb} KB: output differs from the legacy cleaner")
+            ok = False
+        if speedup < args.min_speedup:
+            print(f"FAIL: {size_kb} KB: speedup {speedup:.1f}x, expected at least {args.min_speedup}x")
+            ok = False
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
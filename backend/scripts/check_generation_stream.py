@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Check: streamed generation delivers the first text early and the same result
+
+Starts a local mock of /v1/chat/completions that answers like the model:
+after --first-token-delay it sends the canned answer in small SSE chunks
+(--token-delay between them), or the whole answer at once when the request
+is not streamed. For the summary, the article text and the Telegram post
+the script runs the blocking method and its stream_* counterpart and checks:
+  - the first text event arrives within --max-first-text seconds,
+  - the streamed result equals the result of the blocking method,
+  - with --unavailable-model the stream falls back to the next model.
+
+AIService reads generation settings from the database, so the script uses a
+temporary SQLite file unless --database-url is given.
+
+Usage:
+    python scripts/check_generation_stream.py --first-token-delay 0.5 --token-delay 0.01
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--first-token-delay", type=float, default=0.5, help="model latency before the first token, s")
+parser.add_argument("--token-delay", type=float, default=0.01, help="delay between streamed chunks, s")
+parser.add_argument("--chunk-size", type=int, default=8, help="characters per streamed chunk")
+parser.add_argument("--max-first-text", type=float, default=1.0, help="allowed time to the first text event, s")
+parser.add_argument("--unavailable-model", default=None, help="model the mock answers with 404 model_not_found")
+parser.add_argument("--database-url", default=None)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/stream.db"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from database.connection import create_db_and_tables
+from models.schemas import ProjectType
+from services.ai_provider import OpenAIProvider
+from services.ai_service import AIService, TelegramPostSettings
+
+PARAGRAPH = (
+    "<p>Исследователи наблюдали 15 000 пациентов в течение пяти лет и сравнили \"стандартную\" "
+    "схему терапии с персонализированной. Частота осложнений снизилась на 40%, а время "
+    "госпитализации - в среднем на 2,5 дня.</p>\n"
+)
+ANSWERS = {
+    "summary": json.dumps({
+        "summary": "Российские ученые провели исследование с участием 15 000 пациентов. " * 6,
+        "facts": ["В исследовании участвовали 15 000 пациентов", "Риск снизился на 40%", "Период: 2018-2023"],
+    }, ensure_ascii=False, indent=2),
+    "article": "```json\n" + json.dumps({
+        "news_text": "<h2>Главное</h2>\n<br>\n" + PARAGRAPH * 16,
+        "seo_title": "Персонализированная терапия снижает риск осложнений",
+        "seo_description": "Исследование 15 000 пациентов: осложнений на 40% меньше",
+        "seo_keywords": ["терапия", "осложнения", "исследование"],
+        "image_prompt": "стеклянная банка с витаминами на белом мраморе",
+        "image_url": "https://example.com/image.jpg",
+    }, ensure_ascii=False, indent=2) + "\n```",
+    "telegram": "🩺 А знали ли вы, что привычная схема лечения может давать на 40% больше осложнений? "
+                "Ученые наблюдали 15 000 пациентов и нашли ответ.\n\nПодробности →",
+}
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint answering with canned content, streamed or not"""
+    protocol_version = "HTTP/1.1"
+
+    @staticmethod
+    def _answer_for(request: dict) -> str:
+        system_prompt = request["messages"][0]["content"]
+        if "Telegram" in system_prompt:
+            return ANSWERS["telegram"]
+        if '"summary"' in system_prompt:
+            return ANSWERS["summary"]
+        return ANSWERS["article"]
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model")
+        if model == args.unavailable_model:
+            self._send_json(404, {"error": {"code": "model_not_found", "message": f"The model {model} does not exist"}})
+            return
+
+        answer = self._answer_for(request)
+        chunks = [answer[i:i + args.chunk_size] for i in range(0, len(answer), args.chunk_size)]
+        usage = {"prompt_tokens": 900, "completion_tokens": len(chunks), "total_tokens": 900 + len(chunks)}
+
+        if not request.get("stream"):
+            time.sleep(args.first_token_delay + args.token_delay * len(chunks))
+            self._send_json(200, {
+                "model": model,
+                "choices": [{"message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(args.first_token_delay)
+        for index, chunk in enumerate(chunks):
+            finish = "stop" if index == len(chunks) - 1 else None
+            event = {"model": model, "choices": [{"delta": {"content": chunk}, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(args.token_delay)
+        if request.get("stream_options", {}).get("include_usage"):
+            self.wfile.write(f"data: {json.dumps({'model': model, 'choices': [], 'usage': usage})}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def consume(stream) -> tuple:
+    """(время первого текста, время до конца, результат, число событий)"""
+    started = time.perf_counter()
+    first_text = None
+    events = 0
+    result = None
+    async for event, data in stream:
+        events += 1
+        if event == "delta" and first_text is None:
+            first_text = time.perf_counter() - started
+        if event == "result":
+            result = data
+    return first_text, time.perf_counter() - started, result, events
+
+
+async def run(service: AIService) -> bool:
+    ok = True
+    summary, facts = "Выжимка исследования", ["Факт 1", "Факт 2"]
+    cases = [
+        (
+            "summary",
+            lambda: service.summarize_article("Текст статьи", "Заголовок", ProjectType.THERAPY),
+            lambda: service.stream_summary("Текст статьи", "Заголовок", ProjectType.THERAPY),
+            lambda blocking: blocking[0].dict(),
+            lambda streamed: streamed["summary"].dict(),
+        ),
+        (
+            "article text",
+            lambda: service.generate_article_text(summary, facts, ProjectType.THERAPY, "Заголовок"),
+            lambda: service.stream_article_text(summary, facts, ProjectType.THERAPY, "Заголовок"),
+            lambda blocking: blocking[0],
+            lambda streamed: streamed["article"],
+        ),
+        (
+            "telegram post",
+            lambda: service.generate_telegram_post("Заголовок", None, summary, facts, ProjectType.THERAPY, TelegramPostSettings()),
+            lambda: service.stream_telegram_post("Заголовок", None, summary, facts, ProjectType.THERAPY, TelegramPostSettings()),
+            lambda blocking: blocking[0],
+            lambda streamed: streamed["telegram_post"],
+        ),
+    ]
+
+    print(f"{'':16} {'blocking':>10} {'first text':>12} {'stream total':>13} {'events':>7}")
+    for name, blocking_call, stream_call, blocking_value, stream_value in cases:
+        started = time.perf_counter()
+        blocking = await blocking_call()
+        blocking_seconds = time.perf_counter() - started
+
+        first_text, total, streamed, events = await consume(stream_call())
+        first_label = f"{first_text:.2f}s" if first_text is not None else "-"
+        print(f"{name:16} {blocking_seconds:9.2f}s {first_label:>12} {total:12.2f}s {events:7}")
+
+        if first_text is None or first_text > args.max_first_text:
+            print(f"FAIL: {name}: first text after {first_label}, expected under {args.max_first_text}s")
+            ok = False
+        if streamed is None or stream_value(streamed) != blocking_value(blocking):
+            print(f"FAIL: {name}: streamed result differs from the blocking one")
+            ok = False
+        if streamed and not streamed["metrics"].get("success", False):
+            print(f"FAIL: {name}: {streamed['metrics'].get('error')}")
+            ok = False
+        if streamed and args.unavailable_model and streamed["metrics"].get("model_used") == args.unavailable_model:
+            print(f"FAIL: {name}: stream used the unavailable model")
+            ok = False
+
+    await service.provider.aclose()
+    return ok
+
+
+def main():
+    create_db_and_tables()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    service = AIService()
+    service.provider = OpenAIProvider("test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", http2=False)
+    try:
+        ok = asyncio.run(run(service))
+    finally:
+        server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Check: KIE image download does not block the event loop
+
+Starts a local stub server that serves a large "image" slowly, in chunks,
+plus a /ping endpoint. While KieNanoBananaClient.download_image_to_file
+streams the image to disk, the script keeps sending /ping requests from the
+same event loop and measures their latency and the longest loop stall.
+
+It also checks the size cap: a download over max_image_bytes must fail and
+leave no partial file behind.
+
+Usage:
+    python scripts/check_image_download.py --size-mb 8 --chunk-delay 0.02
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.kie_image_client import KieNanoBananaClient
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    """/image.png - slow chunked body, /ping - immediate response"""
+    protocol_version = "HTTP/1.1"
+    image_size = 0
+    chunk_size = 64 * 1024
+    chunk_delay = 0.0
+
+    def do_GET(self):
+        if self.path.startswith("/ping"):
+            body = b"pong"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(self.image_size))
+        self.end_headers()
+        sent = 0
+        chunk = b"\x89" * self.chunk_size
+        while sent < self.image_size:
+            part = chunk[:min(self.chunk_size, self.image_size - sent)]
+            self.wfile.write(part)
+            sent += len(part)
+            time.sleep(self.chunk_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def ping_while(base_url: str, done: asyncio.Event) -> list:
+    """Latency of /ping requests sent while the download runs"""
+    latencies = []
+    async with httpx.AsyncClient(timeout=10) as client:
+        while not done.is_set():
+            started = time.perf_counter()
+            response = await client.get(f"{base_url}/ping")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.01)
+    return latencies
+
+
+async def max_loop_stall(done: asyncio.Event) -> float:
+    """Longest gap between ticks of a 1ms heartbeat"""
+    stall = 0.0
+    last = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stall = max(stall, now - last - 0.001)
+        last = now
+    return stall * 1000
+
+
+async def run(args, base_url: str) -> bool:
+    ok = True
+    image_size = StubImageHandler.image_size
+    client = KieNanoBananaClient(api_key="stub", max_image_bytes=image_size * 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = Path(tmp) / "image.png"
+        done = asyncio.Event()
+
+        async def download():
+            try:
+                return await client.download_image_to_file(f"{base_url}/image.png", dest)
+            finally:
+                done.set()
+
+        started = time.perf_counter()
+        size, latencies, stall = await asyncio.gather(download(), ping_while(base_url, done), max_loop_stall(done))
+        elapsed = time.perf_counter() - started
+
+        print(f"download: {size} bytes in {elapsed:.2f}s")
+        print(f"pings served during download: {len(latencies)}, "
+              f"max latency {max(latencies or [0]):.1f}ms, max loop stall {stall:.1f}ms")
+
+        if size != image_size or dest.stat().st_size != image_size:
+            print(f"FAIL: expected {image_size} bytes on disk")
+            ok = False
+        if len(latencies) < 5 or stall > args.max_stall_ms:
+            print(f"FAIL: event loop was blocked during download (limit {args.max_stall_ms}ms)")
+            ok = False
+
+        # Ограничение размера: загрузка прерывается, частичный файл удаляется
+        capped = KieNanoBananaClient(api_key="stub", max_image_bytes=image_size // 2)
+        capped_dest = Path(tmp) / "capped.png"
+        try:
+            await capped.download_image_to_file(f"{base_url}/image.png", capped_dest)
+            print("FAIL: download over max_image_bytes succeeded")
+            ok = False
+        except ValueError as e:
+            leftovers = list(Path(tmp).glob("capped*"))
+            print(f"size cap: rejected ({e}), leftover files: {len(leftovers)}")
+            if leftovers:
+                print("FAIL: partial file left on disk")
+                ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="server delay between 64KB chunks (seconds)")
+    parser.add_argument("--max-stall-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    StubImageHandler.image_size = int(args.size_mb * 1024 * 1024)
+    StubImageHandler.chunk_delay = args.chunk_delay
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        ok = asyncio.run(run(args, base_url))
+    finally:
+        server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Check: KIE task polling against a local fake KIE server
+
+The fake server implements /jobs/createTask, /jobs/recordInfo and serves the
+result files. Each task becomes ready after a random delay; every
+--rate-limit-every status request is answered with 429 and Retry-After
+(counted from the moment the 429 is sent, so requests already in flight
+alongside it are not counted as early).
+The script compares, for the same set of tasks:
+  - fixed interval polling (old behaviour: one poll stream per task),
+  - adaptive polling (one poll stream per task),
+  - wait_for_many (one loop for all tasks),
+and reports status requests, delay between task completion and detection,
+and whether Retry-After was honoured. Finally it runs a full batch through
+generate_images_to_files.
+
+Usage:
+    python scripts/check_kie_polling.py --tasks 20 --min-ready 1 --max-ready 6
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from uuid import uuid4
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.kie_image_client import KieNanoBananaClient
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x00" * 4096
+
+
+class FakeKie:
+    """Состояние фейкового сервера"""
+
+    def __init__(self, min_ready: float, max_ready: float, rate_limit_every: int, retry_after: float):
+        self.min_ready = min_ready
+        self.max_ready = max_ready
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.ready_at = {}
+        self.detected_at = {}
+        self.status_requests = 0
+        self.rate_limited_from = 0.0
+        self.rate_limited_until = 0.0
+        self.early_requests = 0
+        self.active = 0
+        self.max_active = 0
+
+
+class FakeKieServer(ThreadingHTTPServer):
+    # Все задачи создаются одновременно: очередь accept по умолчанию (5) переполняется
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeKieHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    kie: FakeKie = None
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        kie = self.kie
+        task_id = uuid4().hex
+        with kie.lock:
+            kie.ready_at[task_id] = time.monotonic() + random.uniform(kie.min_ready, kie.max_ready)
+        self._json(200, {"code": 200, "message": "success", "data": {"taskId": task_id}})
+
+    def do_GET(self):
+        kie = self.kie
+        url = urlparse(self.path)
+        if url.path.startswith("/files/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(IMAGE)))
+            self.end_headers()
+            self.wfile.write(IMAGE)
+            return
+
+        task_id = parse_qs(url.query)["taskId"][0]
+        with kie.lock:
+            kie.active += 1
+            kie.max_active = max(kie.max_active, kie.active)
+            kie.status_requests += 1
+            now = time.monotonic()
+            if kie.rate_limited_from <= now < kie.rate_limited_until:
+                kie.early_requests += 1
+            limited = kie.rate_limit_every and kie.status_requests % kie.rate_limit_every == 0
+            ready = now >= kie.ready_at[task_id]
+            if ready:
+                kie.detected_at.setdefault(task_id, now)
+
+        # Небольшая задержка ответа, чтобы параллельные запросы пересекались
+        time.sleep(0.02)
+        with kie.lock:
+            kie.active -= 1
+
+        if limited:
+            # Retry-After отсчитывается с момента ответа: запросы, уже летевшие
+            # одновременно с этим, клиент отменить не может
+            with kie.lock:
+                kie.rate_limited_from = time.monotonic()
+                kie.rate_limited_until = kie.rate_limited_from + kie.retry_after
+            self._json(429, {"code": 429, "message": "rate limited"}, {"Retry-After": str(kie.retry_after)})
+            return
+
+        host = self.headers.get("Host")
+        data = {"taskId": task_id, "state": "success" if ready else "generating"}
+        if ready:
+            data["resultJson"] = json.dumps({"resultUrls": [f"http://{host}/files/{task_id}.png"]})
+        self._json(200, {"code": 200, "data": data})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def report(name: str, kie: FakeKie, elapsed: float, results: dict) -> dict:
+    lags = [kie.detected_at[task_id] - kie.ready_at[task_id] for task_id in kie.detected_at]
+    succeeded = sum(1 for value in results.values() if isinstance(value, dict))
+    row = {
+        "succeeded": succeeded,
+        "requests": kie.status_requests,
+        "lag": statistics.mean(lags) if lags else 0.0,
+        "early": kie.early_requests,
+        "max_active": kie.max_active,
+    }
+    print(
+        f"{name:28} {succeeded:3}/{len(results):<3} ok  {kie.status_requests:5} status requests  "
+        f"detect lag avg {row['lag']:.2f}s max {max(lags or [0]):.2f}s  "
+        f"parallel {kie.max_active:3}  requests inside Retry-After: {kie.early_requests}  ({elapsed:.1f}s)"
+    )
+    return row
+
+
+async def per_task(client: KieNanoBananaClient, task_ids: list) -> dict:
+    responses = await asyncio.gather(*(client.wait_for_completion(task_id) for task_id in task_ids), return_exceptions=True)
+    return dict(zip(task_ids, responses))
+
+
+async def run(args, base_url: str, kie: FakeKie) -> bool:
+    ok = True
+    timeout_attempts = int(args.max_ready * 4 / args.max_interval) + 1
+
+    fixed = KieNanoBananaClient(
+        api_key="fake", base_url=base_url, max_poll_attempts=timeout_attempts,
+        poll_interval=args.max_interval, poll_min_interval=args.max_interval, poll_backoff=1.0
+    )
+    adaptive = KieNanoBananaClient(
+        api_key="fake", base_url=base_url, max_poll_attempts=timeout_attempts,
+        poll_interval=args.max_interval, poll_min_interval=args.min_interval,
+        max_parallel_polls=args.parallel
+    )
+
+    rows = {}
+    for name, client, waiter in (
+        ("fixed, task per coroutine", fixed, per_task),
+        ("adaptive, task per coroutine", adaptive, per_task),
+        ("adaptive, wait_for_many", adaptive, lambda c, ids: c.wait_for_many(ids)),
+    ):
+        kie.reset()
+        random.seed(args.seed)
+        task_ids = await asyncio.gather(*(client.create_task(f"prompt {index}") for index in range(args.tasks)))
+        started = time.monotonic()
+        results = await waiter(client, task_ids)
+        rows[name] = report(name, kie, time.monotonic() - started, results)
+        if rows[name]["succeeded"] != args.tasks:
+            print(f"FAIL: {name}: not all tasks completed")
+            ok = False
+        # Независимые корутины не знают о 429 соседей, общий цикл обязан соблюдать паузу
+        if waiter is not per_task and kie.early_requests:
+            print(f"FAIL: {name}: status requests sent before Retry-After elapsed")
+            ok = False
+
+    if rows["adaptive, wait_for_many"]["max_active"] > args.parallel:
+        print(f"FAIL: wait_for_many exceeded {args.parallel} parallel requests")
+        ok = False
+    if rows["adaptive, wait_for_many"]["lag"] >= rows["fixed, task per coroutine"]["lag"]:
+        print("FAIL: adaptive polling does not detect completion faster than fixed interval")
+        ok = False
+
+    kie.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        items = [(f"prompt {index}", Path(tmp) / f"{index}.png") for index in range(args.tasks)]
+        started = time.monotonic()
+        results = await adaptive.generate_images_to_files(items)
+        saved = sum(1 for result in results if isinstance(result, int) and result == len(IMAGE))
+        print(f"{'generate_images_to_files':28} {saved:3}/{len(items):<3} files saved ({time.monotonic() - started:.1f}s)")
+        if saved != len(items):
+            print(f"FAIL: batch generation: {[r for r in results if not isinstance(r, int)][:3]}")
+            ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--min-ready", type=float, default=1.0, help="min seconds until a task is ready")
+    parser.add_argument("--max-ready", type=float, default=6.0, help="max seconds until a task is ready")
+    parser.add_argument("--min-interval", type=float, default=0.5, help="first adaptive poll interval")
+    parser.add_argument("--max-interval", type=float, default=2.0, help="max (and fixed) poll interval")
+    parser.add_argument("--parallel", type=int, default=5, help="max_parallel_polls for wait_for_many")
+    parser.add_argument("--rate-limit-every", type=int, default=25, help="answer every Nth status request with 429 (0 - never)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    kie = FakeKie(args.min_ready, args.max_ready, args.rate_limit_every, args.retry_after)
+    FakeKieHandler.kie = kie
+    server = FakeKieServer(("127.0.0.1", 0), FakeKieHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        ok = asyncio.run(run(args, base_url, kie))
+    finally:
+        server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Check: repeated summaries and cleanups are answered from the LLM response cache
+
+Starts a local mock of /v1/chat/completions that counts requests and runs
+AIService against it with the cache enabled (--backend db or disk):
+  - the second identical summary / cleanup makes no model request and
+    reports cache_hit with the tokens of the first answer,
+  - force_fresh goes to the model again,
+  - a different project or text is a cache miss,
+  - expired entries are not served and the cache keeps at most
+    --max-entries entries.
+
+The db backend uses a temporary SQLite file unless --database-url is given.
+
+Usage:
+    python scripts/check_llm_cache.py --backend db
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--backend", choices=["db", "disk"], default="db")
+parser.add_argument("--max-entries", type=int, default=3)
+parser.add_argument("--database-url", default=None)
+args = parser.parse_args()
+
+temp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{temp_dir}/llm_cache.db"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["LLM_CACHE_ENABLED"] = "true"
+os.environ["LLM_CACHE_BACKEND"] = args.backend
+os.environ["LLM_CACHE_DIR"] = temp_dir
+os.environ["LLM_CACHE_MAX_ENTRIES"] = str(args.max_entries)
+
+from database.connection import create_db_and_tables
+from models.schemas import ProjectType
+from services.ai_provider import OpenAIProvider
+from services.ai_service import AIService
+from services.llm_cache import llm_cache
+
+SUMMARY = json.dumps({
+    "summary": "Российские ученые провели исследование с участием 15 000 пациентов.",
+    "facts": ["В исследовании участвовали 15 000 пациентов", "Риск снизился на 40%"],
+}, ensure_ascii=False)
+CLEANED = "# Персонализированная терапия\n\n" + "Исследователи наблюдали 15 000 пациентов в течение пяти лет. " * 5
+ARTICLE = CLEANED + "\n\nГлавная | О нас | Контакты\n© 2024 Все права защищены"
+TOKENS = 1234
+
+requests_count = 0
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint counting requests"""
+
+    def do_POST(self):
+        global requests_count
+        requests_count += 1
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        answer = SUMMARY if '"summary"' in request["messages"][0]["content"] else CLEANED
+        body = json.dumps({
+            "model": request.get("model"),
+            "choices": [{"message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": TOKENS - 100, "completion_tokens": 100, "total_tokens": TOKENS},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def run(service: AIService) -> bool:
+    ok = True
+
+    def check(name: str, metrics: dict, expect_hit: bool, expect_requests: int):
+        nonlocal ok
+        hit = metrics.get("cache_hit", False)
+        status = "OK" if hit == expect_hit and requests_count == expect_requests else "FAIL"
+        print(f"{name:32} cache_hit={str(hit):5} tokens_used={metrics.get('tokens_used'):5} "
+              f"tokens_saved={str(metrics.get('tokens_saved')):5} requests={requests_count} {status}")
+        if status == "FAIL":
+            ok = False
+        if hit and (metrics.get("tokens_used") != 0 or metrics.get("tokens_saved") != TOKENS):
+            print(f"FAIL: {name}: expected tokens_used 0 and tokens_saved {TOKENS}")
+            ok = False
+
+    summarize = lambda project, **kwargs: service.summarize_article("Текст статьи", "Заголовок", project, **kwargs)
+
+    first, metrics = await summarize(ProjectType.THERAPY)
+    check("summary", metrics, False, 1)
+    cached, metrics = await summarize(ProjectType.THERAPY)
+    check("summary again", metrics, True, 1)
+    if cached.dict() != first.dict():
+        print("FAIL: cached summary differs from the original one")
+        ok = False
+    _, metrics = await summarize(ProjectType.THERAPY, force_fresh=True)
+    check("summary force_fresh", metrics, False, 2)
+    _, metrics = await summarize(ProjectType.PEDIATRICS)
+    check("summary other project", metrics, False, 3)
+
+    streamed = None
+    async for event, data in service.stream_summary("Текст статьи", "Заголовок", ProjectType.THERAPY):
+        if event == "result":
+            streamed = data
+    check("stream summary", streamed["metrics"], True, 3)
+    if streamed["summary"].dict() != first.dict():
+        print("FAIL: streamed cached summary differs from the original one")
+        ok = False
+
+    cleaned, metrics = await service.clean_article_content(ARTICLE, "https://example.com/news/1")
+    check("cleanup", metrics, False, 4)
+    cached_cleaned, metrics = await service.clean_article_content(ARTICLE, "https://example.com/news/1")
+    check("cleanup again", metrics, True, 4)
+    if cached_cleaned != cleaned:
+        print("FAIL: cached cleanup differs from the original one")
+        ok = False
+    _, metrics = await service.clean_article_content(ARTICLE + " ", "https://example.com/news/1")
+    check("cleanup other text", metrics, False, 5)
+
+    entries = llm_cache.get_stats()["entries"]
+    print(f"{'entries':32} {entries} (max {args.max_entries})")
+    if entries > args.max_entries:
+        print(f"FAIL: cache holds {entries} entries, max {args.max_entries}")
+        ok = False
+
+    llm_cache.ttl_seconds = -1
+    _, metrics = await summarize(ProjectType.GYNECOLOGY)
+    _, metrics = await summarize(ProjectType.GYNECOLOGY)
+    check("summary after expiry", metrics, False, 7)
+
+    print(f"stats: {llm_cache.get_stats()}")
+    await service.provider.aclose()
+    return ok
+
+
+def main():
+    create_db_and_tables()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    service = AIService()
+    service.provider = OpenAIProvider("test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", http2=False)
+    try:
+        ok = asyncio.run(run(service))
+    finally:
+        server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
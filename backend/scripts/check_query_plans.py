@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Check: query plans of the hot draft and article queries
+
+Seeds an EMPTY scratch PostgreSQL database, runs the hot queries through the
+real service methods and captures the SQL they execute, then runs
+EXPLAIN (FORMAT JSON) for each statement - once before and once after
+applying migration 26 (composite and partial indexes). After the migration
+no plan may contain a Seq Scan on articles or news_generation_drafts.
+COUNT(*) statements are reported but not checked: counting most of a table
+is legitimately a sequential scan.
+
+Usage:
+    python scripts/check_query_plans.py --database-url postgresql://postgres@localhost/plans
+Exit code is 1 if any checked plan falls back to a sequential scan.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--database-url", required=True, help="URL of an EMPTY scratch PostgreSQL database")
+parser.add_argument("--articles", type=int, default=100_000)
+parser.add_argument("--drafts", type=int, default=50_000)
+parser.add_argument("--limit", type=int, default=50, help="page size for the list queries")
+args = parser.parse_args()
+
+if not args.database_url.startswith("postgresql"):
+    parser.error("query plans are checked on PostgreSQL only")
+os.environ["DATABASE_URL"] = args.database_url
+
+from sqlalchemy import event, insert
+
+from database.connection import engine, create_db_and_tables
+from database.models import Article, NewsGenerationDraft, SourceType, ProjectType, moscow_now
+from database.service import news_service
+from services.news_generation_service import NewsGenerationService
+from services.publication_worker import publication_worker
+from services.scheduler import publication_scheduler
+
+BATCH = 5000
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "26_add_composite_indexes_for_hot_queries.sql"
+CHECKED_TABLES = {"articles", "news_generation_drafts"}
+
+
+def seed():
+    print(f"Seeding {args.articles} articles and {args.drafts} drafts...")
+    random.seed(42)
+    sources = list(SourceType)
+    projects = [p.value for p in ProjectType]
+    # Как в рабочей базе: запланированных немного, большинство опубликовано
+    statuses = ["summary_pending"] * 20 + ["generated"] * 25 + ["published"] * 53 + ["scheduled"] * 2
+    now = moscow_now().replace(tzinfo=None)
+    base = now - timedelta(minutes=args.articles)
+
+    with engine.begin() as conn:
+        rows = []
+        for i in range(args.articles):
+            rows.append({
+                "title": f"Новость {i}",
+                "url": f"https://example.org/news/{i}",
+                "content": "Текст медицинской новости. " * 20,
+                "source_site": random.choice(sources),
+                "published_date": None if i % 10 == 0 else base + timedelta(minutes=i),
+                "created_at": base + timedelta(minutes=i, seconds=30),
+                "is_processed": False,
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(Article.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Article.__table__), rows)
+
+        rows = []
+        for i in range(args.drafts):
+            status = random.choice(statuses)
+            created = base + timedelta(minutes=i * args.articles // args.drafts)
+            published = status == "published"
+            rows.append({
+                "article_id": random.randint(1, args.articles),
+                "project": random.choice(projects),
+                "summary": "Выжимка",
+                "facts": "[]",
+                "generated_news_text": "Текст" if status != "summary_pending" else None,
+                "status": status,
+                "can_retry": True,
+                "retry_count": 0,
+                "is_published": published,
+                "published_project_code": "GS" if published else None,
+                "bitrix_id": i if published else None,
+                "published_at": created + timedelta(hours=1) if published else None,
+                # Половина запланированных уже должна быть опубликована
+                "scheduled_at": now + timedelta(minutes=random.randint(-600, 600)) if status == "scheduled" else None,
+                "created_at": created,
+                "updated_at": created,
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(NewsGenerationDraft.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(NewsGenerationDraft.__table__), rows)
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql("VACUUM ANALYZE")
+
+
+class StatementCapture:
+    """Collects SQL statements (with parameters) executed by the engine"""
+
+    def __init__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def run(self, func):
+        self.statements = []
+        func()
+        return list(self.statements)
+
+
+def hot_queries():
+    """(name, callable) - the hot paths, called exactly as the application does"""
+    sample = engine.connect()
+    try:
+        article_id, project = sample.exec_driver_sql(
+            "SELECT article_id, project FROM news_generation_drafts ORDER BY id DESC LIMIT 1"
+        ).one()
+    finally:
+        sample.close()
+    published_filter = SimpleNamespace(
+        project=None, author=None, date_from=None, date_to=None, status=None, page=1, limit=args.limit
+    )
+    first_page = news_service.get_articles_with_drafts(limit=args.limit, include_content=False)
+
+    return [
+        ("scheduled publications due", NewsGenerationService.get_scheduled_publications),
+        ("scheduler: projects with due drafts", publication_scheduler._get_due_projects),
+        ("worker: next scheduled_at", publication_worker._seconds_until_next),
+        ("draft by article and project", lambda: NewsGenerationService.get_draft_by_article_and_project(article_id, project)),
+        ("drafts of an article", lambda: NewsGenerationService.get_drafts_by_article(article_id)),
+        ("published news, first page", lambda: NewsGenerationService.get_published_news(published_filter)),
+        ("articles, first page", lambda: news_service.get_articles_with_drafts(limit=args.limit, include_content=False)),
+        ("articles, keyset page", lambda: news_service.get_articles_with_drafts(
+            limit=args.limit, cursor=first_page["next_cursor"], include_content=False)),
+        ("articles of a source, first page", lambda: news_service.get_articles_with_drafts(
+            source=SourceType.RIA, limit=args.limit, include_content=False)),
+    ]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(statement: str, parameters) -> dict:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+        raw.rollback()
+    finally:
+        raw.close()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def check_plans(queries, capture: StatementCapture, enforce: bool) -> int:
+    failures = 0
+    for name, func in queries:
+        for statement, parameters in capture.run(func):
+            plan = explain(statement, parameters)
+            nodes = list(plan_nodes(plan))
+            scans = sorted({
+                f"{node['Node Type']}({node.get('Index Name') or node['Relation Name']})"
+                for node in nodes if "Relation Name" in node
+            })
+            seq_scans = [
+                node["Relation Name"] for node in nodes
+                if node["Node Type"] == "Seq Scan" and node["Relation Name"] in CHECKED_TABLES
+            ]
+            is_count = "count(" in statement.lower()
+            failed = enforce and seq_scans and not is_count
+            marker = "FAIL" if failed else ("info" if is_count else "ok")
+            print(f"  [{marker:4}] {name:38} cost={plan['Total Cost']:>10.1f}  {', '.join(scans)}")
+            if failed:
+                failures += 1
+    return failures
+
+
+def main():
+    create_db_and_tables()
+    seed()
+    capture = StatementCapture()
+    queries = hot_queries()
+
+    print("-" * 100)
+    print("Before migration 26:")
+    check_plans(queries, capture, enforce=False)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(MIGRATION.read_text(encoding="utf-8"))
+
+    print("After migration 26:")
+    failures = check_plans(queries, capture, enforce=True)
+
+    print("OK" if not failures else f"FAILED: {failures} statement(s) fall back to Seq Scan")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
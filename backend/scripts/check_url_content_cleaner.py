@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Check: URLArticleParser._clean_content output matches the golden files
+
+Every fixture page scripts/fixtures/url_cleaner/<name>.md (markdown as
+returned by Jina Reader) is cleaned and compared with <name>.golden.md.
+On a mismatch the script prints a unified diff of the first differences.
+
+The golden files record the output of the cleaner before it was rewritten
+as a precompiled single-pass engine. Regenerate them only when the cleaning
+rules change on purpose:
+    python scripts/check_url_content_cleaner.py --update
+Exit code is 1 if any page differs.
+"""
+import argparse
+import difflib
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.url_article_parser import URLArticleParser
+
+DEFAULT_FIXTURES = Path(__file__).parent / "fixtures" / "url_cleaner"
+
+
+def fixture_pages(fixtures: Path) -> list:
+    return sorted(p for p in fixtures.glob("*.md") if not p.name.endswith(".golden.md"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--update", action="store_true", help="rewrite golden files with the current output")
+    args = parser.parse_args()
+
+    cleaner = URLArticleParser()
+    pages = fixture_pages(args.fixtures)
+    if not pages:
+        print(f"No fixture pages in {args.fixtures}")
+        sys.exit(1)
+
+    failed = 0
+    for page in pages:
+        golden = page.with_name(page.stem + ".golden.md")
+        output = cleaner._clean_content(page.read_text(encoding="utf-8"))
+
+        if args.update:
+            golden.write_text(output, encoding="utf-8")
+            print(f"{page.name:28} golden updated ({len(output)} chars)")
+            continue
+
+        if not golden.exists():
+            print(f"{page.name:28} FAIL: no golden file {golden.name}")
+            failed += 1
+            continue
+
+        expected = golden.read_text(encoding="utf-8")
+        if output == expected:
+            print(f"{page.name:28} OK ({len(output)} chars)")
+            continue
+
+        failed += 1
+        print(f"{page.name:28} FAIL")
+        diff = difflib.unified_diff(
+            expected.splitlines(), output.splitlines(), golden.name, "output", lineterm=""
+        )
+        for line in list(diff)[:40]:
+            print(f"    {line}")
+
+    if args.update:
+        return
+    print("OK" if not failed else f"FAILED: {failed} of {len(pages)} pages differ")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
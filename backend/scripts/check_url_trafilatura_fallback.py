@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Check: the trafilatura fallback of URLArticleParser does not block the event loop
+
+Starts a local slow HTTP server: Jina Reader answers 503 (so every URL goes
+to the trafilatura fallback) and article pages of --page-kb kilobytes are
+sent in chunks over --slow-seconds. A /ping endpoint is served by aiohttp
+from the same event loop as the parser and polled while the articles are
+parsed:
+  - parse_multiple_urls downloads and extracts --urls pages concurrently
+    (downloads overlap each other and extraction runs on up to --workers
+    processes) and every page is parsed,
+  - /ping keeps answering within --max-latency seconds during downloads
+    and extraction,
+  - an extraction longer than URL_PARSER_EXTRACT_TIMEOUT gives None, and
+    the next fallback works again,
+  - a cancelled extraction stops its worker process.
+
+Usage:
+    python scripts/check_url_trafilatura_fallback.py --urls 4 --page-kb 300
+Exit code is 1 if any check fails.
+"""
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--urls", type=int, default=4)
+parser.add_argument("--page-kb", type=int, default=300)
+parser.add_argument("--slow-seconds", type=float, default=2.0)
+parser.add_argument("--workers", type=int, default=2)
+parser.add_argument("--max-latency", type=float, default=0.25)
+args = parser.parse_args()
+
+os.environ["URL_PARSER_EXTRACT_WORKERS"] = str(args.workers)
+
+import aiohttp
+from aiohttp import web
+
+from services.url_article_parser import URLArticleParser, _extract_with_trafilatura, trafilatura_extractor
+
+# Ошибки Jina и таймауты здесь ожидаемы
+logging.getLogger("services.url_article_parser").setLevel(logging.CRITICAL)
+
+
+def build_page(size_kb: int) -> bytes:
+    """Новостная страница с навигацией, статьей и подвалом размером около size_kb"""
+    head = (
+        "<html><head><meta charset='utf-8'><title>Новое исследование</title></head><body>"
+        "<nav><a href='/'>Главная</a> <a href='/news'>Новости</a></nav>"
+        "<article><h1>Персонализированная терапия снижает риск осложнений</h1>"
+    )
+    tail = "</article><footer>© 2024 Все права защищены</footer></body></html>"
+    parts = [head]
+    size = len(head.encode("utf-8"))
+    index = 0
+    while size < size_kb * 1024:
+        index += 1
+        paragraph = (
+            f"<div class='block'><p>Абзац {index}. Исследователи наблюдали {index * 13} пациентов "
+            f"в течение {index % 7 + 1} лет и отметили снижение риска на {index % 40 + 5}%. "
+            f"<b>Результаты</b> подтверждены в группе {index}.</p>"
+            f"<ul><li>Показатель {index}</li><li>Контроль {index}</li></ul></div>"
+        )
+        parts.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+    parts.append(tail)
+    return "".join(parts).encode("utf-8")
+
+
+PAGE = build_page(args.page_kb)
+
+
+class SlowSiteHandler(BaseHTTPRequestHandler):
+    """Jina Reader с ошибкой 503 и медленно отдаваемые страницы статей"""
+
+    def do_GET(self):
+        if self.path.startswith("/jina/"):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        chunks = 10
+        step = len(PAGE) // chunks + 1
+        for offset in range(0, len(PAGE), step):
+            time.sleep(args.slow_seconds / chunks)
+            self.wfile.write(PAGE[offset:offset + step])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Pinger:
+    """Опрос /ping, который обслуживается тем же event loop, что и парсер"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies = []
+        self._task = None
+
+    async def _run(self):
+        async with aiohttp.ClientSession() as session:
+            while True:
+                started = time.perf_counter()
+                async with session.get(self.url) as response:
+                    await response.read()
+                self.latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+    def start(self):
+        self.latencies = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> tuple:
+        """(число ответов, максимальная задержка)"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return len(self.latencies), max(self.latencies, default=float("inf"))
+
+
+async def run(site: str) -> bool:
+    ok = True
+
+    def check(name: str, passed: bool, details: str):
+        nonlocal ok
+        print(f"{name:34} {details} {'OK' if passed else 'FAIL'}")
+        ok = ok and passed
+
+    app = web.Application()
+    app.router.add_get("/ping", lambda request: web.Response(text="pong"))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    ping_site = web.TCPSite(runner, "127.0.0.1", 0)
+    await ping_site.start()
+    port = ping_site._server.sockets[0].getsockname()[1]
+    pinger = Pinger(f"http://127.0.0.1:{port}/ping")
+
+    # Столько event loop простаивал бы при извлечении прямо в корутине
+    started = time.perf_counter()
+    expected = _extract_with_trafilatura(PAGE)
+    extract_seconds = time.perf_counter() - started
+    print(f"{'page':34} {len(PAGE) // 1024} KB, in-loop extract would block {extract_seconds * 1000:.0f}ms")
+
+    urls = [f"{site}/article/{index}" for index in range(args.urls)]
+    async with URLArticleParser() as url_parser:
+        url_parser.JINA_READER_BASE_URL = f"{site}/jina"
+
+        pinger.start()
+        started = time.perf_counter()
+        results = await url_parser.parse_multiple_urls(urls)
+        elapsed = time.perf_counter() - started
+        pings, latency = await pinger.stop()
+
+        parsed = sum(1 for result in results if result["success"] and result["content"] == expected)
+        check("parse_multiple_urls", parsed == len(urls), f"{parsed}/{len(urls)} parsed in {elapsed:.2f}s")
+        sequential = len(urls) * (args.slow_seconds + extract_seconds)
+        parallel = min(args.workers, os.cpu_count() or 1)
+        concurrent = args.slow_seconds + math.ceil(len(urls) / parallel) * extract_seconds
+        check("concurrent", elapsed < (sequential + concurrent) / 2,
+              f"{elapsed:.2f}s, ~{concurrent:.2f}s expected, {sequential:.2f}s one by one")
+        check("ping during parsing", pings > 0 and latency < args.max_latency,
+              f"{pings} answers, max latency {latency * 1000:.0f}ms")
+
+        timeout = trafilatura_extractor.timeout
+        trafilatura_extractor.timeout = extract_seconds / 10
+        pinger.start()
+        started = time.perf_counter()
+        content = await url_parser._parse_via_trafilatura(urls[0])
+        elapsed = time.perf_counter() - started
+        pings, latency = await pinger.stop()
+        trafilatura_extractor.timeout = timeout
+        check("extraction timeout", content is None and latency < args.max_latency,
+              f"None after {elapsed:.2f}s, max ping latency {latency * 1000:.0f}ms")
+
+        content = await url_parser._parse_via_trafilatura(urls[0])
+        check("fallback after timeout", content == expected, f"{len(content or '')} chars")
+
+    workers = len(multiprocessing.active_children())
+    task = asyncio.create_task(trafilatura_extractor.extract(PAGE))
+    await asyncio.sleep(extract_seconds / 2)
+    task.cancel()
+    try:
+        await task
+        cancelled = False
+    except asyncio.CancelledError:
+        cancelled = True
+    await asyncio.sleep(0.5)
+    left = len(multiprocessing.active_children())
+    check("cancelled extraction", cancelled and left == workers - 1, f"worker processes {workers} -> {left}")
+
+    trafilatura_extractor.close()
+    await runner.cleanup()
+    return ok
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowSiteHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        ok = asyncio.run(run(f"http://127.0.0.1:{server.server_address[1]}"))
+    finally:
+        server.shutdown()
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
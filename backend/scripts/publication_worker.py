@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Постоянно работающий воркер публикаций по расписанию
+
+Заменяет запуск publish_scheduled_news.py по cron: процесс не завершается,
+спит до ближайшей публикации и просыпается по PostgreSQL NOTIFY при
+изменении расписания. Останавливается по SIGTERM / SIGINT.
+"""
+
+import sys
+import os
+import asyncio
+import logging
+import signal
+
+# Добавляем путь к backend модулям (скрипт находится в backend/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.publication_worker import publication_worker
+
+# Настройка логирования (логи пишутся в stdout)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, publication_worker.stop)
+
+    await publication_worker.run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logger.error(f"Publication worker crashed: {e}", exc_info=True)
+        sys.exit(1)
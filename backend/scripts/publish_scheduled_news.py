@@ -40,6 +40,15 @@ async def main():
         else:
             logger.info("No articles ready for publication")
 
+        stats = publication_scheduler.last_run_stats
+        if stats:
+            logger.info(
+                f"Run summary: published={stats['published']} failed={stats['failed']} "
+                f"in {stats['elapsed_seconds']}s ({stats['throughput_per_minute']}/min), "
+                f"publish p50={stats['publish_seconds_p50']}s p95={stats['publish_seconds_p95']}s, "
+                f"schedule delay p50={stats['schedule_delay_seconds_p50']}s max={stats['schedule_delay_seconds_max']}s"
+            )
+
         logger.info("Scheduled publications check completed")
         logger.info("=" * 60)
 
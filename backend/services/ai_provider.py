@@ -3,8 +3,11 @@ OpenAI провайдер с поддержкой прокси для обход
 """
 
 import os
+import asyncio
+import json
 import httpx
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Any, AsyncIterator
 from core.config import settings
 
@@ -14,10 +17,26 @@ logger = logging.getLogger(__name__)
 class OpenAIProvider:
     """OpenAI провайдер с поддержкой прокси"""
     
-    def __init__(self, api_key: str, proxy_url: str = None):
+    def __init__(
+        self,
+        api_key: str,
+        proxy_url: str = None,
+        base_url: str = "https://api.openai.com/v1",
+        pooled: bool = True,
+        http2: bool = True,
+        limits: Optional[httpx.Limits] = None
+    ):
         self.api_key = api_key
         self.proxy_url = proxy_url
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = base_url
+        
+        # Общий клиент с пулом соединений: TCP/TLS и CONNECT через прокси
+        # выполняются один раз, дальше соединения переиспользуются
+        self.pooled = pooled
+        self.http2 = http2 and self._http2_available()
+        self.limits = limits or httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Безопасное логирование прокси (маскируем пароль)
         if self.proxy_url:
@@ -37,6 +56,56 @@ class OpenAIProvider:
             return '@'.join(parts)
         return proxy_url
     
+    @staticmethod
+    def _http2_available() -> bool:
+        """HTTP/2 в httpx требует пакет h2 (httpx[http2])"""
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("⚠️ Пакет h2 не установлен, OpenAI клиент работает по HTTP/1.1")
+            return False
+    
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Параметры httpx клиента (таймаут, прокси, пул соединений)"""
+        client_kwargs = {"timeout": httpx.Timeout(60.0)}
+        if self.proxy_url:
+            client_kwargs['proxy'] = self.proxy_url
+        if self.pooled:
+            client_kwargs['limits'] = self.limits
+            client_kwargs['http2'] = self.http2
+        return client_kwargs
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Получение общего клиента, создается лениво в текущем event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Клиент привязан к event loop, в котором были открыты соединения
+            self._client = httpx.AsyncClient(**self._client_kwargs())
+            self._client_loop = loop
+            logger.info(
+                f"🔗 Создан пул соединений OpenAI (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+        return self._client
+    
+    @asynccontextmanager
+    async def _client_context(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Общий клиент в режиме пула, иначе новый клиент на каждый вызов"""
+        if self.pooled:
+            yield self._get_client()
+        else:
+            async with httpx.AsyncClient(**self._client_kwargs()) as client:
+                yield client
+    
+    async def aclose(self):
+        """Закрытие пула соединений (вызывается при остановке приложения)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("🔌 Пул соединений OpenAI закрыт")
+        self._client = None
+        self._client_loop = None
+    
     async def get_completion(
         self, 
         messages: List[Dict[str, str]], 
@@ -72,13 +141,10 @@ class OpenAIProvider:
         # Удаляем None значения
         payload = {k: v for k, v in payload.items() if v is not None}
         
-        # Настройка клиента с прокси
-        client_kwargs = {"timeout": httpx.Timeout(60.0)}
         if self.proxy_url:
-            client_kwargs['proxy'] = self.proxy_url
             logger.debug(f"🔗 Используется прокси для OpenAI запроса к модели {model}")
 
-        async with httpx.AsyncClient(**client_kwargs) as client:
+        async with self._client_context() as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
@@ -112,10 +178,10 @@ class OpenAIProvider:
         Args:
             messages: Список сообщений
             model: Модель OpenAI
-            **kwargs: Дополнительные параметры
+            **kwargs: Дополнительные параметры (temperature, max_tokens, etc.)
             
         Yields:
-            Dict с частями ответа
+            Dict с частями ответа; последний фрагмент содержит usage
         """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -127,16 +193,20 @@ class OpenAIProvider:
             "messages": messages,
             "temperature": kwargs.get('temperature', 0.7),
             "max_tokens": kwargs.get('max_tokens', 1000),
+            "top_p": kwargs.get('top_p', 1.0),
+            "frequency_penalty": kwargs.get('frequency_penalty', 0.0),
+            "presence_penalty": kwargs.get('presence_penalty', 0.0),
             "stream": True,
+            # Расход токенов приходит отдельным фрагментом в конце потока
+            "stream_options": {"include_usage": True},
         }
         
-        # Настройка клиента с прокси
-        client_kwargs = {"timeout": httpx.Timeout(60.0)}
+        payload = {k: v for k, v in payload.items() if v is not None}
+        
         if self.proxy_url:
-            client_kwargs['proxy'] = self.proxy_url
             logger.debug(f"🔗 Используется прокси для стримингового OpenAI запроса к модели {model}")
 
-        async with httpx.AsyncClient(**client_kwargs) as client:
+        async with self._client_context() as client:
             try:
                 async with client.stream(
                     "POST",
@@ -144,6 +214,9 @@ class OpenAIProvider:
                     headers=headers,
                     json=payload
                 ) as response:
+                    if response.is_error:
+                        # Тело ошибки в потоковом режиме нужно дочитать явно
+                        await response.aread()
                     response.raise_for_status()
                     
                     async for line in response.aiter_lines():
@@ -152,17 +225,23 @@ class OpenAIProvider:
                             if data_str.strip() == "[DONE]":
                                 break
                             try:
-                                import json
                                 data = json.loads(data_str)
-                                if data.get("choices") and data["choices"][0].get("delta"):
-                                    delta = data["choices"][0]["delta"]
-                                    if "content" in delta:
-                                        yield {
-                                            "content": delta["content"],
-                                            "finish_reason": data["choices"][0].get("finish_reason")
-                                        }
                             except json.JSONDecodeError:
                                 continue
+                            if data.get("choices") and data["choices"][0].get("delta"):
+                                delta = data["choices"][0]["delta"]
+                                if delta.get("content"):
+                                    yield {
+                                        "content": delta["content"],
+                                        "finish_reason": data["choices"][0].get("finish_reason")
+                                    }
+                            if data.get("usage"):
+                                yield {
+                                    "content": "",
+                                    "finish_reason": None,
+                                    "usage": data["usage"],
+                                    "model": data.get("model", model)
+                                }
                                 
             except httpx.HTTPStatusError as e:
                 logger.error(f"HTTP error {e.response.status_code} при стриминговом запросе к OpenAI: {e.response.text}")
@@ -185,7 +264,13 @@ def create_openai_provider() -> OpenAIProvider:
     if not api_key:
         raise ValueError("OPENAI_API_KEY не найден в переменных окружения")
     
-    return OpenAIProvider(api_key, proxy_url)
+    limits = httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    )
+    
+    return OpenAIProvider(api_key, proxy_url, http2=settings.OPENAI_HTTP2, limits=limits)
 
 
 # Глобальный экземпляр провайдера
@@ -205,6 +290,14 @@ def get_openai_provider() -> OpenAIProvider:
     return _openai_provider
 
 
+async def close_openai_provider():
+    """
+    Закрытие пула соединений глобального провайдера (вызывается из lifespan)
+    """
+    if _openai_provider is not None:
+        await _openai_provider.aclose()
+
+
 # Синхронная обертка для совместимости с существующим кодом
 class OpenAIClient:
     """Обертка для совместимости с существующим кодом"""
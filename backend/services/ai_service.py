@@ -2,13 +2,14 @@
 Сервис для работы с AI моделями (OpenAI GPT-3.5 и GPT-4o)
 """
 
+import asyncio
 import json
 import re
 import time
 import logging
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 from models.schemas import ArticleSummary, GeneratedArticle, ProjectType
 from pydantic import BaseModel
@@ -16,9 +17,15 @@ from core.config import settings
 from services.settings_service import settings_service
 from services.ai_provider import get_openai_provider
 from services.kie_image_client import get_kie_client
+from services.image_store import image_store
+from services.json_stream import JsonFieldStream
+from services.llm_cache import llm_cache
 
 logger = logging.getLogger(__name__)
 
+# Событие потоковой генерации: (тип, данные) - field/delta/value по полям ответа, result в конце
+StreamEvent = Tuple[str, Dict]
+
 
 class TelegramPostSettings(BaseModel):
     hook_type: str = "question"  # question, shocking_fact, statistics, contradiction
@@ -33,8 +40,92 @@ class AIService:
     def __init__(self, api_key: str = None):
         # Используем новый провайдер с поддержкой прокси
         self.provider = get_openai_provider()
-        
-    async def summarize_article(self, article_content: str, article_title: str, project: ProjectType) -> Tuple[ArticleSummary, Dict]:
+
+    async def _stream_completion(self, request: Dict, state: Dict, **kwargs) -> AsyncIterator[str]:
+        """
+        Потоковый ответ модели с перебором моделей-кандидатов
+
+        К следующей модели переходим только до первого фрагмента: после него
+        текст уже ушел клиенту. В state записываются использованная модель,
+        время первого фрагмента и расход токенов.
+        """
+        last_error = None
+        for candidate in request["model_candidates"]:
+            started = False
+            try:
+                async for part in self.provider.get_streaming_completion(
+                    messages=[
+                        {"role": "system", "content": request["system_prompt"]},
+                        {"role": "user", "content": request["user_prompt"]}
+                    ],
+                    model=candidate,
+                    temperature=request["temperature"],
+                    max_tokens=request["max_tokens"],
+                    **kwargs
+                ):
+                    if part.get("usage"):
+                        state["usage"] = part["usage"]
+                        continue
+                    if not started:
+                        started = True
+                        state["model_used"] = candidate
+                        state["first_token_at"] = time.time()
+                    yield part["content"]
+                return
+            except Exception as e:
+                last_error = e
+                err_msg = str(e).lower()
+                if not started and ("model_not_found" in err_msg or "404" in err_msg):
+                    continue
+                raise
+        raise last_error or Exception("No available model for streaming")
+
+    @staticmethod
+    def _field_events(parser: JsonFieldStream, content: str) -> List[StreamEvent]:
+        """События разбора очередного фрагмента JSON-ответа"""
+        events = []
+        for event, field, data in parser.feed(content):
+            if event == "delta":
+                events.append((event, {"field": field, "text": data}))
+            elif event == "value":
+                events.append((event, {"field": field, "value": data}))
+            else:
+                events.append((event, {"field": field}))
+        return events
+
+    @staticmethod
+    def _response_cache_key(operation: str, model: str, params: Dict, inputs: Dict) -> Optional[str]:
+        """Ключ кэша ответа модели (None, если кэш отключен)"""
+        if llm_cache is None:
+            return None
+        return llm_cache.make_key(operation, model, params, inputs)
+
+    @staticmethod
+    async def _cached_response(cache_key: Optional[str], force_fresh: bool = False) -> Optional[Dict]:
+        """Сохраненный ответ модели: response и tokens (стоимость исходного запроса)"""
+        if cache_key is None or force_fresh:
+            return None
+        return await llm_cache.get(cache_key)
+
+    @staticmethod
+    async def _store_response(cache_key: Optional[str], operation: str, model: str, response, tokens: int) -> None:
+        """Сохранение ответа модели в кэш (при force_fresh запись обновляется)"""
+        if cache_key is not None:
+            await llm_cache.set(cache_key, operation, model, response, tokens)
+
+    @staticmethod
+    def _cache_hit_metrics(cached: Dict, start_time: float) -> Dict:
+        """Метрики операции, выполненной по кэшированному ответу"""
+        return {
+            "model_used": cached["response"]["model"],
+            "tokens_used": 0,
+            "processing_time_seconds": time.time() - start_time,
+            "success": True,
+            "cache_hit": True,
+            "tokens_saved": cached["tokens"]
+        }
+
+    async def summarize_article(self, article_content: str, article_title: str, project: ProjectType, force_fresh: bool = False) -> Tuple[ArticleSummary, Dict]:
         """
         Создание ПОДРОБНОЙ выжимки статьи с помощью GPT-3.5-turbo-16k (до 1200 символов)
         
@@ -42,12 +133,106 @@ class AIService:
             article_content: Полный текст статьи
             article_title: Заголовок статьи
             project: Тип проекта для адаптации
+            force_fresh: Не брать выжимку из кэша ответов модели
             
         Returns:
             Tuple[ArticleSummary, Dict]: Подробная выжимка (до 1200 символов) с максимумом фактов и метрики
         """
         start_time = time.time()
         
+        try:
+            request = self._summary_request(article_content, article_title, project)
+            cached = await self._cached_response(request["cache_key"], force_fresh)
+            if cached:
+                summary = ArticleSummary(summary=cached["response"]["summary"], facts=cached["response"]["facts"])
+                metrics = self._cache_hit_metrics(cached, start_time)
+                logger.info(f"Article summary taken from cache, tokens saved: {metrics['tokens_saved']}")
+                return summary, metrics
+
+            system_prompt = request["system_prompt"]
+            user_prompt = request["user_prompt"]
+            summary_model_name = request["model_candidates"][0]
+            summary_model_candidates = request["model_candidates"]
+            summary_temperature_value = request["temperature"]
+            summary_max_tokens_value = request["max_tokens"]
+
+            last_error = None
+            used_summary_model = summary_model_name
+            response = None
+            for candidate in summary_model_candidates:
+                try:
+                    response = await self.provider.get_completion(
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        model=candidate,
+                        temperature=summary_temperature_value,
+                        max_tokens=summary_max_tokens_value,
+                        top_p=0.95
+                    )
+                    used_summary_model = candidate
+                    break
+                except Exception as e:
+                    last_error = e
+                    # Продолжаем попытки при неактивной/недоступной модели
+                    err_msg = str(e).lower()
+                    if "model_not_found" in err_msg or "404" in err_msg:
+                        continue
+                    # Иные ошибки пробрасываем
+                    raise
+            if response is None:
+                # Если все кандидаты провалились — бросаем последнюю ошибку
+                raise last_error or Exception("No available model for summarize")
+            
+            # Извлекаем JSON из ответа
+            result_data = self._parse_summary_json(response["content"])
+
+            # Создаем объект ArticleSummary
+            summary = ArticleSummary(
+                summary=result_data["summary"],
+                facts=result_data["facts"]
+            )
+            
+            # Метрики
+            processing_time = time.time() - start_time
+            metrics = {
+                "model_used": used_summary_model,
+                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
+                "processing_time_seconds": processing_time,
+                "success": True,
+                "cache_hit": False
+            }
+            await self._store_response(
+                request["cache_key"], "summary", used_summary_model,
+                {"summary": summary.summary, "facts": summary.facts, "model": used_summary_model},
+                metrics["tokens_used"]
+            )
+            
+            logger.info(f"Article summarized successfully. Tokens: {response.get('usage', {}).get('total_tokens', 0)}, Time: {processing_time:.2f}s")
+
+            return summary, metrics
+
+        except Exception as e:
+            processing_time = time.time() - start_time
+            logger.error(f"Error in summarize_article: {e}")
+            
+            metrics = {
+                "model_used": "gpt-3.5-turbo-16k",
+                "tokens_used": 0,
+                "processing_time_seconds": processing_time,
+                "success": False,
+                "error": str(e)
+            }
+            
+            raise Exception(f"Ошибка при сжатии статьи: {str(e)}")
+
+    def _summary_request(self, article_content: str, article_title: str, project: ProjectType) -> Dict:
+        """
+        Промпты и параметры модели для выжимки
+
+        Общие для summarize_article и stream_summary.
+        """
         # Определяем специализацию для проекта
         project_specialization = {
             ProjectType.GYNECOLOGY: "гинекологии и женского здоровья",
@@ -116,128 +301,145 @@ class AIService:
 Технический маркер уникальности (НЕ включай его в ответ и не упоминай): {generation_marker}
 """
 
+        # Настройки модели для выжимки из системных настроек
         try:
-            # Настройки модели для выжимки из системных настроек
-            try:
-                summary_model_setting = settings_service.get_app_setting("openai_summary_model")
-                summary_model_name = (summary_model_setting.setting_value if summary_model_setting and summary_model_setting.setting_value else "gpt-4o")
+            summary_model_setting = settings_service.get_app_setting("openai_summary_model")
+            summary_model_name = (summary_model_setting.setting_value if summary_model_setting and summary_model_setting.setting_value else "gpt-4o")
 
-                summary_temperature_setting = settings_service.get_app_setting("openai_summary_temperature")
-                summary_temperature_value = float(summary_temperature_setting.setting_value) if summary_temperature_setting and summary_temperature_setting.setting_value else 0.3
+            summary_temperature_setting = settings_service.get_app_setting("openai_summary_temperature")
+            summary_temperature_value = float(summary_temperature_setting.setting_value) if summary_temperature_setting and summary_temperature_setting.setting_value else 0.3
 
-                summary_max_tokens_setting = settings_service.get_app_setting("openai_summary_max_tokens")
-                summary_max_tokens_value = int(summary_max_tokens_setting.setting_value) if summary_max_tokens_setting and summary_max_tokens_setting.setting_value else 1500
-            except Exception:
-                # На случай проблем с доступом к настройкам
-                summary_model_name = "gpt-4o"
-                summary_temperature_value = 0.3
-                summary_max_tokens_value = 1500
-
-            # Пытаемся использовать выбранную модель, с безопасным фолбэком при отсутствии доступа
-            preferred_order = [summary_model_name, "gpt-4o", "gpt-4o-mini", "gpt-4", "gpt-3.5-turbo-16k"]
-            # Убираем дубликаты, сохраняя порядок
-            seen = set()
-            summary_model_candidates = []
-            for m in preferred_order:
-                if m and m not in seen:
-                    seen.add(m)
-                    summary_model_candidates.append(m)
+            summary_max_tokens_setting = settings_service.get_app_setting("openai_summary_max_tokens")
+            summary_max_tokens_value = int(summary_max_tokens_setting.setting_value) if summary_max_tokens_setting and summary_max_tokens_setting.setting_value else 1500
+        except Exception:
+            # На случай проблем с доступом к настройкам
+            summary_model_name = "gpt-4o"
+            summary_temperature_value = 0.3
+            summary_max_tokens_value = 1500
+
+        # Пытаемся использовать выбранную модель, с безопасным фолбэком при отсутствии доступа
+        preferred_order = [summary_model_name, "gpt-4o", "gpt-4o-mini", "gpt-4", "gpt-3.5-turbo-16k"]
+        # Убираем дубликаты, сохраняя порядок
+        seen = set()
+        summary_model_candidates = []
+        for m in preferred_order:
+            if m and m not in seen:
+                seen.add(m)
+                summary_model_candidates.append(m)
+
+        # Ключ кэша - без маркера уникальности: он меняется при каждом вызове.
+        # Системный промпт зависит от проекта, поэтому выжимка кэшируется для пары статья + проект
+        cache_key = self._response_cache_key(
+            "summary",
+            summary_model_candidates[0],
+            {"temperature": summary_temperature_value, "max_tokens": summary_max_tokens_value, "top_p": 0.95},
+            {"system_prompt": system_prompt, "title": article_title, "content": article_content, "project": project.value},
+        )
 
-            last_error = None
-            used_summary_model = summary_model_name
-            response = None
-            for candidate in summary_model_candidates:
-                try:
-                    response = await self.provider.get_completion(
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        model=candidate,
-                        temperature=summary_temperature_value,
-                        max_tokens=summary_max_tokens_value,
-                        top_p=0.95
-                    )
-                    used_summary_model = candidate
-                    break
-                except Exception as e:
-                    last_error = e
-                    # Продолжаем попытки при неактивной/недоступной модели
-                    err_msg = str(e).lower()
-                    if "model_not_found" in err_msg or "404" in err_msg:
-                        continue
-                    # Иные ошибки пробрасываем
-                    raise
-            if response is None:
-                # Если все кандидаты провалились — бросаем последнюю ошибку
-                raise last_error or Exception("No available model for summarize")
-            
-            # Извлекаем JSON из ответа
-            content = response["content"].strip()
-            
-            # Пытаемся найти JSON в ответе
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "model_candidates": summary_model_candidates,
+            "temperature": summary_temperature_value,
+            "max_tokens": summary_max_tokens_value,
+            "cache_key": cache_key,
+        }
 
-            # Парсинг JSON с обработкой ошибок
+    def _parse_summary_json(self, content: str) -> Dict:
+        """Разбор JSON-ответа модели с выжимкой (с исправлением типичных ошибок)"""
+        content = content.strip()
+        
+        # Пытаемся найти JSON в ответе
+        if content.startswith("```json"):
+            content = content[7:-3].strip()
+        elif content.startswith("```"):
+            content = content[3:-3].strip()
+
+        # Парсинг JSON с обработкой ошибок
+        try:
+            result_data = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            logger.error(f"Response content: {content}")
+
+            # Попытка исправить JSON
             try:
-                result_data = json.loads(content)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {str(e)}")
-                logger.error(f"Response content: {content}")
+                fixed_content = re.sub(r'"\s*\n\s*"', '",\n  "', content)
+                fixed_content = re.sub(r'}\s*\n\s*"', '},\n  "', fixed_content)
+                fixed_content = re.sub(r']\s*\n\s*"', '],\n  "', fixed_content)
 
-                # Попытка исправить JSON
-                try:
-                    fixed_content = re.sub(r'"\s*\n\s*"', '",\n  "', content)
-                    fixed_content = re.sub(r'}\s*\n\s*"', '},\n  "', fixed_content)
-                    fixed_content = re.sub(r']\s*\n\s*"', '],\n  "', fixed_content)
+                # Добавляем закрывающую скобку если отсутствует
+                fixed_content = fixed_content.strip()
+                if not fixed_content.endswith('}'):
+                    fixed_content += '\n}'
+                    logger.info("Added missing closing brace to JSON")
 
-                    # Добавляем закрывающую скобку если отсутствует
-                    fixed_content = fixed_content.strip()
-                    if not fixed_content.endswith('}'):
-                        fixed_content += '\n}'
-                        logger.info("Added missing closing brace to JSON")
+                result_data = json.loads(fixed_content)
+                logger.info("Successfully fixed JSON in summarize_article")
+            except json.JSONDecodeError:
+                raise Exception(f"Ошибка парсинга ответа AI: {str(e)}")
 
-                    result_data = json.loads(fixed_content)
-                    logger.info("Successfully fixed JSON in summarize_article")
-                except json.JSONDecodeError:
-                    raise Exception(f"Ошибка парсинга ответа AI: {str(e)}")
+        return result_data
 
-            # Создаем объект ArticleSummary
-            summary = ArticleSummary(
-                summary=result_data["summary"],
-                facts=result_data["facts"]
-            )
-            
-            # Метрики
-            processing_time = time.time() - start_time
-            metrics = {
-                "model_used": used_summary_model,
-                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
-                "processing_time_seconds": processing_time,
-                "success": True
-            }
-            
-            logger.info(f"Article summarized successfully. Tokens: {response.get('usage', {}).get('total_tokens', 0)}, Time: {processing_time:.2f}s")
+    async def stream_summary(self, article_content: str, article_title: str, project: ProjectType, force_fresh: bool = False) -> AsyncIterator[StreamEvent]:
+        """
+        Потоковое создание выжимки
 
-            return summary, metrics
+        Отдает события разбора ответа по полям (summary - фрагментами, facts -
+        списком целиком), последнее событие - ("result", {"summary", "metrics"}).
+        Выжимка из кэша отдается теми же событиями сразу целиком.
+        """
+        start_time = time.time()
+        try:
+            request = self._summary_request(article_content, article_title, project)
+            parser = JsonFieldStream()
+            cached = await self._cached_response(request["cache_key"], force_fresh)
+            if cached:
+                summary = ArticleSummary(summary=cached["response"]["summary"], facts=cached["response"]["facts"])
+                for event in self._field_events(parser, json.dumps(summary.dict(), ensure_ascii=False)):
+                    yield event
+                metrics = self._cache_hit_metrics(cached, start_time)
+                metrics["first_token_seconds"] = metrics["processing_time_seconds"]
+                logger.info(f"Article summary (stream) taken from cache, tokens saved: {metrics['tokens_saved']}")
+                yield "result", {"summary": summary, "metrics": metrics}
+                return
+
+            parts = []
+            state = {}
+            async for content in self._stream_completion(request, state, top_p=0.95):
+                parts.append(content)
+                for event in self._field_events(parser, content):
+                    yield event
 
-        except Exception as e:
-            processing_time = time.time() - start_time
-            logger.error(f"Error in summarize_article: {e}")
-            
+            try:
+                result_data = self._parse_summary_json("".join(parts))
+            except Exception:
+                # Потоковый разбор терпимее к ошибкам JSON - берем его значения
+                if not {"summary", "facts"} <= parser.values.keys():
+                    raise
+                result_data = parser.values
+
+            summary = ArticleSummary(summary=result_data["summary"], facts=result_data["facts"])
             metrics = {
-                "model_used": "gpt-3.5-turbo-16k",
-                "tokens_used": 0,
-                "processing_time_seconds": processing_time,
-                "success": False,
-                "error": str(e)
+                "model_used": state.get("model_used"),
+                "tokens_used": state.get("usage", {}).get("total_tokens", 0),
+                "processing_time_seconds": time.time() - start_time,
+                "first_token_seconds": state.get("first_token_at", time.time()) - start_time,
+                "success": True,
+                "cache_hit": False
             }
-            
+            await self._store_response(
+                request["cache_key"], "summary", metrics["model_used"],
+                {"summary": summary.summary, "facts": summary.facts, "model": metrics["model_used"]},
+                metrics["tokens_used"]
+            )
+            logger.info(f"Article summarized (stream). Tokens: {metrics['tokens_used']}, first token: {metrics['first_token_seconds']:.2f}s, time: {metrics['processing_time_seconds']:.2f}s")
+        except Exception as e:
+            logger.error(f"Error in stream_summary: {e}")
             raise Exception(f"Ошибка при сжатии статьи: {str(e)}")
 
+        yield "result", {"summary": summary, "metrics": metrics}
+
     async def generate_telegram_post_for_published(
         self,
         news_data: Dict,  # Данные опубликованной новости
@@ -523,66 +725,127 @@ class AIService:
             settings = TelegramPostSettings()
 
         try:
-            # Определяем стратегию интриги по настройкам
-            hook_strategies = {
-                "question": {
-                    "approach": "Начни с провокационного вопроса",
-                    "examples": ["А знали ли вы, что...", "Что если бы вам сказали...", "Почему врачи не говорят о..."]
-                },
-                "shocking_fact": {
-                    "approach": "Начни с неожиданного факта",
-                    "examples": ["85% людей не знают о...", "Новое исследование шокировало экспертов...", "То, что обнаружили ученые..."]
-                },
-                "statistics": {
-                    "approach": "Начни с впечатляющей статистики",
-                    "examples": ["Каждая 3-я женщина сталкивается с...", "В 90% случаев врачи не замечают...", "За последний год число случаев..."]
-                },
-                "contradiction": {
-                    "approach": "Начни с развенчания мифа",
-                    "examples": ["Вопреки общему мнению...", "То, что считалось безопасным...", "Оказывается, все это время мы ошибались..."]
-                }
+            request = self._telegram_post_request(article_title, summary, facts, settings)
+            system_prompt = request["system_prompt"]
+            user_prompt = request["user_prompt"]
+            model_name = request["model_candidates"][0]
+            candidates = request["model_candidates"]
+
+            last_error = None
+            used_model = model_name
+            response = None
+            for candidate in candidates:
+                try:
+                    response = await self.provider.get_completion(
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        model=candidate,
+                        temperature=request["temperature"],
+                        max_tokens=request["max_tokens"],
+                        top_p=0.95,
+                    )
+                    used_model = candidate
+                    break
+                except Exception as e:
+                    last_error = e
+                    err_msg = str(e).lower()
+                    if "model_not_found" in err_msg or "404" in err_msg:
+                        continue
+                    raise
+            if response is None:
+                raise last_error or Exception("No available model for telegram post")
+
+            content = self._finalize_telegram_post(response.get("content", ""), article_url)
+
+            processing_time = time.time() - start_time
+            metrics = {
+                "model_used": used_model,
+                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
+                "processing_time_seconds": processing_time,
+                "success": True,
+            }
+            return content, metrics
+
+        except Exception as e:
+            processing_time = time.time() - start_time
+            logger.error(f"Error in generate_telegram_post: {e}")
+            metrics = {
+                "model_used": locals().get("model_name", "gpt-4o-mini"),
+                "tokens_used": 0,
+                "processing_time_seconds": processing_time,
+                "success": False,
+                "error": str(e),
+            }
+            return self._telegram_post_fallback(summary, article_url), metrics
+
+    def _telegram_post_request(self, article_title: str, summary: str, facts: List[str], settings: TelegramPostSettings) -> Dict:
+        """
+        Промпты и параметры модели для анонса в Telegram
+
+        Общие для generate_telegram_post и stream_telegram_post.
+        """
+        # Определяем стратегию интриги по настройкам
+        hook_strategies = {
+            "question": {
+                "approach": "Начни с провокационного вопроса",
+                "examples": ["А знали ли вы, что...", "Что если бы вам сказали...", "Почему врачи не говорят о..."]
+            },
+            "shocking_fact": {
+                "approach": "Начни с неожиданного факта",
+                "examples": ["85% людей не знают о...", "Новое исследование шокировало экспертов...", "То, что обнаружили ученые..."]
+            },
+            "statistics": {
+                "approach": "Начни с впечатляющей статистики",
+                "examples": ["Каждая 3-я женщина сталкивается с...", "В 90% случаев врачи не замечают...", "За последний год число случаев..."]
+            },
+            "contradiction": {
+                "approach": "Начни с развенчания мифа",
+                "examples": ["Вопреки общему мнению...", "То, что считалось безопасным...", "Оказывается, все это время мы ошибались..."]
             }
-            hook_strategy = hook_strategies.get(settings.hook_type, hook_strategies["question"])
+        }
+        hook_strategy = hook_strategies.get(settings.hook_type, hook_strategies["question"])
 
-            disclosure_levels = {
-                "hint": {
-                    "instruction": "Дай только намек на суть, создай максимальное любопытство",
-                    "detail": "Упомяни проблему/открытие, но НЕ раскрывай решение или результат"
-                },
-                "main_idea": {
-                    "instruction": "Раскрой основную идею, но скрой детали и выводы",
-                    "detail": "Объясни суть проблемы/исследования, но оставь интригу о результатах"
-                },
-                "almost_all": {
-                    "instruction": "Расскажи почти всё, но скрой самое важное - итоговые выводы",
-                    "detail": "Дай полный контекст и даже некоторые результаты, но финальные выводы/рекомендации остаются за кадром"
-                }
+        disclosure_levels = {
+            "hint": {
+                "instruction": "Дай только намек на суть, создай максимальное любопытство",
+                "detail": "Упомяни проблему/открытие, но НЕ раскрывай решение или результат"
+            },
+            "main_idea": {
+                "instruction": "Раскрой основную идею, но скрой детали и выводы",
+                "detail": "Объясни суть проблемы/исследования, но оставь интригу о результатах"
+            },
+            "almost_all": {
+                "instruction": "Расскажи почти всё, но скрой самое важное - итоговые выводы",
+                "detail": "Дай полный контекст и даже некоторые результаты, но финальные выводы/рекомендации остаются за кадром"
             }
-            disclosure_level = disclosure_levels.get(settings.disclosure_level, disclosure_levels["hint"])
+        }
+        disclosure_level = disclosure_levels.get(settings.disclosure_level, disclosure_levels["hint"])
 
-            cta_styles = {
-                "curiosity": {
-                    "phrase": "Подробности →",
-                    "tone": "Мягкий призыв через любопытство"
-                },
-                "urgency": {
-                    "phrase": "Читать сейчас →",
-                    "tone": "Подчеркивание важности и срочности"
-                },
-                "expertise": {
-                    "phrase": "Узнать больше →",
-                    "tone": "Экспертный подход, фокус на знаниях"
-                }
+        cta_styles = {
+            "curiosity": {
+                "phrase": "Подробности →",
+                "tone": "Мягкий призыв через любопытство"
+            },
+            "urgency": {
+                "phrase": "Читать сейчас →",
+                "tone": "Подчеркивание важности и срочности"
+            },
+            "expertise": {
+                "phrase": "Узнать больше →",
+                "tone": "Экспертный подход, фокус на знаниях"
             }
-            cta_style = cta_styles.get(settings.call_to_action, cta_styles["curiosity"])
+        }
+        cta_style = cta_styles.get(settings.call_to_action, cta_styles["curiosity"])
 
-            system_prompt = f"""Ты — опытный СММ-специалист медицинского издания, мастер создания ИНТРИГУЮЩИХ анонсов для Telegram.
+        system_prompt = f"""Ты — опытный СММ-специалист медицинского издания, мастер создания ИНТРИГУЮЩИХ анонсов для Telegram.
 
 🎯 ГЛАВНАЯ ЦЕЛЬ: Создать пост, который заставит читателя перейти на сайт за полной информацией!
 
 📋 СТРАТЕГИЯ ИНТРИГИ:
 {hook_strategy['approach']}
-Примеры зацепок: {hook_strategy['example']}
+Примеры зацепок: {', '.join(hook_strategy['examples'])}
 
 🔍 УРОВЕНЬ РАСКРЫТИЯ:
 {disclosure_level['instruction']}
@@ -611,102 +874,123 @@ class AIService:
 - Оставлять читателя с вопросами
 - Создавать ощущение упущенной выгоды, если не перейдет"""
 
-            facts_text = "\n".join([f"• {f}" for f in (facts or [])[:3]])  # Ограничиваем 3 самыми важными фактами
-            user_prompt = (
-                f"ИСТОЧНИК ДЛЯ ИНТРИГУЮЩЕГО АНОНСА:\n"
-                f"Заголовок статьи: {article_title}\n\n"
-                f"Суть материала: {summary}\n\n"
-                f"Ключевые факты:\n{facts_text}\n\n"
-                f"🎯 ЗАДАЧА: Создай ИНТРИГУЮЩИЙ анонс, который заставит перейти на сайт!\n\n"
-                f"📋 НАСТРОЙКИ ИНТРИГИ:\n"
-                f"• Тип зацепки: {hook_strategy['approach'].lower()}\n"
-                f"• Уровень раскрытия: {disclosure_level['instruction'].lower()}\n"
-                f"• Призыв к действию: {cta_style['tone'].lower()}\n\n"
-                f"⚠️ ПОМНИ: НЕ раскрывай полную суть! Читатель должен захотеть перейти за подробностями!\n"
-                f"✅ Обязательно заверши постом фразой: \"{cta_style['phrase']}\""
+        facts_text = "\n".join([f"• {f}" for f in (facts or [])[:3]])  # Ограничиваем 3 самыми важными фактами
+        user_prompt = (
+            f"ИСТОЧНИК ДЛЯ ИНТРИГУЮЩЕГО АНОНСА:\n"
+            f"Заголовок статьи: {article_title}\n\n"
+            f"Суть материала: {summary}\n\n"
+            f"Ключевые факты:\n{facts_text}\n\n"
+            f"🎯 ЗАДАЧА: Создай ИНТРИГУЮЩИЙ анонс, который заставит перейти на сайт!\n\n"
+            f"📋 НАСТРОЙКИ ИНТРИГИ:\n"
+            f"• Тип зацепки: {hook_strategy['approach'].lower()}\n"
+            f"• Уровень раскрытия: {disclosure_level['instruction'].lower()}\n"
+            f"• Призыв к действию: {cta_style['tone'].lower()}\n\n"
+            f"⚠️ ПОМНИ: НЕ раскрывай полную суть! Читатель должен захотеть перейти за подробностями!\n"
+            f"✅ Обязательно заверши постом фразой: \"{cta_style['phrase']}\""
+        )
+
+        # Читаем модель из настроек с фолбэком к gpt-4o-mini
+        try:
+            summary_model_setting = settings_service.get_app_setting("openai_summary_model")
+            model_name = (
+                summary_model_setting.setting_value
+                if summary_model_setting and summary_model_setting.setting_value
+                else "gpt-4o-mini"
             )
+        except Exception:
+            model_name = "gpt-4o-mini"
 
-            # Читаем модель из настроек с фолбэком к gpt-4o-mini
-            try:
-                summary_model_setting = settings_service.get_app_setting("openai_summary_model")
-                model_name = (
-                    summary_model_setting.setting_value
-                    if summary_model_setting and summary_model_setting.setting_value
-                    else "gpt-4o-mini"
-                )
-            except Exception:
-                model_name = "gpt-4o-mini"
+        preferred_order = [model_name, "gpt-4o-mini", "gpt-4o", "gpt-4", "gpt-3.5-turbo-16k"]
+        seen = set()
+        candidates = []
+        for m in preferred_order:
+            if m and m not in seen:
+                seen.add(m)
+                candidates.append(m)
 
-            preferred_order = [model_name, "gpt-4o-mini", "gpt-4o", "gpt-4", "gpt-3.5-turbo-16k"]
-            seen = set()
-            candidates = []
-            for m in preferred_order:
-                if m and m not in seen:
-                    seen.add(m)
-                    candidates.append(m)
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "model_candidates": candidates,
+            "temperature": 0.6,
+            "max_tokens": 500,
+        }
 
-            last_error = None
-            used_model = model_name
-            response = None
-            for candidate in candidates:
-                try:
-                    response = await self.provider.get_completion(
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                        model=candidate,
-                        temperature=0.6,
-                        max_tokens=500,
-                        top_p=0.95,
-                    )
-                    used_model = candidate
-                    break
-                except Exception as e:
-                    last_error = e
-                    err_msg = str(e).lower()
-                    if "model_not_found" in err_msg or "404" in err_msg:
-                        continue
-                    raise
-            if response is None:
-                raise last_error or Exception("No available model for telegram post")
+    @staticmethod
+    def _finalize_telegram_post(content: Optional[str], article_url: Optional[str]) -> str:
+        """Обрезка анонса по длине и добавление ссылки"""
+        content = (content or "").strip()
+        # Обрезаем по длине для интригующих постов (200-350 символов)
+        max_length = 350
+        if len(content) > max_length:
+            content = content[:max_length].rstrip() + "…"
+        if article_url and (article_url not in content):
+            separator = "\n— " if "\n" not in content[-4:] else "— "
+            content = f"{content}{separator}{article_url}"
+        return content
+
+    @staticmethod
+    def _telegram_post_fallback(summary: str, article_url: Optional[str]) -> str:
+        """Фолбэк при ошибке модели: простой анонс из выжимки"""
+        fallback = (summary or "").strip()
+        fallback = (fallback[:380] + "…") if len(fallback) > 380 else fallback
+        if article_url:
+            fallback = f"{fallback}\n— {article_url}"
+        return fallback
+
+    async def stream_telegram_post(
+        self,
+        article_title: str,
+        article_url: Optional[str],
+        summary: str,
+        facts: List[str],
+        project: ProjectType,
+        settings: Optional[TelegramPostSettings] = None
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Потоковая генерация анонса для Telegram
 
-            content = (response.get("content", "") or "").strip()
-            # Обрезаем по длине для интригующих постов (200-350 символов)
-            max_length = 350
-            if len(content) > max_length:
-                content = content[:max_length].rstrip() + "…"
-            if article_url and (article_url not in content):
-                separator = "\n— " if "\n" not in content[-4:] else "— "
-                content = f"{content}{separator}{article_url}"
+        Анонс - обычный текст, поэтому фрагменты отдаются как есть (delta поля
+        telegram_post). Итоговый текст после обрезки и добавления ссылки - в
+        событии value и в ("result", {"telegram_post", "metrics"}). При ошибке
+        модели, как и generate_telegram_post, возвращает простой анонс из выжимки.
+        """
+        start_time = time.time()
+        if settings is None:
+            settings = TelegramPostSettings()
 
-            processing_time = time.time() - start_time
+        state = {}
+        try:
+            request = self._telegram_post_request(article_title, summary, facts, settings)
+            yield "field", {"field": "telegram_post"}
+            parts = []
+            async for content in self._stream_completion(request, state, top_p=0.95):
+                parts.append(content)
+                yield "delta", {"field": "telegram_post", "text": content}
+
+            post = self._finalize_telegram_post("".join(parts), article_url)
             metrics = {
-                "model_used": used_model,
-                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
-                "processing_time_seconds": processing_time,
+                "model_used": state.get("model_used"),
+                "tokens_used": state.get("usage", {}).get("total_tokens", 0),
+                "processing_time_seconds": time.time() - start_time,
+                "first_token_seconds": state.get("first_token_at", time.time()) - start_time,
                 "success": True,
             }
-            return content, metrics
-
         except Exception as e:
-            processing_time = time.time() - start_time
-            logger.error(f"Error in generate_telegram_post: {e}")
+            logger.error(f"Error in stream_telegram_post: {e}")
+            post = self._telegram_post_fallback(summary, article_url)
             metrics = {
-                "model_used": locals().get("model_name", "gpt-4o-mini"),
+                "model_used": state.get("model_used", "gpt-4o-mini"),
                 "tokens_used": 0,
-                "processing_time_seconds": processing_time,
+                "processing_time_seconds": time.time() - start_time,
                 "success": False,
                 "error": str(e),
             }
-            # Фолбэк: простой анонс
-            fallback = (summary or "").strip()
-            fallback = (fallback[:380] + "…") if len(fallback) > 380 else fallback
-            if article_url:
-                fallback = f"{fallback}\n— {article_url}"
-            return fallback, metrics
 
-    async def clean_article_content(self, raw_content: str, source_url: str, max_retries: int = 3) -> Tuple[str, Dict]:
+        yield "value", {"field": "telegram_post", "value": post}
+        yield "result", {"telegram_post": post, "metrics": metrics}
+
+    async def clean_article_content(self, raw_content: str, source_url: str, max_retries: int = 3, force_fresh: bool = False) -> Tuple[str, Dict]:
         """
         🧹 Очистка статьи от навигации, рекламы, футеров через GPT-4o mini
         Включает retry механизм (3 попытки) и валидацию результата.
@@ -715,6 +999,7 @@ class AIService:
             raw_content: Сырой контент после парсинга (Jina AI / trafilatura)
             source_url: URL источника для контекста
             max_retries: Максимальное количество попыток при ошибках (по умолчанию 3)
+            force_fresh: Не брать очищенный текст из кэша ответов модели
 
         Returns:
             Tuple[str, Dict]: Очищенный контент и метрики
@@ -727,19 +1012,8 @@ class AIService:
         if len(raw_content) > 30000:
             logger.warning(f"⚠️ Content too large ({len(raw_content)} chars), truncating to 30000")
             raw_content = raw_content[:30000]
-        
-        # 🔄 RETRY LOOP: пытаемся до max_retries раз
-        for attempt in range(1, max_retries + 1):
-            try:
-                if attempt > 1:
-                    logger.warning(f"🔄 GPT cleaning retry attempt {attempt}/{max_retries}")
-                    # Небольшая задержка между попытками
-                    import asyncio
-                    await asyncio.sleep(min(attempt * 2, 10))  # 2, 4, 6... секунд, макс 10
-                
-                logger.info(f"🧹 Cleaning article content via GPT-4o mini (attempt {attempt}), input length: {len(raw_content)} chars")
 
-                system_prompt = """Ты — эксперт по очистке текста статей от служебной информации.
+        system_prompt = """Ты — эксперт по очистке текста статей от служебной информации.
 
 🎯 ЗАДАЧА: Извлечь ТОЛЬКО основной контент статьи, удалив всё лишнее.
 
@@ -802,7 +1076,7 @@ BAD (удалить): "Написать нам | Условия использо
 
 GOOD (сохранить): Заголовок и основной текст статьи с медицинской информацией"""
 
-                user_prompt = f"""Очисти эту статью от навигации, рекламы и служебной информации.
+        user_prompt = f"""Очисти эту статью от навигации, рекламы и служебной информации.
 
 Источник: {source_url}
 
@@ -811,6 +1085,39 @@ GOOD (сохранить): Заголовок и основной текст с
 
 Верни только очищенный контент в markdown."""
 
+        # Очистка детерминирована (temperature 0), поэтому результат для того же текста берется из кэша
+        cache_key = self._response_cache_key(
+            "cleanup",
+            "gpt-4o-mini",
+            {"temperature": 0.0, "max_tokens": 8000},
+            {"system_prompt": system_prompt, "source_url": source_url, "content": raw_content},
+        )
+        cached = await self._cached_response(cache_key, force_fresh)
+        if cached:
+            cleaned_content = cached["response"]["content"]
+            metrics = self._cache_hit_metrics(cached, start_time)
+            metrics.update({
+                "input_length": original_length,
+                "output_length": len(cleaned_content),
+                "reduction_percent": round((1 - len(cleaned_content) / len(raw_content)) * 100, 1) if len(raw_content) > 0 else 0,
+                "attempt": 0,
+                "validation_passed": True,
+                "validation_warnings": []
+            })
+            logger.info(f"✅ Article cleanup taken from cache, tokens saved: {metrics['tokens_saved']}")
+            return cleaned_content, metrics
+        
+        # 🔄 RETRY LOOP: пытаемся до max_retries раз
+        for attempt in range(1, max_retries + 1):
+            try:
+                if attempt > 1:
+                    logger.warning(f"🔄 GPT cleaning retry attempt {attempt}/{max_retries}")
+                    # Небольшая задержка между попытками
+                    import asyncio
+                    await asyncio.sleep(min(attempt * 2, 10))  # 2, 4, 6... секунд, макс 10
+                
+                logger.info(f"🧹 Cleaning article content via GPT-4o mini (attempt {attempt}), input length: {len(raw_content)} chars")
+
                 response = await self.provider.get_completion(
                     model="gpt-4o-mini",  # Быстро и дёшево
                     messages=[
@@ -836,7 +1143,8 @@ GOOD (сохранить): Заголовок и основной текст с
                     "reduction_percent": round((1 - len(cleaned_content) / len(raw_content)) * 100, 1) if len(raw_content) > 0 else 0,
                     "attempt": attempt,
                     "validation_passed": validation_result["passed"],
-                    "validation_warnings": validation_result["warnings"]
+                    "validation_warnings": validation_result["warnings"],
+                    "cache_hit": False
                 }
 
                 # Логируем результат валидации
@@ -845,6 +1153,8 @@ GOOD (сохранить): Заголовок и основной текст с
                     logger.warning(f"🔍 Cleaned content preview (first 500 chars): {cleaned_content[:500]}")
                 else:
                     logger.info(f"✅ Article cleaned via GPT-4o mini: {metrics['reduction_percent']}% reduction, {metrics['tokens_used']} tokens, {processing_time:.2f}s (attempt {attempt})")
+                    # В кэш попадает только очистка, прошедшая валидацию
+                    await self._store_response(cache_key, "cleanup", "gpt-4o-mini", {"content": cleaned_content, "model": "gpt-4o-mini"}, metrics["tokens_used"])
 
                 return cleaned_content, metrics
 
@@ -870,7 +1180,8 @@ GOOD (сохранить): Заголовок и основной текст с
             "error_type": type(last_error).__name__,
             "fallback": True,
             "attempts": max_retries,
-            "validation_passed": False
+            "validation_passed": False,
+            "cache_hit": False
         }
         return raw_content, metrics
     
@@ -1186,54 +1497,281 @@ GOOD (сохранить): Заголовок и основной текст с
                 image_url=result_data["image_url"]
             )
 
-            # Метрики
-            processing_time = time.time() - start_time
-            target_length = formatting_options.target_length if formatting_options else min_length
-            metrics = {
-                "model_used": used_model,
-                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
-                "processing_time_seconds": processing_time,
-                "success": True,
-                "text_length_clean": text_length,
-                "text_length_html": len(result_data["news_text"]),
-                "target_length": target_length,
-                "source_url": source_url,
-                "source_domain": source_domain
-            }
+            # Метрики
+            processing_time = time.time() - start_time
+            target_length = formatting_options.target_length if formatting_options else min_length
+            metrics = {
+                "model_used": used_model,
+                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
+                "processing_time_seconds": processing_time,
+                "success": True,
+                "text_length_clean": text_length,
+                "text_length_html": len(result_data["news_text"]),
+                "target_length": target_length,
+                "source_url": source_url,
+                "source_domain": source_domain
+            }
+
+            logger.info(f"Article generated from URL {source_url}: {text_length} clean characters. Tokens: {response.get('usage', {}).get('total_tokens', 0)}, Time: {processing_time:.2f}s")
+
+            return article, metrics
+
+        except Exception as e:
+            processing_time = time.time() - start_time
+            logger.error(f"Error in generate_article_from_external_content: {e}")
+
+            metrics = {
+                "model_used": model_name,
+                "tokens_used": 0,
+                "processing_time_seconds": processing_time,
+                "success": False,
+                "error": str(e)
+            }
+
+            raise Exception(f"Ошибка при генерации статьи из URL: {str(e)}")
+
+    async def generate_full_article(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> Tuple[GeneratedArticle, Dict]:
+        """
+        Генерация подробной НОВОСТИ (2500-4000 символов) с SEO и изображением
+
+        Args:
+            summary: Выжимка новости (до 700 символов)
+            facts: Список ключевых фактов
+            project: Тип проекта (для SEO-оптимизации)
+            original_title: Оригинальный заголовок
+
+        Returns:
+            Tuple[GeneratedArticle, Dict]: Сгенерированная новость (минимум 2500 символов) с динамическим image_prompt и метрики
+        """
+        start_time = time.time()
+        stage_seconds = {}
+
+        async def text_branch():
+            started = time.time()
+            result = await self.generate_article_text(summary, facts, project, original_title, formatting_options)
+            stage_seconds["text"] = time.time() - started
+            return result
+
+        # При ошибке одной ветки TaskGroup отменяет вторую (например, ожидание KIE)
+        try:
+            async with asyncio.TaskGroup() as group:
+                text_task = group.create_task(text_branch())
+                image_task = group.create_task(self._image_branch(summary, original_title, stage_seconds))
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+
+        result_data, metrics = text_task.result()
+        image_prompt, image_url = image_task.result()
+
+        article = GeneratedArticle(
+            news_text=result_data["news_text"],
+            seo_title=result_data["seo_title"],
+            seo_description=result_data["seo_description"],
+            seo_keywords=result_data["seo_keywords"],
+            image_prompt=image_prompt,
+            image_url=image_url
+        )
+        metrics["processing_time_seconds"] = time.time() - start_time
+        metrics["stage_seconds"] = {stage: round(value, 2) for stage, value in stage_seconds.items()}
+        metrics["stage_seconds"]["total"] = round(metrics["processing_time_seconds"], 2)
+        logger.info(f"Article generated in {metrics['processing_time_seconds']:.1f}s, stages: {metrics['stage_seconds']}")
+        return article, metrics
+
+    async def _image_branch(self, summary: str, original_title: str, stage_seconds: Dict) -> Tuple[str, str]:
+        """Промпт и изображение для новости (время этапов - в stage_seconds)"""
+        # Промпт зависит только от выжимки и заголовка, поэтому изображение
+        # готовится параллельно с текстом, а не после него
+        started = time.time()
+        logger.info("Generating image prompt via GPT-4o-mini...")
+        image_prompt = await self.generate_image_prompt(summary, original_title)
+        stage_seconds["image_prompt"] = time.time() - started
+
+        started = time.time()
+        image_url = await self._generate_image(image_prompt)
+        stage_seconds["image"] = time.time() - started
+        return image_prompt, image_url
+
+    async def stream_full_article(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> AsyncIterator[StreamEvent]:
+        """
+        Потоковая генерация новости с SEO и изображением
+
+        Текст отдается событиями stream_article_text, изображение готовится
+        параллельно и приходит событиями value полей image_prompt и image_url.
+        Последнее событие - ("result", {"article": GeneratedArticle, "metrics"}).
+        """
+        start_time = time.time()
+        stage_seconds = {}
+        image_task = asyncio.create_task(self._image_branch(summary, original_title, stage_seconds))
+        try:
+            started = time.time()
+            async for event, data in self.stream_article_text(summary, facts, project, original_title, formatting_options):
+                if event == "result":
+                    result_data, metrics = data["article"], data["metrics"]
+                else:
+                    yield event, data
+            stage_seconds["text"] = time.time() - started
+
+            image_prompt, image_url = await image_task
+        finally:
+            # Клиент отключился или текст не сгенерирован - изображение больше не нужно
+            if not image_task.done():
+                image_task.cancel()
+            elif not image_task.cancelled():
+                image_task.exception()
+
+        yield "value", {"field": "image_prompt", "value": image_prompt}
+        yield "value", {"field": "image_url", "value": image_url}
+
+        article = GeneratedArticle(
+            news_text=result_data["news_text"],
+            seo_title=result_data["seo_title"],
+            seo_description=result_data["seo_description"],
+            seo_keywords=result_data["seo_keywords"],
+            image_prompt=image_prompt,
+            image_url=image_url
+        )
+        metrics["processing_time_seconds"] = time.time() - start_time
+        metrics["stage_seconds"] = {stage: round(value, 2) for stage, value in stage_seconds.items()}
+        metrics["stage_seconds"]["total"] = round(metrics["processing_time_seconds"], 2)
+        logger.info(f"Article streamed in {metrics['processing_time_seconds']:.1f}s, first token {metrics['first_token_seconds']:.2f}s, stages: {metrics['stage_seconds']}")
+        yield "result", {"article": article, "metrics": metrics}
+
+    async def generate_article_text(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> Tuple[Dict, Dict]:
+        """
+        Генерация текста новости и SEO-полей без изображения
+
+        Returns:
+            Tuple[Dict, Dict]: Данные статьи (news_text, seo_title, seo_description, seo_keywords) и метрики
+        """
+        start_time = time.time()
+        
+        try:
+            request = self._article_text_request(summary, facts, project, original_title, formatting_options)
+            system_prompt = request["system_prompt"]
+            user_prompt = request["user_prompt"]
+            min_length, max_length = request["min_length"], request["max_length"]
+            model_name = request["model_candidates"][0]
+            temperature_value = request["temperature"]
+            max_tokens_value = request["max_tokens"]
+            generation_model_candidates = request["model_candidates"]
+
+            last_error = None
+            used_generation_model = model_name
+            response = None
+            for candidate in generation_model_candidates:
+                try:
+                    response = await self.provider.get_completion(
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        model=candidate,
+                        temperature=temperature_value,
+                        max_tokens=max_tokens_value,
+                        frequency_penalty=0.2,
+                        presence_penalty=0.2
+                    )
+                    used_generation_model = candidate
+                    break
+                except Exception as e:
+                    last_error = e
+                    err_msg = str(e).lower()
+                    if "model_not_found" in err_msg or "404" in err_msg:
+                        continue
+                    raise
+            if response is None:
+                raise last_error or Exception("No available model for generation")
+            
+            # Извлекаем JSON из ответа
+            result_data = self._parse_article_json(response["content"])
+
+            # Проверяем длину сгенерированной статьи (чистый текст без HTML тегов)
+            text_length = self._clean_text_length(result_data["news_text"])
+            metrics = self._article_text_metrics(result_data, request, used_generation_model, response.get("usage", {}), start_time)
+            processing_time = metrics["processing_time_seconds"]
+            
+            # Логируем результат с информацией о длине
+            tokens_used = response.get("usage", {}).get("total_tokens", 0)
+            target_length = formatting_options.target_length if formatting_options else min_length
+            
+            # Если статья слишком короткая (менее 70% от минимальной длины), попробуем сгенерировать еще раз
+            if text_length < min_length * 0.7:
+                logger.warning(f"Generated news is too short: {text_length} clean characters (minimum {min_length}, target {target_length}). Attempting regeneration...")
+                
+                # Попытка повторной генерации с более подробными инструкциями
+                retry_prompt = f"""ВНИМАНИЕ! Предыдущая попытка дала слишком короткую статью ({text_length} символов).
+Пожалуйста, создай более развернутую статью с большим количеством деталей.
+
+{user_prompt}
 
-            logger.info(f"Article generated from URL {source_url}: {text_length} clean characters. Tokens: {response.get('usage', {}).get('total_tokens', 0)}, Time: {processing_time:.2f}s")
+💡 ДОПОЛНИТЕЛЬНО: Добавь больше деталей, примеров, контекста, научных данных для более полного раскрытия темы!
+Примерный объем: около {target_length} символов чистого текста."""
 
-            return article, metrics
+                try:
+                    retry_response = await self.provider.get_completion(
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": retry_prompt}
+                        ],
+                        model=used_generation_model,
+                        temperature=temperature_value * 0.8,  # Снижаем температуру для более предсказуемого результата
+                        max_tokens=max_tokens_value,
+                        frequency_penalty=0.3,
+                        presence_penalty=0.3
+                    )
+                    
+                    retry_content = retry_response.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                    retry_result_data = json.loads(retry_content)
+                    
+                    # Проверяем длину повторно сгенерированной статьи
+                    retry_clean_text = re.sub(r'<[^>]*>', '', retry_result_data["news_text"])
+                    retry_clean_text = re.sub(r'\s+', ' ', retry_clean_text).strip()
+                    retry_text_length = len(retry_clean_text)
+                    
+                    if retry_text_length > text_length:
+                        logger.info(f"Regeneration successful: {retry_text_length} clean characters (improved from {text_length})")
+                        result_data = retry_result_data
+                        text_length = retry_text_length
+                        response = retry_response
+                        
+                except Exception as retry_error:
+                    logger.error(f"Failed to regenerate article: {retry_error}")
+                    # Используем оригинальную статью
+            
+            if text_length < min_length * 0.8:
+                logger.warning(f"Generated news is short: {text_length} clean characters (target {target_length}). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
+            elif text_length > max_length * 1.2:
+                logger.warning(f"Generated news is long: {text_length} clean characters (target {target_length}). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
+            else:
+                logger.info(f"News generated successfully: {text_length} clean characters (target {target_length}, acceptable range). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
+            
+            return {
+                "news_text": result_data["news_text"],
+                "seo_title": result_data["seo_title"],
+                "seo_description": result_data["seo_description"],
+                "seo_keywords": result_data["seo_keywords"]
+            }, metrics
 
         except Exception as e:
             processing_time = time.time() - start_time
-            logger.error(f"Error in generate_article_from_external_content: {e}")
-
+            logger.error(f"Error in generate_article_text: {e}")
+            
             metrics = {
-                "model_used": model_name,
+                "model_used": locals().get("model_name", "gpt-4o-mini"),
                 "tokens_used": 0,
                 "processing_time_seconds": processing_time,
                 "success": False,
                 "error": str(e)
             }
+            
+            raise Exception(f"Ошибка при генерации статьи: {str(e)}")
 
-            raise Exception(f"Ошибка при генерации статьи из URL: {str(e)}")
-
-    async def generate_full_article(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> Tuple[GeneratedArticle, Dict]:
+    def _article_text_request(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> Dict:
         """
-        Генерация подробной НОВОСТИ (2500-4000 символов) с SEO
-
-        Args:
-            summary: Выжимка новости (до 700 символов)
-            facts: Список ключевых фактов
-            project: Тип проекта (для SEO-оптимизации)
-            original_title: Оригинальный заголовок
+        Промпты и параметры генерации текста новости
 
-        Returns:
-            Tuple[GeneratedArticle, Dict]: Сгенерированная новость (минимум 2500 символов) с динамическим image_prompt и метрики
+        Общие для generate_article_text и stream_article_text.
         """
-        start_time = time.time()
-        
         # Определяем специализацию и аудиторию для проекта
         project_info = {
             ProjectType.GYNECOLOGY: {
@@ -1490,221 +2028,164 @@ GOOD (сохранить): Заголовок и основной текст с
             system_prompt += f"\n\n🎛️ ДОПОЛНИТЕЛЬНЫЕ ТРЕБОВАНИЯ К ФОРМАТИРОВАНИЮ:\n{formatting_instructions}"
 
         # Читаем параметры генерации из настроек (если есть), с безопасными дефолтами
-        try:
-            gen_model_setting = settings_service.get_app_setting("openai_generation_model")
-            model_name = (gen_model_setting.setting_value if gen_model_setting and gen_model_setting.setting_value else "gpt-4o")
+        gen_model_setting = settings_service.get_app_setting("openai_generation_model")
+        model_name = (gen_model_setting.setting_value if gen_model_setting and gen_model_setting.setting_value else "gpt-4o")
 
-            temperature_setting = settings_service.get_app_setting("openai_temperature")
-            temperature_value = float(temperature_setting.setting_value) if temperature_setting and temperature_setting.setting_value else 0.6
+        temperature_setting = settings_service.get_app_setting("openai_temperature")
+        temperature_value = float(temperature_setting.setting_value) if temperature_setting and temperature_setting.setting_value else 0.6
 
-            max_tokens_setting = settings_service.get_app_setting("openai_max_tokens")
-            max_tokens_value = int(max_tokens_setting.setting_value) if max_tokens_setting and max_tokens_setting.setting_value else 8000
+        max_tokens_setting = settings_service.get_app_setting("openai_max_tokens")
+        max_tokens_value = int(max_tokens_setting.setting_value) if max_tokens_setting and max_tokens_setting.setting_value else 8000
 
-            # Модели-кандидаты с безопасными фолбэками
-            preferred_order = [model_name, "gpt-4o-mini", "gpt-4o", "gpt-4", "gpt-3.5-turbo-16k"]
-            seen = set()
-            generation_model_candidates = []
-            for m in preferred_order:
-                if m and m not in seen:
-                    seen.add(m)
-                    generation_model_candidates.append(m)
-
-            last_error = None
-            used_generation_model = model_name
-            response = None
-            for candidate in generation_model_candidates:
-                try:
-                    response = await self.provider.get_completion(
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        model=candidate,
-                        temperature=temperature_value,
-                        max_tokens=max_tokens_value,
-                        frequency_penalty=0.2,
-                        presence_penalty=0.2
-                    )
-                    used_generation_model = candidate
-                    break
-                except Exception as e:
-                    last_error = e
-                    err_msg = str(e).lower()
-                    if "model_not_found" in err_msg or "404" in err_msg:
-                        continue
-                    raise
-            if response is None:
-                raise last_error or Exception("No available model for generation")
-            
-            # Извлекаем JSON из ответа
-            content = response["content"].strip()
-            
-            # Пытаемся найти JSON в ответе
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
-            
-            # Дополнительная очистка JSON: правильно обрабатываем переносы строк в значениях
-            # Заменяем переносы строк только внутри строковых значений JSON, но НЕ в HTML контенте
-            def fix_json_newlines(match):
-                # Получаем содержимое строки (без кавычек)
-                string_content = match.group(0)
-
-                # Если это поле news_text с HTML, не заменяем переносы строк
-                # чтобы сохранить HTML форматирование
-                if '"news_text"' in string_content or any(html_tag in string_content for html_tag in ['<p>', '<br>', '<div>', '<h1>', '<h2>', '<h3>', '<strong>', '<em>']):
-                    # Заменяем только системные символы, но сохраняем HTML структуру
-                    return string_content.replace('\r', '\\r').replace('\t', '\\t')
-                else:
-                    # Для других полей заменяем все как обычно
-                    return string_content.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+        # Модели-кандидаты с безопасными фолбэками
+        preferred_order = [model_name, "gpt-4o-mini", "gpt-4o", "gpt-4", "gpt-3.5-turbo-16k"]
+        seen = set()
+        generation_model_candidates = []
+        for m in preferred_order:
+            if m and m not in seen:
+                seen.add(m)
+                generation_model_candidates.append(m)
 
-            # Исправляем переносы только в строковых значениях
-            content = re.sub(r'"[^"]*"', fix_json_newlines, content, flags=re.DOTALL)
-            
-            # Попытка исправления типичных ошибок JSON
-            try:
-                result_data = json.loads(content)
-            except json.JSONDecodeError as e:
-                # Логируем ошибку для отладки
-                logger.error(f"Failed to parse JSON response: {str(e)}")
-                logger.error(f"Response content: {content}")
-                
-                # Попытка исправить отсутствующие запятые и закрывающие скобки
-                try:
-                    # Исправляем отсутствующие запятые между полями JSON
-                    fixed_content = re.sub(r'"\s*\n\s*"', '",\n  "', content)
-                    fixed_content = re.sub(r'}\s*\n\s*"', '},\n  "', fixed_content)
-                    fixed_content = re.sub(r']\s*\n\s*"', '],\n  "', fixed_content)
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "model_candidates": generation_model_candidates,
+            "temperature": temperature_value,
+            "max_tokens": max_tokens_value,
+            "min_length": min_length,
+            "max_length": max_length,
+            "target_length": formatting_options.target_length if formatting_options else min_length,
+        }
 
-                    # Проверяем, что JSON заканчивается на закрывающую скобку
-                    fixed_content = fixed_content.strip()
-                    if not fixed_content.endswith('}'):
-                        # Добавляем закрывающую скобку, если она отсутствует
-                        fixed_content += '\n}'
-                        logger.info("Added missing closing brace to JSON")
+    def _parse_article_json(self, content: str) -> Dict:
+        """Разбор JSON-ответа модели с текстом новости (с исправлением типичных ошибок)"""
+        content = content.strip()
+        
+        # Пытаемся найти JSON в ответе
+        if content.startswith("```json"):
+            content = content[7:-3].strip()
+        elif content.startswith("```"):
+            content = content[3:-3].strip()
+        
+        # Дополнительная очистка JSON: правильно обрабатываем переносы строк в значениях
+        # Заменяем переносы строк только внутри строковых значений JSON, но НЕ в HTML контенте
+        def fix_json_newlines(match):
+            # Получаем содержимое строки (без кавычек)
+            string_content = match.group(0)
+
+            # Если это поле news_text с HTML, не заменяем переносы строк
+            # чтобы сохранить HTML форматирование
+            if '"news_text"' in string_content or any(html_tag in string_content for html_tag in ['<p>', '<br>', '<div>', '<h1>', '<h2>', '<h3>', '<strong>', '<em>']):
+                # Заменяем только системные символы, но сохраняем HTML структуру
+                return string_content.replace('\r', '\\r').replace('\t', '\\t')
+            else:
+                # Для других полей заменяем все как обычно
+                return string_content.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
 
-                    result_data = json.loads(fixed_content)
-                    logger.info("Successfully fixed JSON by adding missing commas/braces")
-                except json.JSONDecodeError:
-                    # Если исправление не помогло, выбрасываем исходную ошибку
-                    raise Exception(f"Invalid JSON response from AI: {str(e)}")
+        # Исправляем переносы только в строковых значениях
+        content = re.sub(r'"[^"]*"', fix_json_newlines, content, flags=re.DOTALL)
+        
+        # Попытка исправления типичных ошибок JSON
+        try:
+            result_data = json.loads(content)
+        except json.JSONDecodeError as e:
+            # Логируем ошибку для отладки
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            logger.error(f"Response content: {content}")
             
-            # Генерируем профессиональный промпт для изображения через GPT-4o-mini
-            # На основе выжимки создаем уникальный английский промпт для Gemini
-            logger.info("Generating image prompt via GPT-4o-mini...")
-            image_prompt = await self.generate_image_prompt(summary, original_title)
+            # Попытка исправить отсутствующие запятые и закрывающие скобки
+            try:
+                # Исправляем отсутствующие запятые между полями JSON
+                fixed_content = re.sub(r'"\s*\n\s*"', '",\n  "', content)
+                fixed_content = re.sub(r'}\s*\n\s*"', '},\n  "', fixed_content)
+                fixed_content = re.sub(r']\s*\n\s*"', '],\n  "', fixed_content)
+
+                # Проверяем, что JSON заканчивается на закрывающую скобку
+                fixed_content = fixed_content.strip()
+                if not fixed_content.endswith('}'):
+                    # Добавляем закрывающую скобку, если она отсутствует
+                    fixed_content += '\n}'
+                    logger.info("Added missing closing brace to JSON")
+
+                result_data = json.loads(fixed_content)
+                logger.info("Successfully fixed JSON by adding missing commas/braces")
+            except json.JSONDecodeError:
+                # Если исправление не помогло, выбрасываем исходную ошибку
+                raise Exception(f"Invalid JSON response from AI: {str(e)}")
+
+        return result_data
+
+    @staticmethod
+    def _clean_text_length(news_text: str) -> int:
+        """Длина чистого текста новости (без HTML тегов и повторных пробелов)"""
+        clean_text = re.sub(r'<[^>]*>', '', news_text)
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        return len(clean_text)
 
-            # Генерируем изображение по полученному промпту
-            image_url = await self._generate_image(image_prompt)
-            result_data["image_url"] = image_url
-            result_data["image_prompt"] = image_prompt  # Сохраняем для отображения
-            
-            # Проверяем длину сгенерированной статьи
-            # Подсчитываем длину чистого текста (без HTML тегов)
-            clean_text = re.sub(r'<[^>]*>', '', result_data["news_text"])
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            text_length = len(clean_text)
-            
-            # Создаем объект GeneratedArticle
-            article = GeneratedArticle(
-                news_text=result_data["news_text"],
-                seo_title=result_data["seo_title"],
-                seo_description=result_data["seo_description"],
-                seo_keywords=result_data["seo_keywords"],
-                image_prompt=result_data["image_prompt"],
-                image_url=result_data["image_url"]
-            )
-            
-            # Метрики
-            processing_time = time.time() - start_time
-            target_length = formatting_options.target_length if formatting_options else min_length
-            metrics = {
-                "model_used": used_generation_model,
-                "tokens_used": response.get("usage", {}).get("total_tokens", 0),
-                "processing_time_seconds": processing_time,
-                "success": True,
-                "text_length_clean": text_length,  # Длина чистого текста
-                "text_length_html": len(result_data["news_text"]),  # Длина с HTML
-                "target_length": target_length,
-                "min_length": min_length,
-                "max_length": max_length,
-                "meets_length_requirements": min_length <= text_length <= max_length,
-                "meets_target_length": abs(text_length - target_length) <= 300  # Допустимое отклонение ±300 символов
-            }
-            
-            # Логируем результат с информацией о длине
-            tokens_used = response.get("usage", {}).get("total_tokens", 0)
-            target_length = formatting_options.target_length if formatting_options else min_length
-            
-            # Если статья слишком короткая (менее 70% от минимальной длины), попробуем сгенерировать еще раз
-            if text_length < min_length * 0.7:
-                logger.warning(f"Generated news is too short: {text_length} clean characters (minimum {min_length}, target {target_length}). Attempting regeneration...")
-                
-                # Попытка повторной генерации с более подробными инструкциями
-                retry_prompt = f"""ВНИМАНИЕ! Предыдущая попытка дала слишком короткую статью ({text_length} символов).
-Пожалуйста, создай более развернутую статью с большим количеством деталей.
+    def _article_text_metrics(self, result_data: Dict, request: Dict, model_used: str, usage: Dict, start_time: float) -> Dict:
+        """Метрики генерации текста новости с проверкой длины"""
+        text_length = self._clean_text_length(result_data["news_text"])
+        min_length, max_length, target_length = request["min_length"], request["max_length"], request["target_length"]
+        return {
+            "model_used": model_used,
+            "tokens_used": (usage or {}).get("total_tokens", 0),
+            "processing_time_seconds": time.time() - start_time,
+            "success": True,
+            "text_length_clean": text_length,  # Длина чистого текста
+            "text_length_html": len(result_data["news_text"]),  # Длина с HTML
+            "target_length": target_length,
+            "min_length": min_length,
+            "max_length": max_length,
+            "meets_length_requirements": min_length <= text_length <= max_length,
+            "meets_target_length": abs(text_length - target_length) <= 300  # Допустимое отклонение ±300 символов
+        }
 
-{user_prompt}
+    async def stream_article_text(self, summary: str, facts: List[str], project: ProjectType, original_title: str, formatting_options=None) -> AsyncIterator[StreamEvent]:
+        """
+        Потоковая генерация текста новости и SEO-полей
 
-💡 ДОПОЛНИТЕЛЬНО: Добавь больше деталей, примеров, контекста, научных данных для более полного раскрытия темы!
-Примерный объем: около {target_length} символов чистого текста."""
+        Отдает события разбора JSON-ответа по полям (news_text и другие строки -
+        фрагментами), последнее событие - ("result", {"article", "metrics"}).
+        В отличие от generate_article_text, короткая статья не генерируется
+        повторно: текст уже показан редактору, длина отражается в метриках.
+        """
+        start_time = time.time()
+        try:
+            request = self._article_text_request(summary, facts, project, original_title, formatting_options)
+            parser = JsonFieldStream()
+            parts = []
+            state = {}
+            async for content in self._stream_completion(request, state, frequency_penalty=0.2, presence_penalty=0.2):
+                parts.append(content)
+                for event in self._field_events(parser, content):
+                    yield event
 
-                try:
-                    retry_response = await self.provider.get_completion(
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": retry_prompt}
-                        ],
-                        model=used_generation_model,
-                        temperature=temperature_value * 0.8,  # Снижаем температуру для более предсказуемого результата
-                        max_tokens=max_tokens_value,
-                        frequency_penalty=0.3,
-                        presence_penalty=0.3
-                    )
-                    
-                    retry_content = retry_response.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                    retry_result_data = json.loads(retry_content)
-                    
-                    # Проверяем длину повторно сгенерированной статьи
-                    retry_clean_text = re.sub(r'<[^>]*>', '', retry_result_data["news_text"])
-                    retry_clean_text = re.sub(r'\s+', ' ', retry_clean_text).strip()
-                    retry_text_length = len(retry_clean_text)
-                    
-                    if retry_text_length > text_length:
-                        logger.info(f"Regeneration successful: {retry_text_length} clean characters (improved from {text_length})")
-                        result_data = retry_result_data
-                        text_length = retry_text_length
-                        response = retry_response
-                        
-                except Exception as retry_error:
-                    logger.error(f"Failed to regenerate article: {retry_error}")
-                    # Используем оригинальную статью
-            
-            if text_length < min_length * 0.8:
-                logger.warning(f"Generated news is short: {text_length} clean characters (target {target_length}). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
-            elif text_length > max_length * 1.2:
-                logger.warning(f"Generated news is long: {text_length} clean characters (target {target_length}). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
-            else:
-                logger.info(f"News generated successfully: {text_length} clean characters (target {target_length}, acceptable range). Tokens: {tokens_used}, Time: {processing_time:.2f}s")
-            
-            return article, metrics
+            try:
+                result_data = self._parse_article_json("".join(parts))
+            except Exception:
+                # Потоковый разбор терпимее к ошибкам JSON - берем его значения
+                if not {"news_text", "seo_title", "seo_description", "seo_keywords"} <= parser.values.keys():
+                    raise
+                result_data = parser.values
 
+            metrics = self._article_text_metrics(result_data, request, state.get("model_used"), state.get("usage"), start_time)
+            metrics["first_token_seconds"] = state.get("first_token_at", time.time()) - start_time
+            if not metrics["meets_length_requirements"]:
+                logger.warning(f"Streamed news length {metrics['text_length_clean']} clean characters is out of range (target {metrics['target_length']})")
         except Exception as e:
-            processing_time = time.time() - start_time
-            logger.error(f"Error in generate_full_article: {e}")
-            
-            metrics = {
-                "model_used": locals().get("model_name", "gpt-4o-mini"),
-                "tokens_used": 0,
-                "processing_time_seconds": processing_time,
-                "success": False,
-                "error": str(e)
-            }
-            
+            logger.error(f"Error in stream_article_text: {e}")
             raise Exception(f"Ошибка при генерации статьи: {str(e)}")
 
+        yield "result", {
+            "article": {
+                "news_text": result_data["news_text"],
+                "seo_title": result_data["seo_title"],
+                "seo_description": result_data["seo_description"],
+                "seo_keywords": result_data["seo_keywords"]
+            },
+            "metrics": metrics
+        }
+
     def _build_formatting_instructions(self, formatting_options) -> str:
         """Строит инструкции для форматирования на основе выбранных параметров"""
         instructions = []
@@ -1750,7 +2231,7 @@ GOOD (сохранить): Заголовок и основной текст с
 
         return "\n".join(instructions)
 
-    async def generate_image_prompt(self, summary: str, article_title: str) -> str:
+    async def generate_image_prompt(self, summary: str, article_title: str, raise_on_error: bool = False) -> str:
         """
         Генерация профессионального промпта для изображения на основе выжимки статьи
         Использует GPT-4o-mini для создания детального английского промпта для Gemini
@@ -1758,6 +2239,7 @@ GOOD (сохранить): Заголовок и основной текст с
         Args:
             summary: Текст выжимки статьи
             article_title: Заголовок статьи
+            raise_on_error: Пробрасывать ошибку вместо запасного промпта
 
         Returns:
             Профессиональный промпт на английском языке для генерации изображения
@@ -1816,17 +2298,20 @@ Generate a detailed English prompt (2-4 sentences) for creating a photorealistic
 
         except Exception as e:
             logger.error(f"Error generating image prompt: {e}")
+            if raise_on_error:
+                raise
             # Fallback промпт на английском
             fallback = f"Professional medical photography related to {article_title}. Clean hospital setting, natural lighting, photorealistic, documentary style, 16:9 aspect ratio."
             logger.warning(f"Using fallback image prompt: {fallback}")
             return fallback
 
-    async def _generate_image(self, prompt: str) -> str:
+    async def _generate_image(self, prompt: str, raise_on_error: bool = False) -> str:
         """
         Генерация изображения через KIE AI (Nano Banana - Google Gemini 2.5 Flash)
 
         Args:
             prompt: Промпт для генерации изображения
+            raise_on_error: Пробрасывать ошибку вместо стокового изображения
 
         Returns:
             str: URL сгенерированного изображения
@@ -1837,19 +2322,21 @@ Generate a detailed English prompt (2-4 sentences) for creating a photorealistic
 
             logger.info(f"Генерируем изображение через KIE AI: {prompt[:100]}...")
 
-            # Генерация изображения (ожидание до 10 минут)
-            image_bytes = await kie_client.generate_image(prompt)
-
-            if not image_bytes:
-                raise RuntimeError("Пустой ответ от KIE API")
+            # Генерация изображения (ожидание до 10 минут), результат
+            # скачивается потоково сразу в файл (PNG формат от KIE)
+            filepath = image_store.temp_path("png")
+            try:
+                size = await kie_client.generate_image_to_file(prompt, filepath)
 
-            # Сохранение файла (PNG формат от KIE)
-            storage_dir = Path(settings.BASE_DIR) / "storage" / "images"
-            storage_dir.mkdir(parents=True, exist_ok=True)
+                if not size:
+                    raise RuntimeError("Пустой ответ от KIE API")
 
-            filename = f"{uuid4().hex}.png"
-            filepath = storage_dir / filename
-            filepath.write_bytes(image_bytes)
+                # Перенос в хранилище (имя по SHA-256) и построение вариантов
+                filename = await image_store.ingest_file(filepath, "png")
+            except BaseException:
+                # Не оставляем на диске пустой или недоперенесенный файл
+                await asyncio.to_thread(filepath.unlink, missing_ok=True)
+                raise
 
             # Формирование URL для доступа к изображению
             base_url = os.getenv('IMAGE_SERVICE_PUBLIC_BASE_URL', 'http://localhost:8000').rstrip("/")
@@ -1860,14 +2347,17 @@ Generate a detailed English prompt (2-4 sentences) for creating a photorealistic
 
         except Exception as e:
             logger.error(f"Error generating image via KIE AI: {e}")
+            if raise_on_error:
+                raise
             return "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=1024&h=1024&q=80"
 
-    async def regenerate_image(self, prompt: str) -> Tuple[str, Dict]:
+    async def regenerate_image(self, prompt: str, raise_on_error: bool = False) -> Tuple[str, Dict]:
         """
         Перегенерация изображения с новым промптом
         
         Args:
             prompt: Новый промпт для генерации
+            raise_on_error: Ошибка генерации вместо стокового изображения
             
         Returns:
             Tuple[str, Dict]: URL изображения и метрики
@@ -1875,7 +2365,7 @@ Generate a detailed English prompt (2-4 sentences) for creating a photorealistic
         start_time = time.time()
         
         try:
-            image_url = await self._generate_image(prompt)
+            image_url = await self._generate_image(prompt, raise_on_error=raise_on_error)
             
             processing_time = time.time() - start_time
             metrics = {
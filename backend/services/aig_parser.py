@@ -7,7 +7,7 @@ from urllib.parse import urljoin
 import logging
 
 from models.schemas import NewsSource
-from services.base_parser import BaseNewsParser
+from services.base_parser import BaseNewsParser, KnownURLProbe
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,8 @@ class AigParser(BaseNewsParser):
         self.name = "aig"
         self.news_url = "https://aig-journal.ru/content/roubric/news"
     
-    async def parse_news_list(self, max_articles: int = 50, date_filter: Optional[str] = None, fetch_full_content: bool = True) -> List[NewsSource]:
+    async def parse_news_list(self, max_articles: int = 50, date_filter: Optional[str] = None, fetch_full_content: bool = True,
+                              known_url_probe: Optional[KnownURLProbe] = None) -> List[NewsSource]:
         """Парсинг списка новостей с главной страницы aig-journal.ru с поддержкой пагинации"""
         try:
             logger.info(f"Starting parse_news_list for aig-journal with max_articles={max_articles}")
@@ -44,110 +45,92 @@ class AigParser(BaseNewsParser):
                 
                 logger.info(f"Parsing page {page}: {url}")
                 
-                async with self.session.get(url) as response:
-                    logger.info(f"HTTP response status for page {page}: {response.status}")
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch news list page {page}: {response.status}")
-                        break
-                    
-                    html = await response.text()
-                    logger.info(f"Received HTML content length for page {page}: {len(html)}")
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Ищем ссылки на статьи - используем паттерны /content/medarticles/ и /content/news/
-                    article_links = soup.find_all('a', {'href': re.compile(r'/content/(medarticles|news)/')})
-                    
-                    logger.info(f"Found {len(article_links)} news article links on page {page}")
-                    
-                    page_articles_count = 0
-                    
-                    for link in article_links:
-                        try:
-                            # Получаем URL статьи
-                            href = link.get('href')
-                            if not href:
-                                logger.debug("Href attribute not found in article link")
-                                continue
-                                
-                            full_url = urljoin(self.base_url, href)
-                            
-                            # Проверяем на дубли по URL
-                            if full_url in seen_urls:
-                                continue
-                            seen_urls.add(full_url)
-                            
-                            # Извлекаем заголовок из ссылки
-                            title = link.get_text(strip=True)
-                            
-                            # Если заголовок пустой, пробуем найти в родительском элементе
-                            if not title:
-                                parent = link.parent
-                                if parent:
-                                    title_elem = parent.find(['h1', 'h2', 'h3', 'h4'])
-                                    title = title_elem.get_text(strip=True) if title_elem else ""
-                            
-                            # Если заголовок все еще пустой, генерируем его из URL
-                            if not title:
-                                title = href.split('/')[-1].replace('.html', '').replace('-', ' ').title()
-                            
-                            # Проверяем на дубли по заголовку
-                            if title in seen_titles:
-                                continue
-                            seen_titles.add(title)
-                            
-                            # Если нужен полный контент, парсим статью с метаданными
-                            full_content = ""
-                            published_date = None
-                            published_time = None
-                            views_count = None
-                            author = None
-                            
-                            if fetch_full_content:
-                                full_content, published_date, published_time, views_count, author = await self._fetch_full_article_with_metadata(full_url)
-                            
-                            # Используем полный контент если есть, иначе заголовок как превью
-                            content = full_content if full_content else title
-                            
-                            # Создаем объект новости с метаданными
-                            news_item = NewsSource(
-                                title=title,
-                                url=full_url,
-                                content=content,
-                                published_date=published_date,
-                                published_time=published_time,
-                                views_count=views_count,
-                                author=author,
-                                source_site="aig-journal.ru"
-                            )
+                html = await self._get_html(url)
+                if html is None:
+                    logger.error(f"Failed to fetch news list page {page}")
+                    break
+                
+                logger.info(f"Received HTML content length for page {page}: {len(html)}")
+                soup = await self._parse_html(html)
+                
+                # Ищем ссылки на статьи - используем паттерны /content/medarticles/ и /content/news/
+                article_links = soup.find_all('a', {'href': re.compile(r'/content/(medarticles|news)/')})
+                
+                logger.info(f"Found {len(article_links)} news article links on page {page}")
+                
+                # Собираем кандидатов со страницы, тексты статей загружаем параллельно
+                candidates = []
+                
+                for link in article_links:
+                    try:
+                        # Получаем URL статьи
+                        href = link.get('href')
+                        if not href:
+                            logger.debug("Href attribute not found in article link")
+                            continue
                             
-                            if self._is_relevant_news(news_item, date_filter):
-                                news_items.append(news_item)
-                                page_articles_count += 1
-                                logger.info(f"Added news from page {page}: {title[:50]}...")
-                                
-                                # Добавляем задержку между запросами
-                                await asyncio.sleep(0.5)
-                                
-                                # Ограничиваем количество статей
-                                if len(news_items) >= max_articles:
-                                    break
-                                    
-                        except Exception as e:
-                            logger.warning(f"Error parsing article link on page {page}: {e}")
+                        full_url = urljoin(self.base_url, href)
+                        
+                        # Проверяем на дубли по URL
+                        if full_url in seen_urls:
                             continue
-                    
-                    logger.info(f"Added {page_articles_count} articles from page {page}")
-                    
-                    # Если достигли максимального количества статей, прекращаем парсинг
-                    if len(news_items) >= max_articles:
-                        logger.info(f"Reached max articles limit ({max_articles}), stopping pagination")
-                        break
-                    
-                    # Переходим к следующей странице
-                    page += 1
-                    
-                    # Добавляем задержку между страницами
-                    await asyncio.sleep(1.0)
+                        seen_urls.add(full_url)
+                        
+                        # Извлекаем заголовок из ссылки
+                        title = link.get_text(strip=True)
+                        
+                        # Если заголовок пустой, пробуем найти в родительском элементе
+                        if not title:
+                            parent = link.parent
+                            if parent:
+                                title_elem = parent.find(['h1', 'h2', 'h3', 'h4'])
+                                title = title_elem.get_text(strip=True) if title_elem else ""
+                        
+                        # Если заголовок все еще пустой, генерируем его из URL
+                        if not title:
+                            title = href.split('/')[-1].replace('.html', '').replace('-', ' ').title()
+                        
+                        # Проверяем на дубли по заголовку
+                        if title in seen_titles:
+                            continue
+                        seen_titles.add(title)
+                        
+                        candidates.append((title, full_url))
+                                
+                    except Exception as e:
+                        logger.warning(f"Error parsing article link on page {page}: {e}")
+                        continue
+                
+                added = await self._fetch_stage(
+                    candidates,
+                    self._fetch_candidate if fetch_full_content else None,
+                    self._build_news_item,
+                    news_items,
+                    max_articles,
+                    date_filter,
+                    known_url_probe=known_url_probe
+                )
+                page_articles_count = len(added)
+                for news_item in added:
+                    logger.info(f"Added news from page {page}: {news_item.title[:50]}...")
+                
+                logger.info(f"Added {page_articles_count} articles from page {page}")
+                
+                # Если достигли максимального количества статей, прекращаем парсинг
+                if len(news_items) >= max_articles:
+                    logger.info(f"Reached max articles limit ({max_articles}), stopping pagination")
+                    break
+                
+                # Все статьи страницы уже сохранены - дальше в ленте только более старые
+                if candidates and not added and known_url_probe:
+                    logger.info("No new articles on this page, stopping pagination")
+                    break
+                
+                # Переходим к следующей странице
+                page += 1
+                
+                # Добавляем задержку между страницами
+                await asyncio.sleep(1.0)
             
             logger.info(f"Successfully parsed {len(news_items)} unique news articles from {page-1} pages")
             return news_items
@@ -156,113 +139,131 @@ class AigParser(BaseNewsParser):
             logger.error(f"Error parsing news list: {e}")
             return []
     
+    async def _fetch_candidate(self, candidate: tuple) -> tuple:
+        """Загрузка текста и метаданных статьи для кандидата (title, url)"""
+        return await self._fetch_full_article_with_metadata(candidate[1])
+    
+    def _build_news_item(self, candidate: tuple, fetched: Optional[tuple]) -> NewsSource:
+        """Сборка новости из кандидата со страницы списка и загруженной статьи"""
+        title, full_url = candidate
+        full_content, published_date, published_time, views_count, author = fetched or ("", None, None, None, None)
+        
+        # Используем полный контент если есть, иначе заголовок как превью
+        return NewsSource(
+            title=title,
+            url=full_url,
+            content=full_content if full_content else title,
+            published_date=published_date,
+            published_time=published_time,
+            views_count=views_count,
+            author=author,
+            source_site="aig-journal.ru"
+        )
+    
     async def _fetch_full_article(self, url: str) -> str:
         """Получение полного контента статьи"""
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to fetch article {url}: {response.status}")
-                    return ""
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Удаляем ненужные элементы
-                for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                    element.decompose()
-                
-                # Ищем основной контент статьи
-                content_parts = []
-                
-                # Специфичная логика для AIG Journal - собираем контент из определенных контейнеров
-                lead_container = soup.find('div', class_='c-typography-lead')
-                text_container = soup.find('div', class_='c-typography-text')
-                
-                # Добавляем вводный текст (lead)
-                if lead_container:
-                    lead_text = lead_container.get_text(strip=True)
-                    if lead_text and len(lead_text) > 20:
-                        content_parts.append(lead_text)
-                
-                # Добавляем основной текст
-                if text_container:
-                    # Ищем все параграфы в основном контейнере
-                    paragraphs = text_container.find_all('p')
-                    for p in paragraphs:
-                        text = p.get_text(strip=True)
-                        if (text and len(text) > 20 and 
-                            not any(skip_word in text.lower() for skip_word in 
-                                   ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее', 'подробнее'])):
-                            content_parts.append(text)
+            html = await self._get_html(url)
+            if html is None:
+                return ""
+            soup = await self._parse_html(html)
+            
+            # Удаляем ненужные элементы
+            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+                element.decompose()
+            
+            # Ищем основной контент статьи
+            content_parts = []
+            
+            # Специфичная логика для AIG Journal - собираем контент из определенных контейнеров
+            lead_container = soup.find('div', class_='c-typography-lead')
+            text_container = soup.find('div', class_='c-typography-text')
+            
+            # Добавляем вводный текст (lead)
+            if lead_container:
+                lead_text = lead_container.get_text(strip=True)
+                if lead_text and len(lead_text) > 20:
+                    content_parts.append(lead_text)
+            
+            # Добавляем основной текст
+            if text_container:
+                # Ищем все параграфы в основном контейнере
+                paragraphs = text_container.find_all('p')
+                for p in paragraphs:
+                    text = p.get_text(strip=True)
+                    if (text and len(text) > 20 and 
+                        not any(skip_word in text.lower() for skip_word in 
+                               ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее', 'подробнее'])):
+                        content_parts.append(text)
+            
+            # Если специфичные контейнеры не найдены, используем общие селекторы
+            if not content_parts:
+                general_selectors = [
+                    {'tag': 'div', 'class': 'article-text'},
+                    {'tag': 'div', 'class': 'article-content'},
+                    {'tag': 'div', 'class': 'content-text'},
+                    {'tag': 'div', 'class': 'post-content'},
+                    {'tag': 'div', 'class': 'entry-content'},
+                    {'tag': 'article'},
+                    {'tag': 'main'},
+                ]
                 
-                # Если специфичные контейнеры не найдены, используем общие селекторы
-                if not content_parts:
-                    general_selectors = [
-                        {'tag': 'div', 'class': 'article-text'},
-                        {'tag': 'div', 'class': 'article-content'},
-                        {'tag': 'div', 'class': 'content-text'},
-                        {'tag': 'div', 'class': 'post-content'},
-                        {'tag': 'div', 'class': 'entry-content'},
-                        {'tag': 'article'},
-                        {'tag': 'main'},
-                    ]
-                    
-                    for selector in general_selectors:
-                        if 'class' in selector:
-                            container = soup.find(selector['tag'], class_=selector['class'])
-                        else:
-                            container = soup.find(selector['tag'])
-                            
-                        if container:
-                            # Ищем все параграфы и div с текстом внутри контейнера
-                            text_elements = container.find_all(['p', 'div'], recursive=True)
-                            for elem in text_elements:
-                                # Пропускаем элементы с определенными классами
-                                if elem.get('class'):
-                                    classes = ' '.join(elem.get('class', []))
-                                    if any(skip_class in classes.lower() for skip_class in 
-                                          ['nav', 'menu', 'sidebar', 'footer', 'header', 'ad', 'banner', 'social', 'btn', 'button']):
-                                        continue
-                                
-                                text = elem.get_text(strip=True)
-                                if (text and len(text) > 20 and 
-                                    not any(skip_word in text.lower() for skip_word in 
-                                           ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее', 'подробнее'])):
-                                    content_parts.append(text)
+                for selector in general_selectors:
+                    if 'class' in selector:
+                        container = soup.find(selector['tag'], class_=selector['class'])
+                    else:
+                        container = soup.find(selector['tag'])
+                        
+                    if container:
+                        # Ищем все параграфы и div с текстом внутри контейнера
+                        text_elements = container.find_all(['p', 'div'], recursive=True)
+                        for elem in text_elements:
+                            # Пропускаем элементы с определенными классами
+                            if elem.get('class'):
+                                classes = ' '.join(elem.get('class', []))
+                                if any(skip_class in classes.lower() for skip_class in 
+                                      ['nav', 'menu', 'sidebar', 'footer', 'header', 'ad', 'banner', 'social', 'btn', 'button']):
+                                    continue
                             
-                            if content_parts:
-                                break
-                
-                # Если основной метод не сработал, ищем все параграфы на странице
-                if not content_parts:
-                    all_paragraphs = soup.find_all('p')
-                    for p in all_paragraphs:
-                        text = p.get_text(strip=True)
-                        if (text and len(text) > 20 and 
-                            not any(skip_word in text.lower() for skip_word in 
-                                   ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее'])):
-                            content_parts.append(text)
-                
-                # Если все еще нет контента, ищем в любых div с текстом
-                if not content_parts:
-                    all_divs = soup.find_all('div')
-                    for div in all_divs:
-                        text = div.get_text(strip=True)
-                        if (text and len(text) > 50 and len(text) < 1000 and
-                            not any(skip_word in text.lower() for skip_word in 
-                                   ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться'])):
-                            content_parts.append(text)
-                
-                # Убираем дубли и объединяем
-                unique_parts = []
-                seen_texts = set()
-                for part in content_parts:
-                    if part not in seen_texts and len(part) > 20:
-                        unique_parts.append(part)
-                        seen_texts.add(part)
-                
-                return '\n\n'.join(unique_parts[:8])  # Ограничиваем количество абзацев
-                
+                            text = elem.get_text(strip=True)
+                            if (text and len(text) > 20 and 
+                                not any(skip_word in text.lower() for skip_word in 
+                                       ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее', 'подробнее'])):
+                                content_parts.append(text)
+                        
+                        if content_parts:
+                            break
+            
+            # Если основной метод не сработал, ищем все параграфы на странице
+            if not content_parts:
+                all_paragraphs = soup.find_all('p')
+                for p in all_paragraphs:
+                    text = p.get_text(strip=True)
+                    if (text and len(text) > 20 and 
+                        not any(skip_word in text.lower() for skip_word in 
+                               ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться', 'читать далее'])):
+                        content_parts.append(text)
+            
+            # Если все еще нет контента, ищем в любых div с текстом
+            if not content_parts:
+                all_divs = soup.find_all('div')
+                for div in all_divs:
+                    text = div.get_text(strip=True)
+                    if (text and len(text) > 50 and len(text) < 1000 and
+                        not any(skip_word in text.lower() for skip_word in 
+                               ['навигация', 'реклама', 'подписаться', 'следить', 'комментарий', 'поделиться'])):
+                        content_parts.append(text)
+            
+            # Убираем дубли и объединяем
+            unique_parts = []
+            seen_texts = set()
+            for part in content_parts:
+                if part not in seen_texts and len(part) > 20:
+                    unique_parts.append(part)
+                    seen_texts.add(part)
+            
+            return '\n\n'.join(unique_parts[:8])  # Ограничиваем количество абзацев
+            
         except Exception as e:
             logger.error(f"Error fetching full article {url}: {e}")
             return ""
@@ -373,22 +374,19 @@ class AigParser(BaseNewsParser):
     async def _fetch_full_article_with_metadata(self, url: str) -> tuple[str, Optional[datetime], Optional[str], Optional[int], Optional[str]]:
         """Получение полного контента статьи с метаданными"""
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to fetch article {url}: {response.status}")
-                    return "", None, None, None
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Извлекаем метаданные
-                published_date, published_time, views_count, author = await self._extract_article_metadata(soup)
-                
-                # Получаем контент из уже загруженного HTML
-                content = await self._extract_content_from_soup(soup)
-                
-                return content, published_date, published_time, views_count, author
-                
+            html = await self._get_html(url)
+            if html is None:
+                return "", None, None, None, None
+            soup = await self._parse_html(html)
+            
+            # Извлекаем метаданные
+            published_date, published_time, views_count, author = await self._extract_article_metadata(soup)
+            
+            # Получаем контент из уже загруженного HTML
+            content = await self._extract_content_from_soup(soup)
+            
+            return content, published_date, published_time, views_count, author
+            
         except Exception as e:
             logger.error(f"Error fetching article with metadata {url}: {e}")
             return "", None, None, None, None
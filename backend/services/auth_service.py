@@ -2,8 +2,11 @@
 Сервис аутентификации и авторизации
 """
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
@@ -14,6 +17,10 @@ from core.config import settings
 # Контекст для хэширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Кэш пользователей для авторизации запросов: (username, iat) -> (истекает, User)
+_user_cache: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, User]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
 
 class AuthService:
     """Сервис для работы с аутентификацией и авторизацией"""
@@ -37,21 +44,71 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
         
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
         encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
         return encoded_jwt
     
     @staticmethod
-    def verify_token(token: str) -> Optional[str]:
-        """Проверить JWT токен и получить username"""
+    def decode_token(token: str) -> Optional[dict]:
+        """Проверить JWT токен и получить payload (None - токен невалиден или без sub)"""
         try:
             payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-            username: str = payload.get("sub")
-            if username is None:
-                return None
-            return username
         except JWTError:
             return None
+        if payload.get("sub") is None:
+            return None
+        return payload
+    
+    @staticmethod
+    def verify_token(token: str) -> Optional[str]:
+        """Проверить JWT токен и получить username"""
+        payload = AuthService.decode_token(token)
+        return payload["sub"] if payload else None
+    
+    @staticmethod
+    def get_user_for_token(payload: dict) -> Optional[User]:
+        """
+        Пользователь для проверенного токена с кэшированием
+        
+        Ключ кэша - username и время выпуска токена (iat); запись живет
+        AUTH_USER_CACHE_TTL секунд, поэтому частые запросы фронтенда не
+        обращаются к БД. Удаление пользователя и смена пароля сбрасывают
+        кэш сразу (в этом процессе), прочие изменения видны не позже TTL.
+        Возвращаемый объект общий для запросов - его нельзя изменять.
+        """
+        username = payload["sub"]
+        ttl = settings.AUTH_USER_CACHE_TTL
+        if ttl <= 0:
+            return AuthService.get_user_by_username(username)
+        
+        key = (username, payload.get("iat"))
+        now = time.monotonic()
+        with _user_cache_lock:
+            cached = _user_cache.get(key)
+            if cached and cached[0] > now:
+                _user_cache.move_to_end(key)
+                return cached[1]
+        
+        user = AuthService.get_user_by_username(username)
+        if user is None:
+            # Отсутствующих пользователей не кэшируем
+            return None
+        with _user_cache_lock:
+            _user_cache[key] = (now + ttl, user)
+            _user_cache.move_to_end(key)
+            while len(_user_cache) > settings.AUTH_USER_CACHE_SIZE:
+                _user_cache.popitem(last=False)
+        return user
+    
+    @staticmethod
+    def invalidate_user_cache(username: Optional[str] = None):
+        """Сбросить кэш пользователя (всех токенов) или весь кэш"""
+        with _user_cache_lock:
+            if username is None:
+                _user_cache.clear()
+                return
+            for key in [key for key in _user_cache if key[0] == username]:
+                del _user_cache[key]
     
     @staticmethod
     def get_user_by_username(username: str) -> Optional[User]:
@@ -157,8 +214,10 @@ class AuthService:
                 session.delete(expense)
             
             # Теперь можно безопасно удалить пользователя
+            username = user.username
             session.delete(user)
             session.commit()
+            AuthService.invalidate_user_cache(username)
             return True
 
     @staticmethod
@@ -168,9 +227,11 @@ class AuthService:
             user = session.get(User, user_id)
             if not user:
                 return False
+            username = user.username
             user.hashed_password = AuthService.get_password_hash(new_password)
             session.add(user)
             session.commit()
+            AuthService.invalidate_user_cache(username)
             return True
 
 
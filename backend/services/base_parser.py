@@ -1,23 +1,86 @@
 from abc import ABC, abstractmethod
 import aiohttp
+import asyncio
+import random
 import ssl
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from datetime import datetime
+from urllib.parse import urlparse
 import logging
 from bs4 import BeautifulSoup
 
+from core.config import settings
 from models.schemas import NewsSource
+from services.http_cache import HTTPCache, http_cache
 
 logger = logging.getLogger(__name__)
 
+
+def _detect_html_parser() -> str:
+    """Самый быстрый из установленных бэкендов BeautifulSoup"""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = _detect_html_parser()
+
+# Общий пул для разбора HTML всеми парсерами
+_html_executor = ThreadPoolExecutor(max_workers=settings.PARSER_HTML_WORKERS, thread_name_prefix="html-parse")
+
+
+def make_soup(html: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """Разбор HTML выбранным (по умолчанию самым быстрым) бэкендом"""
+    return BeautifulSoup(html, parser or HTML_PARSER)
+
+
+# Проверка уже сохраненных URL: по списку URL возвращает те, что есть в базе
+KnownURLProbe = Callable[[List[str]], Set[str]]
+
+# Счетчики текущего запуска парсинга. Парсеры - общие синглтоны, а контекст
+# у каждой задачи свой, поэтому одновременные запуски не смешивают статистику
+_run_fetch_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("parser_fetch_stats", default=None)
+
+
+def new_fetch_stats() -> Dict[str, int]:
+    """Пустые счетчики запуска: попадания HTTP-кэша, ответы 304, пропущенные известные URL"""
+    return {"cache_hits": 0, "not_modified": 0, "known_urls": 0}
+
+
+@contextmanager
+def collect_fetch_stats(stats: Dict[str, int]):
+    """Загрузки парсеров внутри блока (в этой задаче и порожденных ею) считаются в stats"""
+    token = _run_fetch_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_fetch_stats.reset(token)
+
+
 class BaseNewsParser(ABC):
     """Базовый класс для всех парсеров новостей"""
     
+    # Параметры загрузки статей (могут переопределяться в парсерах)
+    max_concurrent_per_host: int = 4  # Одновременных запросов к одному хосту
+    politeness_delay: float = 0.25  # Минимальный интервал между запросами к хосту, сек
+    fetch_retries: int = 3  # Попыток на один URL
+    retry_backoff: float = 1.0  # Базовая задержка экспоненциального backoff, сек
+    use_http_cache: bool = True  # Условные запросы и ответы из дискового HTTP-кэша
+    html_parser: str = HTML_PARSER  # Бэкенд BeautifulSoup: lxml, если установлен
+    
     def __init__(self, source_name: str, base_url: str):
         self.source_name = source_name
         self.name = source_name  # Добавляем атрибут name для совместимости
         self.base_url = base_url
         self.session = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_request: Dict[str, float] = {}
         
     async def __aenter__(self):
         """Инициализация HTTP сессии"""
@@ -43,9 +106,174 @@ class BaseNewsParser(ABC):
         if self.session:
             await self.session.close()
     
+    async def _wait_politeness(self, host: str):
+        """Выдерживает минимальный интервал между запросами к одному хосту"""
+        now = time.monotonic()
+        start_at = max(now, self._host_next_request.get(host, 0.0))
+        self._host_next_request[host] = start_at + self.politeness_delay
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+    
+    async def _parse_html(self, html: str) -> BeautifulSoup:
+        """Разбор HTML в пуле потоков, чтобы большие страницы не блокировали event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_html_executor, make_soup, html, self.html_parser)
+    
+    @staticmethod
+    def _count_fetch(counter: str, amount: int = 1):
+        """Увеличивает счетчик текущего запуска (если он собирается)"""
+        stats = _run_fetch_stats.get()
+        if stats is not None:
+            stats[counter] = stats.get(counter, 0) + amount
+    
+    def _drop_known(self, candidates: List[Any], known_url_probe: Optional[KnownURLProbe]) -> List[Any]:
+        """
+        Отбрасывает кандидатов (title, url, ...), чьи URL уже есть в базе
+        
+        Один пакетный запрос на страницу списка вместо загрузки и парсинга
+        статьи, которую save_articles все равно отбросит как дубликат.
+        """
+        if not known_url_probe or not candidates:
+            return candidates
+        try:
+            known = known_url_probe([candidate[1] for candidate in candidates])
+        except Exception as e:
+            logger.warning(f"Known URL probe failed, fetching all candidates: {e}")
+            return candidates
+        if not known:
+            return candidates
+        
+        fresh = [candidate for candidate in candidates if candidate[1] not in known]
+        self._count_fetch("known_urls", len(candidates) - len(fresh))
+        logger.info(f"Skipped {len(candidates) - len(fresh)} already saved articles")
+        return fresh
+    
+    async def _get_html(self, url: str) -> Optional[str]:
+        """
+        Загрузка страницы с ограничением параллелизма на хост и повторами
+        
+        Свежие записи HTTP-кэша отдаются без запроса, для остальных отправляется
+        условный GET и ответ 304 обслуживается из кэша. Чтение и запись кэша
+        (SQLite и zlib) идут в пуле потоков. Повторяет запрос при
+        сетевых ошибках, 429 и 5xx с экспоненциальным backoff и случайным jitter.
+        Возвращает None, если страницу получить не удалось.
+        """
+        cache = http_cache if self.use_http_cache else None
+        entry = await asyncio.to_thread(cache.get, url) if cache else None
+        if entry and entry["fresh"]:
+            await asyncio.to_thread(cache.mark_used, url)
+            self._count_fetch("cache_hits")
+            return entry["text"]
+        headers = HTTPCache.conditional_headers(entry)
+        
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrent_per_host))
+        
+        for attempt in range(1, self.fetch_retries + 1):
+            retry_after = None
+            async with semaphore:
+                await self._wait_politeness(host)
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 304 and entry:
+                            await asyncio.to_thread(cache.touch, url, response.headers)
+                            self._count_fetch("not_modified")
+                            return entry["text"]
+                        if response.status == 200:
+                            text = await response.text()
+                            if cache:
+                                await asyncio.to_thread(cache.store, url, text, response.headers)
+                            return text
+                        if response.status != 429 and response.status < 500:
+                            logger.warning(f"Failed to fetch {url}: {response.status}")
+                            return None
+                        logger.warning(f"Retryable status {response.status} for {url} (attempt {attempt}/{self.fetch_retries})")
+                        header = response.headers.get('Retry-After')
+                        if header and header.isdigit():
+                            retry_after = float(header)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Error fetching {url} (attempt {attempt}/{self.fetch_retries}): {e}")
+            
+            if attempt < self.fetch_retries:
+                # Full jitter: случайная задержка в пределах экспоненциального окна
+                delay = retry_after if retry_after is not None else random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+                await asyncio.sleep(delay)
+        
+        logger.error(f"Giving up on {url} after {self.fetch_retries} attempts")
+        return None
+    
+    async def _fetch_stage(
+        self,
+        candidates: List[Any],
+        fetch: Optional[Callable[[Any], Awaitable[Any]]],
+        build: Callable[[Any, Any], Optional[NewsSource]],
+        news_items: List[NewsSource],
+        max_articles: int,
+        date_filter: Optional[str] = None,
+        known_url_probe: Optional[KnownURLProbe] = None
+    ) -> List[NewsSource]:
+        """
+        Параллельная загрузка статей, найденных на странице списка
+        
+        Уже сохраненные статьи отбрасываются до загрузки (если передан
+        known_url_probe). Кандидаты обрабатываются порциями по числу
+        недостающих статей, чтобы не скачивать лишнего, если часть статей
+        отсеет фильтр по дате. Порядок результатов совпадает с порядком
+        кандидатов в списке.
+        
+        Args:
+            candidates: Кортежи (title, url, ...) со страницы списка в порядке следования
+            fetch: Корутина загрузки статьи для кандидата (None - без загрузки)
+            build: Сборка NewsSource из кандидата и результата fetch
+            news_items: Список, в который добавляются подходящие статьи
+            max_articles: Целевое количество статей в news_items
+            date_filter: Фильтр по дате
+            known_url_probe: Проверка уже сохраненных URL (None - загружать все)
+            
+        Returns:
+            Статьи, добавленные в news_items за этот вызов
+        """
+        async def safe_fetch(candidate):
+            try:
+                return await fetch(candidate)
+            except Exception as e:
+                logger.warning(f"Error fetching article: {e}")
+                return None
+        
+        candidates = self._drop_known(candidates, known_url_probe)
+        
+        added = []
+        position = 0
+        while position < len(candidates) and len(news_items) < max_articles:
+            chunk = candidates[position:position + max_articles - len(news_items)]
+            position += len(chunk)
+            
+            if fetch:
+                results = await asyncio.gather(*(safe_fetch(candidate) for candidate in chunk))
+            else:
+                results = [None] * len(chunk)
+            
+            for candidate, result in zip(chunk, results):
+                try:
+                    news_item = build(candidate, result)
+                except Exception as e:
+                    logger.warning(f"Error building article: {e}")
+                    continue
+                if news_item and self._is_relevant_news(news_item, date_filter):
+                    news_items.append(news_item)
+                    added.append(news_item)
+        
+        return added
+    
     @abstractmethod
-    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True) -> List[NewsSource]:
-        """Парсинг списка новостей с главной страницы"""
+    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True,
+                              known_url_probe: Optional[KnownURLProbe] = None) -> List[NewsSource]:
+        """
+        Парсинг списка новостей с главной страницы
+        
+        known_url_probe передается на каждый запуск: парсеры общие, а
+        предпросмотр должен видеть и уже сохраненные статьи.
+        """
         pass
     
     @abstractmethod
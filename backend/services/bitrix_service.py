@@ -7,6 +7,7 @@ import logging
 from typing import Dict, Any, Optional
 from urllib.parse import urlparse, urlunparse
 from core.config import settings
+from services.image_store import image_store
 
 logger = logging.getLogger(__name__)
 
@@ -191,7 +192,8 @@ class BitrixService:
                 payload["main_type"] = main_type
                 
             if image_url:
-                payload["image_url"] = image_url
+                # Bitrix скачивает изображение сам: отдаем вариант нужного размера, а не исходный PNG
+                payload["image_url"] = image_store.variant_url(image_url, "bitrix")
                 
             if seo_title:
                 payload["seo_title"] = seo_title
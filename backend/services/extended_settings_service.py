@@ -352,6 +352,9 @@ class ExtendedSettingsService:
                 
                 session.commit()
             
+            from services.settings_service import settings_service
+            settings_service.invalidate_cache()
+            
             logger.info("Initialized all extended app settings")
             
         except Exception as e:
@@ -0,0 +1,400 @@
+"""
+Фоновые задачи генерации статей
+
+POST-запрос только ставит задачу в очередь (таблица generation_jobs) и сразу
+возвращает ее ID. Воркеры внутри процесса забирают задачи из базы, выполняют
+этапы text и image_prompt -> image (параллельно), затем save, и после каждого
+этапа сохраняют промежуточный результат. Поэтому задача переживает перезапуск, а повтор после
+ошибки продолжается с упавшего этапа, не оплачивая заново уже полученный текст.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import or_, update
+from sqlmodel import select
+
+from core.config import settings
+from database.connection import DatabaseSession
+from database.models import Article, GenerationJob, ProjectType, moscow_now
+from database.schemas import ArticleFormattingOptions
+from services.news_generation_service import news_generation_service
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["text", "image_prompt", "image", "save"]
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class GenerationJobService:
+    """Очередь задач генерации в БД и пул воркеров текущего процесса"""
+
+    def __init__(self):
+        self.worker_id = f"{uuid4().hex[:12]}"
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    # ---------- Работа с задачами ----------
+
+    def submit(self, draft_id: int, formatting_options: Optional[ArticleFormattingOptions] = None, created_by: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Постановка задачи генерации статьи в очередь
+
+        Если для черновика уже есть незавершенная задача, возвращается она.
+        """
+        with DatabaseSession() as session:
+            active = session.exec(
+                select(GenerationJob)
+                .where(GenerationJob.draft_id == draft_id, GenerationJob.status.in_(["queued", "running"]))
+                .order_by(GenerationJob.created_at.desc())
+            ).first()
+            if active:
+                return self._to_dict(active)
+
+            job = GenerationJob(
+                draft_id=draft_id,
+                payload=json.dumps({
+                    "formatting_options": formatting_options.dict() if formatting_options else None
+                }, ensure_ascii=False),
+                created_by=created_by
+            )
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            logger.info(f"Queued generation job {job.id} for draft {draft_id}")
+            result = self._to_dict(job)
+
+        self._notify()
+        return result
+
+    def resume(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Возврат упавшей задачи в очередь: выполнение продолжится с этапа ошибки"""
+        with DatabaseSession() as session:
+            job = session.get(GenerationJob, job_id)
+            if not job:
+                return None
+            if job.status == "failed":
+                job.status = "queued"
+                job.error_message = None
+                job.finished_at = None
+                job.updated_at = moscow_now()
+                session.add(job)
+                session.commit()
+                session.refresh(job)
+                logger.info(f"Resumed generation job {job_id} at stage '{job.stage}'")
+            result = self._to_dict(job)
+
+        self._notify()
+        return result
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Состояние задачи"""
+        with DatabaseSession() as session:
+            job = session.get(GenerationJob, job_id)
+            return self._to_dict(job) if job else None
+
+    def get_latest_job(self, draft_id: int) -> Optional[Dict[str, Any]]:
+        """Последняя задача генерации черновика"""
+        with DatabaseSession() as session:
+            job = session.exec(
+                select(GenerationJob)
+                .where(GenerationJob.draft_id == draft_id)
+                .order_by(GenerationJob.created_at.desc())
+            ).first()
+            return self._to_dict(job) if job else None
+
+    async def wait(self, job_id: int, timeout: float, interval: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Ожидание завершения задачи (опрос БД, работает и для задач других процессов)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if not job or job["status"] in TERMINAL_STATUSES or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _to_dict(job: GenerationJob) -> Dict[str, Any]:
+        state = json.loads(job.result) if job.result else {}
+        article = None
+        if job.status == "completed":
+            article = {
+                "draft_id": job.draft_id,
+                "news_text": state.get("news_text"),
+                "seo_title": state.get("seo_title"),
+                "seo_description": state.get("seo_description"),
+                "seo_keywords": state.get("seo_keywords", []),
+                "image_prompt": state.get("image_prompt"),
+                "image_url": state.get("image_url")
+            }
+        return {
+            "job_id": job.id,
+            "draft_id": job.draft_id,
+            "status": job.status,
+            "stage": job.stage,
+            "completed_stages": state.get("completed_stages", []),
+            "attempts": job.attempts,
+            "error_message": job.error_message,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "updated_at": job.updated_at,
+            "result": article
+        }
+
+    # ---------- Воркеры ----------
+
+    def start(self):
+        """Запуск воркеров в текущем event loop"""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(number))
+            for number in range(settings.GENERATION_JOB_WORKERS)
+        ]
+        logger.info(f"Generation job workers started: {len(self._workers)} (worker_id={self.worker_id})")
+
+    async def stop(self):
+        """Остановка воркеров; незавершенные задачи возвращаются в очередь"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        with DatabaseSession() as session:
+            session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.status == "running", GenerationJob.worker_id == self.worker_id)
+                .values(status="queued", worker_id=None, updated_at=moscow_now())
+            )
+        logger.info("Generation job workers stopped")
+
+    def _notify(self):
+        """Будит свободного воркера после постановки задачи"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker_loop(self, number: int):
+        while not self._stopping:
+            try:
+                job_id = self._claim_next()
+            except Exception as e:
+                logger.error(f"Generation worker {number}: failed to claim job: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.GENERATION_JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job_id)
+
+    def _claim_next(self) -> Optional[int]:
+        """
+        Захват следующей задачи
+
+        Берется задача из очереди или брошенная (нет heartbeat дольше
+        GENERATION_JOB_STALE_SECONDS). Условный UPDATE гарантирует, что
+        задачу получит только один воркер, в том числе из другого процесса.
+        """
+        stale_before = moscow_now() - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS)
+        claimable = or_(
+            GenerationJob.status == "queued",
+            (GenerationJob.status == "running") & (GenerationJob.heartbeat_at < stale_before)
+        )
+        with DatabaseSession() as session:
+            candidates = session.exec(
+                select(GenerationJob.id).where(claimable).order_by(GenerationJob.created_at).limit(5)
+            ).all()
+            for job_id in candidates:
+                now = moscow_now()
+                claimed = session.execute(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == job_id, claimable)
+                    .values(
+                        status="running",
+                        worker_id=self.worker_id,
+                        heartbeat_at=now,
+                        started_at=now,
+                        updated_at=now,
+                        attempts=GenerationJob.attempts + 1
+                    )
+                )
+                session.commit()
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    async def _heartbeat(self, job_id: int):
+        interval = max(1.0, settings.GENERATION_JOB_STALE_SECONDS / 4)
+        while True:
+            await asyncio.sleep(interval)
+            with DatabaseSession() as session:
+                session.execute(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == job_id, GenerationJob.worker_id == self.worker_id)
+                    .values(heartbeat_at=moscow_now())
+                )
+
+    def _save_progress(self, job_id: int, stage: str, state: Dict[str, Any]):
+        with DatabaseSession() as session:
+            session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(stage=stage, result=json.dumps(state, ensure_ascii=False), updated_at=moscow_now())
+            )
+
+    def _finish(self, job_id: int, status: str, error_message: Optional[str] = None):
+        now = moscow_now()
+        with DatabaseSession() as session:
+            session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(status=status, error_message=error_message, finished_at=now, updated_at=now, worker_id=None)
+            )
+
+    async def _run_job(self, job_id: int):
+        with DatabaseSession() as session:
+            job = session.get(GenerationJob, job_id)
+            draft_id = job.draft_id
+            state = json.loads(job.result) if job.result else {}
+            payload = json.loads(job.payload) if job.payload else {}
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        start_time = time.time()
+        try:
+            await self._run_stages(job_id, draft_id, state, payload)
+            self._finish(job_id, "completed")
+            logger.info(f"Generation job {job_id} completed in {time.time() - start_time:.1f}s")
+        except asyncio.CancelledError:
+            # Остановка процесса: задачу вернет в очередь stop() или проверка heartbeat
+            raise
+        except Exception as e:
+            failed_stage = self._current_stage(state.get("completed_stages", []))
+            logger.error(f"Generation job {job_id} failed at stage '{failed_stage}': {e}")
+            self._finish(job_id, "failed", str(e))
+            try:
+                news_generation_service.mark_draft_error(
+                    draft_id=draft_id,
+                    error_message=f"{failed_stage}: {e}",
+                    error_step="generation",
+                    can_retry=True
+                )
+                news_generation_service.log_generation_operation(
+                    draft_id=draft_id,
+                    operation_type="generation",
+                    model_used=state.get("metrics", {}).get("model_used", "gpt-4o"),
+                    success=False,
+                    processing_time_seconds=time.time() - start_time,
+                    error_message=str(e)
+                )
+            except Exception as log_error:
+                logger.error(f"Failed to record error for draft {draft_id}: {log_error}")
+        finally:
+            heartbeat.cancel()
+
+    async def _run_stages(self, job_id: int, draft_id: int, state: Dict[str, Any], payload: Dict[str, Any]):
+        """
+        Выполнение незавершенных этапов; результат каждого этапа сохраняется в БД
+
+        Текст и ветка промпт -> изображение независимы и выполняются
+        параллельно, сохранение - после обеих. Ошибка одной ветки не отменяет
+        другую: ее результат сохраняется, и повтор продолжится с этапа ошибки.
+        """
+        from services.ai_service import get_ai_service
+
+        draft = news_generation_service.get_draft(draft_id)
+        if not draft:
+            raise ValueError(f"Черновик с ID {draft_id} не найден")
+
+        with DatabaseSession() as session:
+            article = session.get(Article, draft.article_id)
+            original_title = article.title if article else "Без заголовка"
+
+        ai_service = get_ai_service()
+        completed = state.setdefault("completed_stages", [])
+        stage_seconds = state.setdefault("stage_seconds", {})
+        run_started = time.time()
+
+        def complete(stage: str, started: float):
+            stage_seconds[stage] = round(time.time() - started, 2)
+            completed.append(stage)
+            self._save_progress(job_id, self._current_stage(completed), state)
+
+        async def text_branch():
+            started = time.time()
+            options = payload.get("formatting_options")
+            text_data, metrics = await ai_service.generate_article_text(
+                summary=draft.summary,
+                facts=json.loads(draft.facts) if draft.facts else [],
+                project=ProjectType(draft.project),
+                original_title=original_title,
+                formatting_options=ArticleFormattingOptions(**options) if options else None
+            )
+            state.update(text_data)
+            state["metrics"] = metrics
+            complete("text", started)
+
+        async def image_branch():
+            if "image_prompt" not in completed:
+                started = time.time()
+                state["image_prompt"] = await ai_service.generate_image_prompt(draft.summary, original_title, raise_on_error=True)
+                complete("image_prompt", started)
+            if "image" not in completed:
+                started = time.time()
+                # Без подмены стоковым изображением: ошибка KIE должна остановить задачу на этапе image
+                state["image_url"], _ = await ai_service.regenerate_image(state["image_prompt"], raise_on_error=True)
+                complete("image", started)
+
+        self._save_progress(job_id, self._current_stage(completed), state)
+        branches = []
+        if "text" not in completed:
+            branches.append(text_branch())
+        if "image" not in completed:
+            branches.append(image_branch())
+        errors = [result for result in await asyncio.gather(*branches, return_exceptions=True) if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+        if "save" not in completed:
+            started = time.time()
+            news_generation_service.save_generated_content(
+                draft_id=draft_id,
+                generated_content={
+                    "news_text": state["news_text"],
+                    "seo_title": state["seo_title"],
+                    "seo_description": state["seo_description"],
+                    "seo_keywords": state["seo_keywords"],
+                    "image_prompt": state["image_prompt"],
+                    "image_url": state["image_url"]
+                }
+            )
+            news_generation_service.clear_draft_error(draft_id)
+            metrics = state.get("metrics", {})
+            news_generation_service.log_generation_operation(
+                draft_id=draft_id,
+                operation_type="generation",
+                model_used=metrics.get("model_used", "gpt-4o"),
+                success=True,
+                processing_time_seconds=time.time() - run_started,
+                tokens_used=metrics.get("tokens_used")
+            )
+            complete("save", started)
+
+    @staticmethod
+    def _current_stage(completed: List[str]) -> str:
+        """Первый незавершенный этап (save, если завершены все)"""
+        return next((stage for stage in STAGES if stage not in completed), STAGES[-1])
+
+
+# Глобальный экземпляр сервиса
+generation_job_service = GenerationJobService()
@@ -0,0 +1,189 @@
+"""
+Дисковый HTTP-кэш для парсеров новостей
+
+Хранит тела ответов вместе с ETag / Last-Modified и сроком свежести из
+Cache-Control. Парсер сначала отдает свежую запись без запроса, иначе
+отправляет условный GET (If-None-Match / If-Modified-Since) и при 304
+берет тело из кэша. Размер ограничен, вытесняются давно не используемые записи.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class HTTPCache:
+    """Кэш ответов в SQLite-файле с LRU-вытеснением по размеру"""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ленивое открытие базы кэша"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL DEFAULT 0,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Запись кэша для URL: text, etag, last_modified, fresh"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT etag, last_modified, expires_at, body, size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            etag, last_modified, expires_at, body, size = row
+            try:
+                text = zlib.decompress(body).decode("utf-8")
+            except (zlib.error, UnicodeDecodeError):
+                conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._total_bytes -= size
+                return None
+        return {
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": expires_at > time.time(),
+        }
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Заголовки условного запроса для имеющейся записи"""
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def _expires_at(headers) -> float:
+        """Срок свежести ответа по Cache-Control / Expires (0 - требуется проверка)"""
+        cache_control = (headers.get("Cache-Control") or "").lower()
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0.0
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            return time.time() + int(match.group(1))
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                pass
+        return 0.0
+
+    def store(self, url: str, text: str, headers) -> None:
+        """Сохранение ответа 200, если его можно проверить или он свежий"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        expires_at = self._expires_at(headers)
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return
+        if not etag and not last_modified and expires_at == 0.0:
+            return  # Такой ответ нельзя ни отдать из кэша, ни проверить
+
+        body = zlib.compress(text.encode("utf-8"))
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, expires_at, body, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, expires_at, body, len(body), time.time()),
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict(conn)
+
+    def touch(self, url: str, headers) -> None:
+        """Обновление записи после 304: время доступа, срок свежести и валидаторы"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE responses SET accessed_at = ?, expires_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), self._expires_at(headers), headers.get("ETag"), headers.get("Last-Modified"), url),
+            )
+
+    def mark_used(self, url: str) -> None:
+        """Обновление времени доступа при выдаче свежей записи"""
+        with self._lock:
+            self._connect().execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Удаление давно не используемых записей сверх лимита размера"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        removed = 0
+        rows = conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total_bytes -= size
+            removed += 1
+        if removed:
+            logger.info(f"HTTP cache: evicted {removed} entries, size {self._total_bytes} bytes")
+
+    def clear(self) -> None:
+        """Полная очистка кэша"""
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """Размер кэша"""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "size_bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+# Глобальный экземпляр кэша (None, если кэш отключен)
+http_cache: Optional[HTTPCache] = (
+    HTTPCache(
+        Path(settings.PARSER_HTTP_CACHE_DIR) / "responses.sqlite3",
+        settings.PARSER_HTTP_CACHE_MAX_MB * 1024 * 1024,
+    )
+    if settings.PARSER_HTTP_CACHE_ENABLED
+    else None
+)
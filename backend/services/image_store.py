@@ -0,0 +1,204 @@
+"""
+Хранилище изображений с адресацией по содержимому
+
+Оригинал сохраняется как storage/images/{sha256}.{ext}, поэтому одинаковые
+файлы (повторная загрузка, одна и та же картинка для нескольких черновиков)
+хранятся один раз. При сохранении в пуле процессов строятся уменьшенные
+варианты storage/images/{sha256}/{variant}.{format}: миниатюра для
+интерфейса, размер для Telegram и размер для Bitrix. Варианты отдаются той же
+статикой /images, так что Bitrix и Telegram получают файл нужного размера,
+а не исходный PNG на несколько мегабайт.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow не установлен: храним только оригиналы
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Вариант -> (максимальная сторона, форматы)
+VARIANTS: Dict[str, Tuple[int, Tuple[str, ...]]] = {
+    "thumb": (320, ("webp", "jpg")),
+    "telegram": (1280, ("jpg",)),
+    "bitrix": (1600, ("jpg", "webp")),
+}
+
+_STORE_NAME_RE = re.compile(r"/images/([0-9a-f]{64})\.(\w+)$")
+
+
+def _render_variants(source: str, target_dir: str, variants: Dict[str, Tuple[int, Tuple[str, ...]]]) -> List[str]:
+    """
+    Построение уменьшенных вариантов изображения (выполняется в пуле процессов)
+
+    Returns:
+        Имена созданных файлов
+    """
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    created = []
+    with Image.open(source) as original:
+        original.load()
+        has_alpha = original.mode in ("RGBA", "LA") or "transparency" in original.info
+        for variant, (max_side, formats) in variants.items():
+            image = original.copy()
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+            for fmt in formats:
+                name = f"{variant}.{fmt}"
+                partial = target / f"{name}.part"
+                if fmt == "jpg":
+                    converted = image.convert("RGBA" if has_alpha else "RGB")
+                    if has_alpha:
+                        # JPEG без прозрачности: подкладываем белый фон
+                        background = Image.new("RGB", converted.size, (255, 255, 255))
+                        background.paste(converted, mask=converted.split()[-1])
+                        converted = background
+                    converted.save(partial, "JPEG", quality=85, optimize=True, progressive=True)
+                else:
+                    image.save(partial, "WEBP", quality=80, method=4)
+                os.replace(partial, target / name)
+                created.append(name)
+    return created
+
+
+class ImageStore:
+    """Хранилище оригиналов и вариантов изображений"""
+
+    def __init__(self, root: Path, workers: int = 2, temp_dir: Optional[Path] = None):
+        self.root = Path(root)
+        # Рядом с хранилищем (тот же раздел - os.replace атомарен), но вне
+        # каталога, который отдается статикой /images
+        self.temp_dir = Path(temp_dir) if temp_dir else self.root.with_name(f"{self.root.name}_tmp")
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    # ---------- Сохранение ----------
+
+    async def ingest_bytes(self, data: bytes, extension: str) -> str:
+        """Сохранение изображения из памяти; возвращает имя файла оригинала"""
+        temp = self.temp_path(extension)
+        try:
+            await asyncio.to_thread(temp.write_bytes, data)
+            return await self.ingest_file(temp, extension)
+        except BaseException:
+            await asyncio.to_thread(temp.unlink, missing_ok=True)
+            raise
+
+    async def ingest_file(self, path: Path, extension: Optional[str] = None) -> str:
+        """
+        Перенос скачанного файла в хранилище
+
+        Файл переименовывается в {sha256}.{ext}; если такой оригинал уже есть,
+        временный файл удаляется. Затем строятся недостающие варианты.
+
+        Returns:
+            Имя файла оригинала ({sha256}.{ext})
+        """
+        path = Path(path)
+        extension = (extension or path.suffix.lstrip(".") or "png").lower()
+        digest = await asyncio.to_thread(self._sha256, path)
+        filename = f"{digest}.{extension}"
+        target = self.root / filename
+
+        if target.exists():
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+            logger.info(f"Image store: duplicate of {filename}, reused")
+        else:
+            await asyncio.to_thread(os.replace, path, target)
+            logger.info(f"Image store: saved {filename}")
+
+        await self.ensure_variants(digest, extension)
+        return filename
+
+    def temp_path(self, extension: str = "png") -> Path:
+        """Путь для временного файла в том же разделе, что и хранилище"""
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        return self.temp_dir / f"{uuid4().hex}.{extension}"
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def ensure_variants(self, digest: str, extension: str) -> List[str]:
+        """Построение недостающих вариантов в пуле процессов"""
+        if Image is None:
+            return []
+
+        variant_dir = self.root / digest
+        missing = {
+            variant: (max_side, tuple(fmt for fmt in formats if not (variant_dir / f"{variant}.{fmt}").exists()))
+            for variant, (max_side, formats) in VARIANTS.items()
+        }
+        missing = {variant: spec for variant, spec in missing.items() if spec[1]}
+        if not missing:
+            return []
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, _render_variants,
+                str(self.root / f"{digest}.{extension}"), str(variant_dir), missing
+            )
+        except Exception as e:
+            # Без вариантов будет отдаваться оригинал
+            logger.error(f"Image store: failed to build variants for {digest}: {e}")
+            return []
+
+    # ---------- Выдача ----------
+
+    def local_path(self, image_url: Optional[str], variant: Optional[str] = None, fmt: str = "jpg") -> Optional[Path]:
+        """
+        Локальный файл для URL изображения из хранилища
+
+        Для варианта возвращается его файл, если он построен, иначе оригинал.
+        None - изображение не из хранилища (внешний URL или старое имя).
+        """
+        match = _STORE_NAME_RE.search(image_url or "")
+        if not match:
+            return None
+        digest, extension = match.groups()
+        if variant:
+            candidate = self.root / digest / f"{variant}.{fmt}"
+            if candidate.exists():
+                return candidate
+        original = self.root / f"{digest}.{extension}"
+        return original if original.exists() else None
+
+    def variant_url(self, image_url: Optional[str], variant: str, fmt: str = "jpg") -> Optional[str]:
+        """URL варианта изображения; если варианта нет - исходный URL"""
+        match = _STORE_NAME_RE.search(image_url or "")
+        if not match:
+            return image_url
+        digest = match.group(1)
+        if not (self.root / digest / f"{variant}.{fmt}").exists():
+            return image_url
+        return image_url[:match.start()] + f"/images/{digest}/{variant}.{fmt}"
+
+    def close(self):
+        """Остановка пула процессов"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Глобальный экземпляр хранилища
+image_store = ImageStore(Path(settings.BASE_DIR) / "storage" / "images", workers=settings.IMAGE_STORE_WORKERS)
@@ -0,0 +1,193 @@
+"""
+Потоковый разбор JSON-ответа модели по полям
+
+Модель возвращает один JSON-объект ({"news_text": "...", "seo_title": "..."}),
+а при стриминге он приходит кусками произвольной длины. JsonFieldStream
+разбирает верхний уровень объекта по мере поступления текста:
+
+    field  - начато значение поля;
+    delta  - очередной фрагмент строкового значения (уже раскодированный);
+    value  - значение поля целиком (массивы и объекты - после json.loads).
+
+Разбор терпим к тому, что модели делают со "строгим" JSON: текст или
+```json перед объектом пропускается, сырые переносы строк внутри строк
+принимаются как есть. Итоговый ответ все равно разбирается обычным парсером;
+собранные здесь значения - запасной вариант, если он не справился.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+# Событие разбора: (тип, поле, данные)
+FieldEvent = Tuple[str, str, Any]
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStream:
+    """Инкрементальный разбор верхнего уровня JSON-объекта"""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.done = False
+        self._state = "start"
+        self._key = ""
+        self._field = None
+        self._escape = ""
+        self._high_surrogate = ""
+        self._raw: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._raw_escape = False
+
+    def feed(self, text: str) -> List[FieldEvent]:
+        """Разбор очередного фрагмента; возвращает события в порядке появления"""
+        events: List[FieldEvent] = []
+        chunk: List[str] = []
+
+        for char in text:
+            state = self._state
+
+            if state == "string":
+                if self._escape:
+                    self._escape += char
+                    decoded = self._decode_escape()
+                    if decoded:
+                        chunk.append(decoded)
+                        self._raw.append(decoded)
+                elif char == "\\":
+                    self._escape = char
+                elif char == '"':
+                    if chunk:
+                        events.append(("delta", self._field, "".join(chunk)))
+                        chunk = []
+                    self._finish_value("".join(self._raw), events)
+                else:
+                    chunk.append(char)
+                    self._raw.append(char)
+                continue
+
+            if state == "start":
+                if char == "{":
+                    self._state = "key"
+
+            elif state == "key":
+                if char == '"':
+                    self._key = ""
+                    self._state = "key_string"
+                elif char == "}":
+                    self.done = True
+                    self._state = "done"
+
+            elif state == "key_string":
+                if self._escape:
+                    self._escape += char
+                    decoded = self._decode_escape()
+                    if decoded:
+                        self._key += decoded
+                elif char == "\\":
+                    self._escape = char
+                elif char == '"':
+                    self._state = "colon"
+                else:
+                    self._key += char
+
+            elif state == "colon":
+                if char == ":":
+                    self._field = self._key
+                    self._raw = []
+                    self._state = "value"
+
+            elif state == "value":
+                if char.isspace():
+                    continue
+                events.append(("field", self._field, None))
+                if char == '"':
+                    self._state = "string"
+                elif char in "[{":
+                    self._raw.append(char)
+                    self._depth = 1
+                    self._in_string = False
+                    self._raw_escape = False
+                    self._state = "nested"
+                else:
+                    self._raw.append(char)
+                    self._state = "scalar"
+
+            elif state == "nested":
+                self._raw.append(char)
+                if self._in_string:
+                    if self._raw_escape:
+                        self._raw_escape = False
+                    elif char == "\\":
+                        self._raw_escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char in "[{":
+                    self._depth += 1
+                elif char in "]}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._finish_value(self._parse_raw("".join(self._raw)), events)
+
+            elif state == "scalar":
+                if char in ",}" or char.isspace():
+                    self._finish_value(self._parse_raw("".join(self._raw).strip()), events)
+                    if char == ",":
+                        self._state = "key"
+                    elif char == "}":
+                        self.done = True
+                        self._state = "done"
+                else:
+                    self._raw.append(char)
+
+            elif state == "after_value":
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self.done = True
+                    self._state = "done"
+
+        if chunk:
+            events.append(("delta", self._field, "".join(chunk)))
+        return events
+
+    def _decode_escape(self):
+        """Раскодирует накопленную escape-последовательность, None - если она еще не полная"""
+        escape = self._escape
+        if escape[1] != "u":
+            self._escape = ""
+            return _ESCAPES.get(escape[1], escape[1])
+        if len(escape) < 6:
+            return None
+        self._escape = ""
+        try:
+            code = int(escape[2:], 16)
+        except ValueError:
+            return escape
+        # Символы вне BMP приходят парой суррогатов \\uD83D\\uDE00
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = chr(code)
+            return ""
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate:
+            pair = self._high_surrogate + chr(code)
+            self._high_surrogate = ""
+            decoded = pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        else:
+            decoded = chr(code)
+        return decoded
+
+    def _finish_value(self, value, events: List[FieldEvent]):
+        self.values[self._field] = value
+        events.append(("value", self._field, value))
+        self._raw = []
+        self._state = "after_value"
+
+    @staticmethod
+    def _parse_raw(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return raw
@@ -9,9 +9,10 @@ import base64
 import logging
 import time
 import asyncio
-from typing import Dict, Optional
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import httpx
-import requests
 from httpx import HTTPStatusError, TimeoutException
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,8 @@ class KieNanoBananaClient:
     Особенности:
     - Text-to-Image генерация через Google Gemini 2.5 Flash
     - Асинхронные операции для высокой производительности
-    - Автоматический polling до завершения задачи
+    - Адаптивный polling до завершения задачи (сначала часто, затем реже)
+    - Опрос множества задач одним циклом (wait_for_many)
     - Retry логика с exponential backoff
     - Обработка rate limits (429 ошибок)
     """
@@ -35,7 +37,12 @@ class KieNanoBananaClient:
         base_url: str = "https://api.kie.ai/api/v1",
         timeout: int = 600,
         max_poll_attempts: int = 120,
-        poll_interval: int = 5
+        poll_interval: int = 5,
+        max_image_bytes: int = 20 * 1024 * 1024,
+        download_timeout: int = 60,
+        poll_min_interval: float = 1.0,
+        poll_backoff: float = 1.5,
+        max_parallel_polls: int = 10
     ):
         """
         Инициализация клиента
@@ -44,8 +51,13 @@ class KieNanoBananaClient:
             api_key: KIE AI API ключ
             base_url: Базовый URL API
             timeout: Таймаут для HTTP запросов (секунды) - по умолчанию 600 (10 минут)
-            max_poll_attempts: Максимальное количество попыток polling - по умолчанию 120 (10 минут при интервале 5 сек)
-            poll_interval: Интервал между polling запросами (секунды) - по умолчанию 5
+            max_poll_attempts: Вместе с poll_interval задает общее время ожидания задачи - по умолчанию 120 (10 минут при интервале 5 сек)
+            poll_interval: Максимальный интервал между polling запросами (секунды) - по умолчанию 5
+            max_image_bytes: Максимальный размер скачиваемого изображения (байты)
+            download_timeout: Таймаут скачивания изображения (секунды)
+            poll_min_interval: Первый интервал polling (секунды), дальше он растет до poll_interval
+            poll_backoff: Множитель интервала после каждого опроса
+            max_parallel_polls: Максимум одновременных запросов статуса в wait_for_many
         """
         if not api_key:
             raise ValueError("KIE API key is required")
@@ -55,6 +67,11 @@ class KieNanoBananaClient:
         self.timeout = timeout
         self.max_poll_attempts = max_poll_attempts
         self.poll_interval = poll_interval
+        self.max_image_bytes = max_image_bytes
+        self.download_timeout = download_timeout
+        self.poll_min_interval = min(poll_min_interval, poll_interval)
+        self.poll_backoff = poll_backoff
+        self.max_parallel_polls = max_parallel_polls
 
         self.headers = {
             'Content-Type': 'application/json',
@@ -136,36 +153,94 @@ class KieNanoBananaClient:
                     logger.error(f"HTTP {status_code}: {error_detail}")
                     raise
 
-    async def get_task_status(self, task_id: str) -> Dict:
+    async def get_task_status(self, task_id: str, client: Optional[httpx.AsyncClient] = None) -> Dict:
         """
         Получает статус задачи
 
         Args:
             task_id: Идентификатор задачи
+            client: HTTP клиент для переиспользования соединения (опционально)
 
         Returns:
             Словарь с информацией о задаче
         """
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout) as own_client:
+                return await self.get_task_status(task_id, client=own_client)
+
         endpoint = f"{self.base_url}/jobs/recordInfo"
         params = {"taskId": task_id}
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
+        response = await client.get(endpoint, headers=self.headers, params=params)
+        response.raise_for_status()
+
+        result = response.json()
+
+        # API возвращает: {"code": 200, "data": {...}}
+        if result.get("code") != 200:
+            error_msg = result.get("message", "Unknown error")
+            logger.error(f"KIE API error getting task status: {error_msg}")
+            raise ValueError(f"KIE API error: {error_msg}")
+
+        return result.get("data", {})
+
+    def _next_interval(self, interval: float) -> float:
+        """Следующий интервал polling"""
+        return min(interval * self.poll_backoff, self.poll_interval)
 
-            result = response.json()
+    @staticmethod
+    def _retry_after(response: httpx.Response, default: float) -> float:
+        """Пауза из заголовка Retry-After (секунды или HTTP-дата)"""
+        value = response.headers.get("Retry-After")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return default
+
+    def _poll_deadline(self) -> float:
+        """Общее время ожидания задачи (как при прежнем фиксированном polling)"""
+        return time.monotonic() + self.max_poll_attempts * self.poll_interval
+
+    @staticmethod
+    def _is_finished(task_id: str, task_info: Dict, elapsed: float) -> bool:
+        """
+        Проверка статуса задачи
 
-            # API возвращает: {"code": 200, "data": {...}}
-            if result.get("code") != 200:
-                error_msg = result.get("message", "Unknown error")
-                logger.error(f"KIE API error getting task status: {error_msg}")
-                raise ValueError(f"KIE API error: {error_msg}")
+        Returns:
+            True - задача выполнена, False - еще выполняется
 
-            return result.get("data", {})
+        Raises:
+            RuntimeError: Если задача завершилась с ошибкой
+        """
+        # API возвращает поле "state": "success", "fail", "waiting", "generating", etc.
+        status = task_info.get("state", "unknown")
+        logger.debug(f"  Task {task_id} status: {status} (elapsed: {elapsed:.0f}s)")
+
+        if status == "success":
+            logger.info(f"Task completed successfully: {task_id} (took {elapsed:.0f}s)")
+            return True
+
+        if status == "fail":
+            error_msg = task_info.get("failMsg", "Unknown error")
+            error_code = task_info.get("failCode", "N/A")
+            logger.error(f"Task failed: {task_id} - {error_code}: {error_msg}")
+            raise RuntimeError(f"Image generation failed ({error_code}): {error_msg}")
+
+        # Статусы "waiting", "generating", etc - продолжаем ждать
+        return False
 
     async def wait_for_completion(self, task_id: str) -> Dict:
         """
-        Ожидает завершения задачи с периодическим опросом
+        Ожидает завершения задачи с адаптивным опросом
+
+        Первые опросы идут с интервалом poll_min_interval, затем интервал
+        растет в poll_backoff раз до poll_interval. При 429 выдерживается
+        пауза из Retry-After.
 
         Args:
             task_id: Идентификатор задачи
@@ -177,63 +252,130 @@ class KieNanoBananaClient:
             TimeoutError: Если задача не завершилась за отведенное время
             RuntimeError: Если задача завершилась с ошибкой
         """
-        attempts = 0
-        start_time = time.time()
+        start_time = time.monotonic()
+        deadline = self._poll_deadline()
+        interval = self.poll_min_interval
+        polls = 0
 
         logger.info(f"Waiting for task completion: {task_id}")
 
-        while attempts < self.max_poll_attempts:
-            try:
-                task_info = await self.get_task_status(task_id)
-                # API возвращает поле "state": "success", "fail", "waiting", "generating", etc.
-                status = task_info.get("state", "unknown")
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            while time.monotonic() < deadline:
+                try:
+                    task_info = await self.get_task_status(task_id, client=client)
+                    polls += 1
+                    if self._is_finished(task_id, task_info, time.monotonic() - start_time):
+                        return task_info
+                    delay = interval
+                    interval = self._next_interval(interval)
+
+                except HTTPStatusError as e:
+                    if e.response.status_code != 429:
+                        raise
+                    # Rate limit - ждем сколько просит сервер и опрашиваем реже
+                    delay = self._retry_after(e.response, interval * 2)
+                    interval = min(interval * 2, self.poll_interval)
+                    logger.warning(f"Rate limit during polling, waiting {delay:.1f}s")
+
+                await asyncio.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+
+        elapsed = int(time.monotonic() - start_time)
+        raise TimeoutError(f"Task {task_id} did not complete in {elapsed}s ({polls} polls)")
+
+    async def wait_for_many(self, task_ids: List[str]) -> Dict[str, Union[Dict, Exception]]:
+        """
+        Ожидает завершения нескольких задач одним циклом опроса
 
-                elapsed = int(time.time() - start_time)
-                logger.debug(f"  [{attempts + 1}/{self.max_poll_attempts}] Status: {status} (elapsed: {elapsed}s)")
+        У каждой задачи свой адаптивный интервал; задачи, которым пора
+        опрашиваться, опрашиваются вместе через общий HTTP клиент (не более
+        max_parallel_polls запросов одновременно). Перед каждой пачкой
+        запросов проверяется пауза: 429 приостанавливает опрос всех задач
+        на время из Retry-After, и новые запросы до ее окончания не уходят.
 
-                if status == "success":
-                    logger.info(f"Task completed successfully: {task_id} (took {elapsed}s)")
-                    return task_info
+        Args:
+            task_ids: Идентификаторы задач
 
-                elif status == "fail":
-                    error_msg = task_info.get("failMsg", "Unknown error")
-                    error_code = task_info.get("failCode", "N/A")
-                    logger.error(f"Task failed: {task_id} - {error_code}: {error_msg}")
-                    raise RuntimeError(f"Image generation failed ({error_code}): {error_msg}")
+        Returns:
+            Словарь task_id -> информация о задаче или исключение
+            (RuntimeError - задача упала, TimeoutError - не успела)
+        """
+        start_time = time.monotonic()
+        deadline = self._poll_deadline()
+        # task_id -> (время следующего опроса, текущий интервал)
+        pending: Dict[str, Tuple[float, float]] = {task_id: (start_time, self.poll_min_interval) for task_id in task_ids}
+        results: Dict[str, Union[Dict, Exception]] = {}
+        paused_until = 0.0
+
+        logger.info(f"Waiting for {len(pending)} tasks")
+
+        limits = httpx.Limits(max_connections=self.max_parallel_polls)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+
+                due = [task_id for task_id, (next_at, _) in pending.items() if next_at <= now]
+                if not due or now < paused_until:
+                    wake_at = max(min(next_at for next_at, _ in pending.values()), paused_until)
+                    await asyncio.sleep(max(0.0, min(wake_at, deadline) - now))
+                    continue
 
-                else:
-                    # Статусы "waiting", "generating", etc - продолжаем ждать
-                    await asyncio.sleep(self.poll_interval)
-                    attempts += 1
+                # Пачками по max_parallel_polls: после 429 следующая пачка не отправляется
+                chunk = due[:self.max_parallel_polls]
+                responses = await asyncio.gather(
+                    *(self.get_task_status(task_id, client=client) for task_id in chunk),
+                    return_exceptions=True
+                )
 
-            except HTTPStatusError as e:
-                if e.response.status_code == 429:
-                    # Rate limit - увеличиваем интервал
-                    wait_time = self.poll_interval * 2
-                    logger.warning(f"Rate limit during polling, waiting {wait_time}s")
-                    await asyncio.sleep(wait_time)
-                    attempts += 1
-                else:
-                    raise
+                now = time.monotonic()
+                for task_id, response in zip(chunk, responses):
+                    interval = pending[task_id][1]
 
-        elapsed = int(time.time() - start_time)
-        raise TimeoutError(
-            f"Task {task_id} did not complete in {elapsed}s "
-            f"({self.max_poll_attempts} attempts)"
-        )
+                    if isinstance(response, HTTPStatusError) and response.response.status_code == 429:
+                        paused_until = max(paused_until, now + self._retry_after(response.response, interval * 2))
+                        pending[task_id] = (paused_until, min(interval * 2, self.poll_interval))
+                        continue
+
+                    if isinstance(response, BaseException):
+                        results[task_id] = response
+                        del pending[task_id]
+                        continue
+
+                    try:
+                        finished = self._is_finished(task_id, response, now - start_time)
+                    except RuntimeError as e:
+                        results[task_id] = e
+                        del pending[task_id]
+                        continue
 
-    def _extract_image_bytes(self, task_info: Dict) -> bytes:
+                    if finished:
+                        results[task_id] = response
+                        del pending[task_id]
+                    else:
+                        pending[task_id] = (now + interval, self._next_interval(interval))
+
+                if paused_until > now:
+                    logger.warning(f"Rate limit during polling, pausing {paused_until - now:.1f}s")
+
+        elapsed = int(time.monotonic() - start_time)
+        for task_id in pending:
+            results[task_id] = TimeoutError(f"Task {task_id} did not complete in {elapsed}s")
+
+        return results
+
+    def _extract_image_url(self, task_info: Dict) -> str:
         """
-        Извлекает image bytes из ответа API
+        Извлекает URL изображения из ответа API
 
         Args:
             task_info: Информация о завершенной задаче
 
         Returns:
-            Image bytes (PNG format)
+            URL сгенерированного изображения
 
         Raises:
-            ValueError: Если не удалось извлечь изображение
+            ValueError: Если в ответе нет URL
         """
         # API возвращает resultJson: "{\"resultUrls\":[\"https://...\"]}"
         result_json_str = task_info.get("resultJson")
@@ -244,29 +386,93 @@ class KieNanoBananaClient:
 
         try:
             result_data = json.loads(result_json_str)
-            result_urls = result_data.get("resultUrls", [])
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse resultJson: {e}")
+            raise ValueError(f"Invalid resultJson format: {e}")
 
-            if not result_urls:
-                raise ValueError("No resultUrls in resultJson")
+        result_urls = result_data.get("resultUrls", [])
+        if not result_urls:
+            raise ValueError("No resultUrls in resultJson")
 
-            image_url = result_urls[0]
-            logger.info(f"Downloading image from URL: {image_url}")
+        return result_urls[0]
 
-            # Загружаем изображение по URL
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
+    async def _stream_image(self, image_url: str, on_chunk: Callable[[bytes], Awaitable[None]]) -> int:
+        """
+        Потоковое скачивание изображения с ограничением размера
 
-            image_bytes = response.content
-            logger.debug(f"Downloaded image ({len(image_bytes)} bytes)")
-            return image_bytes
+        Args:
+            image_url: URL изображения
+            on_chunk: Обработчик очередного фрагмента
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse resultJson: {e}")
-            raise ValueError(f"Invalid resultJson format: {e}")
+        Returns:
+            Размер скачанного изображения в байтах
+
+        Raises:
+            ValueError: При ошибке скачивания или превышении max_image_bytes
+        """
+        logger.info(f"Downloading image from URL: {image_url}")
+        size = 0
+        try:
+            async with httpx.AsyncClient(timeout=self.download_timeout, follow_redirects=True) as client:
+                async with client.stream("GET", image_url) as response:
+                    response.raise_for_status()
+
+                    declared = int(response.headers.get("Content-Length") or 0)
+                    if declared > self.max_image_bytes:
+                        raise ValueError(f"Image is too large: {declared} bytes (limit {self.max_image_bytes})")
+
+                    async for chunk in response.aiter_bytes(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise ValueError(f"Image is larger than limit {self.max_image_bytes} bytes")
+                        await on_chunk(chunk)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Failed to download image: {e}")
             raise ValueError(f"Failed to download image: {e}")
 
+        logger.debug(f"Downloaded image ({size} bytes)")
+        return size
+
+    async def download_image(self, image_url: str) -> bytes:
+        """Скачивание изображения в память (асинхронно, с ограничением размера)"""
+        chunks = []
+
+        async def collect(chunk: bytes):
+            chunks.append(chunk)
+
+        await self._stream_image(image_url, collect)
+        return b"".join(chunks)
+
+    async def download_image_to_file(self, image_url: str, dest: Path) -> int:
+        """
+        Скачивание изображения сразу на диск
+
+        Фрагменты пишутся во временный файл в пуле потоков, чтобы запись не
+        блокировала event loop; после успешной загрузки файл переименовывается
+        в dest, при ошибке - удаляется.
+
+        Returns:
+            Размер файла в байтах
+        """
+        dest = Path(dest)
+        await asyncio.to_thread(dest.parent.mkdir, parents=True, exist_ok=True)
+        partial = dest.with_name(dest.name + ".part")
+        file = await asyncio.to_thread(open, partial, "wb")
+        try:
+            async def write(chunk: bytes):
+                await asyncio.to_thread(file.write, chunk)
+
+            size = await self._stream_image(image_url, write)
+            await asyncio.to_thread(file.close)
+            await asyncio.to_thread(os.replace, partial, dest)
+            return size
+        except BaseException:
+            await asyncio.to_thread(file.close)
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+            raise
+
     async def generate_image(
         self,
         prompt: str,
@@ -287,6 +493,73 @@ class KieNanoBananaClient:
         Raises:
             Exception: При неудачной генерации после всех попыток
         """
+        image_bytes = await self._generate(prompt, image_urls, max_retries, self.download_image)
+        logger.info(f"Image generated successfully ({len(image_bytes)} bytes)")
+        return image_bytes
+
+    async def generate_image_to_file(
+        self,
+        prompt: str,
+        dest: Path,
+        image_urls: Optional[list] = None,
+        max_retries: int = 3
+    ) -> int:
+        """
+        Полный цикл генерации изображения с сохранением результата в файл
+
+        Args:
+            prompt: Текстовое описание для генерации
+            dest: Путь к файлу изображения
+            image_urls: Список URL для редактирования (опционально)
+            max_retries: Максимальное количество попыток при ошибках
+
+        Returns:
+            Размер файла в байтах
+        """
+        size = await self._generate(
+            prompt, image_urls, max_retries,
+            lambda image_url: self.download_image_to_file(image_url, dest)
+        )
+        logger.info(f"Image generated successfully ({size} bytes): {dest}")
+        return size
+
+    async def generate_images_to_files(self, items: List[Tuple[str, Path]]) -> List[Union[int, Exception]]:
+        """
+        Генерация пакета изображений (например, для нескольких черновиков)
+
+        Все задачи создаются сразу, ожидаются одним циклом wait_for_many,
+        готовые изображения скачиваются параллельно. Повторов нет: ошибка
+        одной задачи не прерывает остальные.
+
+        Args:
+            items: Пары (промпт, путь к файлу изображения)
+
+        Returns:
+            Для каждого элемента размер файла в байтах или исключение
+        """
+        created = await asyncio.gather(
+            *(self.create_task(prompt) for prompt, _ in items),
+            return_exceptions=True
+        )
+        task_ids = [task_id for task_id in created if isinstance(task_id, str)]
+        finished = await self.wait_for_many(task_ids) if task_ids else {}
+
+        async def fetch(index: int):
+            task_id = created[index]
+            if isinstance(task_id, BaseException):
+                return task_id
+            task_info = finished[task_id]
+            if isinstance(task_info, BaseException):
+                return task_info
+            return await self.download_image_to_file(self._extract_image_url(task_info), items[index][1])
+
+        results = await asyncio.gather(*(fetch(index) for index in range(len(items))), return_exceptions=True)
+        succeeded = sum(1 for result in results if isinstance(result, int))
+        logger.info(f"Batch image generation: {succeeded}/{len(items)} succeeded")
+        return results
+
+    async def _generate(self, prompt: str, image_urls: Optional[list], max_retries: int, fetch_result: Callable):
+        """Создание задачи, ожидание и получение результата с повторами при ошибках"""
         last_error = None
 
         for attempt in range(max_retries):
@@ -297,18 +570,15 @@ class KieNanoBananaClient:
                 # Шаг 2: Ожидание завершения
                 task_info = await self.wait_for_completion(task_id)
 
-                # Шаг 3: Извлечение изображения
-                image_bytes = self._extract_image_bytes(task_info)
-
-                logger.info(f"Image generated successfully ({len(image_bytes)} bytes)")
-                return image_bytes
+                # Шаг 3: Скачивание изображения
+                return await fetch_result(self._extract_image_url(task_info))
 
             except HTTPStatusError as e:
                 status_code = e.response.status_code
 
                 if status_code == 429:
-                    # Rate limit - exponential backoff
-                    wait_time = (2 ** attempt) * 5  # 5, 10, 20 секунд
+                    # Rate limit - Retry-After или exponential backoff
+                    wait_time = self._retry_after(e.response, (2 ** attempt) * 5)  # 5, 10, 20 секунд
                     logger.warning(f"Rate limit exceeded, retry {attempt + 1}/{max_retries} after {wait_time}s")
                     await asyncio.sleep(wait_time)
                     last_error = e
@@ -373,13 +643,15 @@ def get_kie_client(
         api_key = api_key or os.getenv("KIE_API_KEY")
         base_url = base_url or os.getenv("KIE_API_BASE_URL", "https://api.kie.ai/api/v1")
         timeout = timeout or int(os.getenv("KIE_TIMEOUT", "600"))
+        max_image_mb = int(os.getenv("KIE_MAX_IMAGE_MB", "20"))
 
         _kie_client_instance = KieNanoBananaClient(
             api_key=api_key,
             base_url=base_url,
             timeout=timeout,
             max_poll_attempts=120,  # 10 минут при интервале 5 сек
-            poll_interval=5
+            poll_interval=5,
+            max_image_bytes=max_image_mb * 1024 * 1024
         )
 
     return _kie_client_instance
@@ -0,0 +1,258 @@
+"""
+Кэш ответов модели по хэшу входных данных
+
+Выжимку одной и той же статьи и очистку одного и того же текста модель
+делает заново при каждом повторе (перегенерация черновика, повторный парсинг
+URL), хотя результат не меняется. Ключ записи - sha256 от операции, модели,
+параметров запроса и входных данных; запись живет LLM_CACHE_TTL_HOURS часов,
+сверх LLM_CACHE_MAX_ENTRIES вытесняются давно не используемые.
+
+Хранилище:
+    db   - таблица llm_response_cache, общая для всех воркеров;
+    disk - SQLite-файл в LLM_CACHE_DIR (по аналогии с HTTP-кэшем парсеров).
+
+Кэш включается LLM_CACHE_ENABLED=true; при ошибке хранилища запрос идет к
+модели как обычно.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, update
+from sqlmodel import select
+
+from core.config import settings
+from database.connection import DatabaseSession
+from database.models import LLMCacheEntry, moscow_now
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLLMCacheBackend:
+    """Записи кэша в SQLite-файле"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ленивое открытие базы кэша"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at ON llm_responses(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, tokens FROM llm_responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_responses SET hits = hits + 1, accessed_at = ? WHERE key = ?", (now, key))
+        return {"response": json.loads(row[0]), "tokens": row[1]}
+
+    def set(self, key: str, operation: str, model: str, response: Any, tokens: int, ttl_seconds: float, max_entries: int) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, operation, model, response, tokens, hits, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, operation, model, json.dumps(response, ensure_ascii=False), tokens, now + ttl_seconds, now),
+            )
+            conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+            # Давно не используемые записи сверх лимита
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_responses")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+
+class DatabaseLLMCacheBackend:
+    """
+    Записи кэша в таблице llm_response_cache основной базы
+
+    Удаление просроченных записей и обрезка по числу записей - запросы по всей
+    таблице, поэтому выполняются не на каждой записи, а раз в sweep_every
+    записей или когда оценка размера (результат последней очистки плюс записи
+    этого процесса после нее) превышает лимит. Просроченные записи до очистки
+    не отдаются: get проверяет expires_at.
+    """
+
+    def __init__(self, sweep_every: int = 100):
+        self.sweep_every = sweep_every
+        self._lock = threading.Lock()
+        self._writes_since_sweep = 0
+        self._estimated_entries: Optional[int] = None
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = moscow_now()
+        with DatabaseSession() as session:
+            entry = session.exec(
+                select(LLMCacheEntry).where(LLMCacheEntry.key == key, LLMCacheEntry.expires_at > now)
+            ).first()
+            if entry is None:
+                return None
+            result = {"response": json.loads(entry.response), "tokens": entry.tokens}
+            session.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key)
+                .values(hits=LLMCacheEntry.hits + 1, accessed_at=now)
+            )
+        return result
+
+    def set(self, key: str, operation: str, model: str, response: Any, tokens: int, ttl_seconds: float, max_entries: int) -> None:
+        now = moscow_now()
+        with DatabaseSession() as session:
+            entry = session.get(LLMCacheEntry, key) or LLMCacheEntry(key=key, operation=operation, model=model, response="", expires_at=now)
+            entry.operation = operation
+            entry.model = model
+            entry.response = json.dumps(response, ensure_ascii=False)
+            entry.tokens = tokens
+            entry.hits = 0
+            entry.created_at = now
+            entry.accessed_at = now
+            entry.expires_at = now + timedelta(seconds=ttl_seconds)
+            session.add(entry)
+
+        with self._lock:
+            self._writes_since_sweep += 1
+            due = (
+                self._estimated_entries is None
+                or self._writes_since_sweep >= self.sweep_every
+                or self._estimated_entries + self._writes_since_sweep > max_entries
+            )
+            if not due:
+                return
+            self._writes_since_sweep = 0
+
+        with DatabaseSession() as session:
+            session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now))
+            entries = session.exec(select(func.count()).select_from(LLMCacheEntry)).one()
+            if entries > max_entries:
+                # Обрезаем с запасом, чтобы заполненный кэш не чистился на каждой записи
+                excess = entries - max_entries + min(self.sweep_every, max_entries // 10)
+                stale = select(LLMCacheEntry.key).order_by(LLMCacheEntry.accessed_at).limit(excess)
+                session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale.scalar_subquery())))
+                entries -= excess
+        self._estimated_entries = entries
+
+    def clear(self) -> None:
+        with DatabaseSession() as session:
+            session.execute(delete(LLMCacheEntry))
+
+    def count(self) -> int:
+        with DatabaseSession() as session:
+            return session.exec(select(func.count()).select_from(LLMCacheEntry)).one()
+
+
+class LLMResponseCache:
+    """Кэш ответов модели с TTL и вытеснением по числу записей"""
+
+    def __init__(self, backend, ttl_seconds: float, max_entries: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(operation: str, model: str, params: Dict, inputs: Dict) -> str:
+        """Ключ записи: хэш операции, модели, параметров запроса и входных данных"""
+        payload = json.dumps(
+            {"operation": operation, "model": model, "params": params, "inputs": inputs},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Запись кэша: response (сохраненный ответ) и tokens (его стоимость), None - промах"""
+        try:
+            entry = await asyncio.to_thread(self.backend.get, key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.tokens_saved += entry["tokens"]
+        return entry
+
+    async def set(self, key: str, operation: str, model: str, response: Any, tokens: int) -> None:
+        """Сохранение ответа модели (ошибка хранилища не прерывает генерацию)"""
+        try:
+            await asyncio.to_thread(
+                self.backend.set, key, operation, model, response, tokens or 0, self.ttl_seconds, self.max_entries
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Полная очистка кэша"""
+        self.backend.clear()
+
+    def get_stats(self) -> Dict:
+        """Размер кэша и попадания с момента запуска процесса"""
+        return {
+            "entries": self.backend.count(),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+def _create_backend():
+    if settings.LLM_CACHE_BACKEND == "disk":
+        return DiskLLMCacheBackend(Path(settings.LLM_CACHE_DIR) / "responses.sqlite3")
+    return DatabaseLLMCacheBackend()
+
+
+# Глобальный экземпляр кэша (None, если кэш отключен)
+llm_cache: Optional[LLMResponseCache] = (
+    LLMResponseCache(_create_backend(), settings.LLM_CACHE_TTL_HOURS * 3600, settings.LLM_CACHE_MAX_ENTRIES)
+    if settings.LLM_CACHE_ENABLED
+    else None
+)
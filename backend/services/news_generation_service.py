@@ -6,6 +6,7 @@ import json
 import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from sqlalchemy import text
 from sqlmodel import Session, select
 from database.connection import DatabaseSession
 from database.models import moscow_now
@@ -16,9 +17,21 @@ from database.schemas import NewsGenerationDraftRead, GenerationLogRead
 
 logger = logging.getLogger(__name__)
 
+# Канал PostgreSQL NOTIFY, который слушает воркер публикаций
+PUBLICATION_NOTIFY_CHANNEL = "publication_schedule"
+
 
 class NewsGenerationService:
     """Сервис для работы с генерацией новостей"""
+
+    @staticmethod
+    def _notify_schedule_changed(session: Session, draft_id: int):
+        """Оповещение воркера публикаций об изменении расписания (доставляется при коммите)"""
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": PUBLICATION_NOTIFY_CHANNEL, "payload": str(draft_id)}
+            )
     
     @staticmethod
     def create_draft(
@@ -247,6 +260,7 @@ class NewsGenerationService:
                 draft.scheduled_at = scheduled_at
                 draft.updated_at = moscow_now()
 
+                NewsGenerationService._notify_schedule_changed(session, draft_id)
                 session.commit()
                 logger.info(f"Updated scheduled time for draft {draft_id} to {scheduled_at}")
                 return True
@@ -520,7 +534,9 @@ class NewsGenerationService:
         success: bool,
         tokens_used: Optional[int] = None,
         processing_time_seconds: Optional[float] = None,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        cache_hit: bool = False,
+        tokens_saved: Optional[int] = None
     ) -> int:
         """
         Логирование операции генерации
@@ -533,6 +549,8 @@ class NewsGenerationService:
             tokens_used: Количество использованных токенов
             processing_time_seconds: Время обработки в секундах
             error_message: Сообщение об ошибке
+            cache_hit: Ответ модели взят из кэша
+            tokens_saved: Токены, сэкономленные кэшем
             
         Returns:
             int: ID созданной записи лога
@@ -546,7 +564,9 @@ class NewsGenerationService:
                     success=success,
                     tokens_used=tokens_used,
                     processing_time_seconds=processing_time_seconds,
-                    error_message=error_message
+                    error_message=error_message,
+                    cache_hit=cache_hit,
+                    tokens_saved=tokens_saved
                 )
                 
                 session.add(log_entry)
@@ -593,6 +613,8 @@ class NewsGenerationService:
                         error_message=log.error_message,
                         tokens_used=log.tokens_used,
                         processing_time_seconds=log.processing_time_seconds,
+                        cache_hit=log.cache_hit,
+                        tokens_saved=log.tokens_saved,
                         created_at=log.created_at
                     )
                     for log in logs
@@ -738,6 +760,7 @@ class NewsGenerationService:
                 # Сохраняем дополнительные параметры в JSON для использования при публикации
                 draft.generated_seo_description = draft.generated_seo_description or ""
                 
+                NewsGenerationService._notify_schedule_changed(session, draft_id)
                 session.commit()
                 
                 logger.info(f"Scheduled publication for draft {draft_id} at {scheduled_at}")
@@ -766,6 +789,7 @@ class NewsGenerationService:
                     raise ValueError(f"Черновик с ID {draft_id} не найден")
                 
                 draft.scheduled_at = new_scheduled_at
+                NewsGenerationService._notify_schedule_changed(session, draft_id)
                 session.commit()
                 
                 logger.info(f"Rescheduled publication for draft {draft_id} to {new_scheduled_at}")
@@ -796,6 +820,7 @@ class NewsGenerationService:
                 
                 draft.status = "generated"
                 draft.scheduled_at = None
+                NewsGenerationService._notify_schedule_changed(session, draft_id)
                 session.commit()
                 
                 logger.info(f"Cancelled scheduled publication for draft {draft_id}")
@@ -1186,6 +1211,11 @@ class NewsGenerationService:
                 except Exception as e:
                     logger.warning(f"Could not delete logs for draft {draft_id}: {e}")
 
+                # Удаляем задачи фоновой генерации
+                from database.models import GenerationJob
+                for job in session.exec(select(GenerationJob).where(GenerationJob.draft_id == draft_id)).all():
+                    session.delete(job)
+
                 # Удаляем черновик
                 session.delete(draft)
                 session.commit()
@@ -4,7 +4,7 @@ from typing import List, Optional, Dict, Type
 from datetime import datetime
 
 from models.schemas import NewsSource
-from services.base_parser import BaseNewsParser
+from services.base_parser import BaseNewsParser, collect_fetch_stats, new_fetch_stats
 from services.medvestnik_parser import MedvestnikParser
 from services.ria_parser import RiaParser
 from services.aig_parser import AigParser
@@ -54,9 +54,16 @@ class NewsParserManager:
         source: str, 
         max_articles: int = 50, 
         date_filter: Optional[str] = None, 
-        fetch_full_content: bool = True
+        fetch_full_content: bool = True,
+        skip_known_urls: bool = False,
+        fetch_stats: Optional[Dict[str, int]] = None
     ) -> List[NewsSource]:
-        """Парсинг новостей из конкретного источника"""
+        """
+        Парсинг новостей из конкретного источника
+        
+        skip_known_urls - без уже сохраненных статей; в fetch_stats (см.
+        new_fetch_stats) записываются счетчики загрузок этого запуска.
+        """
         print(f"DEBUG: parse_news_from_source called for source: {source}")
         parser = self.get_parser(source)
         if not parser:
@@ -73,11 +80,20 @@ class NewsParserManager:
             
             logger.info(f"Starting news parsing from {source}")
             print(f"DEBUG: Calling parse_news_list for {source} with max_articles={max_articles}")
-            news_items = await parser.parse_news_list(
-                max_articles=max_articles,
-                date_filter=date_filter,
-                fetch_full_content=fetch_full_content
-            )
+            # Пропуск уже сохраненных статей до загрузки текста - только при парсинге
+            # в базу: для предпросмотра парсер должен возвращать и известные статьи
+            known_url_probe = None
+            if skip_known_urls:
+                from database.service import news_service
+                known_url_probe = news_service.get_known_urls
+            
+            with collect_fetch_stats(fetch_stats if fetch_stats is not None else new_fetch_stats()):
+                news_items = await parser.parse_news_list(
+                    max_articles=max_articles,
+                    date_filter=date_filter,
+                    fetch_full_content=fetch_full_content,
+                    known_url_probe=known_url_probe
+                )
             print(f"DEBUG: parse_news_list returned {len(news_items)} items for {source}")
             logger.info(f"Successfully parsed {len(news_items)} articles from {source}")
             return news_items
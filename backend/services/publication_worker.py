@@ -0,0 +1,164 @@
+"""
+Постоянно работающий воркер публикаций по расписанию
+
+В отличие от запуска scripts/publish_scheduled_news.py раз в минуту, процесс
+живет долго: пул соединений с БД и импортированные модули переиспользуются.
+Воркер спит до ближайшего scheduled_at и просыпается раньше по PostgreSQL
+NOTIFY, который отправляют schedule_publication / reschedule_publication /
+cancel_scheduled_publication, так что публикация происходит в течение
+секунд после наступления времени.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from core.config import settings
+from database.connection import DatabaseSession, engine
+from database.models import NewsGenerationDraft, moscow_now
+from services.news_generation_service import PUBLICATION_NOTIFY_CHANNEL
+from services.scheduler import publication_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class PublicationWorker:
+    """Цикл публикаций: публикация наступивших, сон до следующего события"""
+
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._listen_conn = None
+        # draft_id -> время (monotonic), раньше которого упавший черновик не повторяем
+        self._retry_at: Dict[int, float] = {}
+
+    async def run(self):
+        """Основной цикл (до вызова stop)"""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        logger.info("Publication worker started")
+
+        try:
+            while not self._stopping:
+                self._ensure_listener()
+                self._wakeup.clear()
+
+                # Недавно упавшие черновики ждут PUBLICATION_WORKER_RETRY_DELAY
+                now_monotonic = time.monotonic()
+                self._retry_at = {draft_id: at for draft_id, at in self._retry_at.items() if at > now_monotonic}
+                await publication_scheduler.process_scheduled_publications(exclude_draft_ids=set(self._retry_at))
+                stats = publication_scheduler.last_run_stats
+                if stats:
+                    retry_at = time.monotonic() + settings.PUBLICATION_WORKER_RETRY_DELAY
+                    for draft_id in stats["failed_draft_ids"]:
+                        self._retry_at[draft_id] = retry_at
+
+                delay = self._seconds_until_next()
+                if delay > 0:
+                    logger.debug(f"Publication worker sleeping {delay:.1f}s")
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._close_listener()
+            logger.info("Publication worker stopped")
+
+    def stop(self):
+        """Остановка после текущей итерации"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _seconds_until_next(self) -> float:
+        """
+        Время до следующей проверки
+
+        Ближайший scheduled_at без учета черновиков, ожидающих повтора; не
+        дольше PUBLICATION_WORKER_MAX_SLEEP (или интервала опроса без LISTEN).
+        """
+        now_monotonic = time.monotonic()
+        self._retry_at = {draft_id: at for draft_id, at in self._retry_at.items() if at > now_monotonic}
+
+        cap = settings.PUBLICATION_WORKER_MAX_SLEEP if self._listen_conn else settings.PUBLICATION_WORKER_POLL_INTERVAL
+        if self._retry_at:
+            cap = min(cap, min(self._retry_at.values()) - now_monotonic)
+
+        with DatabaseSession() as session:
+            query = select(func.min(NewsGenerationDraft.scheduled_at)).where(NewsGenerationDraft.status == "scheduled")
+            if self._retry_at:
+                query = query.where(NewsGenerationDraft.id.not_in(list(self._retry_at)))
+            next_at = session.exec(query).first()
+
+        if next_at is None:
+            return max(0.0, cap)
+
+        now = moscow_now()
+        if next_at.tzinfo is None:
+            next_at = next_at.replace(tzinfo=now.tzinfo)
+        return max(0.0, min((next_at - now).total_seconds(), cap))
+
+    # ---------- LISTEN/NOTIFY ----------
+
+    def _ensure_listener(self):
+        """Подписка на канал изменений расписания (только PostgreSQL)"""
+        if self._listen_conn is not None or engine.dialect.name != "postgresql":
+            return
+        try:
+            import psycopg2
+            import psycopg2.extensions
+
+            dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+            conn = psycopg2.connect(dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {PUBLICATION_NOTIFY_CHANNEL}")
+
+            asyncio.get_running_loop().add_reader(conn.fileno(), self._on_notify)
+            self._listen_conn = conn
+            logger.info(f"Listening for schedule changes on '{PUBLICATION_NOTIFY_CHANNEL}'")
+        except Exception as e:
+            logger.warning(f"LISTEN unavailable, polling every {settings.PUBLICATION_WORKER_POLL_INTERVAL}s: {e}")
+
+    def _on_notify(self):
+        """Чтение уведомлений из соединения LISTEN"""
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except Exception as e:
+            # Переподключение - в начале следующей итерации
+            logger.warning(f"LISTEN connection lost: {e}")
+            self._close_listener()
+            self._wakeup.set()
+            return
+
+        if conn.notifies:
+            draft_ids = [notify.payload for notify in conn.notifies]
+            conn.notifies.clear()
+            for draft_id in draft_ids:
+                # Изменение расписания - повод повторить черновик сразу
+                if draft_id.isdigit():
+                    self._retry_at.pop(int(draft_id), None)
+            logger.info(f"Schedule changed for drafts {draft_ids}, waking up")
+            self._wakeup.set()
+
+    def _close_listener(self):
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# Глобальный экземпляр воркера
+publication_worker = PublicationWorker()
@@ -13,7 +13,7 @@ from urllib.parse import urljoin, urlparse
 import logging
 
 from models.schemas import NewsSource
-from services.base_parser import BaseNewsParser
+from services.base_parser import BaseNewsParser, KnownURLProbe
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +29,8 @@ class RBCMedicalParser(BaseNewsParser):
         super().__init__(source_name="rbc_medical", base_url="https://www.rbc.ru")
         self.tag_url = "https://www.rbc.ru/life/tag/health"
     
-    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True) -> List[NewsSource]:
+    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True,
+                              known_url_probe: Optional[KnownURLProbe] = None) -> List[NewsSource]:
         """Основной метод парсинга новостей с тега health"""
         articles = []
         
@@ -50,10 +51,10 @@ class RBCMedicalParser(BaseNewsParser):
                 logger.info(f"Парсим страницу {page}: {url}")
                 
                 # Получаем HTML страницы
-                async with self.session.get(url) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
+                html = await self._get_html(url)
+                if html is None:
+                    break
+                soup = await self._parse_html(html)
                 
                 # Ищем JSON-данные в скрипте
                 script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
@@ -77,11 +78,9 @@ class RBCMedicalParser(BaseNewsParser):
                     logger.info(f"Cursor: {last_cursor} -> {new_cursor}")
                     last_cursor = new_cursor
                     
-                    page_articles_count = 0
+                    # Собираем кандидатов со страницы, тексты статей загружаем параллельно
+                    candidates = []
                     for article_data in articles_data:
-                        if processed_count >= max_articles:
-                            break
-                        
                         try:
                             # Извлекаем данные из JSON
                             title = article_data.get('title', '').strip()
@@ -110,44 +109,26 @@ class RBCMedicalParser(BaseNewsParser):
                                     logger.debug(f"Статья не прошла фильтр по дате: {title}")
                                     continue
                             
-                            # Получаем контент
-                            content = ""
-                            if fetch_full_content:
-                                full_content, article_published_date = await self._fetch_full_article(article_url)
-                                if full_content:
-                                    content = full_content
-                                else:
-                                    # Используем описание из JSON
-                                    content = article_data.get('metaDescription', '').strip() or title
-                                
-                                # Если получили дату из статьи, используем её
-                                if article_published_date:
-                                    published_date = article_published_date
-                                
-                                # Добавляем задержку между запросами
-                                await asyncio.sleep(0.5)
-                            else:
-                                # Используем описание из JSON
-                                content = article_data.get('metaDescription', '').strip() or title
-                            
-                            # Создаем объект новости
-                            news_item = NewsSource(
-                                title=title,
-                                url=article_url,
-                                content=content,
-                                published_date=published_date,
-                                source_site="rbc.ru"
-                            )
-                            
-                            articles.append(news_item)
-                            processed_count += 1
-                            page_articles_count += 1
-                            logger.debug(f"Добавлена новость: {title}")
+                            description = article_data.get('metaDescription', '').strip()
+                            candidates.append((title, article_url, published_date, description))
                             
                         except Exception as e:
                             logger.error(f"Ошибка при обработке статьи: {e}")
                             continue
                     
+                    added = await self._fetch_stage(
+                        candidates,
+                        self._fetch_candidate if fetch_full_content else None,
+                        self._build_news_item,
+                        articles,
+                        max_articles,
+                        known_url_probe=known_url_probe
+                    )
+                    processed_count = len(articles)
+                    page_articles_count = len(added)
+                    for news_item in added:
+                        logger.debug(f"Добавлена новость: {news_item.title}")
+                    
                     # Проверяем, есть ли еще страницы
                     more_exists = json_data.get('props', {}).get('pageProps', {}).get('articles', {}).get('moreExists', False)
                     if not more_exists or page_articles_count == 0:
@@ -169,63 +150,85 @@ class RBCMedicalParser(BaseNewsParser):
         logger.info(f"Парсинг завершен. Получено {len(articles)} новостей")
         return articles
     
+    async def _fetch_candidate(self, candidate: tuple) -> tuple[Optional[str], Optional[datetime]]:
+        """Загрузка текста статьи для кандидата (title, url, date, description)"""
+        return await self._fetch_full_article(candidate[1])
+    
+    def _build_news_item(self, candidate: tuple, fetched: Optional[tuple]) -> NewsSource:
+        """Сборка новости из данных JSON страницы тега и загруженной статьи"""
+        title, article_url, published_date, description = candidate
+        full_content, article_published_date = fetched or (None, None)
+        
+        # Если получили дату из статьи, используем её
+        if article_published_date:
+            published_date = article_published_date
+        
+        # Без полного текста используем описание из JSON
+        return NewsSource(
+            title=title,
+            url=article_url,
+            content=full_content or description or title,
+            published_date=published_date,
+            source_site="rbc.ru"
+        )
+    
     async def _fetch_full_article(self, url: str) -> tuple[Optional[str], Optional[datetime]]:
         """Получение полного текста статьи и даты публикации"""
         try:
-            async with self.session.get(url) as response:
-                response.raise_for_status()
-                text = await response.text()
-                soup = BeautifulSoup(text, 'html.parser')
-                
-                # Извлекаем дату публикации из метаданных статьи
-                published_date = None
-                metadata = self._extract_article_metadata(soup, url)
-                if 'published_date' in metadata:
-                    published_date = metadata['published_date']
-                
-                # Ищем основной контент статьи - сначала пробуем найти контейнер
-                content_selectors = [
-                    '.article__text',
-                    '.article__content', 
-                    '.news-text',
-                    '.js-mediator-article',
-                    '[data-vr-contentbox]',
-                    '.article__text__overview'
-                ]
-                
-                content_parts = []
-                
-                # Пробуем найти основной контейнер статьи
-                main_container = None
-                for selector in content_selectors:
-                    container = soup.select_one(selector)
-                    if container:
-                        main_container = container
-                        break
-                
-                if main_container:
-                    # Убираем рекламные блоки и служебную информацию
-                    for unwanted in main_container.find_all(['script', 'style', '.banner', '.adv', '.social', '.promo']):
-                        unwanted.decompose()
-                    
-                    # Извлекаем параграфы из контейнера
-                    paragraphs = main_container.find_all(['p', 'div'])
-                    for p in paragraphs:
-                        text = p.get_text(strip=True)
-                        if text and len(text) > 30 and not any(skip in text.lower() for skip in ['реклама', 'подписаться', 'читайте также']):
-                            content_parts.append(text)
-                else:
-                    # Если не нашли контейнер, ищем все параграфы на странице
-                    paragraphs = soup.find_all('p')
-                    for p in paragraphs:
-                        text = p.get_text(strip=True)
-                        if text and len(text) > 30 and not any(skip in text.lower() for skip in ['реклама', 'подписаться', 'читайте также']):
-                            content_parts.append(text)
-                
-                content = '\n\n'.join(content_parts) if content_parts else None
-                
-                return content, published_date
+            text = await self._get_html(url)
+            if text is None:
+                return None, None
+            soup = await self._parse_html(text)
+            
+            # Извлекаем дату публикации из метаданных статьи
+            published_date = None
+            metadata = self._extract_article_metadata(soup, url)
+            if 'published_date' in metadata:
+                published_date = metadata['published_date']
+            
+            # Ищем основной контент статьи - сначала пробуем найти контейнер
+            content_selectors = [
+                '.article__text',
+                '.article__content', 
+                '.news-text',
+                '.js-mediator-article',
+                '[data-vr-contentbox]',
+                '.article__text__overview'
+            ]
+            
+            content_parts = []
+            
+            # Пробуем найти основной контейнер статьи
+            main_container = None
+            for selector in content_selectors:
+                container = soup.select_one(selector)
+                if container:
+                    main_container = container
+                    break
+            
+            if main_container:
+                # Убираем рекламные блоки и служебную информацию
+                for unwanted in main_container.find_all(['script', 'style', '.banner', '.adv', '.social', '.promo']):
+                    unwanted.decompose()
                 
+                # Извлекаем параграфы из контейнера
+                paragraphs = main_container.find_all(['p', 'div'])
+                for p in paragraphs:
+                    text = p.get_text(strip=True)
+                    if text and len(text) > 30 and not any(skip in text.lower() for skip in ['реклама', 'подписаться', 'читайте также']):
+                        content_parts.append(text)
+            else:
+                # Если не нашли контейнер, ищем все параграфы на странице
+                paragraphs = soup.find_all('p')
+                for p in paragraphs:
+                    text = p.get_text(strip=True)
+                    if text and len(text) > 30 and not any(skip in text.lower() for skip in ['реклама', 'подписаться', 'читайте также']):
+                        content_parts.append(text)
+            
+            content = '\n\n'.join(content_parts) if content_parts else None
+            
+            return content, published_date
+            
         except Exception as e:
             logger.error(f"Ошибка при получении полного текста статьи {url}: {e}")
             return None, None
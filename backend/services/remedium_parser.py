@@ -12,37 +12,85 @@ from datetime import datetime
 import logging
 
 from models.schemas import NewsSource
-from services.base_parser import BaseNewsParser
+from services.base_parser import BaseNewsParser, KnownURLProbe
 
 logger = logging.getLogger(__name__)
 
 class RemediumParser(BaseNewsParser):
     """Парсер для сайта Remedium.ru"""
     
+    # Страницы списка по PAGEN_2: с первой (самые новые) до последней допустимой
+    FIRST_PAGE = 1528
+    LAST_PAGE = 1400
+    
     def __init__(self):
         super().__init__(source_name="remedium", base_url="https://remedium.ru")
         self.news_url = f"{self.base_url}/news/"
     
-    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True) -> List[NewsSource]:
-        """Парсинг списка новостей с главной страницы"""
-        articles = await self.parse_news(limit=max_articles)
+    async def parse_news_list(self, max_articles: int = 10, date_filter: Optional[str] = None, fetch_full_content: bool = True,
+                              known_url_probe: Optional[KnownURLProbe] = None) -> List[NewsSource]:
+        """Парсинг списка новостей с поддержкой пагинации, тексты статей загружаются параллельно"""
+        articles = []
+        seen_urls = set()  # Для отслеживания уникальных URL
         
-        # Если нужен полный контент, загружаем его для каждой статьи
-        if fetch_full_content and articles:
-            logger.info(f"Загружаем полный контент для {len(articles)} статей Remedium")
-            for i, article in enumerate(articles):
-                try:
-                    # Конвертируем HttpUrl в строку
-                    url_str = str(article.url)
-                    full_article = await self.fetch_full_article(url_str)
-                    if full_article and full_article.content:
-                        articles[i].content = full_article.content
-                        logger.info(f"Загружен полный контент для статьи: {article.title[:50]}...")
-                except Exception as e:
-                    logger.warning(f"Не удалось загрузить полный контент для {str(article.url)}: {e}")
+        try:
+            # Нумерация страниц обратная: 1528 - самые новые
+            for page in range(self.FIRST_PAGE, self.LAST_PAGE - 1, -1):
+                if len(articles) >= max_articles:
+                    break
+                
+                page_items = await self._parse_list_page(page)
+                if not page_items:
+                    break
+                
+                # Собираем кандидатов со страницы
+                candidates = []
+                for item in page_items:
+                    url = str(item.url)  # Конвертируем HttpUrl в строку
+                    if url not in seen_urls:
+                        seen_urls.add(url)
+                        candidates.append((item.title, url, item))
+                
+                if not candidates:
+                    logger.info("Новых статей на странице нет, завершаем парсинг")
+                    break
+                
+                added = await self._fetch_stage(
+                    candidates,
+                    self._fetch_candidate if fetch_full_content else None,
+                    self._build_news_item,
+                    articles,
+                    max_articles,
+                    date_filter,
+                    known_url_probe=known_url_probe
+                )
+                logger.info(f"Со страницы {self.FIRST_PAGE - page + 1} добавлено {len(added)} статей")
+                
+                # Статьи страницы отсеяны по дате или уже сохранены - дальше в ленте только более старые
+                if not added:
+                    logger.info("Новых статей на странице нет, завершаем парсинг")
+                    break
+            else:
+                logger.warning("Достигнута минимальная страница поиска")
+            
+        except Exception as e:
+            logger.error(f"Ошибка парсинга Remedium.ru: {e}")
         
+        logger.info(f"Найдено {len(articles)} уникальных статей с Remedium.ru")
         return articles
     
+    async def _fetch_candidate(self, candidate: tuple) -> Optional[NewsSource]:
+        """Загрузка полного текста статьи для кандидата (title, url, item)"""
+        return await self.fetch_full_article(candidate[1])
+    
+    def _build_news_item(self, candidate: tuple, full_article: Optional[NewsSource]) -> NewsSource:
+        """Новость со страницы списка, с полным текстом, если он загружен"""
+        article = candidate[2]
+        if full_article and full_article.content:
+            article.content = full_article.content
+            logger.info(f"Загружен полный контент для статьи: {article.title[:50]}...")
+        return article
+    
     async def _fetch_full_article(self, url: str) -> Optional[NewsSource]:
         """Получение полного текста статьи"""
         return await self.fetch_full_article(url)
@@ -94,87 +142,43 @@ class RemediumParser(BaseNewsParser):
     async def fetch_page(self, url: str) -> Optional[str]:
         """Получение HTML страницы"""
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.error(f"Ошибка загрузки страницы {url}: {response.status}")
-                    return None
+            html = await self._get_html(url)
+            if html is None:
+                logger.error(f"Ошибка загрузки страницы {url}")
+            return html
         except Exception as e:
             logger.error(f"Ошибка получения страницы {url}: {e}")
             return None
 
-    async def parse_news(self, limit: int = 20) -> List[NewsSource]:
-        """Парсинг новостей с поддержкой пагинации"""
+    async def _parse_list_page(self, page: int) -> Optional[List[NewsSource]]:
+        """Статьи одной страницы списка (без видеозаметок); None, если страницу получить не удалось"""
+        page_url = f"{self.news_url}?PAGEN_2={page}"
+        logger.info(f"Парсинг страницы {self.FIRST_PAGE - page + 1}: {page_url}")
         
-        try:
-            articles = []
-            seen_urls = set()  # Для отслеживания уникальных URL
-            page = 1528  # Начинаем с первой страницы (самые новые)
-            articles_per_page = 39  # На каждой странице ~39 элементов
-            
-            while len(articles) < limit:
-                # Формируем URL для текущей страницы
-                page_url = f"{self.news_url}?PAGEN_2={page}"
-                logger.info(f"Парсинг страницы {1528 - page + 1}: {page_url}")
-                
-                html = await self.fetch_page(page_url)
-                if not html:
-                    logger.warning(f"Не удалось загрузить страницу {page}")
-                    break
-                
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Ищем новостные элементы
-                news_items = soup.find_all('div', class_='b-section-item')
-                
-                if not news_items:
-                    logger.info("Новостные элементы не найдены, завершаем парсинг")
-                    break
-                
-                page_articles = []
-                for item in news_items:
-                    # Проверяем, что это не видеозаметка
-                    if self._is_video_note(item):
-                        continue
-                        
-                    article_data = self._extract_article_data(item)
-                    if article_data and article_data.url not in seen_urls:
-                        seen_urls.add(article_data.url)
-                        page_articles.append(article_data)
-                        
-                        # Если достигли лимита, прерываем
-                        if len(articles) + len(page_articles) >= limit:
-                            break
-                
-                articles.extend(page_articles)
-                
-                logger.info(f"Со страницы {1528 - page + 1} получено {len(page_articles)} уникальных статей")
-                
-                # Если на странице мало статей и мы еще не достигли лимита, продолжаем
-                if len(page_articles) < 5 and len(articles) < limit * 0.8:
-                    logger.info("Мало статей на странице, но продолжаем поиск")
-                elif len(page_articles) == 0:
-                    logger.info("Статьи не найдены, завершаем парсинг")
-                    break
-                
-                # Переходим к следующей странице (более старые новости)
-                page -= 1
-                
-                # Защита от бесконечного цикла - увеличиваем диапазон поиска
-                if page < 1400:  # Расширяем диапазон поиска
-                    logger.warning("Достигнута минимальная страница поиска")
-                    break
-            
-            # Обрезаем до нужного лимита
-            articles = articles[:limit]
-            
-            logger.info(f"Найдено {len(articles)} уникальных статей с Remedium.ru")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Ошибка парсинга Remedium.ru: {e}")
-            return []
+        html = await self.fetch_page(page_url)
+        if not html:
+            logger.warning(f"Не удалось загрузить страницу {page}")
+            return None
+        
+        soup = await self._parse_html(html)
+        
+        # Ищем новостные элементы
+        news_items = soup.find_all('div', class_='b-section-item')
+        if not news_items:
+            logger.info("Новостные элементы не найдены, завершаем парсинг")
+            return None
+        
+        page_articles = []
+        for item in news_items:
+            # Проверяем, что это не видеозаметка
+            if self._is_video_note(item):
+                continue
+            
+            article_data = self._extract_article_data(item)
+            if article_data:
+                page_articles.append(article_data)
+        
+        return page_articles
     
     def _is_video_note(self, item) -> bool:
         """Проверяет, является ли элемент видеозаметкой врача"""
@@ -347,7 +351,7 @@ class RemediumParser(BaseNewsParser):
             if not html:
                 return None
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = await self._parse_html(html)
             
             return self._extract_full_article_content(soup, url)
             
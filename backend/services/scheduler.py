@@ -5,157 +5,248 @@
 import asyncio
 import logging
 import json
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
-from fastapi import BackgroundTasks
+from typing import Dict, List, Optional, Set
+from sqlalchemy import func
+from sqlmodel import select
 
-from services.news_generation_service import news_generation_service
+from core.config import settings
 from services.bitrix_service import bitrix_service
 from database.models import NewsGenerationDraft, NewsStatus, moscow_now
-from database.connection import DatabaseSession
+from database.connection import DatabaseSession, engine
 
 logger = logging.getLogger(__name__)
 
+# Проект по умолчанию для черновиков без published_project_code
+DEFAULT_PROJECT_CODE = "GS"
+
 
 class PublicationScheduler:
     """Планировщик автопубликации новостей"""
     
     def __init__(self):
         self.is_running = False
+        # Сводка последнего запуска process_scheduled_publications
+        self.last_run_stats: Optional[Dict] = None
     
-    async def process_scheduled_publications(self) -> int:
+    async def process_scheduled_publications(
+        self,
+        per_project_limit: Optional[int] = None,
+        exclude_draft_ids: Optional[Set[int]] = None
+    ) -> int:
         """
         Обработка всех запланированных публикаций
-        
+
+        Черновики разных проектов публикуются параллельно, внутри проекта -
+        не более per_project_limit одновременно (1 - по одному, как раньше).
+        Каждый черновик захватывается SELECT ... FOR UPDATE SKIP LOCKED и
+        остается заблокированным до записи результата, поэтому пересекающиеся
+        запуски cron или несколько реплик не публикуют его дважды.
+
+        Соединение (и блокировка) держится на время запроса к Bitrix, поэтому
+        одновременных публикаций не больше, чем позволяет пул соединений
+        (_pool_publication_slots): лишние воркеры ждут слота, а не блокируют
+        event loop на получении соединения из пула.
+
+        Args:
+            per_project_limit: Параллельных публикаций на проект
+                (по умолчанию PUBLICATION_CONCURRENCY_PER_PROJECT)
+            exclude_draft_ids: Черновики, которые в этом запуске не берем
+                (упавшие недавно - воркер повторяет их после задержки)
+
         Returns:
             int: Количество опубликованных новостей
         """
         try:
             logger.info("Starting scheduled publications processing")
-            
-            # Получаем все готовые к публикации
-            scheduled_draft_ids = news_generation_service.get_scheduled_publications()
-            
-            if not scheduled_draft_ids:
+            limit = max(1, per_project_limit or settings.PUBLICATION_CONCURRENCY_PER_PROJECT)
+            started = time.monotonic()
+
+            exclude_draft_ids = set(exclude_draft_ids or ())
+            projects = self._get_due_projects(exclude_draft_ids)
+            if not projects:
                 logger.info("No scheduled publications found")
+                self.last_run_stats = None
                 return 0
-            
-            published_count = 0
-            
-            for draft_id in scheduled_draft_ids:
-                try:
-                    await self._publish_draft(draft_id)
-                    published_count += 1
-                    logger.info(f"Successfully published draft {draft_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to publish draft {draft_id}: {e}")
-                    # Продолжаем обработку других черновиков
-                    continue
-            
-            logger.info(f"Scheduled publications processing completed. Published: {published_count}")
-            return published_count
-            
+
+            # Черновики, уже взятые в этом запуске (в том числе упавшие - до следующего запуска)
+            attempted: Set[int] = set(exclude_draft_ids)
+            results: List[Dict] = []
+            if engine.dialect.name == "postgresql":
+                slots = asyncio.Semaphore(self._pool_publication_slots())
+                await asyncio.gather(*(
+                    self._project_worker(project, attempted, results, slots)
+                    for project in projects
+                    for _ in range(limit)
+                ))
+            else:
+                # Без блокировок строк (SQLite, одно соединение) - строго по очереди
+                limit = 1
+                slots = asyncio.Semaphore(1)
+                for project in projects:
+                    await self._project_worker(project, attempted, results, slots)
+
+            self.last_run_stats = self._summarize_run(results, time.monotonic() - started, projects, limit)
+            logger.info(f"Scheduled publications processing completed: {self.last_run_stats}")
+            return self.last_run_stats["published"]
+
         except Exception as e:
             logger.error(f"Error in process_scheduled_publications: {e}")
             return 0
-    
-    async def _publish_draft(self, draft_id: int):
+
+    @staticmethod
+    def _get_due_projects(exclude_draft_ids: Optional[Set[int]] = None) -> List[str]:
+        """Проекты, у которых есть публикации, время которых наступило"""
+        with DatabaseSession() as session:
+            project = func.coalesce(NewsGenerationDraft.published_project_code, DEFAULT_PROJECT_CODE)
+            query = select(project).where(
+                NewsGenerationDraft.status == "scheduled",
+                NewsGenerationDraft.scheduled_at <= moscow_now()
+            ).distinct()
+            if exclude_draft_ids:
+                query = query.where(NewsGenerationDraft.id.not_in(exclude_draft_ids))
+            return list(session.exec(query).all())
+
+    @staticmethod
+    def _pool_publication_slots() -> int:
         """
-        Публикация конкретного черновика
-        
-        Args:
-            draft_id: ID черновика для публикации
+        Сколько публикаций могут идти одновременно, не исчерпав пул соединений
+
+        Публикация держит соединение с блокировкой черновика, а bitrix_service
+        во время нее читает настройки проекта вторым соединением.
         """
-        try:
-            # Получаем черновик в новой сессии
-            with DatabaseSession() as session:
-                draft = session.get(NewsGenerationDraft, draft_id)
-                if not draft:
-                    raise ValueError(f"Draft {draft_id} not found")
-                
-                # Формируем контент из полей черновика
-                generated_content = {
-                    "news_text": draft.generated_news_text,
-                    "seo_title": draft.generated_seo_title,
-                    "seo_description": draft.generated_seo_description,
-                    "seo_keywords": json.loads(draft.generated_seo_keywords) if draft.generated_seo_keywords else [],
-                    "image_prompt": draft.generated_image_prompt,
-                    "image_url": draft.generated_image_url
-                }
-                
-                project_code = draft.published_project_code or "GS"
-            
-            # Публикуем в Bitrix
-            result = await bitrix_service.publish_article(
-                title=generated_content.get("seo_title", ""),
-                preview_text=generated_content.get("seo_description", ""),
-                detail_text=generated_content.get("news_text", ""),
-                project_code=project_code,
-                source=None,
-                main_type=None,
-                image_url=generated_content.get("image_url"),
-                seo_title=generated_content.get("seo_title", ""),
-                seo_description=generated_content.get("seo_description", ""),
-                seo_keywords=", ".join(generated_content.get("seo_keywords", []))
-            )
-            
-            if result["success"]:
-                # Обновляем статус в БД
-                self._mark_as_published(
-                    draft_id=draft_id,
-                    project_code=project_code,
-                    project_name=result.get("project", "Неизвестный проект"),
-                    bitrix_id=result.get("bitrix_id")
-                )
-                
-                logger.info(f"Draft {draft_id} published successfully to Bitrix. ID: {result.get('bitrix_id')}")
-                
-                # Отправляем в Telegram
-                await self._send_to_telegram(draft_id, result.get("url"))
-                
-            else:
-                raise Exception(f"Bitrix publication failed: {result.get('error', 'Unknown error')}")
-                
-        except Exception as e:
-            logger.error(f"Error publishing draft {draft_id}: {e}")
-            # Можно добавить логику для повторных попыток или уведомлений
-            raise
-    
-    def _mark_as_published(
-        self, 
-        draft_id: int, 
-        project_code: str, 
-        project_name: str, 
-        bitrix_id: Optional[int] = None
+        pool = engine.pool
+        if not hasattr(pool, "size"):
+            return 1
+        # _max_overflow == -1 - без ограничения, в расчет не берем
+        capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+        return max(1, capacity // 2)
+
+    async def _project_worker(
+        self,
+        project_code: str,
+        attempted: Set[int],
+        results: List[Dict],
+        slots: asyncio.Semaphore
     ):
+        """Публикует черновики проекта по одному, пока есть незахваченные"""
+        while True:
+            async with slots:
+                if not await self._publish_next(project_code, attempted, results):
+                    return
+
+    async def _publish_next(self, project_code: str, attempted: Set[int], results: List[Dict]) -> bool:
         """
-        Отметить черновик как опубликованный
-        
-        Args:
-            draft_id: ID черновика
-            project_code: Код проекта
-            project_name: Название проекта
-            bitrix_id: ID в Bitrix
+        Захват и публикация следующего черновика проекта
+
+        Returns:
+            bool: False, если захватывать больше нечего
         """
-        try:
-            with DatabaseSession() as session:
-                draft = session.get(NewsGenerationDraft, draft_id)
-                if draft:
-                    draft.status = "published"
-                    draft.is_published = True
-                    draft.published_at = moscow_now()
-                    draft.published_project_code = project_code
-                    draft.published_project_name = project_name
-                    draft.bitrix_id = bitrix_id
-                    
-                    session.commit()
-                    logger.info(f"Marked draft {draft_id} as published")
-                
-        except Exception as e:
-            logger.error(f"Error marking draft {draft_id} as published: {e}")
-            raise
-    
+        with DatabaseSession() as session:
+            query = (
+                select(NewsGenerationDraft)
+                .where(
+                    NewsGenerationDraft.status == "scheduled",
+                    NewsGenerationDraft.scheduled_at <= moscow_now(),
+                    func.coalesce(NewsGenerationDraft.published_project_code, DEFAULT_PROJECT_CODE) == project_code
+                )
+                .order_by(NewsGenerationDraft.scheduled_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if attempted:
+                # SQLite не поддерживает блокировки строк: защищаемся и внутри процесса
+                query = query.where(NewsGenerationDraft.id.not_in(attempted))
+
+            draft = session.exec(query).first()
+            if not draft:
+                return False
+
+            draft_id = draft.id
+            attempted.add(draft_id)
+            started = time.monotonic()
+            now = moscow_now()
+            scheduled_at = draft.scheduled_at
+            if scheduled_at.tzinfo is None:
+                scheduled_at = scheduled_at.replace(tzinfo=now.tzinfo)
+            record = {"draft_id": draft_id, "project": project_code, "delay": (now - scheduled_at).total_seconds()}
+
+            try:
+                result = await self._publish_to_bitrix(draft, project_code)
+                # Запись результата в той же транзакции, что держит блокировку строки
+                self._apply_published(draft, project_code, result)
+                session.add(draft)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                record.update(success=False, duration=time.monotonic() - started)
+                results.append(record)
+                logger.error(f"Failed to publish draft {draft_id}: {e}")
+                return True
+
+        logger.info(f"Draft {draft_id} published successfully to Bitrix. ID: {result.get('bitrix_id')}")
+        await self._send_to_telegram(draft_id, result.get("url"))
+
+        record.update(success=True, duration=time.monotonic() - started)
+        results.append(record)
+        return True
+
+    @staticmethod
+    def _summarize_run(results: List[Dict], elapsed: float, projects: List[str], limit: int) -> Dict:
+        """Сводка запуска: пропускная способность и задержки"""
+        def percentile(values: List[float], share: float) -> float:
+            if not values:
+                return 0.0
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(share * len(values)))], 2)
+
+        durations = [r["duration"] for r in results if r["success"]]
+        delays = [r["delay"] for r in results if r["success"]]
+        published = len(durations)
+        return {
+            "published": published,
+            "failed": len(results) - published,
+            "projects": len(projects),
+            "per_project_limit": limit,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_per_minute": round(published / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "publish_seconds_p50": percentile(durations, 0.5),
+            "publish_seconds_p95": percentile(durations, 0.95),
+            "schedule_delay_seconds_p50": percentile(delays, 0.5),
+            "schedule_delay_seconds_max": percentile(delays, 1.0),
+            "failed_draft_ids": [r["draft_id"] for r in results if not r["success"]],
+        }
+
+    async def _publish_to_bitrix(self, draft: NewsGenerationDraft, project_code: str) -> Dict:
+        """Публикация черновика в Bitrix; исключение, если Bitrix вернул ошибку"""
+        seo_keywords = json.loads(draft.generated_seo_keywords) if draft.generated_seo_keywords else []
+        result = await bitrix_service.publish_article(
+            title=draft.generated_seo_title or "",
+            preview_text=draft.generated_seo_description or "",
+            detail_text=draft.generated_news_text or "",
+            project_code=project_code,
+            source=None,
+            main_type=None,
+            image_url=draft.generated_image_url,
+            seo_title=draft.generated_seo_title or "",
+            seo_description=draft.generated_seo_description or "",
+            seo_keywords=", ".join(seo_keywords)
+        )
+        if not result["success"]:
+            raise Exception(f"Bitrix publication failed: {result.get('error', 'Unknown error')}")
+        return result
+
+    @staticmethod
+    def _apply_published(draft: NewsGenerationDraft, project_code: str, result: Dict):
+        """Отметка черновика как опубликованного"""
+        draft.status = "published"
+        draft.is_published = True
+        draft.published_at = moscow_now()
+        draft.published_project_code = project_code
+        draft.published_project_name = result.get("project", "Неизвестный проект")
+        draft.bitrix_id = result.get("bitrix_id")
+
     async def start_scheduler(self, interval_minutes: int = 1):
         """
         Запуск планировщика
@@ -198,7 +289,7 @@ class PublicationScheduler:
         """
         try:
             # Импортируем функцию отправки в Telegram
-            from api.news_generation import send_to_telegram
+            from services.telegram_service import send_to_telegram
             
             # Получаем черновик для данных
             with DatabaseSession() as session:
@@ -2,6 +2,8 @@
 Сервис для управления настройками приложения
 """
 
+import threading
+import time
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlmodel import Session, select
@@ -23,8 +25,60 @@ logger = logging.getLogger(__name__)
 class SettingsService:
     """Сервис для управления настройками приложения"""
     
-    def __init__(self):
+    def __init__(self, cache_ttl: Optional[float] = None):
         self.session = DatabaseSession
+        
+        # Кэш всех app_settings одним снимком: get_app_setting вызывается
+        # по несколько раз на каждый запрос генерации (модель, температура, max_tokens)
+        if cache_ttl is None:
+            from core.config import settings as app_settings
+            cache_ttl = app_settings.SETTINGS_CACHE_TTL
+        self._cache_ttl = cache_ttl
+        self._cache: Optional[Dict[str, AppSettingsRead]] = None
+        self._cache_loaded_at = 0.0
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_invalidations = 0
+    
+    # Кэш настроек приложения
+    
+    def _get_settings_snapshot(self) -> Dict[str, AppSettingsRead]:
+        """Получить снимок всех настроек, перечитывая его из БД по истечении TTL"""
+        with self._cache_lock:
+            if self._cache is not None and time.monotonic() - self._cache_loaded_at < self._cache_ttl:
+                self._cache_hits += 1
+                return self._cache
+            self._cache_misses += 1
+            
+            with self.session() as session:
+                settings = session.exec(select(AppSettings)).all()
+                snapshot = {setting.setting_key: AppSettingsRead(**setting.__dict__) for setting in settings}
+            
+            self._cache = snapshot
+            self._cache_loaded_at = time.monotonic()
+            return snapshot
+    
+    def invalidate_cache(self):
+        """Сбросить кэш настроек (вызывается после любых изменений app_settings)"""
+        with self._cache_lock:
+            self._cache = None
+            self._cache_invalidations += 1
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Статистика кэша настроек"""
+        with self._cache_lock:
+            total = self._cache_hits + self._cache_misses
+            age = time.monotonic() - self._cache_loaded_at if self._cache is not None else None
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "invalidations": self._cache_invalidations,
+                "hit_ratio": round(self._cache_hits / total, 4) if total else 0.0,
+                "cached_settings": len(self._cache) if self._cache is not None else 0,
+                "snapshot_age_seconds": round(age, 1) if age is not None else None,
+                "ttl_seconds": self._cache_ttl
+            }
     
     # Методы для Bitrix проектов
     
@@ -113,13 +167,8 @@ class SettingsService:
             return [AppSettingsRead(**setting.__dict__) for setting in settings]
     
     def get_app_setting(self, setting_key: str) -> Optional[AppSettingsRead]:
-        """Получить конкретную настройку"""
-        with self.session() as session:
-            stmt = select(AppSettings).where(AppSettings.setting_key == setting_key)
-            setting = session.exec(stmt).first()
-            if setting:
-                return AppSettingsRead(**setting.__dict__)
-            return None
+        """Получить конкретную настройку (из кэша)"""
+        return self._get_settings_snapshot().get(setting_key)
     
     def create_app_setting(self, setting_data: AppSettingsCreate) -> AppSettingsRead:
         """Создать настройку"""
@@ -128,6 +177,7 @@ class SettingsService:
             session.add(setting)
             session.commit()
             session.refresh(setting)
+            self.invalidate_cache()
             return AppSettingsRead.model_validate(setting)
     
     def update_app_setting(self, setting_key: str, setting_data: AppSettingsUpdate) -> Optional[AppSettingsRead]:
@@ -148,6 +198,7 @@ class SettingsService:
             session.add(setting)
             session.commit()
             session.refresh(setting)
+            self.invalidate_cache()
             return AppSettingsRead.model_validate(setting)
     
     def delete_app_setting(self, setting_key: str) -> bool:
@@ -161,6 +212,7 @@ class SettingsService:
             
             session.delete(setting)
             session.commit()
+            self.invalidate_cache()
             return True
     
     def initialize_default_settings(self):
@@ -0,0 +1,97 @@
+"""
+Отправка сообщений в Telegram-канал
+
+Вынесено из api.news_generation, чтобы воркер публикаций мог отправлять
+посты, не импортируя FastAPI-роутеры.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Optional
+
+import httpx
+
+from core.config import settings
+from services.image_store import image_store
+
+logger = logging.getLogger(__name__)
+
+
+def convert_markdown_to_html(text: str) -> str:
+    """Конвертирует простую markdown разметку в HTML для Telegram"""
+    # Конвертируем **жирный** и *жирный* в <b>жирный</b>
+    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'\*(.*?)\*', r'<b>\1</b>', text)
+
+    # Конвертируем _курсив_ в <i>курсив</i>
+    text = re.sub(r'_(.*?)_', r'<i>\1</i>', text)
+
+    # Конвертируем `код` в <code>код</code>
+    text = re.sub(r'`(.*?)`', r'<code>\1</code>', text)
+
+    return text
+
+
+async def send_to_telegram(text: str, photo_url: Optional[str] = None) -> None:
+    """Отправка сообщения в Telegram-канал (текст или фото с подписью).
+
+    Если photo_url недоступен публично (например, localhost), пробуем скачать байты и загрузить файл.
+    """
+    try:
+        token = settings.TELEGRAM_BOT_TOKEN
+        chat_id = settings.TELEGRAM_CHAT_ID
+        if not token or not chat_id:
+            raise RuntimeError("TELEGRAM_BOT_TOKEN/CHAT_ID не настроены")
+
+        # Конвертируем markdown в HTML для корректного отображения в Telegram
+        formatted_text = convert_markdown_to_html(text)
+
+        async with httpx.AsyncClient(timeout=20.0) as client:
+            # Изображение из своего хранилища отправляем с диска в размере для Telegram
+            local_photo = image_store.local_path(photo_url, "telegram", "jpg") if photo_url else None
+            if local_photo:
+                img_bytes = await asyncio.to_thread(local_photo.read_bytes)
+                url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                mime = "image/jpeg" if local_photo.suffix == ".jpg" else f"image/{local_photo.suffix.lstrip('.')}"
+                files = {"photo": (local_photo.name, img_bytes, mime)}
+                data = {"chat_id": chat_id, "caption": formatted_text, "parse_mode": "HTML"}
+                await client.post(url, data=data, files=files)
+            elif photo_url:
+                # Пытаемся загрузить фото по URL и отправить как файл (надёжнее, чем отдавать URL)
+                try:
+                    # Изображения теперь генерируются и хранятся в том же backend сервисе
+                    fetch_url = photo_url
+                    try:
+                        from urllib.parse import urlparse, urlunparse
+                        parts = urlparse(photo_url)
+                        # Обновленная логика для локального доступа
+                        if parts.hostname in ("localhost", "127.0.0.1") and parts.port == 8000:
+                            # Используем localhost для доступа к собственным ресурсам
+                            fetch_url = photo_url
+                    except Exception:
+                        fetch_url = photo_url
+
+                    img_resp = await client.get(fetch_url)
+                    if img_resp.status_code == 200:
+                        img_bytes = img_resp.content
+                        url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                        files = {"photo": ("image.jpg", img_bytes, "image/jpeg")}
+                        data = {"chat_id": chat_id, "caption": formatted_text, "parse_mode": "HTML"}
+                        await client.post(url, data=data, files=files)
+                    else:
+                        # Фолбэк: пробуем передать как ссылку
+                        url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                        payload = {"chat_id": chat_id, "photo": photo_url, "caption": formatted_text, "parse_mode": "HTML"}
+                        await client.post(url, data=payload)
+                except Exception:
+                    # Фолбэк: отправляем как ссылку
+                    url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                    payload = {"chat_id": chat_id, "photo": photo_url, "caption": formatted_text, "parse_mode": "HTML"}
+                    await client.post(url, data=payload)
+            else:
+                url = f"https://api.telegram.org/bot{token}/sendMessage"
+                payload = {"chat_id": chat_id, "text": formatted_text, "parse_mode": "HTML", "disable_web_page_preview": False}
+                await client.post(url, json=payload)
+    except Exception as e:
+        logger.error(f"Error sending message to Telegram: {e}")
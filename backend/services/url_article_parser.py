@@ -5,12 +5,162 @@
 import asyncio
 import aiohttp
 import logging
-from typing import Optional, Dict, Any
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Iterable, List
 from urllib.parse import urlparse
 from pydantic import HttpUrl
 
+from core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Правила очистки контента, скомпилированные один раз при импорте.
+# Порядок важен: каждое правило применяется к результату предыдущего.
+# Второй элемент - подстрока, без которой правило не может сработать:
+# если ее нет в тексте, проход по документу пропускается (None - проверять всегда).
+_CLEANUP_RULES = [
+    # Ссылки на соцсети в формате [text](url)
+    (re.compile(r'\[.*?\]\(https?://(vk\.com|twitter\.com|facebook\.com|t\.me|instagram\.com|youtube\.com|ok\.ru|zen\.yandex\.ru)/[^\)]*\)'), '](http'),
+    # Строки только с символами/эмодзи/иконками
+    (re.compile(r'^[\s\*\[\]()•▪▫◦‣⁃]+$', re.MULTILINE), None),
+    # Copyright и годы
+    (re.compile(r'©\s*\d{4}(-\d{4})?'), '©'),
+    # Email адреса
+    (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '@'),
+    # Телефоны в формате +7, 8-800 и т.д.
+    (re.compile(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}'), None),
+    # ИНН, ОГРН, ОКПО (распространенные форматы)
+    (re.compile(r'\b(ИНН|ОГРН|ОКПО|КПП|ОКВЭД)[\s:]*\d+', re.IGNORECASE), None),
+    # Адреса (город, улица, дом)
+    (re.compile(r'\b(г\.|город|ул\.|улица|пр\.|проспект|д\.|дом)\s+[А-Яа-яёЁ0-9\s,.-]+'), None),
+    # Строки с количеством пользователей/просмотров
+    (re.compile(r'\*{2,}\s*(зарегистрированных|просмотров|пользователей)', re.IGNORECASE), '**'),
+]
+
+# Строки с навигацией, рекламой, модальными окнами и footer (поиск в строке в нижнем регистре)
+_SKIP_LINE_KEYWORDS = [
+    # Авторизация и регистрация
+    'image ', 'войти', 'вход', 'авторизуйтесь', 'авторизоваться', 'регистрация', 'зарегистрироваться',
+    'комментарии', 'комментировать', 'загрузить еще',
+    # Подписки и реклама
+    'подписаться', 'подписка', 'реклама', 'banner', 'написать нам',
+    # Cookie и модальные окна
+    'cookie', 'принять', 'подтвердите', 'совершеннолетн', 'возраст', '18+',
+    # Соцсети и мессенджеры
+    '[](http', 'vk.com', 'telegram', 'поделиться', 'twitter', 'whatsapp', 'viber', 'skype',
+    'facebook', 'youtube', 'instagram', 'яндекс.метрика',
+    # Footer и контакты
+    'рекламодателям', 'контакты', 'редакция', 'политика', 'оферта', 'пользовательское соглашение',
+    'инн', 'огрн', 'окпо', 'юридический адрес', 'наименование организации', 'ооо', 'ао', 'зао',
+    # Навигация
+    'читайте также', 'о нас', 'мероприятия', 'эксперты', 'специальности', 'главная',
+    # Дополнительный контент
+    'воспроизведение материалов', 'источник:', 'фото:', 'видео:',
+    'все права защищены', 'перепечатка', 'использование материалов',
+    'новостная лента', 'популярное', 'популярные новости', 'рекомендуем', 'по теме',
+    'смотрите также', 'больше новостей', 'следите за нами', 'ближайшие мероприятия',
+    'условия использования', 'читать далее', 'подробнее'
+]
+
+
+def _keyword_pattern(keywords: Iterable[str]) -> re.Pattern:
+    """
+    Одно регулярное выражение, находящее любое из ключевых слов
+
+    Слова сворачиваются в префиксное дерево ((?:в(?:ойти|ход)|...)), поэтому
+    поиск идет за один проход по строке без перебора слов. Для проверки
+    "есть ли хотя бы одно слово" продолжения слова не нужны: "вход"
+    находится раньше, чем "входить".
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return re.compile(build(trie))
+
+
+_SKIP_LINE_RE = _keyword_pattern(_SKIP_LINE_KEYWORDS)
+
+
+def _extract_with_trafilatura(html: bytes) -> Optional[str]:
+    """Извлечение текста статьи из HTML (выполняется в процессе пула)"""
+    from trafilatura import extract
+
+    return extract(
+        html,
+        include_comments=False,  # Без комментариев
+        include_tables=True,     # С таблицами (могут быть полезны в статьях)
+        no_fallback=False,       # Использовать fallback методы
+        favor_precision=True,    # Приоритет точности над полнотой
+        deduplicate=True,        # Удалить дубликаты
+    )
+
+
+class TrafilaturaExtractor:
+    """
+    Пул процессов для trafilatura.extract
+
+    Разбор HTML занимает до нескольких секунд CPU, поэтому выполняется вне
+    event loop. Каждый слот - отдельный однопроцессный исполнитель: при
+    таймауте или отмене запроса завершается только процесс этого извлечения,
+    остальные продолжают работу, а слот пересоздается при следующем вызове.
+    Одновременно выполняется не больше workers извлечений.
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._idle: List[Optional[ProcessPoolExecutor]] = [None] * workers
+        self._semaphore = asyncio.Semaphore(workers)
+
+    async def extract(self, html: bytes) -> Optional[str]:
+        """Текст статьи; asyncio.TimeoutError, если извлечение дольше timeout"""
+        async with self._semaphore:
+            executor = self._idle.pop() or ProcessPoolExecutor(max_workers=1)
+            loop = asyncio.get_running_loop()
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, _extract_with_trafilatura, html), self.timeout
+                )
+            except (asyncio.TimeoutError, asyncio.CancelledError, BrokenProcessPool):
+                # Запущенную в процессе задачу не отменить - завершаем сам процесс
+                self._terminate(executor)
+                self._idle.append(None)
+                raise
+            except BaseException:
+                self._idle.append(executor)
+                raise
+            self._idle.append(executor)
+            return result
+
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor):
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Остановка процессов пула"""
+        for executor in self._idle:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._idle = [None] * self.workers
+
+
+# Глобальный пул извлечения (процессы запускаются при первом фолбэке)
+trafilatura_extractor = TrafilaturaExtractor(settings.URL_PARSER_EXTRACT_WORKERS, settings.URL_PARSER_EXTRACT_TIMEOUT)
+
 
 class URLArticleParser:
     """
@@ -23,6 +173,7 @@ class URLArticleParser:
 
     JINA_READER_BASE_URL = "https://r.jina.ai"
     REQUEST_TIMEOUT = 30  # секунд
+    MAX_PAGE_BYTES = 20 * 1024 * 1024  # Предельный размер страницы для trafilatura
 
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
@@ -96,37 +247,17 @@ class URLArticleParser:
         Returns:
             Очищенный контент
         """
-        import re
-
-        # Удаляем ссылки на соцсети в формате [text](url)
-        content = re.sub(r'\[.*?\]\(https?://(vk\.com|twitter\.com|facebook\.com|t\.me|instagram\.com|youtube\.com|ok\.ru|zen\.yandex\.ru)/[^\)]*\)', '', content)
-
-        # Удаляем строки только с символами/эмодзи/иконками
-        content = re.sub(r'^[\s\*\[\]()•▪▫◦‣⁃]+$', '', content, flags=re.MULTILINE)
-
-        # Удаляем copyright и годы
-        content = re.sub(r'©\s*\d{4}(-\d{4})?', '', content)
-
-        # Удаляем email адреса
-        content = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', content)
-
-        # Удаляем телефоны в формате +7, 8-800 и т.д.
-        content = re.sub(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}', '', content)
-
-        # Удаляем ИНН, ОГРН, ОКПО (распространенные форматы)
-        content = re.sub(r'\b(ИНН|ОГРН|ОКПО|КПП|ОКВЭД)[\s:]*\d+', '', content, flags=re.IGNORECASE)
-
-        # Удаляем адреса (город, улица, дом)
-        content = re.sub(r'\b(г\.|город|ул\.|улица|пр\.|проспект|д\.|дом)\s+[А-Яа-яёЁ0-9\s,.-]+', '', content)
-
-        # Удаляем строки с количеством пользователей/просмотров
-        content = re.sub(r'\*{2,}\s*(зарегистрированных|просмотров|пользователей)', '', content, flags=re.IGNORECASE)
+        for pattern, required in _CLEANUP_RULES:
+            if required is None or required in content:
+                content = pattern.sub('', content)
 
         lines = content.split('\n')
+        # Нижний регистр - один раз для всего текста: lower() не меняет число строк
+        lowered_lines = content.lower().split('\n')
         cleaned_lines = []
         skip_until_title = True
 
-        for line in lines:
+        for line, lowered in zip(lines, lowered_lines):
             # Пропускаем всё до первого заголовка Title: или первого H1
             if skip_until_title:
                 if line.startswith('Title:') or line.startswith('# '):
@@ -135,29 +266,7 @@ class URLArticleParser:
                 continue
 
             # Пропускаем строки с навигацией, рекламой, модальными окнами и footer
-            if any(keyword in line.lower() for keyword in [
-                # Авторизация и регистрация
-                'image ', 'войти', 'вход', 'авторизуйтесь', 'авторизоваться', 'регистрация', 'зарегистрироваться',
-                'комментарии', 'комментировать', 'загрузить еще',
-                # Подписки и реклама
-                'подписаться', 'подписка', 'реклама', 'banner', 'написать нам',
-                # Cookie и модальные окна
-                'cookie', 'принять', 'подтвердите', 'совершеннолетн', 'возраст', '18+',
-                # Соцсети и мессенджеры
-                '[](http', 'vk.com', 'telegram', 'поделиться', 'twitter', 'whatsapp', 'viber', 'skype',
-                'facebook', 'youtube', 'instagram', 'яндекс.метрика',
-                # Footer и контакты
-                'рекламодателям', 'контакты', 'редакция', 'политика', 'оферта', 'пользовательское соглашение',
-                'инн', 'огрн', 'окпо', 'юридический адрес', 'наименование организации', 'ооо', 'ао', 'зао',
-                # Навигация
-                'читайте также', 'о нас', 'мероприятия', 'эксперты', 'специальности', 'главная',
-                # Дополнительный контент
-                'воспроизведение материалов', 'источник:', 'фото:', 'видео:',
-                'все права защищены', 'перепечатка', 'использование материалов',
-                'новостная лента', 'популярное', 'популярные новости', 'рекомендуем', 'по теме',
-                'смотрите также', 'больше новостей', 'следите за нами', 'ближайшие мероприятия',
-                'условия использования', 'читать далее', 'подробнее'
-            ]):
+            if _SKIP_LINE_RE.search(lowered):
                 continue
 
             # Пропускаем пустые строки подряд (больше 2)
@@ -256,10 +365,38 @@ class URLArticleParser:
 
         return metadata
 
+    async def _fetch_page(self, url: str) -> Optional[bytes]:
+        """
+        Загрузка страницы через сессию парсера
+
+        Байты передаются в trafilatura как есть: кодировку она определяет сама.
+        """
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                logger.warning(f"🔧 [TRAFILATURA] ❌ HTTP {response.status} for {url}")
+                return None
+            if (response.content_length or 0) > self.MAX_PAGE_BYTES:
+                logger.warning(f"🔧 [TRAFILATURA] ❌ Page too large: {response.content_length} bytes")
+                return None
+
+            chunks = []
+            size = 0
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                size += len(chunk)
+                if size > self.MAX_PAGE_BYTES:
+                    logger.warning(f"🔧 [TRAFILATURA] ❌ Page too large: over {self.MAX_PAGE_BYTES} bytes")
+                    return None
+                chunks.append(chunk)
+            return b"".join(chunks)
+
     async def _parse_via_trafilatura(self, url: str) -> Optional[str]:
         """
         Fallback парсинг через trafilatura для случаев, когда Jina не справился
 
+        Страница загружается асинхронно через сессию парсера, извлечение
+        текста идет в пуле процессов с таймаутом URL_PARSER_EXTRACT_TIMEOUT,
+        так что медленный сайт и тяжелый HTML не блокируют event loop.
+
         Args:
             url: URL для парсинга
 
@@ -267,30 +404,24 @@ class URLArticleParser:
             Извлеченный текст или None при ошибке
         """
         try:
-            from trafilatura import fetch_url, extract
-
             logger.info(f"🔧 [TRAFILATURA] ========== START FALLBACK ==========")
             logger.info(f"🔧 [TRAFILATURA] URL: {url}")
 
+            if not self.session:
+                raise RuntimeError("Session not initialized. Use 'async with' context manager.")
+
             # Загружаем страницу
             logger.info(f"🔧 [TRAFILATURA] Downloading page...")
-            downloaded = fetch_url(url)
+            downloaded = await self._fetch_page(url)
             if not downloaded:
                 logger.warning(f"🔧 [TRAFILATURA] ❌ Failed to download URL: {url}")
                 return None
             
             logger.info(f"🔧 [TRAFILATURA] ✅ Downloaded {len(downloaded)} bytes")
 
-            # Извлекаем контент с оптимальными настройками
+            # Извлекаем контент в пуле процессов
             logger.info(f"🔧 [TRAFILATURA] Extracting content...")
-            text = extract(
-                downloaded,
-                include_comments=False,  # Без комментариев
-                include_tables=True,     # С таблицами (могут быть полезны в статьях)
-                no_fallback=False,       # Использовать fallback методы
-                favor_precision=True,    # Приоритет точности над полнотой
-                deduplicate=True,        # Удалить дубликаты
-            )
+            text = await trafilatura_extractor.extract(downloaded)
 
             if text and len(text) > 100:
                 logger.info(f"🔧 [TRAFILATURA] ✅ Extracted {len(text)} characters")
@@ -303,6 +434,9 @@ class URLArticleParser:
         except ImportError:
             logger.error("🔧 [TRAFILATURA] ❌ Not installed! Run: pip install trafilatura")
             return None
+        except asyncio.TimeoutError:
+            logger.error(f"🔧 [TRAFILATURA] ❌ Timeout: download or extraction took too long for {url}")
+            return None
         except Exception as e:
             logger.error(f"🔧 [TRAFILATURA] ❌ Error: {str(e)}", exc_info=True)
             return None
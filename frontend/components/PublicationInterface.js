@@ -20,7 +20,7 @@ const PublicationInterface = ({ selectedPlatform }) => {
   const loadPublishedArticles = async () => {
     setLoading(true);
     try {
-      const data = await apiClient.request('/api/news/articles-with-publication-status?limit=100&offset=0');
+      const data = await apiClient.request('/api/news/articles-with-publication-status?limit=100&offset=0&include_content=false');
       if (data) {
         // Фильтруем только опубликованные статьи
         const published = data.filter(article => article.is_published);